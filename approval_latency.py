@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Approval-latency analytics for the stock issuance workflow.
+
+Streams exported stock_issuance_requests, inventory_verification_requests and
+approval_history rows and measures how long each stage of the multi-level
+flow takes:
+
+    Supervisor review          submitted_at -> supervisor_reviewed_at
+    Store keeper verification  verification created_at -> verified_at
+    Final approval             forwarded_to_admin (or supervisor review) -> approved/rejected
+    Issuance                   approved -> issued
+    End-to-end                 submitted_at -> issued
+
+Latencies go into mergeable quantile sketches (quantile_sketch.py), per stage
+and per wing, so memory does not grow with the number of samples. Request and
+verification partition files (``<table>-<part>.csv``) are scanned in parallel
+worker processes and their partial results merged; approval_history is
+streamed in order and each approval is released once its issue or rejection
+has been read.
+
+The JSON written by --out feeds the "Workflow Performance" section of
+create-ims-one-pager-docx.py.
+
+Usage:
+    python approval_latency.py <source> [--out FILE] [--jobs N]
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from ims_tables import iter_rows, norm_id, partitions, table_exists, to_timestamp
+from quantile_sketch import QuantileSketch
+
+DEFAULT_OUTPUT = "ims-workflow-performance.json"
+
+SUPERVISOR_REVIEW = "Supervisor review"
+VERIFICATION = "Store keeper verification"
+FINAL_APPROVAL = "Final approval"
+ISSUANCE = "Issuance"
+END_TO_END = "End-to-end"
+STAGES = (SUPERVISOR_REVIEW, VERIFICATION, FINAL_APPROVAL, ISSUANCE, END_TO_END)
+
+FORWARD_ACTIONS = ("forwarded_to_admin",)
+DECISION_ACTIONS = ("approved", "rejected")
+ISSUE_ACTIONS = ("issued",)
+
+
+class LatencyStats:
+    """Per-stage and per-(wing, stage) sketches."""
+
+    def __init__(self):
+        self.stages = {}
+        self.wings = {}
+
+    def add(self, stage, wing, seconds):
+        if seconds is None or seconds < 0:
+            return
+        sketch = self.stages.get(stage)
+        if sketch is None:
+            sketch = self.stages[stage] = QuantileSketch()
+        sketch.add(seconds)
+        if wing is not None:
+            sketch = self.wings.get((wing, stage))
+            if sketch is None:
+                sketch = self.wings[(wing, stage)] = QuantileSketch()
+            sketch.add(seconds)
+
+    def merge(self, other):
+        for key, sketch in other.stages.items():
+            if key in self.stages:
+                self.stages[key].merge(sketch)
+            else:
+                self.stages[key] = sketch
+        for key, sketch in other.wings.items():
+            if key in self.wings:
+                self.wings[key].merge(sketch)
+            else:
+                self.wings[key] = sketch
+        return self
+
+
+def _elapsed(start, end):
+    if start is None or end is None:
+        return None
+    return end - start
+
+
+def scan_requests(source, table):
+    """Supervisor-review latencies plus the request facts later stages need."""
+    stats = LatencyStats()
+    requests = {}
+    for req_id, wing, submitted, created, reviewed in iter_rows(
+        source, table,
+        ["id", "requester_wing_id", "submitted_at", "created_at", "supervisor_reviewed_at"],
+    ):
+        key = norm_id(req_id)
+        if key is None:
+            continue
+        wing = norm_id(wing)
+        submitted = to_timestamp(submitted) or to_timestamp(created)
+        reviewed = to_timestamp(reviewed)
+        requests[key] = (wing, submitted, reviewed)
+        stats.add(SUPERVISOR_REVIEW, wing, _elapsed(submitted, reviewed))
+    return stats, requests
+
+
+def scan_verifications(source, table):
+    stats = LatencyStats()
+    for wing, created, verified in iter_rows(source, table, ["wing_id", "created_at", "verified_at"]):
+        stats.add(VERIFICATION, norm_id(wing), _elapsed(to_timestamp(created), to_timestamp(verified)))
+    return stats
+
+
+def history_events(source, table):
+    """``(approval id, slot, time, final)`` per forward / decision / issue row.
+
+    Slots are 0 forward, 1 decision, 2 issue; an issue or a rejection is the
+    last action of its approval.
+    """
+    for approval_id, action, action_date in iter_rows(
+        source, table, ["request_approval_id", "action_type", "action_date"]
+    ):
+        key = norm_id(approval_id)
+        when = to_timestamp(action_date)
+        if key is None or when is None:
+            continue
+        action = (action or "").strip().lower()
+        if action in FORWARD_ACTIONS:
+            yield key, 0, when, False
+        elif action in DECISION_ACTIONS:
+            yield key, 1, when, action == "rejected"
+        elif action in ISSUE_ACTIONS:
+            yield key, 2, when, True
+
+
+def _scan(task):
+    kind, source, table = task
+    if kind == "requests":
+        return kind, scan_requests(source, table)
+    return kind, scan_verifications(source, table)
+
+
+def analyze(source, jobs=None):
+    """Scan every partition (in parallel) and return merged ``LatencyStats``.
+
+    approval_history is streamed in order in this process: an approval's
+    times are joined to its request and dropped as soon as its issue or
+    rejection is read, so only approvals still in flight are held, and only
+    requests that an approval still needs.
+    """
+    tasks = [("requests", source, t) for t in partitions(source, "stock_issuance_requests")]
+    tasks += [("verifications", source, t) for t in partitions(source, "inventory_verification_requests")]
+
+    # approval_history is keyed by request_approvals.id; map back to the request
+    approval_requests = {}
+    references = {}
+    if table_exists(source, "request_approvals"):
+        for approval_id, request_id in iter_rows(source, "request_approvals", ["id", "request_id"]):
+            request_id = norm_id(request_id)
+            approval_requests[norm_id(approval_id)] = request_id
+            references[request_id] = references.get(request_id, 0) + 1
+
+    stats = LatencyStats()
+    requests = {}
+    jobs = jobs or min(len(tasks), os.cpu_count() or 1) or 1
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_scan, tasks))
+    else:
+        results = [_scan(task) for task in tasks]
+
+    for kind, result in results:
+        if kind == "requests":
+            stats.merge(result[0])
+            requests.update((key, facts) for key, facts in result[1].items() if key in references)
+        else:
+            stats.merge(result)
+    del results
+
+    def finish(approval_id, times):
+        forwarded, decided, issued = times
+        request_id = approval_requests.pop(approval_id, None)
+        wing, submitted, reviewed = requests.get(request_id, (None, None, None))
+        if request_id in references:
+            references[request_id] -= 1
+            if not references[request_id]:
+                del references[request_id]
+                requests.pop(request_id, None)
+        stats.add(FINAL_APPROVAL, wing, _elapsed(forwarded or reviewed, decided))
+        stats.add(ISSUANCE, wing, _elapsed(decided, issued))
+        stats.add(END_TO_END, wing, _elapsed(submitted, issued))
+
+    # Earliest forward / decision / issue time per approval still in flight
+    pending = {}
+    for table in partitions(source, "approval_history"):
+        for key, slot, when, final in history_events(source, table):
+            times = pending.get(key)
+            if times is None:
+                times = pending[key] = [None, None, None]
+            if times[slot] is None or when < times[slot]:
+                times[slot] = when
+            if final:
+                finish(key, pending.pop(key))
+    for key, times in pending.items():
+        finish(key, times)
+    return stats
+
+
+def _summary(sketch):
+    p50, p90, p99 = sketch.quantiles((0.5, 0.9, 0.99))
+    return {"count": sketch.count, "mean": sketch.mean, "p50": p50, "p90": p90, "p99": p99}
+
+
+def report(stats, source):
+    wing_names = {}
+    if table_exists(source, "WingsInformation"):
+        wing_names = {norm_id(k): v for k, v in iter_rows(source, "WingsInformation", ["Id", "Name"])}
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "stages": [
+            dict(stage=stage, **_summary(stats.stages[stage]))
+            for stage in STAGES if stage in stats.stages
+        ],
+        "wings": [
+            dict(wing_id=wing, wing_name=wing_names.get(wing, wing), stage=stage, **_summary(sketch))
+            for (wing, stage), sketch in sorted(stats.wings.items(), key=lambda kv: (str(kv[0][0]), kv[0][1]))
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Approval workflow latency percentiles")
+    parser.add_argument("source", help="CSV export directory (partition files allowed) or SQLite stand-in")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="JSON for the one-pager generator")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per partition, up to CPU count)")
+    args = parser.parse_args(argv)
+
+    stats = analyze(args.source, args.jobs)
+    data = report(stats, args.source)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+    for row in data["stages"]:
+        print(f"{row['stage']:<28} n={row['count']:<7} p50={row['p50'] / 3600:7.1f}h "
+              f"p90={row['p90'] / 3600:7.1f}h p99={row['p99'] / 3600:7.1f}h")
+    print(f"Created: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the delete-button codemods.
+
+Generates deterministic synthetic TSX pages modelled on the real dashboard
+pages (ContractTender, UnifiedTenderManagement, items-master and the other
+pages the rules target) at several sizes and delete-block densities, then
+runs every rule set from hide-delete-buttons.py and
+hide-all-delete-buttons.py over them through the scripts' own
+``apply_patterns``.
+
+Each case records the best of N timed samples (fast cases are looped so
+a sample lasts at least 20 ms), bytes/sec, the tracemalloc peak of one
+extra run and the number of blocks commented out. Results are compared
+with a stored baseline; the run fails when a case is slower or uses more
+memory than the baseline by more than the threshold, or when its match
+count changes.
+
+Usage:
+    python bench_codemods.py [--sizes small,medium,large] [--densities sparse,typical,dense]
+                             [--repeat 5] [--threshold 0.25] [--baseline FILE]
+                             [--update-baseline] [--out FILE] [--filter TEXT]
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from ims_scripts import load_script
+
+DEFAULT_BASELINE = Path(__file__).parent / "benchmarks" / "codemods-baseline.json"
+BASELINE_VERSION = 1
+
+SIZES = {"small": 500, "medium": 5000, "large": 25000}
+DENSITIES = {"sparse": 0.02, "typical": 0.1, "dense": 0.5}
+NEAR_MISS_RATE = 0.1
+SEED = 20260310
+
+MIN_SAMPLE_SECONDS = 0.02
+
+# Noise floors: differences below these are never reported as regressions
+MIN_SECONDS_DELTA = 0.0005
+MIN_PEAK_DELTA_KIB = 64
+
+HIDDEN_MARKER = "Delete button hidden"
+
+# Templates use @N@ for the row number so the JSX braces need no escaping.
+EDIT_BUTTON = '''                      <Button variant="outline" size="sm" onClick={() => handleEdit(row@N@)}>
+                        <Edit className="w-4 h-4" />
+                      </Button>'''
+
+PAGES = {
+    "src/pages/ContractTender.tsx": {
+        "delete": [
+            '''
+                        <Button
+                          variant="outline"
+                          size="sm"
+                          onClick={() => handleDelete(tender.id)}
+                          className="text-red-600 hover:text-red-700 hover:bg-red-50"
+                        >
+                          <Trash2 className="w-4 h-4" />
+                        </Button>''',
+        ],
+        "near_miss": [
+            '''
+                                <PermissionGate permission="tender.delete">
+                                  <Button
+                                    variant="outline"
+                                    size="sm"
+                                    onClick={() => handleDelete(tender.id)}
+                                    disabled={deletingId === tender.id}
+                                    className="text-red-600 hover:text-red-700 hover:bg-red-50"
+                                  >
+                                    <Trash2 className="w-4 h-4" />
+                                  </Button>
+                                </PermissionGate>''',
+        ],
+    },
+    "src/pages/UnifiedTenderManagement.tsx": {
+        "delete": [
+            '''
+                        <Button
+                          variant="outline"
+                          size="sm"
+                          onClick={(e) => {
+                            e.stopPropagation();
+                            deleteDelivery(delivery@N@.id, delivery@N@.delivery_number);
+                          }}
+                          className="h-6 w-6 p-0 text-red-600 hover:text-red-700 hover:bg-red-50"
+                          title="Delete delivery"
+                        >
+                          <Trash2 className="w-3 h-3" />
+                        </Button>''',
+            '''
+                        <div className="flex justify-end mb-4 print:hidden">
+                          <Button
+                            variant="outline"
+                            size="sm"
+                            onClick={() => deleteDelivery(delivery@N@.id, delivery@N@.delivery_number)}
+                            className="text-red-600 hover:text-red-700 hover:bg-red-50 border-red-200"
+                          >
+                            <Trash2 className="w-4 h-4 mr-2" />
+                            Delete Delivery
+                          </Button>
+                        </div>''',
+        ],
+        "near_miss": [
+            '''
+                        <Button variant="ghost" size="sm" onClick={() => removeDeliveryItem(@N@)}>
+                          <Trash2 className="w-3 h-3" />
+                        </Button>''',
+        ],
+    },
+    "src/pages/items-master.tsx": {
+        "delete": [
+            '''
+                      <Button
+                        variant="outline"
+                        size="sm"
+                        onClick={() => handleDelete(item)}
+                        className="text-red-600 hover:text-red-700"
+                      >
+                        <Trash2 className="w-4 h-4 mr-2" />
+                        Delete
+                      </Button>''',
+        ],
+        "near_miss": [
+            '''
+                            <DropdownMenuItem
+                              onClick={() => handleDelete(item)}
+                              className="text-red-600 hover:text-red-700"
+                            >
+                              <Trash2 className="w-4 h-4 mr-2" />
+                              Delete
+                            </DropdownMenuItem>''',
+        ],
+    },
+    "src/pages/Categories.tsx": {
+        "delete": [
+            '''
+                      <Button
+                        variant="outline"
+                        size="sm"
+                        onClick={() => handleDeleteCategory(category@N@.id, category@N@.category_name)}
+                        title="Delete Category"
+                      >
+                        <Trash2 className="w-4 h-4" />
+                      </Button>''',
+        ],
+        "near_miss": [],
+    },
+    "src/pages/SubCategories.tsx": {
+        "delete": [
+            '''
+                        <Button
+                          variant="outline"
+                          size="sm"
+                          onClick={() => handleDeleteSubCategory(subCategory@N@.id, subCategory@N@.sub_category_name)}
+                          title="Delete Sub-Category"
+                        >
+                          <Trash2 className="w-4 h-4" />
+                        </Button>''',
+        ],
+        "near_miss": [],
+    },
+    "src/pages/VendorManagement.tsx": {
+        "delete": [
+            '''
+                        <Button
+                          variant="outline"
+                          size="sm"
+                          onClick={() => handleDeleteVendor(vendor@N@.id, vendor@N@.vendor_name)}
+                          className="text-red-600"
+                        >
+                          <Trash2 className="mr-2 h-4 w-4" />
+                          Delete Vendor
+                        </Button>''',
+        ],
+        "near_miss": [
+            '''
+                            <DropdownMenuItem
+                              onClick={() => handleDeleteVendor(vendor@N@.id, vendor@N@.vendor_name)}
+                              className="text-red-600"
+                              disabled={deletingId === vendor@N@.id}
+                            >
+                              <Trash2 className="mr-2 h-4 w-4" />
+                              {deletingId === vendor@N@.id ? 'Deleting...' : 'Delete Vendor'}
+                            </DropdownMenuItem>''',
+        ],
+    },
+    "src/pages/VendorInfo.tsx": {
+        "delete": [
+            '''
+                      <Button variant="ghost" size="icon" onClick={() => deleteVendor(vendor@N@.id)}>
+                        <Trash2 className="h-4 w-4" />
+                      </Button>''',
+        ],
+        "near_miss": [],
+    },
+}
+
+PAGE_HEADER = '''import { useEffect, useState } from "react";
+import { Button } from "@/components/ui/button";
+import { Badge } from "@/components/ui/badge";
+import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table";
+import { Edit, Eye, Trash2 } from "lucide-react";
+
+export default function SyntheticPage() {
+  const [rows, setRows] = useState<any[]>([]);
+  const [deletingId, setDeletingId] = useState<string | null>(null);
+
+  return (
+    <div className="space-y-6">
+      <Table>
+        <TableHeader>
+          <TableRow>
+            <TableHead>Name</TableHead>
+            <TableHead>Status</TableHead>
+            <TableHead className="text-right">Actions</TableHead>
+          </TableRow>
+        </TableHeader>
+        <TableBody>
+'''
+
+PAGE_FOOTER = '''        </TableBody>
+      </Table>
+    </div>
+  );
+}
+'''
+
+ROW_OPEN = '''                <TableRow key={row@N@.id}>
+                  <TableCell className="font-medium">{row@N@.name}</TableCell>
+                  <TableCell>
+                    <Badge variant={row@N@.status === "Active" ? "default" : "secondary"}>{row@N@.status}</Badge>
+                  </TableCell>
+                  <TableCell className="text-right">
+                    <div className="flex justify-end gap-2">
+'''
+
+ROW_CLOSE = '''
+                    </div>
+                  </TableCell>
+                </TableRow>
+'''
+
+
+def synthetic_page(page, lines, density, seed=SEED):
+    """Deterministic TSX source of roughly ``lines`` lines for ``page``.
+
+    ``density`` is the fraction of table rows that carry a delete block the
+    rules should match; another NEAR_MISS_RATE of rows carry a similar block
+    the rules must leave alone.
+    """
+    model = PAGES[page]
+    rng = random.Random(f"{seed}:{page}:{lines}:{density}")
+    parts = [PAGE_HEADER]
+    count = PAGE_HEADER.count("\n") + PAGE_FOOTER.count("\n")
+    row = 0
+    while count < lines:
+        row += 1
+        n = str(row)
+        chunk = [ROW_OPEN, EDIT_BUTTON]
+        roll = rng.random()
+        if roll < density:
+            chunk.append(rng.choice(model["delete"]))
+        elif roll < density + NEAR_MISS_RATE and model["near_miss"]:
+            chunk.append(rng.choice(model["near_miss"]))
+        chunk.append(ROW_CLOSE)
+        text = "".join(chunk).replace("@N@", n)
+        parts.append(text)
+        count += text.count("\n")
+    parts.append(PAGE_FOOTER)
+    return "".join(parts)
+
+
+def rule_sets():
+    """``{rule set name: (apply_patterns, {page: patterns})}`` from both scripts."""
+    hide = load_script("hide-delete-buttons.py")
+    hide_all = load_script("hide-all-delete-buttons.py")
+    return {
+        "hide-delete-buttons": (hide.apply_patterns, dict(hide.files_to_fix)),
+        "hide-all-delete-buttons": (hide_all.apply_patterns, dict(hide_all.FILES_TO_PROCESS)),
+    }
+
+
+def measure(apply, patterns, content, repeat):
+    """Return ``(best_seconds, peak_kib, matches)`` for one case."""
+    output = apply(content, patterns)  # warm-up: fills the re module's compile cache
+    # Like timeit's autorange: loop fast cases so each sample lasts MIN_SAMPLE_SECONDS
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            apply(content, patterns)
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            break
+        loops *= 2
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            apply(content, patterns)
+        best = min(best, (time.perf_counter() - started) / loops)
+    tracemalloc.start()
+    try:
+        apply(content, patterns)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    matches = output.count(HIDDEN_MARKER) - content.count(HIDDEN_MARKER)
+    return best, peak / 1024, matches
+
+
+def run(sizes, densities, repeat, name_filter=None):
+    cases = {}
+    for rule_set, (apply, files) in rule_sets().items():
+        for page, patterns in files.items():
+            if page not in PAGES:
+                continue
+            for size in sizes:
+                for density in densities:
+                    key = f"{rule_set}:{Path(page).stem}:{size}:{density}"
+                    if name_filter and name_filter not in key:
+                        continue
+                    content = synthetic_page(page, SIZES[size], DENSITIES[density])
+                    size_bytes = len(content.encode("utf-8"))
+                    seconds, peak_kib, matches = measure(apply, patterns, content, repeat)
+                    cases[key] = {
+                        "lines": content.count("\n"),
+                        "bytes": size_bytes,
+                        "matches": matches,
+                        "seconds": seconds,
+                        "bytes_per_sec": size_bytes / seconds if seconds else None,
+                        "peak_kib": peak_kib,
+                    }
+                    print(f"{key:<62} {seconds * 1000:9.2f} ms {size_bytes / seconds / 1e6:8.1f} MB/s "
+                          f"{peak_kib:9.0f} KiB {matches:6d} matches")
+    return cases
+
+
+def compare(cases, baseline, threshold):
+    """Return a list of regression messages against ``baseline``."""
+    problems = []
+    for key, current in cases.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if current["matches"] != base["matches"]:
+            problems.append(f"{key}: {current['matches']} matches (baseline {base['matches']})")
+        slower = current["seconds"] - base["seconds"]
+        if slower > MIN_SECONDS_DELTA and current["seconds"] > base["seconds"] * (1 + threshold):
+            problems.append(f"{key}: {current['seconds'] * 1000:.2f} ms "
+                            f"(baseline {base['seconds'] * 1000:.2f} ms, +{slower / base['seconds']:.0%})")
+        grown = current["peak_kib"] - base["peak_kib"]
+        if grown > MIN_PEAK_DELTA_KIB and current["peak_kib"] > base["peak_kib"] * (1 + threshold):
+            problems.append(f"{key}: peak {current['peak_kib']:.0f} KiB (baseline {base['peak_kib']:.0f} KiB)")
+    return problems
+
+
+def _names(value, known):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(known)})")
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the delete-button codemod rule sets")
+    parser.add_argument("--sizes", type=lambda v: _names(v, SIZES), default=list(SIZES))
+    parser.add_argument("--densities", type=lambda v: _names(v, DENSITIES), default=list(DENSITIES))
+    parser.add_argument("--repeat", type=int, default=5, help="timed samples per case (best is kept)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown/growth, 0.25 = 25%%")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--out", help="also write this run's results to a JSON file")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    args = parser.parse_args(argv)
+
+    cases = run(args.sizes, args.densities, args.repeat, args.filter)
+    result = {
+        "version": BASELINE_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "cases": cases,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n✅ Baseline updated: {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"\nℹ️  No baseline at {baseline_path}; run with --update-baseline to store one")
+        return 0
+
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        print(f"\n⚠️  Baseline version {baseline.get('version')} is not {BASELINE_VERSION}; refresh it")
+        return 1
+    if baseline.get("python") != result["python"]:
+        print(f"\n⚠️  Baseline was recorded on Python {baseline.get('python')}, this is {result['python']}")
+
+    problems = compare(cases, baseline["cases"], args.threshold)
+    if problems:
+        print(f"\n❌ {len(problems)} regression(s) beyond {args.threshold:.0%}:")
+        for problem in problems:
+            print(f"   {problem}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.threshold:.0%} ({len(cases)} cases)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the PPTX/DOCX generators.
+
+Drives the slide and section helpers of create-ims-presentation.py,
+create-ims-client-visual-presentation.py, create-ims-one-pager-docx.py and
+create-ims-system-overview-docx.py at scaled sizes (10 / 100 / 1,000
+slides or sections, and tables of 1k / 10k / 100k rows), plus each
+script's own default document. Every case records build time, save time
+and output size from an untraced run, and peak memory from a second run
+under tracemalloc.
+
+Runs are appended to a JSON history file and compared with the previous
+run; the suite fails when a case got slower, bigger or more memory hungry
+than the threshold allows. Each series also reports how its per-unit time
+grows from the smallest to the largest size, so non-linear scaling shows
+up directly.
+
+Usage:
+    python bench_generators.py [--slides 10,100,1000] [--sections 10,100,1000]
+                               [--table-rows 1000,10000,100000] [--only TEXT]
+                               [--threshold 0.25] [--history FILE] [--no-record]
+                               [--skip-memory]
+"""
+
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from ims_scripts import load_script
+
+DEFAULT_HISTORY = Path(__file__).parent / "benchmarks" / "generators-history.json"
+HISTORY_VERSION = 1
+HISTORY_LIMIT = 50
+
+SLIDES = (10, 100, 1000)
+SECTIONS = (10, 100, 1000)
+TABLE_ROWS = (1000, 10000, 100000)
+
+# Per-unit time may grow this much from the smallest to the largest size
+# before a series is reported as non-linear
+LINEARITY_LIMIT = 2.0
+
+# Noise floors: differences below these are never reported as regressions
+MIN_SECONDS_DELTA = 0.05
+MIN_PEAK_DELTA_KIB = 256
+
+BULLETS = [
+    "• Multi-level approval workflows with role-based access",
+    "• Real-time inventory tracking and reconciliation",
+    "  Store keeper verification before final approval",
+    "• Integrated procurement and stock issuance workflows",
+    "  Partial deliveries posted against purchase orders",
+]
+
+
+def _pptx_series(script, kinds):
+    module = load_script(script)
+
+    def build(count):
+        prs = module.new_presentation()
+        for i in range(count):
+            kinds[i % len(kinds)](module, prs, i + 1)
+        return prs
+
+    return build
+
+
+PRESENTATION_SLIDES = [
+    lambda m, prs, i: m.add_content_slide(prs, f"Module {i}", BULLETS, "Inventory Management System"),
+    lambda m, prs, i: m.add_two_column_slide(prs, f"Comparison {i}", BULLETS, BULLETS[::-1]),
+    lambda m, prs, i: m.add_title_slide(prs, f"Part {i}", "Enterprise-Grade Stock Management Solution"),
+]
+
+CLIENT_VISUAL_SLIDES = [
+    lambda m, prs, i: m.add_section_divider(prs, f"Step {i}", "Where every inventory cycle starts"),
+    lambda m, prs, i: m.add_flow_slide(
+        prs, f"Workflow {i}", m.BLUE,
+        ["Create tender with required items", "Engage vendors and evaluate", "Finalize tender and prepare PO"],
+        "This stage ensures demand is formally approved before stock movement starts.",
+    ),
+    lambda m, prs, i: m.add_three_step_overview(prs),
+    lambda m, prs, i: m.add_status_slide(prs),
+]
+
+
+def _docx_sections(script):
+    module = load_script(script)
+
+    def build(count):
+        from docx import Document
+
+        doc = Document()
+        for i in range(count):
+            module.add_heading(doc, f"{i + 1}. Section {i + 1}", 12)
+            doc.add_paragraph(
+                "IMS core modules are integrated and operational for production use, with approval "
+                "controls, verification traceability, and procurement-to-stock continuity."
+            )
+            for bullet in BULLETS:
+                module.add_bullet(doc, bullet.strip("• ").strip())
+        return doc
+
+    return build
+
+
+def _docx_table(script):
+    module = load_script(script)
+
+    def build(count):
+        from docx import Document
+
+        doc = Document()
+        module.add_heading(doc, "Annex. Benchmark Table", 12)
+        module.add_table(
+            doc,
+            ["Item", "Opening", "Received", "Issued", "Closing"],
+            ([f"ITEM-{i:06d}", i, i * 2, i, i * 2] for i in range(count)),
+        )
+        return doc
+
+    return build
+
+
+def _default_document(script, builder):
+    module = load_script(script)
+    return lambda count: getattr(module, builder)()
+
+
+def series(slides, sections, table_rows):
+    """``[(name, unit, sizes, build)]`` for every generator benchmark."""
+    return [
+        ("presentation:deck", "deck", (1,), _default_document("create-ims-presentation.py", "build_presentation")),
+        ("presentation:slides", "slide", slides, _pptx_series("create-ims-presentation.py", PRESENTATION_SLIDES)),
+        ("client-visual:deck", "deck", (1,),
+         _default_document("create-ims-client-visual-presentation.py", "build_presentation")),
+        ("client-visual:slides", "slide", slides,
+         _pptx_series("create-ims-client-visual-presentation.py", CLIENT_VISUAL_SLIDES)),
+        ("one-pager:document", "document", (1,), _default_document("create-ims-one-pager-docx.py", "build_document")),
+        ("one-pager:sections", "section", sections, _docx_sections("create-ims-one-pager-docx.py")),
+        ("one-pager:table-rows", "row", table_rows, _docx_table("create-ims-one-pager-docx.py")),
+        ("system-overview:document", "document", (1,),
+         _default_document("create-ims-system-overview-docx.py", "build_document")),
+        ("system-overview:sections", "section", sections, _docx_sections("create-ims-system-overview-docx.py")),
+        ("system-overview:table-rows", "row", table_rows, _docx_table("create-ims-system-overview-docx.py")),
+    ]
+
+
+def measure(build, count, memory=True):
+    """Build and save one document; return the case's measurements."""
+    started = time.perf_counter()
+    document = build(count)
+    built = time.perf_counter()
+    buffer = io.BytesIO()
+    document.save(buffer)
+    saved = time.perf_counter()
+    result = {
+        "count": count,
+        "build_seconds": built - started,
+        "save_seconds": saved - built,
+        "bytes": buffer.tell(),
+        "peak_kib": None,
+    }
+    del document, buffer
+
+    if memory:
+        tracemalloc.start()
+        try:
+            build(count).save(io.BytesIO())
+            result["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run(all_series, only=None, memory=True):
+    cases = {}
+    scaling = {}
+    for name, unit, sizes, build in all_series:
+        if only and only not in name:
+            continue
+        per_unit = []
+        for count in sizes:
+            key = f"{name}:{count}"
+            case = measure(build, count, memory)
+            cases[key] = case
+            total = case["build_seconds"] + case["save_seconds"]
+            per_unit.append(total / count)
+            peak = f"{case['peak_kib']:10.0f} KiB" if case["peak_kib"] is not None else "           -"
+            print(f"{key:<36} build {case['build_seconds']:8.3f}s  save {case['save_seconds']:7.3f}s  "
+                  f"{case['bytes'] / 1024:9.0f} KiB out  {peak} peak  {total / count * 1000:8.3f} ms/{unit}")
+        if len(per_unit) > 1:
+            scaling[name] = per_unit[-1] / per_unit[0]
+    return cases, scaling
+
+
+def load_history(path):
+    if not path.exists():
+        return {"version": HISTORY_VERSION, "runs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    if history.get("version") != HISTORY_VERSION:
+        raise SystemExit(f"Unsupported history version in {path}: {history.get('version')}")
+    return history
+
+
+def previous_cases(history):
+    """Latest recorded measurement for every case key."""
+    latest = {}
+    for entry in history["runs"]:
+        latest.update(entry["cases"])
+    return latest
+
+
+def compare(cases, previous, threshold):
+    """Return a list of regression messages against the previous measurements."""
+    problems = []
+    for key, current in cases.items():
+        base = previous.get(key)
+        if base is None:
+            continue
+        now = current["build_seconds"] + current["save_seconds"]
+        then = base["build_seconds"] + base["save_seconds"]
+        if now - then > MIN_SECONDS_DELTA and now > then * (1 + threshold):
+            problems.append(f"{key}: {now:.3f}s (previous {then:.3f}s, +{(now - then) / then:.0%})")
+        if current["bytes"] > base["bytes"] * (1 + threshold):
+            problems.append(f"{key}: {current['bytes']:,} bytes (previous {base['bytes']:,})")
+        if current["peak_kib"] is not None and base.get("peak_kib") is not None:
+            grown = current["peak_kib"] - base["peak_kib"]
+            if grown > MIN_PEAK_DELTA_KIB and current["peak_kib"] > base["peak_kib"] * (1 + threshold):
+                problems.append(f"{key}: peak {current['peak_kib']:.0f} KiB (previous {base['peak_kib']:.0f} KiB)")
+    return problems
+
+
+def _sizes(value):
+    try:
+        sizes = tuple(int(part) for part in value.split(",") if part.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {value!r}")
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("sizes must be positive")
+    return tuple(sorted(sizes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PPTX/DOCX generators")
+    parser.add_argument("--slides", type=_sizes, default=SLIDES)
+    parser.add_argument("--sections", type=_sizes, default=SECTIONS)
+    parser.add_argument("--table-rows", type=_sizes, default=TABLE_ROWS)
+    parser.add_argument("--only", help="only run series whose name contains this text")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed growth, 0.25 = 25%%")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY))
+    parser.add_argument("--no-record", action="store_true", help="compare without appending to the history")
+    parser.add_argument("--skip-memory", action="store_true", help="skip the tracemalloc run (faster)")
+    args = parser.parse_args(argv)
+
+    cases, scaling = run(
+        series(args.slides, args.sections, args.table_rows), args.only, memory=not args.skip_memory
+    )
+
+    print()
+    for name, growth in scaling.items():
+        flag = "⚠️ " if growth > LINEARITY_LIMIT else "✅"
+        print(f"{flag} {name}: per-unit time x{growth:.2f} from smallest to largest size")
+
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    problems = compare(cases, previous_cases(history), args.threshold)
+
+    if not args.no_record:
+        history["runs"].append({
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cases": cases,
+            "scaling": scaling,
+        })
+        history["runs"] = history["runs"][-HISTORY_LIMIT:]
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2)
+        print(f"\n📄 History: {history_path} ({len(history['runs'])} runs)")
+
+    if problems:
+        print(f"\n❌ {len(problems)} regression(s) beyond {args.threshold:.0%}:")
+        for problem in problems:
+            print(f"   {problem}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.threshold:.0%} ({len(cases)} cases)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Watch mode for the delete-button codemod.
+
+Keeps the hide-all-delete-buttons.py rules compiled in memory and re-applies
+them whenever one of their target files is saved, so a re-added delete
+button is commented out again within milliseconds instead of waiting for
+someone to rerun the script:
+
+- changes come from inotify (via ctypes, recursive over src/pages and
+  src/components); where inotify is unavailable the directories are polled
+  for modification times instead,
+- bursts of events (editors often write a file several times per save) are
+  debounced and each file is handled once per burst,
+- only the changed region of a file is re-matched: the new content is
+  compared with the content seen last time, and the rules run over the
+  differing span plus CONTEXT_CHARS either side (a delete-button block is far
+  smaller than that); a file seen for the first time is matched in full,
+- blocks already inside a ``{/* ... */}`` comment are left alone, so the
+  daemon's own rewrite does not trigger another one,
+- rewrites are checked with tsx_validator.py and written atomically (temp
+  file + rename); a rewrite that would break the TSX is reported instead.
+
+Each rewrite is reported with its save-to-rewrite time.
+
+Usage:
+    python codemod_watch.py [--root DIR] [--dirs src/pages,src/components]
+                            [--debounce 0.02] [--poll] [--poll-interval 0.25]
+"""
+
+import argparse
+import bisect
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from ims_instrument import count, phase, profiled
+from ims_scripts import load_script
+from tsx_validator import report_rejected, scan, validate, write_atomic
+
+DEFAULT_DIRS = ("src/pages", "src/components")
+DEFAULT_DEBOUNCE = 0.02
+DEFAULT_POLL_INTERVAL = 0.25
+WATCHED_SUFFIXES = (".tsx", ".ts", ".jsx", ".js")
+
+# Characters re-matched either side of the changed span
+CONTEXT_CHARS = 4096
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_IGNORED = 0x00008000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+class RuleSet:
+    """Compiled (pattern, replacement) rules per file, relative to the root."""
+
+    def __init__(self, files_to_process, flags=re.DOTALL):
+        self.rules = {
+            os.path.normpath(path): [(re.compile(pattern, flags), replacement) for pattern, replacement in patterns]
+            for path, patterns in files_to_process
+        }
+
+    def __contains__(self, path):
+        return path in self.rules
+
+    def apply(self, path, content, start=0, end=None):
+        """Rewrite uncommented matches that end inside ``[start, end)``; returns (content, count)."""
+        end = len(content) if end is None else end
+        total = 0
+        comments = None
+        for regex, replacement in self.rules[path]:
+            pieces = []
+            last = 0
+            for match in regex.finditer(content, start, end):
+                if comments is None:
+                    # Lexed once per version of the content, only when a rule matches
+                    comments = scan(content).comments
+                    comment_starts = [span[0] for span in comments]
+                i = bisect.bisect_right(comment_starts, match.start()) - 1
+                if i >= 0 and match.start() < comments[i][1]:
+                    continue
+                pieces.append(content[last:match.start()])
+                pieces.append(match.expand(replacement))
+                last = match.end()
+            if pieces:
+                pieces.append(content[last:])
+                rewritten = "".join(pieces)
+                end += len(rewritten) - len(content)
+                content = rewritten
+                comments = None
+                total += len(pieces) // 2
+        return content, total
+
+
+def changed_span(old, new):
+    """``(start, end)`` of the part of ``new`` that differs from ``old``."""
+    limit = min(len(old), len(new))
+    start = 0
+    # Compare in blocks first; most saves touch a few lines of a large file
+    while start + 4096 <= limit and old[start:start + 4096] == new[start:start + 4096]:
+        start += 4096
+    while start < limit and old[start] == new[start]:
+        start += 1
+    tail = 0
+    limit -= start
+    while tail + 4096 <= limit and old[len(old) - tail - 4096:len(old) - tail] == new[len(new) - tail - 4096:len(new) - tail]:
+        tail += 4096
+    while tail < limit and old[len(old) - tail - 1] == new[len(new) - tail - 1]:
+        tail += 1
+    return start, len(new) - tail
+
+
+class Enforcer:
+    """Applies the rule set to changed files, remembering what each looked like."""
+
+    def __init__(self, root, rules):
+        self.root = Path(root)
+        self.rules = rules
+        self.seen = {}
+
+    def relative(self, path):
+        try:
+            return os.path.normpath(os.path.relpath(path, self.root))
+        except ValueError:
+            return None
+
+    def process(self, path, changed_at=None):
+        rel = self.relative(path)
+        if rel not in self.rules:
+            return 0
+        started = changed_at or time.perf_counter()
+        try:
+            with phase("load"):
+                with open(path, "r", encoding="utf-8", newline="") as f:
+                    content = f.read()
+        except FileNotFoundError:
+            self.seen.pop(rel, None)
+            return 0
+        count("files_scanned")
+        previous = self.seen.get(rel)
+        if previous == content:
+            return 0
+        if previous is None:
+            start, end = 0, len(content)
+        else:
+            start, end = changed_span(previous, content)
+            start = content.rfind("\n", 0, max(0, start - CONTEXT_CHARS)) + 1
+            end = content.find("\n", min(len(content), end + CONTEXT_CHARS))
+            end = len(content) if end < 0 else end + 1
+        with phase("match"):
+            rewritten, replaced = self.rules.apply(rel, content, start, end)
+        count("bytes_matched", end - start)
+        if not replaced:
+            self.seen[rel] = content
+            return 0
+        with phase("validate"):
+            problems = validate(content, rewritten)
+        if problems:
+            # Leave the file as saved; it is matched again on its next change
+            self.seen[rel] = content
+            report_rejected({rel: problems})
+            return 0
+        self.seen[rel] = rewritten
+        with phase("save"):
+            write_atomic(path, rewritten)
+        count("files_modified")
+        count("bytes_written", len(rewritten.encode("utf-8")))
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"✅ {rel}: {replaced} delete button(s) hidden in {elapsed:.1f} ms", flush=True)
+        return replaced
+
+    def prime(self):
+        """Enforce every rule file once and remember its content."""
+        for rel in self.rules.rules:
+            path = self.root / rel
+            if path.exists():
+                self.process(str(path))
+            else:
+                print(f"⚠️  Skipped (not found): {rel}")
+
+
+# ----------------------------------------------------------------------
+# Change sources
+# ----------------------------------------------------------------------
+
+class InotifyWatcher:
+    """Recursive inotify watch through libc; raises OSError where unsupported."""
+
+    def __init__(self, directories):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+        for directory in directories:
+            for current, _, _ in os.walk(directory):
+                self._add(current)
+
+    def _add(self, directory):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.paths[wd] = directory
+
+    def wait(self, timeout):
+        """Changed file paths, blocking up to ``timeout`` seconds (None = forever)."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        changed = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                directory = self.paths.get(wd)
+                if directory is None or mask & IN_IGNORED:
+                    self.paths.pop(wd, None)
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self._add(path)
+                elif name and mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    changed.append(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback that compares modification times of the watched files."""
+
+    def __init__(self, directories, interval=DEFAULT_POLL_INTERVAL):
+        self.directories = directories
+        self.interval = interval
+        self.mtimes = self._snapshot()
+
+    def _snapshot(self):
+        mtimes = {}
+        for directory in self.directories:
+            for current, _, filenames in os.walk(directory):
+                for name in filenames:
+                    if name.endswith(WATCHED_SUFFIXES):
+                        path = os.path.join(current, name)
+                        try:
+                            mtimes[path] = os.stat(path).st_mtime_ns
+                        except FileNotFoundError:
+                            pass
+        return mtimes
+
+    def wait(self, timeout):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = self._snapshot()
+        changed = [path for path, mtime in current.items() if self.mtimes.get(path) != mtime]
+        self.mtimes = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def watch(enforcer, watcher, debounce=DEFAULT_DEBOUNCE):
+    """Debounce change events and enforce the rules on each changed file."""
+    while True:
+        changed = watcher.wait(None)
+        if not changed:
+            continue
+        first_seen = time.perf_counter()
+        pending = dict.fromkeys(changed)
+        # Collect the rest of the burst: stop once it has been quiet for `debounce`
+        while True:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            pending.update(dict.fromkeys(more))
+        for path in pending:
+            enforcer.process(path, first_seen)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep delete buttons hidden while files are edited")
+    parser.add_argument("--root", default=".", help="repository root the rule paths are relative to")
+    parser.add_argument("--dirs", default=",".join(DEFAULT_DIRS), help="comma-separated directories to watch")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="quiet seconds that end a burst")
+    parser.add_argument("--poll", action="store_true", help="poll modification times instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    args = parser.parse_args(argv)
+
+    root = Path(args.root).resolve()
+    rules = RuleSet(load_script("hide-all-delete-buttons.py").FILES_TO_PROCESS)
+    directories = [str(root / d) for d in args.dirs.split(",") if d.strip() and (root / d).is_dir()]
+    if not directories:
+        raise SystemExit(f"None of {args.dirs} exist under {root}")
+
+    enforcer = Enforcer(root, rules)
+    enforcer.prime()
+
+    watcher = None
+    if not args.poll:
+        try:
+            watcher = InotifyWatcher(directories)
+            mode = "inotify"
+        except OSError as e:
+            print(f"ℹ️  inotify unavailable ({e}); polling instead")
+    if watcher is None:
+        watcher = PollingWatcher(directories, args.poll_interval)
+        mode = f"polling every {args.poll_interval:g}s"
+
+    print(f"👀 Watching {', '.join(os.path.relpath(d, root) for d in directories)} "
+          f"({mode}, {len(rules.rules)} rule files) - Ctrl+C to stop", flush=True)
+    try:
+        watch(enforcer, watcher, args.debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("codemod_watch"):
+        sys.exit(main())
@@ -1,13 +1,17 @@
+import hashlib
+import os
+from io import BytesIO
+from pathlib import Path
+
+import pptx
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.shapes.autoshape import Shape
 
-# 16:9 presentation
-prs = Presentation()
-prs.slide_width = Inches(13.33)
-prs.slide_height = Inches(7.5)
+from ims_instrument import count, phase, profiled
 
 # Color system
 NAVY = RGBColor(18, 42, 76)
@@ -21,19 +25,100 @@ TEXT = RGBColor(31, 37, 46)
 MUTED = RGBColor(95, 108, 125)
 WHITE = RGBColor(255, 255, 255)
 
+# Slide layouts of the deck template. The backgrounds, the NAVY top band and
+# the section-divider band live on these layouts, so slides only add their
+# own content. The template is built once, cached as .pptx bytes in
+# TEMPLATE_CACHE_DIR and loaded from memory on later runs; bump
+# TEMPLATE_VERSION when build_template() changes.
+TEMPLATE_VERSION = 1
+TEMPLATE_CACHE_DIR = ".ims-template-cache"
+LAYOUT_DARK = "IMS Dark"
+LAYOUT_DIVIDER = "IMS Section Divider"
+LAYOUT_CONTENT = "IMS Content"
+
+_template_bytes = None
+
+
+def _layout_rectangle(layout, left, top, width, height, color):
+    shapes = layout.shapes
+    sp = shapes._spTree.add_autoshape(shapes._next_shape_id, "Rectangle", "rect", left, top, width, height)
+    shape = Shape(sp, shapes)
+    shape.fill.solid()
+    shape.fill.fore_color.rgb = color
+    shape.line.fill.background()
+
+
+def build_template():
+    """16:9 presentation with only the IMS layouts and no slides."""
+    prs = Presentation()
+    prs.slide_width = Inches(13.33)
+    prs.slide_height = Inches(7.5)
+
+    # Default template indexes: 6 Blank, 5 Title Only, 2 Section Header
+    designs = {
+        6: (LAYOUT_CONTENT, LIGHT_BG, [(Inches(0), Inches(0), Inches(13.33), Inches(1.0), NAVY)]),
+        5: (LAYOUT_DARK, NAVY, []),
+        2: (LAYOUT_DIVIDER, MID_BG, [(Inches(0), Inches(2.2), Inches(13.33), Inches(3.1), NAVY)]),
+    }
+    layouts = prs.slide_layouts
+    for index, layout in reversed(list(enumerate(layouts))):
+        if index not in designs:
+            layouts.remove(layout)
+            continue
+        name, background, rectangles = designs[index]
+        layout.name = name
+        for placeholder in list(layout.placeholders):
+            placeholder.element.getparent().remove(placeholder.element)
+        fill = layout.background.fill
+        fill.solid()
+        fill.fore_color.rgb = background
+        for rectangle in rectangles:
+            _layout_rectangle(layout, *rectangle)
+
+    buffer = BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def template_key():
+    colors = (NAVY, LIGHT_BG, MID_BG)
+    return hashlib.sha1(repr((TEMPLATE_VERSION, pptx.__version__, colors)).encode()).hexdigest()[:12]
+
+
+def template_bytes(cache_dir=TEMPLATE_CACHE_DIR):
+    """The serialized template: from memory, else the disk cache, else built and cached."""
+    global _template_bytes
+    if _template_bytes is not None:
+        count("cache_hits")
+        return _template_bytes
+    path = Path(cache_dir) / f"client-visual-{template_key()}.pptx" if cache_dir else None
+    if path is not None and path.exists():
+        count("cache_hits")
+        _template_bytes = path.read_bytes()
+        return _template_bytes
+
+    count("cache_misses")
+    _template_bytes = build_template()
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(_template_bytes)
+        tmp.replace(path)
+    return _template_bytes
 
-def add_background(slide, color=LIGHT_BG):
-    fill = slide.background.fill
-    fill.solid()
-    fill.fore_color.rgb = color
 
+# 16:9 presentation
+def new_presentation():
+    with phase("load"):
+        return Presentation(BytesIO(template_bytes()))
 
-def add_top_band(slide, title, subtitle=None):
-    band = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(0), Inches(0), Inches(13.33), Inches(1.0))
-    band.fill.solid()
-    band.fill.fore_color.rgb = NAVY
-    band.line.fill.background()
 
+def add_slide(prs, layout_name):
+    return prs.slides.add_slide(prs.slide_layouts.get_by_name(layout_name))
+
+
+def add_top_band(slide, title, subtitle=None):
+    # The NAVY band itself is part of the LAYOUT_CONTENT layout
     title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.2), Inches(9.6), Inches(0.45))
     tf = title_box.text_frame
     p = tf.paragraphs[0]
@@ -51,9 +136,8 @@ def add_top_band(slide, title, subtitle=None):
         sp.font.color.rgb = RGBColor(207, 220, 238)
 
 
-def add_title_slide(title, subtitle):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    add_background(slide, NAVY)
+def add_title_slide(prs, title, subtitle):
+    slide = add_slide(prs, LAYOUT_DARK)
 
     # Visual blocks
     block1 = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(0.7), Inches(1.2), Inches(12.0), Inches(4.8))
@@ -103,19 +187,8 @@ def add_title_slide(title, subtitle):
     sp.alignment = PP_ALIGN.CENTER
 
 
-def add_section_divider(title, caption):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    add_background(slide, WHITE)
-
-    stripe = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(0), Inches(0), Inches(13.33), Inches(7.5))
-    stripe.fill.solid()
-    stripe.fill.fore_color.rgb = MID_BG
-    stripe.line.fill.background()
-
-    band = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(0), Inches(2.2), Inches(13.33), Inches(3.1))
-    band.fill.solid()
-    band.fill.fore_color.rgb = NAVY
-    band.line.fill.background()
+def add_section_divider(prs, title, caption):
+    slide = add_slide(prs, LAYOUT_DIVIDER)
 
     title_box = slide.shapes.add_textbox(Inches(0.8), Inches(2.95), Inches(11.8), Inches(0.9))
     tf = title_box.text_frame
@@ -135,9 +208,8 @@ def add_section_divider(title, caption):
     cp.font.color.rgb = RGBColor(205, 217, 236)
 
 
-def add_three_step_overview():
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    add_background(slide)
+def add_three_step_overview(prs):
+    slide = add_slide(prs, LAYOUT_CONTENT)
     add_top_band(slide, "System Workflow Overview", "Simple business flow used in operations and client reporting")
 
     step_titles = ["1. Tender In", "2. Stock Acquisition", "3. Stock Issuance"]
@@ -184,9 +256,8 @@ def add_three_step_overview():
             ar.line.fill.background()
 
 
-def add_flow_slide(title, color, steps, emphasis):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    add_background(slide)
+def add_flow_slide(prs, title, color, steps, emphasis):
+    slide = add_slide(prs, LAYOUT_CONTENT)
     add_top_band(slide, title)
 
     # left visual process lane
@@ -254,9 +325,8 @@ def add_flow_slide(title, color, steps, emphasis):
         y += 1.1
 
 
-def add_status_slide():
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    add_background(slide)
+def add_status_slide(prs):
+    slide = add_slide(prs, LAYOUT_CONTENT)
     add_top_band(slide, "Current Delivery Status", "What is completed with Admin team and what is next")
 
     # Big progress bar visual
@@ -361,9 +431,8 @@ def add_status_slide():
         p.font.color.rgb = TEXT
 
 
-def add_closing_slide():
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    add_background(slide, NAVY)
+def add_closing_slide(prs):
+    slide = add_slide(prs, LAYOUT_DARK)
 
     title = slide.shapes.add_textbox(Inches(0.9), Inches(1.7), Inches(11.7), Inches(1.0))
     tf = title.text_frame
@@ -392,49 +461,72 @@ def add_closing_slide():
     np.font.color.rgb = WHITE
 
 
-# Build deck
-add_title_slide(
-    "Inventory Management System",
-    "Client Workflow Presentation - Visual Overview"
-)
-add_three_step_overview()
-add_section_divider("Step 1: Tender In", "Where every inventory cycle starts")
-add_flow_slide(
-    "Tender Creation and Finalization",
-    BLUE,
-    [
-        "Create tender with required items and quantities",
-        "Engage vendors and evaluate responses",
-        "Finalize tender and prepare PO path"
-    ],
-    "This stage ensures demand is formally approved before stock movement starts."
-)
-add_section_divider("Step 2: Stock Acquisition (Stock In)", "Convert approved procurement into available inventory")
-add_flow_slide(
-    "Delivery Receiving and Stock Posting",
-    TEAL,
-    [
-        "Receive delivery against purchase order",
-        "Validate quantity and quality during receiving",
-        "Create stock acquisition and update inventory"
-    ],
-    "This stage is completed and tested end-to-end with Admin team entries."
-)
-add_section_divider("Step 3: Stock Issuance (Stock Out)", "Release inventory to requesting users or wings")
-add_flow_slide(
-    "Issuance Flow (Next Active Step)",
-    ORANGE,
-    [
-        "User raises stock request",
-        "Approval flow confirms request eligibility",
-        "Approved quantity is issued and deducted"
-    ],
-    "Stock out is the next execution step currently in progress."
-)
-add_status_slide()
-add_closing_slide()
-
-output_path = "IMS-Client-Workflow-Visual-Presentation.pptx"
-prs.save(output_path)
-print(f"Created: {output_path}")
-print(f"Total slides: {len(prs.slides)}")
+def build_presentation(prs=None):
+    if prs is None:
+        prs = new_presentation()
+
+    # Build deck
+    add_title_slide(
+        prs,
+        "Inventory Management System",
+        "Client Workflow Presentation - Visual Overview"
+    )
+    add_three_step_overview(prs)
+    add_section_divider(prs, "Step 1: Tender In", "Where every inventory cycle starts")
+    add_flow_slide(
+        prs,
+        "Tender Creation and Finalization",
+        BLUE,
+        [
+            "Create tender with required items and quantities",
+            "Engage vendors and evaluate responses",
+            "Finalize tender and prepare PO path"
+        ],
+        "This stage ensures demand is formally approved before stock movement starts."
+    )
+    add_section_divider(prs, "Step 2: Stock Acquisition (Stock In)", "Convert approved procurement into available inventory")
+    add_flow_slide(
+        prs,
+        "Delivery Receiving and Stock Posting",
+        TEAL,
+        [
+            "Receive delivery against purchase order",
+            "Validate quantity and quality during receiving",
+            "Create stock acquisition and update inventory"
+        ],
+        "This stage is completed and tested end-to-end with Admin team entries."
+    )
+    add_section_divider(prs, "Step 3: Stock Issuance (Stock Out)", "Release inventory to requesting users or wings")
+    add_flow_slide(
+        prs,
+        "Issuance Flow (Next Active Step)",
+        ORANGE,
+        [
+            "User raises stock request",
+            "Approval flow confirms request eligibility",
+            "Approved quantity is issued and deducted"
+        ],
+        "Stock out is the next execution step currently in progress."
+    )
+    add_status_slide(prs)
+    add_closing_slide(prs)
+    return prs
+
+
+def main():
+    with phase("render"):
+        prs = build_presentation()
+    count("slides", len(prs.slides))
+    count("shapes", sum(len(slide.shapes) for slide in prs.slides))
+
+    output_path = "IMS-Client-Workflow-Visual-Presentation.pptx"
+    with phase("save"):
+        prs.save(output_path)
+    count("bytes_written", os.path.getsize(output_path))
+    print(f"Created: {output_path}")
+    print(f"Total slides: {len(prs.slides)}")
+
+
+if __name__ == "__main__":
+    with profiled("create-ims-client-visual-presentation"):
+        main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Generate the IMS item catalog deck: one slide per item master with its
+nomenclature, specifications, category, stock levels and current admin and
+wing stock.
+
+Building thousands of slides through python-pptx keeps every slide's XML
+tree in memory until ``prs.save()``. Instead, the title slide and a single
+prototype item slide are built with the create-ims-presentation.py helpers,
+with ``{{field}}`` markers where item values go. The prototype's XML is
+split once into literal pieces and fields, and the deck is then written
+straight into the output zip: each item slide is rendered from the pieces,
+written as its own slide part and dropped, so memory stays flat however
+many items there are. presentation.xml, its relationships and the content
+types are rewritten to list the item slides in place of the prototype.
+
+Items are read from any ims_tables source (CSV exports, a SQLite stand-in or
+an ims_snapshot.py snapshot) into typed column arrays; soft-deleted items
+are left out and slides are ordered by category and nomenclature.
+
+Usage:
+    python create-ims-item-catalog.py SOURCE [--out IMS_Item_Catalog.pptx]
+                                      [--limit N]
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+import zipfile
+from array import array
+from datetime import date
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+from ims_instrument import count, phase, profiled
+from ims_scripts import load_script
+from ims_tables import iter_rows, load_columns, norm_id, table_exists
+
+deck = load_script("create-ims-presentation.py")
+
+DEFAULT_OUTPUT = "IMS_Item_Catalog.pptx"
+SPECIFICATIONS_LIMIT = 600
+
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+SLIDE_RELTYPE = R_NS + "/slide"
+SLIDE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+
+_FIELD = re.compile(r"\{\{(\w+)\}\}")
+# Characters XML 1.0 does not allow, and runs of whitespace (text runs hold one line)
+_INVALID_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_WHITESPACE = re.compile(r"\s+")
+
+ITEM_SCHEMA = {
+    "id": "id",
+    "item_code": "s",
+    "nomenclature": "s",
+    "category_id": "id",
+    "unit": "s",
+    "specifications": "s",
+    "minimum_stock_level": "d",
+    "maximum_stock_level": "d",
+    "reorder_point": "d",
+    "is_deleted": "flag",
+}
+STOCK_SCHEMA = {"item_master_id": "id", "current_quantity": "d", "available_quantity": "d"}
+
+
+class Catalog:
+    """Item columns plus per-item stock totals, in slide order."""
+
+    __slots__ = ("columns", "categories", "order", "admin_current", "admin_available",
+                 "wing_current", "wing_available", "wing_rows", "has_admin", "has_wing")
+
+    def __init__(self, source, limit=None):
+        self.columns = load_columns(source, "item_masters", ITEM_SCHEMA)
+        self.categories = {norm_id(cat_id): name for cat_id, name in iter_rows(source, "categories", ["id", "category_name"])}
+        size = len(self.columns["id"])
+        index = {item_id: i for i, item_id in enumerate(self.columns["id"]) if item_id is not None}
+        self.admin_current, self.admin_available, _, self.has_admin = self._stock(source, "stock_admin", index, size)
+        self.wing_current, self.wing_available, self.wing_rows, self.has_wing = self._stock(source, "stock_wing", index, size)
+
+        names = self.columns["nomenclature"]
+        deleted = self.columns["is_deleted"]
+        live = [i for i in range(size) if not deleted[i]]
+        live.sort(key=lambda i: (self.category(i).lower(), (names[i] or "").lower()))
+        self.order = array("l", live[:limit] if limit else live)
+
+    @staticmethod
+    def _stock(source, table, index, size):
+        current = array("d", bytes(8 * size))
+        available = array("d", bytes(8 * size))
+        rows = array("l", bytes(array("l").itemsize * size))
+        if not table_exists(source, table):
+            return current, available, rows, False
+        stock = load_columns(source, table, STOCK_SCHEMA)
+        for item_id, on_hand, free in zip(stock["item_master_id"], stock["current_quantity"], stock["available_quantity"]):
+            i = index.get(item_id)
+            if i is None:
+                continue
+            if on_hand == on_hand:
+                current[i] += on_hand
+            if free == free:
+                available[i] += free
+            rows[i] += 1
+        return current, available, rows, True
+
+    def __len__(self):
+        return len(self.order)
+
+    def category(self, i):
+        return self.categories.get(self.columns["category_id"][i]) or "Uncategorised"
+
+    def fields(self, i):
+        """Slide values of item ``i`` (unescaped text)."""
+        columns = self.columns
+        specifications = _WHITESPACE.sub(" ", columns["specifications"][i] or "").strip()
+        if len(specifications) > SPECIFICATIONS_LIMIT:
+            specifications = specifications[:SPECIFICATIONS_LIMIT - 1].rstrip() + "…"
+        return {
+            "nomenclature": columns["nomenclature"][i] or "(unnamed item)",
+            "item_code": columns["item_code"][i] or "—",
+            "category": self.category(i),
+            "unit": columns["unit"][i] or "—",
+            "specifications": specifications or "—",
+            "minimum": _quantity(columns["minimum_stock_level"][i]),
+            "reorder_point": _quantity(columns["reorder_point"][i]),
+            "maximum": _quantity(columns["maximum_stock_level"][i]),
+            "admin_current": _quantity(self.admin_current[i]) if self.has_admin else "—",
+            "admin_available": _quantity(self.admin_available[i]) if self.has_admin else "—",
+            "wing_current": _quantity(self.wing_current[i]) if self.has_wing else "—",
+            "wing_available": _quantity(self.wing_available[i]) if self.has_wing else "—",
+            "wing_rows": f"{self.wing_rows[i]:,}",
+        }
+
+
+def _quantity(value):
+    return "—" if value != value else f"{value:,.0f}"
+
+
+def build_prototype(catalog):
+    """Title slide plus one item slide with ``{{field}}`` markers, built with
+    the create-ims-presentation.py helpers"""
+    prs = deck.new_presentation()
+    deck.add_title_slide(prs,
+        "IMS ITEM CATALOG",
+        f"{len(catalog):,} items · {date.today():%d %B %Y}")
+    deck.add_two_column_slide(prs,
+        "{{nomenclature}}",
+        [
+            "Item code: {{item_code}}",
+            "Category: {{category}}",
+            "Unit: {{unit}}",
+            "",
+            "Specifications:",
+            "{{specifications}}",
+        ],
+        [
+            "Current Stock",
+            "Admin store: {{admin_available}} available / {{admin_current}} on hand",
+            "Wings: {{wing_available}} available / {{wing_current}} on hand ({{wing_rows}} wing records)",
+            "",
+            "Stock Levels",
+            "Minimum: {{minimum}}",
+            "Reorder point: {{reorder_point}}",
+            "Maximum: {{maximum}}",
+        ])
+    slide_id = prs.slides._sldIdLst[-1]
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue(), prs.slides[-1].part.partname, slide_id.rId, slide_id.id
+
+
+class SlideTemplate:
+    """Prototype slide XML split into literal pieces and field names."""
+
+    def __init__(self, xml):
+        self.pieces = _FIELD.split(xml)
+
+    def render(self, values):
+        pieces = list(self.pieces)
+        for i in range(1, len(pieces), 2):
+            pieces[i] = escape(_INVALID_XML.sub("", values[pieces[i]]))
+        return "".join(pieces)
+
+
+def _xml(tree):
+    return etree.tostring(tree, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _content_types(xml, prototype, slide_names):
+    tree = etree.fromstring(xml)
+    for override in tree.findall(f"{{{CT_NS}}}Override"):
+        if override.get("PartName") == prototype:
+            tree.remove(override)
+    for name in slide_names:
+        etree.SubElement(tree, f"{{{CT_NS}}}Override", PartName=f"/{name}", ContentType=SLIDE_CONTENT_TYPE)
+    return _xml(tree)
+
+
+def _presentation(xml, prototype_rid, first_id, slide_count):
+    tree = etree.fromstring(xml)
+    slide_list = tree.find(f"{{{P_NS}}}sldIdLst")
+    for slide_id in slide_list.findall(f"{{{P_NS}}}sldId"):
+        if slide_id.get(f"{{{R_NS}}}id") == prototype_rid:
+            slide_list.remove(slide_id)
+    for n in range(slide_count):
+        etree.SubElement(slide_list, f"{{{P_NS}}}sldId", {"id": str(first_id + n), f"{{{R_NS}}}id": f"rIdItem{n + 1}"})
+    return _xml(tree)
+
+
+def _presentation_rels(xml, prototype_rid, slide_names):
+    tree = etree.fromstring(xml)
+    for rel in tree.findall(f"{{{PKG_RELS_NS}}}Relationship"):
+        if rel.get("Id") == prototype_rid:
+            tree.remove(rel)
+    for n, name in enumerate(slide_names, 1):
+        etree.SubElement(tree, f"{{{PKG_RELS_NS}}}Relationship",
+                         Id=f"rIdItem{n}", Type=SLIDE_RELTYPE, Target=name[len("ppt/"):])
+    return _xml(tree)
+
+
+def write_catalog(catalog, output_path):
+    """Write the deck, streaming one slide part per item; returns the slide count."""
+    with phase("render"):
+        package, prototype, prototype_rid, first_id = build_prototype(catalog)
+    source = zipfile.ZipFile(io.BytesIO(package))
+    # Item slides take the prototype's number onwards; the title slide keeps slide1
+    first_number = int(re.search(r"(\d+)\.xml$", prototype).group(1))
+    slide_names = [f"ppt/slides/slide{first_number + n}.xml" for n in range(len(catalog))]
+    prototype_name = prototype.lstrip("/")
+    prototype_rels = f"ppt/slides/_rels/{prototype_name.rsplit('/', 1)[1]}.rels"
+    template = SlideTemplate(source.read(prototype_name).decode("utf-8"))
+    slide_rels = source.read(prototype_rels)
+
+    rewritten = {
+        "[Content_Types].xml": lambda xml: _content_types(xml, prototype, slide_names),
+        "ppt/presentation.xml": lambda xml: _presentation(xml, prototype_rid, first_id, len(catalog)),
+        "ppt/_rels/presentation.xml.rels": lambda xml: _presentation_rels(xml, prototype_rid, slide_names),
+    }
+    with phase("save"):
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as out:
+            for info in source.infolist():
+                if info.filename in (prototype_name, prototype_rels):
+                    continue
+                data = source.read(info.filename)
+                if info.filename in rewritten:
+                    data = rewritten[info.filename](data)
+                out.writestr(info.filename, data)
+            for name, i in zip(slide_names, catalog.order):
+                out.writestr(name, template.render(catalog.fields(i)))
+                out.writestr(f"ppt/slides/_rels/{name.rsplit('/', 1)[1]}.rels", slide_rels)
+    count("slides", len(catalog) + 1)
+    return len(catalog) + 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="One slide per item master, with current stock")
+    parser.add_argument("source", help="CSV export directory, SQLite stand-in database or ims_snapshot.py snapshot")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT)
+    parser.add_argument("--limit", type=int, help="only the first N items")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        raise SystemExit(f"Table source not found: {args.source}")
+    with phase("load"):
+        catalog = Catalog(args.source, args.limit)
+    slides = write_catalog(catalog, args.out)
+    count("bytes_written", os.path.getsize(args.out))
+    print(f"✅ Item catalog created successfully!")
+    print(f"📊 File saved as: {args.out}")
+    print(f"📈 Total slides: {slides} ({len(catalog):,} items)")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("create-ims-item-catalog"):
+        sys.exit(main())
@@ -1,7 +1,13 @@
+import json
+import os
+from pathlib import Path
+
 from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+from ims_instrument import count, phase, profiled
+
 
 def add_heading(doc, text, size=14):
     p = doc.add_paragraph()
@@ -17,67 +23,199 @@ def add_bullet(doc, text):
     return p
 
 
-doc = Document()
-
-# Title
-p = doc.add_paragraph()
-p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-run = p.add_run("INVENTORY MANAGEMENT SYSTEM (IMS)\n6-MONTH PROGRESS REPORT (ONE-PAGER)")
-run.bold = True
-run.font.size = Pt(16)
-
-meta = doc.add_paragraph()
-meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
-meta.add_run("Reporting Period: Month 1 to Month 6\nPrepared For: Project Manager").font.size = Pt(10)
-
-doc.add_paragraph()
-
-add_heading(doc, "1. Executive Summary", 12)
-doc.add_paragraph(
-    "Over the last six months, IMS has been developed into a production-ready enterprise platform for core operations. "
-    "The implemented scope now covers procurement, purchase orders, delivery receiving, stock management, stock issuance, "
-    "multi-level approvals, store keeper verification, and role-based governance."
-)
-
-add_heading(doc, "2. Proper Operational Flow (As Implemented)", 12)
-add_bullet(doc, "User raises stock issuance request (personal/returnable/individual with item-wise quantities).")
-add_bullet(doc, "Wing Supervisor reviews request and performs first-level decision (approve/reject/forward).")
-add_bullet(doc, "If physical confirmation is required, item is forwarded to Store Keeper for verification.")
-add_bullet(doc, "Store Keeper performs physical count and submits verification: available/partial/unavailable.")
-add_bullet(doc, "Approver reviews verification feedback and finalizes approval path.")
-add_bullet(doc, "Admin/next-level approver completes final authorization based on hierarchy and policy.")
-add_bullet(doc, "Store/issuance processing team issues approved items.")
-add_bullet(doc, "System updates stock balances and preserves audit history for all actions.")
-
-add_heading(doc, "3. Procurement to Stock Flow (As Implemented)", 12)
-add_bullet(doc, "Create and manage tenders (Contract / Annual / Spot Purchase).")
-add_bullet(doc, "Manage vendor participation, evaluation, and award decisions.")
-add_bullet(doc, "Generate purchase orders from approved procurement outcomes.")
-add_bullet(doc, "Receive delivery against PO with quantity and quality checks (including partial deliveries).")
-add_bullet(doc, "Post received quantities into inventory and reflect updates in stock views.")
-
-add_heading(doc, "4. Month-Wise Progress Snapshot", 12)
-add_bullet(doc, "Month 1: Requirements finalization, architecture planning, database foundation.")
-add_bullet(doc, "Month 2: Master data and core inventory structures implemented.")
-add_bullet(doc, "Month 3: Tender, vendor, purchase-order lifecycle implemented.")
-add_bullet(doc, "Month 4: Stock issuance and multi-level approval workflows implemented.")
-add_bullet(doc, "Month 5: Store keeper verification workflow, audit trail, and control hardening completed.")
-add_bullet(doc, "Month 6: End-to-end integration, stabilization, SQL enhancements, and release readiness completed.")
-
-add_heading(doc, "5. Key Deliverables Completed", 12)
-add_bullet(doc, "End-to-end stock request-to-issuance workflow.")
-add_bullet(doc, "Tender-to-PO-to-delivery procurement chain.")
-add_bullet(doc, "Store keeper physical verification integrated with approval flow.")
-add_bullet(doc, "Role-based access and permission governance.")
-add_bullet(doc, "Audit trail, transaction-safe processing, and soft-delete data safety.")
-add_bullet(doc, "Financial-year aware inventory reporting support.")
-
-add_heading(doc, "6. Current Status and Next Focus", 12)
-doc.add_paragraph(
-    "Core IMS modules are complete and operational for business use. The main next focus area is advanced reporting and "
-    "analytics dashboards for management insights and KPI-driven monitoring."
-)
-
-output_file = "IMS-6-Month-Progress-One-Pager-Proper-Flow.docx"
-doc.save(output_file)
-print(f"Created: {output_file}")
+def add_table(doc, headers, rows):
+    table = doc.add_table(rows=1, cols=len(headers))
+    table.style = "Table Grid"
+    for cell, text in zip(table.rows[0].cells, headers):
+        cell.text = ""
+        cell.paragraphs[0].add_run(text).bold = True
+    for row in rows:
+        for cell, value in zip(table.add_row().cells, row):
+            cell.text = str(value)
+    return table
+
+
+def fmt_duration(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} days"
+
+
+def fmt_ms(seconds):
+    if seconds is None:
+        return "-"
+    return f"{seconds * 1000:.1f} ms"
+
+
+def build_document():
+    """Build the 6-month progress one-pager."""
+    with phase("load"):
+        doc = Document()
+
+    # Title
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = p.add_run("INVENTORY MANAGEMENT SYSTEM (IMS)\n6-MONTH PROGRESS REPORT (ONE-PAGER)")
+    run.bold = True
+    run.font.size = Pt(16)
+
+    meta = doc.add_paragraph()
+    meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    meta.add_run("Reporting Period: Month 1 to Month 6\nPrepared For: Project Manager").font.size = Pt(10)
+
+    doc.add_paragraph()
+
+    add_heading(doc, "1. Executive Summary", 12)
+    doc.add_paragraph(
+        "Over the last six months, IMS has been developed into a production-ready enterprise platform for core operations. "
+        "The implemented scope now covers procurement, purchase orders, delivery receiving, stock management, stock issuance, "
+        "multi-level approvals, store keeper verification, and role-based governance."
+    )
+
+    add_heading(doc, "2. Proper Operational Flow (As Implemented)", 12)
+    add_bullet(doc, "User raises stock issuance request (personal/returnable/individual with item-wise quantities).")
+    add_bullet(doc, "Wing Supervisor reviews request and performs first-level decision (approve/reject/forward).")
+    add_bullet(doc, "If physical confirmation is required, item is forwarded to Store Keeper for verification.")
+    add_bullet(doc, "Store Keeper performs physical count and submits verification: available/partial/unavailable.")
+    add_bullet(doc, "Approver reviews verification feedback and finalizes approval path.")
+    add_bullet(doc, "Admin/next-level approver completes final authorization based on hierarchy and policy.")
+    add_bullet(doc, "Store/issuance processing team issues approved items.")
+    add_bullet(doc, "System updates stock balances and preserves audit history for all actions.")
+
+    add_heading(doc, "3. Procurement to Stock Flow (As Implemented)", 12)
+    add_bullet(doc, "Create and manage tenders (Contract / Annual / Spot Purchase).")
+    add_bullet(doc, "Manage vendor participation, evaluation, and award decisions.")
+    add_bullet(doc, "Generate purchase orders from approved procurement outcomes.")
+    add_bullet(doc, "Receive delivery against PO with quantity and quality checks (including partial deliveries).")
+    add_bullet(doc, "Post received quantities into inventory and reflect updates in stock views.")
+
+    add_heading(doc, "4. Month-Wise Progress Snapshot", 12)
+    add_bullet(doc, "Month 1: Requirements finalization, architecture planning, database foundation.")
+    add_bullet(doc, "Month 2: Master data and core inventory structures implemented.")
+    add_bullet(doc, "Month 3: Tender, vendor, purchase-order lifecycle implemented.")
+    add_bullet(doc, "Month 4: Stock issuance and multi-level approval workflows implemented.")
+    add_bullet(doc, "Month 5: Store keeper verification workflow, audit trail, and control hardening completed.")
+    add_bullet(doc, "Month 6: End-to-end integration, stabilization, SQL enhancements, and release readiness completed.")
+
+    add_heading(doc, "5. Key Deliverables Completed", 12)
+    add_bullet(doc, "End-to-end stock request-to-issuance workflow.")
+    add_bullet(doc, "Tender-to-PO-to-delivery procurement chain.")
+    add_bullet(doc, "Store keeper physical verification integrated with approval flow.")
+    add_bullet(doc, "Role-based access and permission governance.")
+    add_bullet(doc, "Audit trail, transaction-safe processing, and soft-delete data safety.")
+    add_bullet(doc, "Financial-year aware inventory reporting support.")
+
+    add_heading(doc, "6. Current Status and Next Focus", 12)
+    doc.add_paragraph(
+        "Core IMS modules are complete and operational for business use. The main next focus area is advanced reporting and "
+        "analytics dashboards for management insights and KPI-driven monitoring."
+    )
+
+    section = 7
+
+    # Workflow performance from approval_latency.py, when the analysis has been run
+    performance_file = Path(os.environ.get("IMS_WORKFLOW_PERFORMANCE", "ims-workflow-performance.json"))
+    if performance_file.exists():
+        with open(performance_file, "r", encoding="utf-8") as f:
+            performance = json.load(f)
+        add_heading(doc, f"{section}. Workflow Performance", 12)
+        section += 1
+        doc.add_paragraph("Time taken at each approval stage, measured from the approval history.")
+        add_table(
+            doc,
+            ["Stage", "Requests", "Median (p50)", "p90", "p99"],
+            [
+                [row["stage"], row["count"], fmt_duration(row["p50"]), fmt_duration(row["p90"]), fmt_duration(row["p99"])]
+                for row in performance["stages"]
+            ],
+        )
+        slowest_wings = sorted(
+            (row for row in performance["wings"] if row["stage"] == "End-to-end"),
+            key=lambda row: row["p90"] or 0,
+            reverse=True,
+        )[:10]
+        if slowest_wings:
+            doc.add_paragraph()
+            add_table(
+                doc,
+                ["Wing (end-to-end)", "Requests", "Median (p50)", "p90", "p99"],
+                [
+                    [row["wing_name"], row["count"], fmt_duration(row["p50"]), fmt_duration(row["p90"]), fmt_duration(row["p99"])]
+                    for row in slowest_wings
+                ],
+            )
+
+    # API load test from ims_load_test.py, when a run has been recorded
+    load_test_file = Path(os.environ.get("IMS_LOAD_TEST", "ims-load-test.json"))
+    if load_test_file.exists():
+        with open(load_test_file, "r", encoding="utf-8") as f:
+            load_test = json.load(f)
+        add_heading(doc, f"{section}. Workflow Load Test", 12)
+        section += 1
+        completed = sum(row["completed"] for row in load_test["scenarios"])
+        doc.add_paragraph(
+            f"{load_test['sessions']} issuance-to-issue sessions replayed against {load_test['target']} at "
+            f"{load_test['rate']:g} sessions/s with up to {load_test['concurrency']} active at once: "
+            f"{completed} completed, {load_test['requests']:,} API requests at "
+            f"{load_test['throughput_rps']:.1f} requests/s, error rate {load_test['error_rate']:.2%}."
+        )
+        add_table(
+            doc,
+            ["Endpoint", "Requests", "Errors", "Median (p50)", "p90", "p99"],
+            [
+                [row["endpoint"], row["count"], row["errors"], fmt_ms(row["p50"]), fmt_ms(row["p90"]), fmt_ms(row["p99"])]
+                for row in load_test["endpoints"]
+            ],
+        )
+
+    # Effective permissions from permission_matrix.py, when the matrix has been resolved
+    matrix_file = Path(os.environ.get("IMS_PERMISSION_MATRIX", "ims-permission-matrix.json"))
+    if matrix_file.exists():
+        with open(matrix_file, "r", encoding="utf-8") as f:
+            matrix = json.load(f)
+        summary = matrix["summary"]
+        add_heading(doc, f"{section}. Access Governance", 12)
+        section += 1
+        doc.add_paragraph(
+            f"Effective permissions of {summary['users']:,} users resolved from their active role assignments: "
+            f"{summary['users_deviating']:,} differ from the role templates and "
+            f"{summary['users_without_roles']:,} hold no active role."
+        )
+        if matrix["inactive_effective_roles"]:
+            doc.add_paragraph(
+                "Deactivated roles still granting permissions to assigned users: "
+                + ", ".join(f"{role['display_name']} ({role['users']:,} users)" for role in matrix["inactive_effective_roles"])
+                + "."
+            )
+        add_table(
+            doc,
+            ["Role", "Users", "Permissions", "Drift from Template"],
+            [
+                [role["display_name"] + ("" if role["is_active"] else " (inactive)"), role["users"], role["permissions"],
+                 ", ".join([f"+{key}" for key in role["extra"]] + [f"-{key}" for key in role["missing"]]) or "-"]
+                for role in matrix["roles"] if role["is_active"] or role["users"]
+            ],
+        )
+
+    return doc
+
+
+def main():
+    with phase("render"):
+        doc = build_document()
+    count("paragraphs", len(doc.paragraphs))
+    count("tables", len(doc.tables))
+    output_file = "IMS-6-Month-Progress-One-Pager-Proper-Flow.docx"
+    with phase("save"):
+        doc.save(output_file)
+    count("bytes_written", os.path.getsize(output_file))
+    print(f"Created: {output_file}")
+
+
+if __name__ == "__main__":
+    with profiled("create-ims-one-pager-docx"):
+        main()
@@ -3,15 +3,26 @@
 Generate comprehensive PowerPoint presentation for IMS (Inventory Management System)
 """
 
+import json
+import os
+from pathlib import Path
+
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 
+from ims_instrument import count, phase, profiled
+
 # Create presentation
-prs = Presentation()
-prs.slide_width = Inches(10)
-prs.slide_height = Inches(7.5)
+def new_presentation():
+    """Create a blank 10 x 7.5 inch presentation"""
+    with phase("load"):
+        prs = Presentation()
+    prs.slide_width = Inches(10)
+    prs.slide_height = Inches(7.5)
+    return prs
+
 
 # Define color scheme
 PRIMARY_COLOR = RGBColor(31, 78, 121)  # Professional blue
@@ -164,297 +175,387 @@ def add_two_column_slide(prs, title, left_content, right_content):
     
     return slide
 
-# Slide 1: Title Slide
-add_title_slide(prs, 
-    "INVENTORY MANAGEMENT SYSTEM", 
-    "Enterprise-Grade Stock Management Solution")
-
-# Slide 2: System Overview
-add_content_slide(prs, 
-    "System Overview",
-    [
-        "✓ Enterprise-grade web-based inventory platform",
-        "✓ Multi-location inventory management with hierarchical control",
-        "✓ Integrated procurement and stock issuance workflows",
-        "✓ Real-time inventory tracking and reconciliation",
-        "✓ Multi-level approval workflows with role-based access",
-        "✓ Production-ready system managing 15+ items across multiple locations"
-    ])
-
-# Slide 3: Technology Stack
-add_two_column_slide(prs,
-    "Technology Stack",
-    [
-        "Frontend:",
-        "• React 18 + TypeScript",
-        "• Vite (build tool)",
-        "• shadcn/ui Components",
-        "• Tailwind CSS",
-        "",
-        "Authentication:",
-        "• AspNetCore Identity",
-        "• SSO Support"
-    ],
-    [
-        "Backend:",
-        "• Node.js + Express",
-        "• CommonJS Modules",
-        "• Winston (Logging)",
-        "• Multer (File Uploads)",
-        "",
-        "Database:",
-        "• SQL Server 2022",
-        "• 50+ Tables"
-    ])
-
-# Slide 4: Key Modules - Part 1
-add_content_slide(prs,
-    "Core Modules",
-    [
-        "1. STOCK ACQUISITION (Procurement)",
-        "   • Tender management (Contract, Spot-Purchase, Annual)",
-        "   • Vendor evaluation and bidding",
-        "   • Purchase order creation and tracking",
-        "",
-        "2. STOCK ISSUANCE",
-        "   • Item request system with custom quantities",
-        "   • 3-level approval workflow",
-        "   • Per-item decision making (Approve/Return/Reject)",
-        "   • Automatic inventory deduction"
-    ])
-
-# Slide 5: Key Modules - Part 2
-add_content_slide(prs,
-    "Core Modules (Continued)",
-    [
-        "3. INVENTORY VERIFICATION",
-        "   • Physical stock verification by store keepers",
-        "   • Verification request assignment",
-        "   • Reconciliation with system records",
-        "",
-        "4. ANNUAL TENDER FRAMEWORK",
-        "   • Year-long vendor contracts",
-        "   • Item group organization",
-        "   • Per-item vendor assignment",
-        "",
-        "5. HIERARCHICAL INVENTORY",
-        "   • Admin Store (Central warehouse)",
-        "   • Wing Store (Department-level)",
-        "   • Personal Store (User-allocated items)"
-    ])
-
-# Slide 6: Key Workflows
-add_content_slide(prs,
-    "Main Operational Workflows",
-    [
-        "Stock Acquisition:",
-        "Request → Tender → Vendor Bids → Award → Delivery → Distribution",
-        "",
-        "Stock Issuance:",
-        "Request → Supervisor Approval → Finance → Admin → Issue → Deduct",
-        "",
-        "Inventory Verification:",
-        "Request → Store Keeper → Physical Count → Reconciliation → Update",
-        "",
-        "Annual Tender:",
-        "Define Groups → Create Framework → Assign Vendors → POs → Deliveries"
-    ])
-
-# Slide 7: User Roles & Permissions
-add_content_slide(prs,
-    "User Roles & Permissions",
-    [
-        "Super Admin - Full system access (50 permissions)",
-        "Admin - Inventory, Users, Settings management",
-        "Wing Supervisor - Wing inventory and approvals",
-        "Store Keeper - Physical inventory verification",
-        "Finance/Approver - Purchase order and financial approvals",
-        "Users/Requesters - Item requests and personal allocations",
-        "",
-        "Total Active Users: 499+ registered across the system"
-    ])
-
-# Slide 8: Database Architecture
-add_two_column_slide(prs,
-    "Database Architecture",
-    [
-        "Master Data Tables:",
-        "• Item Masters (15+ items)",
-        "• Categories & Subcategories",
-        "• Vendors (7+ vendors)",
-        "",
-        "Procurement Tables:",
-        "• Tenders & Tender Items",
-        "• Vendors & Bidding",
-        "• Purchase Orders",
-        "• Deliveries & Serial Numbers"
-    ],
-    [
-        "Inventory Tables:",
-        "• Stock Levels (3-tier)",
-        "• Issuance Requests",
-        "• Stock Returns",
-        "• Current Inventory Stock",
-        "",
-        "Control Tables:",
-        "• Approvals & Workflows",
-        "• Approval History",
-        "• User Designations",
-        "• Organizational Hierarchy"
-    ])
-
-# Slide 9: System Features
-add_content_slide(prs,
-    "Key System Features",
-    [
-        "✅ Real-time Stock Tracking",
-        "✅ Multi-Step Hierarchical Approval Workflows",
-        "✅ Complete Audit Trail & History",
-        "✅ Role-Based Access Control (RBAC)",
-        "✅ Three-Level Inventory Management",
-        "✅ Multiple Tender Types Support",
-        "✅ Digital Annual Framework Contracts",
-        "✅ Serial Number & Equipment Tracking",
-        "✅ Document Upload & Attachment Support",
-        "✅ Soft Delete with Data Recovery"
-    ])
-
-# Slide 10: Frontend Architecture
-add_content_slide(prs,
-    "Frontend Architecture",
-    [
-        "Core Pages & Dashboards:",
-        "• Approval Dashboard (Supervisor/Finance)",
-        "• Main Dashboard",
-        "• Stock Issuance Management",
-        "• Current Inventory Stock View",
-        "• Tender Creation & Management",
-        "• Store Keeper Verification",
-        "• User Role Assignment",
-        "• Purchase Order Dashboard",
-        "",
-        "Component Library: 25+ Reusable UI Components"
-    ])
-
-# Slide 11: Backend Architecture
-add_content_slide(prs,
-    "Backend Architecture",
-    [
-        "API Server (Express.js):",
-        "• 40+ REST Endpoints",
-        "• Authentication & Authorization Middleware",
-        "• Comprehensive Logging (Winston)",
-        "• Error Handling & Validation",
-        "",
-        "Key API Routes:",
-        "• /api/tenders - Tender operations",
-        "• /api/stock-issuance - Issuance management",
-        "• /api/approvals - Approval workflows",
-        "• /api/inventory - Stock queries",
-        "• /api/purchase-orders - PO management",
-        "• /api/users - User management"
-    ])
-
-# Slide 12: Project Status & Completion
-add_two_column_slide(prs,
-    "Project Status",
-    [
-        "✅ COMPLETED:",
-        "• Core Inventory",
-        "• Stock Issuance",
-        "• Approval Workflows",
-        "• Tender Management",
-        "• Annual Tenders",
-        "• Purchase Orders",
-        "• Verification System",
-        "• User/Role Management"
-    ],
-    [
-        "🟡 IN PROGRESS:",
-        "• Reporting & Analytics",
-        "",
-        "🔵 FUTURE ENHANCEMENTS:",
-        "• Mobile Application",
-        "• Advanced Analytics",
-        "• Real-time Dashboards",
-        "• AI-based Recommendations"
-    ])
-
-# Slide 13: Deployment & Configuration
-add_content_slide(prs,
-    "Deployment & Configuration",
-    [
-        "Development Stack:",
-        "• Frontend Port: 8080 (Vite dev server)",
-        "• Backend Port: 3001 (Express API)",
-        "",
-        "Configuration Management:",
-        "• Environment-specific configs (dev/test/staging/prod)",
-        "• Docker Support (Dockerfile + docker-compose)",
-        "• Database Migrations (100+ SQL scripts)",
-        "",
-        "Deployment Automation:",
-        "• PowerShell deployment scripts",
-        "• Bash automation support"
-    ])
-
-# Slide 14: Data Security & Compliance
-add_content_slide(prs,
-    "Security & Data Management",
-    [
-        "Authentication & Authorization:",
-        "✓ AspNetCore Identity with SSO",
-        "✓ Role-Based Access Control (RBAC)",
-        "✓ Multi-level approval workflows",
-        "",
-        "Data Management:",
-        "✓ Soft delete mechanism (no permanent data loss)",
-        "✓ Complete audit trail & approval history",
-        "✓ Transaction-based operations",
-        "✓ SQL Server security features"
-    ])
-
-# Slide 15: Business Impact
-add_content_slide(prs,
-    "Business Impact & Benefits",
-    [
-        "Operational Efficiency:",
-        "→ Automated procurement-to-inventory workflow",
-        "→ Real-time stock visibility across 3 inventory levels",
-        "",
-        "Control & Compliance:",
-        "→ Multi-step approval ensuring accountability",
-        "→ Complete audit trail for compliance",
-        "",
-        "Scalability:",
-        "→ Supports 499+ users across organization",
-        "→ Handles 15+ item types with unlimited expansion",
-        "→ Multi-location inventory management"
-    ])
-
-# Slide 16: Implementation Highlights
-add_content_slide(prs,
-    "Implementation Highlights",
-    [
-        "✓ Successfully integrated 3 inventory levels",
-        "✓ Implemented complex approval workflows",
-        "✓ Annual tender system with framework contracts",
-        "✓ Real-time stock tracking & reconciliation",
-        "✓ Vendor management & bidding system",
-        "✓ Purchase order automation",
-        "✓ Serial number tracking for equipment",
-        "✓ Comprehensive user & role management",
-        "✓ Production deployment with 499+ active users"
-    ])
-
-# Slide 17: Closing Slide
-add_title_slide(prs,
-    "Thank You",
-    "Inventory Management System - Enterprise Solution")
-
-# Save presentation
-output_path = "IMS_System_Presentation.pptx"
-prs.save(output_path)
-print(f"✅ PowerPoint presentation created successfully!")
-print(f"📊 File saved as: {output_path}")
-print(f"📈 Total slides: {len(prs.slides)}")
+def add_table_slide(prs, title, headers, rows, subheading=None):
+    """Add a slide with a title bar and a table"""
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    
+    # Add title background bar
+    title_shape = slide.shapes.add_shape(1, Inches(0), Inches(0), Inches(10), Inches(0.9))
+    title_fill = title_shape.fill
+    title_fill.solid()
+    title_fill.fore_color.rgb = PRIMARY_COLOR
+    title_shape.line.color.rgb = PRIMARY_COLOR
+    
+    # Add title
+    title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.15), Inches(9), Inches(0.7))
+    p = title_box.text_frame.paragraphs[0]
+    p.text = title
+    p.font.size = Pt(36)
+    p.font.bold = True
+    p.font.color.rgb = RGBColor(255, 255, 255)
+    
+    top = Inches(1.1)
+    if subheading:
+        sub_box = slide.shapes.add_textbox(Inches(0.5), Inches(1.0), Inches(9), Inches(0.4))
+        p = sub_box.text_frame.paragraphs[0]
+        p.text = subheading
+        p.font.size = Pt(14)
+        p.font.italic = True
+        p.font.color.rgb = ACCENT_COLOR
+        top = Inches(1.5)
+    
+    table = slide.shapes.add_table(len(rows) + 1, len(headers), Inches(0.5), top, Inches(9), Inches(0.4) * (len(rows) + 1)).table
+    table.columns[0].width = Inches(9) - Inches(1.1) * (len(headers) - 1)
+    for col in range(1, len(headers)):
+        table.columns[col].width = Inches(1.1)
+    for r, values in enumerate([headers] + list(rows)):
+        for c, value in enumerate(values):
+            cell = table.cell(r, c)
+            cell.text = str(value)
+            p = cell.text_frame.paragraphs[0]
+            p.font.size = Pt(12 if r else 13)
+            p.font.bold = r == 0
+            p.font.color.rgb = RGBColor(255, 255, 255) if r == 0 else TEXT_COLOR
+            if c:
+                p.alignment = PP_ALIGN.RIGHT
+            if r == 0:
+                cell.fill.solid()
+                cell.fill.fore_color.rgb = PRIMARY_COLOR
+    
+    return slide
+
+def add_slow_endpoints_slide(prs, latency_file):
+    """Add the Top Slow Endpoints slide from a server_latency.py report"""
+    with open(latency_file, "r", encoding="utf-8") as f:
+        latency = json.load(f)
+    rows = [
+        [row["route"], f"{row['count']:,}", f"{row['p50'] * 1000:.0f} ms", f"{row['p90'] * 1000:.0f} ms",
+         f"{row['p99'] * 1000:.0f} ms", f"{row['error_rate']:.1%}"]
+        for row in latency["top_slow"]
+    ]
+    return add_table_slide(prs,
+        "Top Slow Endpoints",
+        ["Endpoint", "Requests", "p50", "p90", "p99", "5xx"],
+        rows,
+        f"Server response times by p90, {latency['first_day']} to {latency['last_day']} "
+        f"({latency['requests']:,} requests)")
+
+def build_presentation(prs=None):
+    """Build the IMS overview deck (17 slides, plus Top Slow Endpoints when a
+    server_latency.py report is present)"""
+    if prs is None:
+        prs = new_presentation()
+
+    # Slide 1: Title Slide
+    add_title_slide(prs, 
+        "INVENTORY MANAGEMENT SYSTEM", 
+        "Enterprise-Grade Stock Management Solution")
+
+    # Slide 2: System Overview
+    add_content_slide(prs, 
+        "System Overview",
+        [
+            "✓ Enterprise-grade web-based inventory platform",
+            "✓ Multi-location inventory management with hierarchical control",
+            "✓ Integrated procurement and stock issuance workflows",
+            "✓ Real-time inventory tracking and reconciliation",
+            "✓ Multi-level approval workflows with role-based access",
+            "✓ Production-ready system managing 15+ items across multiple locations"
+        ])
+
+    # Slide 3: Technology Stack
+    add_two_column_slide(prs,
+        "Technology Stack",
+        [
+            "Frontend:",
+            "• React 18 + TypeScript",
+            "• Vite (build tool)",
+            "• shadcn/ui Components",
+            "• Tailwind CSS",
+            "",
+            "Authentication:",
+            "• AspNetCore Identity",
+            "• SSO Support"
+        ],
+        [
+            "Backend:",
+            "• Node.js + Express",
+            "• CommonJS Modules",
+            "• Winston (Logging)",
+            "• Multer (File Uploads)",
+            "",
+            "Database:",
+            "• SQL Server 2022",
+            "• 50+ Tables"
+        ])
+
+    # Slide 4: Key Modules - Part 1
+    add_content_slide(prs,
+        "Core Modules",
+        [
+            "1. STOCK ACQUISITION (Procurement)",
+            "   • Tender management (Contract, Spot-Purchase, Annual)",
+            "   • Vendor evaluation and bidding",
+            "   • Purchase order creation and tracking",
+            "",
+            "2. STOCK ISSUANCE",
+            "   • Item request system with custom quantities",
+            "   • 3-level approval workflow",
+            "   • Per-item decision making (Approve/Return/Reject)",
+            "   • Automatic inventory deduction"
+        ])
+
+    # Slide 5: Key Modules - Part 2
+    add_content_slide(prs,
+        "Core Modules (Continued)",
+        [
+            "3. INVENTORY VERIFICATION",
+            "   • Physical stock verification by store keepers",
+            "   • Verification request assignment",
+            "   • Reconciliation with system records",
+            "",
+            "4. ANNUAL TENDER FRAMEWORK",
+            "   • Year-long vendor contracts",
+            "   • Item group organization",
+            "   • Per-item vendor assignment",
+            "",
+            "5. HIERARCHICAL INVENTORY",
+            "   • Admin Store (Central warehouse)",
+            "   • Wing Store (Department-level)",
+            "   • Personal Store (User-allocated items)"
+        ])
+
+    # Slide 6: Key Workflows
+    add_content_slide(prs,
+        "Main Operational Workflows",
+        [
+            "Stock Acquisition:",
+            "Request → Tender → Vendor Bids → Award → Delivery → Distribution",
+            "",
+            "Stock Issuance:",
+            "Request → Supervisor Approval → Finance → Admin → Issue → Deduct",
+            "",
+            "Inventory Verification:",
+            "Request → Store Keeper → Physical Count → Reconciliation → Update",
+            "",
+            "Annual Tender:",
+            "Define Groups → Create Framework → Assign Vendors → POs → Deliveries"
+        ])
+
+    # Slide 7: User Roles & Permissions
+    add_content_slide(prs,
+        "User Roles & Permissions",
+        [
+            "Super Admin - Full system access (50 permissions)",
+            "Admin - Inventory, Users, Settings management",
+            "Wing Supervisor - Wing inventory and approvals",
+            "Store Keeper - Physical inventory verification",
+            "Finance/Approver - Purchase order and financial approvals",
+            "Users/Requesters - Item requests and personal allocations",
+            "",
+            "Total Active Users: 499+ registered across the system"
+        ])
+
+    # Slide 8: Database Architecture
+    add_two_column_slide(prs,
+        "Database Architecture",
+        [
+            "Master Data Tables:",
+            "• Item Masters (15+ items)",
+            "• Categories & Subcategories",
+            "• Vendors (7+ vendors)",
+            "",
+            "Procurement Tables:",
+            "• Tenders & Tender Items",
+            "• Vendors & Bidding",
+            "• Purchase Orders",
+            "• Deliveries & Serial Numbers"
+        ],
+        [
+            "Inventory Tables:",
+            "• Stock Levels (3-tier)",
+            "• Issuance Requests",
+            "• Stock Returns",
+            "• Current Inventory Stock",
+            "",
+            "Control Tables:",
+            "• Approvals & Workflows",
+            "• Approval History",
+            "• User Designations",
+            "• Organizational Hierarchy"
+        ])
+
+    # Slide 9: System Features
+    add_content_slide(prs,
+        "Key System Features",
+        [
+            "✅ Real-time Stock Tracking",
+            "✅ Multi-Step Hierarchical Approval Workflows",
+            "✅ Complete Audit Trail & History",
+            "✅ Role-Based Access Control (RBAC)",
+            "✅ Three-Level Inventory Management",
+            "✅ Multiple Tender Types Support",
+            "✅ Digital Annual Framework Contracts",
+            "✅ Serial Number & Equipment Tracking",
+            "✅ Document Upload & Attachment Support",
+            "✅ Soft Delete with Data Recovery"
+        ])
+
+    # Slide 10: Frontend Architecture
+    add_content_slide(prs,
+        "Frontend Architecture",
+        [
+            "Core Pages & Dashboards:",
+            "• Approval Dashboard (Supervisor/Finance)",
+            "• Main Dashboard",
+            "• Stock Issuance Management",
+            "• Current Inventory Stock View",
+            "• Tender Creation & Management",
+            "• Store Keeper Verification",
+            "• User Role Assignment",
+            "• Purchase Order Dashboard",
+            "",
+            "Component Library: 25+ Reusable UI Components"
+        ])
+
+    # Slide 11: Backend Architecture
+    add_content_slide(prs,
+        "Backend Architecture",
+        [
+            "API Server (Express.js):",
+            "• 40+ REST Endpoints",
+            "• Authentication & Authorization Middleware",
+            "• Comprehensive Logging (Winston)",
+            "• Error Handling & Validation",
+            "",
+            "Key API Routes:",
+            "• /api/tenders - Tender operations",
+            "• /api/stock-issuance - Issuance management",
+            "• /api/approvals - Approval workflows",
+            "• /api/inventory - Stock queries",
+            "• /api/purchase-orders - PO management",
+            "• /api/users - User management"
+        ])
+
+    # Slide 12: Project Status & Completion
+    add_two_column_slide(prs,
+        "Project Status",
+        [
+            "✅ COMPLETED:",
+            "• Core Inventory",
+            "• Stock Issuance",
+            "• Approval Workflows",
+            "• Tender Management",
+            "• Annual Tenders",
+            "• Purchase Orders",
+            "• Verification System",
+            "• User/Role Management"
+        ],
+        [
+            "🟡 IN PROGRESS:",
+            "• Reporting & Analytics",
+            "",
+            "🔵 FUTURE ENHANCEMENTS:",
+            "• Mobile Application",
+            "• Advanced Analytics",
+            "• Real-time Dashboards",
+            "• AI-based Recommendations"
+        ])
+
+    # Slide 13: Deployment & Configuration
+    add_content_slide(prs,
+        "Deployment & Configuration",
+        [
+            "Development Stack:",
+            "• Frontend Port: 8080 (Vite dev server)",
+            "• Backend Port: 3001 (Express API)",
+            "",
+            "Configuration Management:",
+            "• Environment-specific configs (dev/test/staging/prod)",
+            "• Docker Support (Dockerfile + docker-compose)",
+            "• Database Migrations (100+ SQL scripts)",
+            "",
+            "Deployment Automation:",
+            "• PowerShell deployment scripts",
+            "• Bash automation support"
+        ])
+
+    # Slide 14: Data Security & Compliance
+    add_content_slide(prs,
+        "Security & Data Management",
+        [
+            "Authentication & Authorization:",
+            "✓ AspNetCore Identity with SSO",
+            "✓ Role-Based Access Control (RBAC)",
+            "✓ Multi-level approval workflows",
+            "",
+            "Data Management:",
+            "✓ Soft delete mechanism (no permanent data loss)",
+            "✓ Complete audit trail & approval history",
+            "✓ Transaction-based operations",
+            "✓ SQL Server security features"
+        ])
+
+    # Slide 15: Business Impact
+    add_content_slide(prs,
+        "Business Impact & Benefits",
+        [
+            "Operational Efficiency:",
+            "→ Automated procurement-to-inventory workflow",
+            "→ Real-time stock visibility across 3 inventory levels",
+            "",
+            "Control & Compliance:",
+            "→ Multi-step approval ensuring accountability",
+            "→ Complete audit trail for compliance",
+            "",
+            "Scalability:",
+            "→ Supports 499+ users across organization",
+            "→ Handles 15+ item types with unlimited expansion",
+            "→ Multi-location inventory management"
+        ])
+
+    # Slide 16: Implementation Highlights
+    add_content_slide(prs,
+        "Implementation Highlights",
+        [
+            "✓ Successfully integrated 3 inventory levels",
+            "✓ Implemented complex approval workflows",
+            "✓ Annual tender system with framework contracts",
+            "✓ Real-time stock tracking & reconciliation",
+            "✓ Vendor management & bidding system",
+            "✓ Purchase order automation",
+            "✓ Serial number tracking for equipment",
+            "✓ Comprehensive user & role management",
+            "✓ Production deployment with 499+ active users"
+        ])
+
+    # Server performance from server_latency.py, when the logs have been analyzed
+    latency_file = Path(os.environ.get("IMS_SERVER_LATENCY", "ims-server-latency.json"))
+    if latency_file.exists():
+        add_slow_endpoints_slide(prs, latency_file)
+
+    # Slide 17: Closing Slide
+    add_title_slide(prs,
+        "Thank You",
+        "Inventory Management System - Enterprise Solution")
+
+    return prs
+
+def main():
+    with phase("render"):
+        prs = build_presentation()
+    count("slides", len(prs.slides))
+    count("shapes", sum(len(slide.shapes) for slide in prs.slides))
+
+    # Save presentation
+    output_path = "IMS_System_Presentation.pptx"
+    with phase("save"):
+        prs.save(output_path)
+    count("bytes_written", os.path.getsize(output_path))
+    print(f"✅ PowerPoint presentation created successfully!")
+    print(f"📊 File saved as: {output_path}")
+    print(f"📈 Total slides: {len(prs.slides)}")
+
+if __name__ == "__main__":
+    with profiled("create-ims-presentation"):
+        main()
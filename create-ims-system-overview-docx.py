@@ -1,7 +1,15 @@
+import json
+import os
+from pathlib import Path
+
 from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+from ims_instrument import count, phase, profiled
+
+ANNEX_ROWS = 10
+
 
 def add_heading(doc, text, size=12):
     p = doc.add_paragraph()
@@ -17,68 +25,209 @@ def add_bullet(doc, text):
     return p
 
 
-doc = Document()
-
-# Title
-p = doc.add_paragraph()
-p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-run = p.add_run("INVENTORY MANAGEMENT SYSTEM (IMS)\nTOTAL SYSTEM OVERVIEW (ONE-PAGER)")
-run.bold = True
-run.font.size = Pt(16)
-
-meta = doc.add_paragraph()
-meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
-meta.add_run("System Summary for Project Management Review").font.size = Pt(10)
-
-doc.add_paragraph()
-
-add_heading(doc, "1. System Purpose")
-doc.add_paragraph(
-    "The Inventory Management System (IMS) is an enterprise web platform that manages the full lifecycle of inventory: "
-    "planning and procurement, purchase ordering, delivery receiving, stock control, request approvals, issuance, and "
-    "verification. It provides role-based access, auditability, and multi-level operational control for organization-wide usage."
-)
-
-add_heading(doc, "2. Core Modules")
-add_bullet(doc, "Procurement Management: Contract, Annual, and Spot/Patty tender workflows.")
-add_bullet(doc, "Vendor Management: Vendor registration, participation, assignment, and evaluation.")
-add_bullet(doc, "Purchase Order Management: PO creation, line-item tracking, and PO lifecycle control.")
-add_bullet(doc, "Delivery Receiving: PO-linked receiving, quality notes, partial delivery handling, and stock posting.")
-add_bullet(doc, "Stock Issuance: Item request, approval routing, processing, and final issuance.")
-add_bullet(doc, "Approval Workflow: Multi-level approval with item-wise decisions and forwarding.")
-add_bullet(doc, "Store Keeper Verification: Physical stock confirmation with available/partial/unavailable outcome.")
-add_bullet(doc, "Inventory Control: Current inventory visibility, stock movements, year-wise balance support.")
-add_bullet(doc, "Administration & Security: User roles, permission governance, and operational audit trail.")
-
-add_heading(doc, "3. End-to-End Business Flow")
-add_bullet(doc, "Procurement Flow: Tender Creation -> Vendor Selection -> PO Generation -> Delivery Receipt -> Stock Update.")
-add_bullet(doc, "Issuance Flow: User Request -> Supervisor Review -> Verification (if needed) -> Final Approval -> Issue -> Stock Deduction.")
-add_bullet(doc, "Verification Flow: Approver Forwards Item -> Store Keeper Physical Check -> Status Feedback -> Approval Finalization.")
-
-add_heading(doc, "4. Inventory Model")
-add_bullet(doc, "Three-level inventory structure implemented: Admin Store, Wing Store, and Personal allocation level.")
-add_bullet(doc, "Real-time status visibility and transaction-driven stock updates across levels.")
-add_bullet(doc, "Financial-year aware inventory reporting support through year-wise inventory views.")
-
-add_heading(doc, "5. Roles and Governance")
-add_bullet(doc, "General Users: Raise item requests and track status.")
-add_bullet(doc, "Wing Supervisors/Approvers: Review and route requests, trigger verification workflows.")
-add_bullet(doc, "Store Keepers: Perform physical verification and confirm stock availability.")
-add_bullet(doc, "Admins/Management: Final approval authority, configuration, monitoring, and oversight.")
-add_bullet(doc, "Role-based permissions and workflow history provide accountability and compliance support.")
-
-add_heading(doc, "6. Technical Overview")
-add_bullet(doc, "Frontend: React + TypeScript + Vite with dashboard-based module navigation.")
-add_bullet(doc, "Backend: Node.js/Express APIs for procurement, inventory, approvals, users, and workflows.")
-add_bullet(doc, "Database: SQL Server with workflow procedures, views, and migration scripts.")
-add_bullet(doc, "Data Integrity: Transaction-safe operations, status-driven workflows, and soft-delete strategy.")
-
-add_heading(doc, "7. Current System Status")
-doc.add_paragraph(
-    "IMS core modules are integrated and operational for production use. The system currently supports end-to-end inventory "
-    "operations with approval controls, verification traceability, and procurement-to-stock continuity."
-)
-
-output_file = "IMS-Total-System-Overview-One-Pager.docx"
-doc.save(output_file)
-print(f"Created: {output_file}")
+def add_table(doc, headers, rows):
+    table = doc.add_table(rows=1, cols=len(headers))
+    table.style = "Table Grid"
+    for cell, text in zip(table.rows[0].cells, headers):
+        cell.text = ""
+        cell.paragraphs[0].add_run(text).bold = True
+    for row in rows:
+        for cell, value in zip(table.add_row().cells, row):
+            cell.text = str(value)
+    return table
+
+
+def fmt_qty(value):
+    return f"{value:,.0f}"
+
+
+def build_document():
+    """Build the total system overview one-pager."""
+    with phase("load"):
+        doc = Document()
+
+    # Title
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = p.add_run("INVENTORY MANAGEMENT SYSTEM (IMS)\nTOTAL SYSTEM OVERVIEW (ONE-PAGER)")
+    run.bold = True
+    run.font.size = Pt(16)
+
+    meta = doc.add_paragraph()
+    meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    meta.add_run("System Summary for Project Management Review").font.size = Pt(10)
+
+    doc.add_paragraph()
+
+    add_heading(doc, "1. System Purpose")
+    doc.add_paragraph(
+        "The Inventory Management System (IMS) is an enterprise web platform that manages the full lifecycle of inventory: "
+        "planning and procurement, purchase ordering, delivery receiving, stock control, request approvals, issuance, and "
+        "verification. It provides role-based access, auditability, and multi-level operational control for organization-wide usage."
+    )
+
+    add_heading(doc, "2. Core Modules")
+    add_bullet(doc, "Procurement Management: Contract, Annual, and Spot/Patty tender workflows.")
+    add_bullet(doc, "Vendor Management: Vendor registration, participation, assignment, and evaluation.")
+    add_bullet(doc, "Purchase Order Management: PO creation, line-item tracking, and PO lifecycle control.")
+    add_bullet(doc, "Delivery Receiving: PO-linked receiving, quality notes, partial delivery handling, and stock posting.")
+    add_bullet(doc, "Stock Issuance: Item request, approval routing, processing, and final issuance.")
+    add_bullet(doc, "Approval Workflow: Multi-level approval with item-wise decisions and forwarding.")
+    add_bullet(doc, "Store Keeper Verification: Physical stock confirmation with available/partial/unavailable outcome.")
+    add_bullet(doc, "Inventory Control: Current inventory visibility, stock movements, year-wise balance support.")
+    add_bullet(doc, "Administration & Security: User roles, permission governance, and operational audit trail.")
+
+    add_heading(doc, "3. End-to-End Business Flow")
+    add_bullet(doc, "Procurement Flow: Tender Creation -> Vendor Selection -> PO Generation -> Delivery Receipt -> Stock Update.")
+    add_bullet(doc, "Issuance Flow: User Request -> Supervisor Review -> Verification (if needed) -> Final Approval -> Issue -> Stock Deduction.")
+    add_bullet(doc, "Verification Flow: Approver Forwards Item -> Store Keeper Physical Check -> Status Feedback -> Approval Finalization.")
+
+    add_heading(doc, "4. Inventory Model")
+    add_bullet(doc, "Three-level inventory structure implemented: Admin Store, Wing Store, and Personal allocation level.")
+    add_bullet(doc, "Real-time status visibility and transaction-driven stock updates across levels.")
+    add_bullet(doc, "Financial-year aware inventory reporting support through year-wise inventory views.")
+
+    add_heading(doc, "5. Roles and Governance")
+    add_bullet(doc, "General Users: Raise item requests and track status.")
+    add_bullet(doc, "Wing Supervisors/Approvers: Review and route requests, trigger verification workflows.")
+    add_bullet(doc, "Store Keepers: Perform physical verification and confirm stock availability.")
+    add_bullet(doc, "Admins/Management: Final approval authority, configuration, monitoring, and oversight.")
+    add_bullet(doc, "Role-based permissions and workflow history provide accountability and compliance support.")
+
+    add_heading(doc, "6. Technical Overview")
+    add_bullet(doc, "Frontend: React + TypeScript + Vite with dashboard-based module navigation.")
+    add_bullet(doc, "Backend: Node.js/Express APIs for procurement, inventory, approvals, users, and workflows.")
+    add_bullet(doc, "Database: SQL Server with workflow procedures, views, and migration scripts.")
+    add_bullet(doc, "Data Integrity: Transaction-safe operations, status-driven workflows, and soft-delete strategy.")
+
+    add_heading(doc, "7. Current System Status")
+    doc.add_paragraph(
+        "IMS core modules are integrated and operational for production use. The system currently supports end-to-end inventory "
+        "operations with approval controls, verification traceability, and procurement-to-stock continuity."
+    )
+
+    # Annex: year-wise balances from fy_rollup.py, when a roll-up has been generated
+    fy_rollup_file = Path(os.environ.get("IMS_FY_ROLLUP", "ims-fy-rollup.json"))
+    if fy_rollup_file.exists():
+        with open(fy_rollup_file, "r", encoding="utf-8") as f:
+            financial_years = json.load(f)["financial_years"]
+        add_heading(doc, "Annex A. Year-wise Inventory Balances")
+        add_table(
+            doc,
+            ["Financial Year", "Opening", "Received", "Issued", "Closing"],
+            [
+                [
+                    fy["year_code"] + (" (current)" if fy["is_current"] else ""),
+                    fmt_qty(fy["totals"]["opening"]),
+                    fmt_qty(fy["totals"]["received"]),
+                    fmt_qty(fy["totals"]["issued"]),
+                    fmt_qty(fy["totals"]["closing"]),
+                ]
+                for fy in financial_years
+            ],
+        )
+
+    # Annex: procurement exceptions from po_reconciliation.py, largest first
+    reconciliation_file = Path(os.environ.get("IMS_PO_RECONCILIATION", "ims-po-reconciliation.json"))
+    if reconciliation_file.exists():
+        with open(reconciliation_file, "r", encoding="utf-8") as f:
+            reconciliation = json.load(f)
+        summary = reconciliation["summary"]
+        add_heading(doc, "Annex B. Procurement Reconciliation")
+        add_table(
+            doc,
+            ["Check", "Matched", "Over", "Under", "Not Yet Due"],
+            [
+                ["PO lines vs deliveries", fmt_qty(summary["matched"]), fmt_qty(summary["over"]),
+                 fmt_qty(summary["under"]), fmt_qty(summary["open"])],
+                ["Deliveries vs stock postings", fmt_qty(summary["posted"]),
+                 fmt_qty(summary["over_posted"] + summary["orphan"]),
+                 fmt_qty(summary["unposted"] + summary["partly_posted"]), fmt_qty(summary["awaiting_receipt"])],
+            ],
+        )
+        if reconciliation["po_lines"]:
+            doc.add_paragraph("Largest PO line variances:")
+            add_table(
+                doc,
+                ["PO", "Item", "Ordered", "Delivered", "Variance", "Status"],
+                [
+                    [row["po_number"], row["item_code"] or row["item_master_id"], fmt_qty(row["ordered"]),
+                     fmt_qty(row["delivered"]), fmt_qty(row["difference"]), row["status"]]
+                    for row in reconciliation["po_lines"][:ANNEX_ROWS]
+                ],
+            )
+        if reconciliation["receipts"]:
+            doc.add_paragraph("Largest receipts not matched by stock postings:")
+            add_table(
+                doc,
+                ["Delivery", "Item", "Delivered", "Posted", "Variance", "Status"],
+                [
+                    [row["delivery_number"] or row["delivery_id"], row["item_code"] or row["item_master_id"],
+                     fmt_qty(row["delivered"]), fmt_qty(row["posted"]), fmt_qty(row["difference"]), row["status"]]
+                    for row in reconciliation["receipts"][:ANNEX_ROWS]
+                ],
+            )
+
+    # Annex: effective permissions from permission_matrix.py
+    matrix_file = Path(os.environ.get("IMS_PERMISSION_MATRIX", "ims-permission-matrix.json"))
+    if matrix_file.exists():
+        with open(matrix_file, "r", encoding="utf-8") as f:
+            matrix = json.load(f)
+        summary = matrix["summary"]
+        add_heading(doc, "Annex C. Effective Permissions")
+        doc.add_paragraph(
+            f"{summary['users']:,} users resolved against {summary['permissions']} active permissions: "
+            f"{summary['users_without_roles']:,} hold no active role and {summary['users_deviating']:,} differ "
+            f"from the templates of their roles; {summary['roles_drifted']} of {summary['roles']} roles have drifted "
+            f"and {summary['roles_inactive_effective']} deactivated roles still grant permissions to assigned users."
+        )
+        add_table(
+            doc,
+            ["Role", "Users", "Permissions", "Extra vs Template", "Missing vs Template"],
+            [
+                [role["display_name"] + ("" if role["is_active"] else " (inactive)"), fmt_qty(role["users"]),
+                 role["permissions"], ", ".join(role["extra"]) or "-",
+                 ", ".join(role["missing"]) or ("-" if role["has_template"] else "no template")]
+                for role in matrix["roles"]
+            ],
+        )
+        doc.add_paragraph("Permissions granted per role:")
+        roles = [role for role in matrix["roles"] if role["is_active"] or role["users"]]
+        masks = [int(role["mask"], 16) for role in roles]
+        add_table(
+            doc,
+            ["Permission"] + [role["role_name"] for role in roles],
+            [
+                [permission["permission_key"]] + ["✓" if mask >> permission["bit"] & 1 else "" for mask in masks]
+                for permission in matrix["permissions"] if permission["is_active"]
+            ],
+        )
+        doc.add_paragraph("Most common role combinations:")
+        add_table(
+            doc,
+            ["Roles", "Users", "Permissions", "Deviation"],
+            [
+                [" + ".join(profile["roles"]) or "(none)", fmt_qty(profile["users"]), profile["permissions"],
+                 ", ".join([f"+{key}" for key in profile["extra"]] + [f"-{key}" for key in profile["missing"]]) or "-"]
+                for profile in matrix["profiles"][:ANNEX_ROWS]
+            ],
+        )
+
+    return doc
+
+
+def main():
+    with phase("render"):
+        doc = build_document()
+    count("paragraphs", len(doc.paragraphs))
+    count("tables", len(doc.tables))
+    output_file = "IMS-Total-System-Overview-One-Pager.docx"
+    with phase("save"):
+        doc.save(output_file)
+    count("bytes_written", os.path.getsize(output_file))
+    print(f"Created: {output_file}")
+
+
+if __name__ == "__main__":
+    with profiled("create-ims-system-overview-docx"):
+        main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Financial-year roll-up of the acquisition and issuance ledgers.
+
+Computes per-item, per-FY opening balance, receipts, issues and closing
+balance (the figures YearwiseInventoryReport.tsx shows) in one sorted pass
+over the ledger events. Financial years run April to March, the same
+'2025-26' codes the financial_years table uses.
+
+Closed years are kept as checkpoints in a JSON file. A later run starts from
+the last checkpoint's closing balances and only reads transactions dated
+from the first open year onwards (the date filters are pushed into the
+read), so adding a year does not replay history. The checkpoints also keep
+the newest change stamp of the ledger tables; a row dated in a closed year
+but entered or edited after that reopens the year, with a warning.
+
+The roll-up file written by --out is read by create-ims-system-overview-docx.py
+for its year-wise inventory annex.
+
+Usage:
+    python fy_rollup.py <source> [--checkpoints FILE] [--out FILE] [--rebuild]
+"""
+
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from ims_tables import iter_rows, norm_id, to_flag, to_number
+
+DEFAULT_CHECKPOINTS = "fy-rollup.checkpoints.json"
+DEFAULT_OUTPUT = "ims-fy-rollup.json"
+CHECKPOINT_VERSION = 2
+
+FY_START_MONTH = 4
+ISSUED_STATUSES = ("ISSUED", "COMPLETED")
+
+
+def fy_code(day):
+    """'2025-26' for any ISO date string from 2025-04-01 to 2026-03-31."""
+    year, month = int(day[0:4]), int(day[5:7])
+    start = year if month >= FY_START_MONTH else year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def fy_start(code):
+    return f"{code[0:4]}-{FY_START_MONTH:02d}-01"
+
+
+def fy_end(code):
+    start = int(code[0:4])
+    return (date(start + 1, FY_START_MONTH, 1) - timedelta(days=1)).isoformat()
+
+
+def next_fy(code):
+    start = int(code[0:4]) + 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def _day(value):
+    """First 10 characters of a timestamp, or None when it is not a date."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if len(text) < 10 or text[4] != "-" or text[7] != "-":
+        return None
+    return text[:10]
+
+
+def _stamp(value):
+    """Change stamp of a row as text, or None."""
+    return None if value is None else str(value).strip() or None
+
+
+def _advance(watermarks, table, stamp):
+    if watermarks is not None and stamp is not None and stamp > watermarks.get(table, ""):
+        watermarks[table] = stamp
+
+
+def _since_day(source, table, columns, dated, fallback, start):
+    """Rows of ``table`` dated on/after ``start``; all rows when ``start`` is None.
+
+    A row is dated by column ``dated`` when it holds a date, else by
+    ``fallback``. Both filters are pushed into the read, so a run after a
+    checkpoint only reads the open years.
+    """
+    if start is None:
+        yield from iter_rows(source, table, columns)
+        return
+    first, second = columns.index(dated), columns.index(fallback)
+    for row in iter_rows(source, table, columns, since=(dated, start), inclusive=True):
+        if _day(row[first]) is not None:
+            yield row
+    for row in iter_rows(source, table, columns, since=(fallback, start), inclusive=True):
+        if _day(row[first]) is None and _day(row[second]) is not None:
+            yield row
+
+
+def load_events(source, start=None, watermarks=None):
+    """Return ledger events dated on/after ``start`` sorted by day.
+
+    Each event is ``(day, item_id, received, issued)``. Receipts come from
+    stock_acquisitions (opening balance rows included, deleted ones not);
+    issues from stock_issuance_items whose request reached ISSUED/COMPLETED,
+    dated by the request's issued_at. ``watermarks`` is advanced to the
+    newest change stamp read per table.
+    """
+    events = []
+    for item, acquired, created, updated, received, deleted in _since_day(
+        source, "stock_acquisitions",
+        ["item_master_id", "acquisition_date", "created_at", "updated_at", "quantity_received", "is_deleted"],
+        "acquisition_date", "created_at", start,
+    ):
+        _advance(watermarks, "stock_acquisitions", _stamp(updated) or _stamp(created))
+        day = _day(acquired) or _day(created)
+        quantity = to_number(received)
+        if day is None or not quantity or to_flag(deleted) or (start and day < start):
+            continue
+        events.append((day, norm_id(item), float(quantity), 0.0))
+
+    issued_on = {}
+    for req_id, status, issued_at, updated_at in _since_day(
+        source, "stock_issuance_requests", ["id", "approval_status", "issued_at", "updated_at"],
+        "issued_at", "updated_at", start,
+    ):
+        _advance(watermarks, "stock_issuance_requests", _stamp(updated_at))
+        if (status or "").strip().upper() not in ISSUED_STATUSES:
+            continue
+        day = _day(issued_at) or _day(updated_at)
+        if day is not None and not (start and day < start):
+            issued_on[norm_id(req_id)] = day
+
+    # The lines carry no date of their own, so this scan stays full-table
+    if issued_on:
+        for request_id, item, issued, requested, is_deleted in iter_rows(
+            source, "stock_issuance_items",
+            ["request_id", "item_master_id", "issued_quantity", "requested_quantity", "is_deleted"],
+        ):
+            day = issued_on.get(norm_id(request_id))
+            if day is None or to_flag(is_deleted):
+                continue
+            quantity = to_number(issued)
+            if quantity is None:
+                quantity = to_number(requested) or 0.0
+            if quantity:
+                events.append((day, norm_id(item), 0.0, float(quantity)))
+
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def late_changes(source, start, watermarks):
+    """Earliest day before ``start`` among ledger rows changed after ``watermarks``.
+
+    Such rows were entered or edited after the years they are dated in were
+    checkpointed. Tables without a watermark (no change stamps) are not checked.
+    """
+    earliest = None
+    # Exclusive reads: a row stamped in the same second as the checkpoint's
+    # newest row was already part of it
+    watermark = watermarks.get("stock_acquisitions")
+    for acquired, created, updated in iter_rows(
+        source, "stock_acquisitions", ["acquisition_date", "created_at", "updated_at"],
+        since=("updated_at", watermark),
+    ) if watermark else ():
+        stamp = _stamp(updated) or _stamp(created)
+        if stamp is None or stamp <= watermark:
+            continue
+        day = _day(acquired) or _day(created)
+        if day is not None and day < start and (earliest is None or day < earliest):
+            earliest = day
+    watermark = watermarks.get("stock_issuance_requests")
+    for issued_at, updated_at in iter_rows(
+        source, "stock_issuance_requests", ["issued_at", "updated_at"],
+        since=("updated_at", watermark),
+    ) if watermark else ():
+        stamp = _stamp(updated_at)
+        if stamp is None or stamp <= watermark:
+            continue
+        # An update re-dates a request without issued_at, so only issued_at counts
+        day = _day(issued_at)
+        if day is not None and day < start and (earliest is None or day < earliest):
+            earliest = day
+    return earliest
+
+
+class FinancialYearRollup:
+    """Per-FY item movements built from checkpoints plus a streaming sweep."""
+
+    def __init__(self):
+        self.years = {}       # year code -> {item: [opening, received, issued, closing]}
+        self.closed = []      # checkpointed year codes, in order
+        self.watermarks = {}  # ledger table -> newest updated_at (or created_at) read
+        self.reopened = []    # closed years the last update() had to replay
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {path}: {data.get('version')}")
+        rollup = cls()
+        rollup.closed = data["closed"]
+        rollup.watermarks = data["watermarks"]
+        rollup.years = {code: data["years"][code] for code in rollup.closed}
+        return rollup
+
+    def save(self, path):
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "closed": self.closed,
+            "watermarks": self.watermarks,
+            "years": {code: self.years[code] for code in self.closed},
+        }
+        tmp = Path(str(path) + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        tmp.replace(path)
+
+    def opening_balances(self):
+        """Closing balances of the last checkpointed year."""
+        if not self.closed:
+            return {}
+        return {item: row[3] for item, row in self.years[self.closed[-1]].items()}
+
+    def update(self, source, today=None):
+        """Sweep every transaction after the last checkpoint.
+
+        Years that ended before ``today`` become checkpoints; a closed year
+        with rows entered or edited after it was checkpointed is reopened
+        (listed in ``reopened``). Returns the number of events processed.
+        """
+        today = today or date.today().isoformat()
+        self.reopened = []
+        if self.closed:
+            late = late_changes(source, fy_start(next_fy(self.closed[-1])), self.watermarks)
+            if late is not None:
+                code = fy_code(late)
+                self.reopened = [c for c in self.closed if c >= code]
+                self.closed = [c for c in self.closed if c < code]
+        start = fy_start(next_fy(self.closed[-1])) if self.closed else None
+        events = load_events(source, start, self.watermarks)
+        for code in [c for c in self.years if c not in self.closed]:
+            del self.years[code]
+
+        balances = self.opening_balances()
+        if events:
+            current = fy_code(events[0][0]) if start is None else next_fy(self.closed[-1])
+        elif start is not None:
+            current = next_fy(self.closed[-1])
+        else:
+            return 0
+        last = fy_code(max(events[-1][0], today) if events else today)
+
+        movements = {}
+        position = 0
+        while True:
+            end = fy_end(current)
+            while position < len(events) and events[position][0] <= end:
+                _, item, received, issued = events[position]
+                totals = movements.get(item)
+                if totals is None:
+                    totals = movements[item] = [0.0, 0.0]
+                totals[0] += received
+                totals[1] += issued
+                position += 1
+            self.years[current] = self._close_year(balances, movements)
+            if end < today:
+                self.closed.append(current)
+            if current >= last:
+                break
+            balances = {item: row[3] for item, row in self.years[current].items()}
+            movements = {}
+            current = next_fy(current)
+        return len(events)
+
+    @staticmethod
+    def _close_year(balances, movements):
+        rows = {}
+        for item in set(balances) | set(movements):
+            opening = balances.get(item, 0.0)
+            received, issued = movements.get(item, (0.0, 0.0))
+            if opening or received or issued:
+                rows[item] = [opening, received, issued, opening + received - issued]
+        return rows
+
+    def report(self, source):
+        """Year-wise rows shaped like YearwiseInventoryReport's YearInventory."""
+        names = {}
+        for item_id, item_code, nomenclature, unit, category_id in iter_rows(
+            source, "item_masters", ["id", "item_code", "nomenclature", "unit", "category_id"]
+        ):
+            names[norm_id(item_id)] = (item_id, item_code, nomenclature, unit, norm_id(category_id))
+        categories = {norm_id(k): v for k, v in iter_rows(source, "categories", ["id", "category_name"])}
+
+        years = []
+        for code in sorted(self.years):
+            items = []
+            totals = {"opening": 0.0, "received": 0.0, "issued": 0.0, "closing": 0.0}
+            for key, (opening, received, issued, closing) in self.years[code].items():
+                item_id, item_code, nomenclature, unit, category = names.get(key, (key, None, None, None, None))
+                items.append({
+                    "item_master_id": item_id,
+                    "item_code": item_code,
+                    "nomenclature": nomenclature,
+                    "unit": unit,
+                    "category_name": categories.get(category),
+                    "opening_balance": opening,
+                    "quantity_received": received,
+                    "quantity_issued": issued,
+                    "closing_balance": closing,
+                })
+                totals["opening"] += opening
+                totals["received"] += received
+                totals["issued"] += issued
+                totals["closing"] += closing
+            items.sort(key=lambda row: row["nomenclature"] or "")
+            years.append({
+                "year_code": code,
+                "year_label": f"Financial Year {code}",
+                "is_current": fy_start(code) <= date.today().isoformat() <= fy_end(code),
+                "is_closed": code in self.closed,
+                "items": items,
+                "totals": totals,
+            })
+        return years
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Financial-year inventory roll-up")
+    parser.add_argument("source", help="CSV export directory or SQLite stand-in database")
+    parser.add_argument("--checkpoints", default=DEFAULT_CHECKPOINTS, help="closed-year checkpoint file")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="roll-up JSON for the DOCX generators")
+    parser.add_argument("--rebuild", action="store_true", help="ignore checkpoints and replay every year")
+    args = parser.parse_args(argv)
+
+    if Path(args.checkpoints).exists() and not args.rebuild:
+        rollup = FinancialYearRollup.load(args.checkpoints)
+    else:
+        rollup = FinancialYearRollup()
+    processed = rollup.update(args.source)
+    rollup.save(args.checkpoints)
+    if rollup.reopened:
+        print(f"⚠️  Reopened {', '.join(rollup.reopened)}: transactions were entered or edited after "
+              f"{'it was' if len(rollup.reopened) == 1 else 'they were'} checkpointed")
+
+    years = rollup.report(args.source)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"financial_years": years}, f, indent=2)
+    print(f"Processed {processed} transactions; {len(rollup.closed)} closed years checkpointed")
+    print(f"Created: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
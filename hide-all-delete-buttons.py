@@ -6,64 +6,91 @@ Simply comments out the delete button JSX elements.
 import os
 import re
 
+from ims_instrument import count, phase, profiled
+from tsx_validator import report_rejected, validate_many, write_atomic
+
+FILES_TO_PROCESS = [
+    ("src/pages/Categories.tsx", [
+        (r'(<Button[^>]*onClick=\{[^}]*handleDeleteCategory[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*</Button>)', 
+         r'{/* Delete button hidden */}\n                  {/* \1 */}'),
+    ]),
+    ("src/pages/SubCategories.tsx", [
+        (r'(<Button[^>]*onClick=\{[^}]*handleDeleteSubCategory[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*</Button>)', 
+         r'{/* Delete button hidden */}\n                          {/* \1 */}'),
+    ]),
+    ("src/pages/UnifiedTenderManagement.tsx", [
+        (r'(onClick=\{[^}]*deleteDelivery[^}]*\}[^>]*title="Delete delivery"[^>]*>.*?<Trash2[^/]*/>\s*</Button>)', 
+         r'{/* Delete button hidden */} {/* \1 */}'),
+        (r'(<Button[^>]*onClick=\{[^}]*deleteDelivery[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*.*?Delete Delivery\s*</Button>)', 
+         r'{/* Delete button hidden */}\n                            {/* \1 */}'),
+    ]),
+    ("src/pages/VendorManagement.tsx", [
+        (r'(<Button[^>]*onClick=\{[^}]*handleDeleteVendor[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*.*?Delete Vendor\s*</Button>)', 
+         r'{/* Delete button hidden */}\n                          {/* \1 */}'),
+    ]),
+    ("src/pages/VendorInfo.tsx", [
+        (r'(<Button[^>]*onClick=\{[^}]*deleteVendor[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*</Button>)', 
+         r'{/* Delete button hidden */}\n                      {/* \1 */}'),
+    ]),
+    ("src/pages/items-master.tsx", [
+        (r'(<Button[^>]*onClick=\{[^}]*handleDelete\(item\)[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*.*?Delete\s*</Button>)', 
+         r'{/* Delete button hidden */}\n                              {/* \1 */}'),
+    ]),
+]
+
+
+def apply_patterns(content, patterns):
+    """Apply one file's (pattern, replacement) pairs and return the new content."""
+    for pattern, replacement in patterns:
+        content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+    return content
+
+
 def comment_out_delete_buttons():
     """Comment out delete buttons in all dashboard files."""
     
-    files_to_process = [
-        ("src/pages/Categories.tsx", [
-            (r'(<Button[^>]*onClick=\{[^}]*handleDeleteCategory[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*</Button>)', 
-             r'{/* Delete button hidden */}\n                  {/* \1 */}'),
-        ]),
-        ("src/pages/SubCategories.tsx", [
-            (r'(<Button[^>]*onClick=\{[^}]*handleDeleteSubCategory[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*</Button>)', 
-             r'{/* Delete button hidden */}\n                          {/* \1 */}'),
-        ]),
-        ("src/pages/UnifiedTenderManagement.tsx", [
-            (r'(onClick=\{[^}]*deleteDelivery[^}]*\}[^>]*title="Delete delivery"[^>]*>.*?<Trash2[^/]*/>\s*</Button>)', 
-             r'{/* Delete button hidden */} {/* \1 */}'),
-            (r'(<Button[^>]*onClick=\{[^}]*deleteDelivery[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*.*?Delete Delivery\s*</Button>)', 
-             r'{/* Delete button hidden */}\n                            {/* \1 */}'),
-        ]),
-        ("src/pages/VendorManagement.tsx", [
-            (r'(<Button[^>]*onClick=\{[^}]*handleDeleteVendor[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*.*?Delete Vendor\s*</Button>)', 
-             r'{/* Delete button hidden */}\n                          {/* \1 */}'),
-        ]),
-        ("src/pages/VendorInfo.tsx", [
-            (r'(<Button[^>]*onClick=\{[^}]*deleteVendor[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*</Button>)', 
-             r'{/* Delete button hidden */}\n                      {/* \1 */}'),
-        ]),
-        ("src/pages/items-master.tsx", [
-            (r'(<Button[^>]*onClick=\{[^}]*handleDelete\(item\)[^}]*\}[^>]*>.*?<Trash2[^/]*/>\s*.*?Delete\s*</Button>)', 
-             r'{/* Delete button hidden */}\n                              {/* \1 */}'),
-        ]),
-    ]
-    
     modified_count = 0
+    rewrites = []
     
-    for file_path, patterns in files_to_process:
+    for file_path, patterns in FILES_TO_PROCESS:
         if not os.path.exists(file_path):
             print(f"⚠️  Skipped (not found): {file_path}")
             continue
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with phase("load"):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        count("files_scanned")
+        count("rules", len(patterns))
         
         original = content
-        
-        for pattern, replacement in patterns:
-            content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+        with phase("match"):
+            content = apply_patterns(content, patterns)
         
         if content != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"✅ {file_path}")
-            modified_count += 1
+            rewrites.append((file_path, original, content))
         else:
             print(f"ℹ️  No change needed: {file_path}")
     
+    # Check every rewrite before anything is written
+    with phase("validate"):
+        results = validate_many(rewrites)
+    
+    for file_path, original, content in rewrites:
+        if results[file_path]:
+            report_rejected({file_path: results[file_path]})
+            continue
+        with phase("save"):
+            write_atomic(file_path, content)
+        count("files_modified")
+        count("bytes_written", os.path.getsize(file_path))
+        print(f"✅ {file_path}")
+        modified_count += 1
+    
     return modified_count
 
 if __name__ == "__main__":
-    print("🔧 Hiding delete buttons across all dashboard pages...\n")
-    count = comment_out_delete_buttons()
-    print(f"\n✨ Done! Modified {count} files.")
+    with profiled("hide-all-delete-buttons"):
+        print("🔧 Hiding delete buttons across all dashboard pages...\n")
+        modified = comment_out_delete_buttons()
+        print(f"\n✨ Done! Modified {modified} files.")
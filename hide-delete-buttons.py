@@ -7,6 +7,9 @@ by commenting them out to prevent accidental deletions.
 import re
 from pathlib import Path
 
+from ims_instrument import count, phase, profiled
+from tsx_validator import report_rejected, validate_many, write_atomic
+
 # Define the files and their delete button patterns to comment out
 files_to_fix = {
     "src/pages/ContractTender.tsx": [
@@ -62,10 +65,21 @@ files_to_fix = {
     ],
 }
 
+def apply_patterns(content, patterns):
+    """Apply one file's pattern entries and return the new content."""
+    for pattern_info in patterns:
+        pattern = pattern_info["pattern"]
+        replacement = pattern_info["replacement"]
+        flags = pattern_info.get("flags", 0)
+        
+        content = re.sub(pattern, replacement, content, flags=flags)
+    return content
+
 def hide_delete_buttons():
     """Hide delete buttons in all specified files."""
     base_path = Path(__file__).parent
     modified_files = []
+    rewrites = []
     
     for file_path, patterns in files_to_fix.items():
         full_path = base_path / file_path
@@ -76,30 +90,42 @@ def hide_delete_buttons():
         
         print(f"📝 Processing: {file_path}")
         
-        with open(full_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with phase("load"):
+            with open(full_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        count("files_scanned")
+        count("rules", len(patterns))
         
         original_content = content
-        
-        for pattern_info in patterns:
-            pattern = pattern_info["pattern"]
-            replacement = pattern_info["replacement"]
-            flags = pattern_info.get("flags", 0)
-            
-            content = re.sub(pattern, replacement, content, flags=flags)
+        with phase("match"):
+            content = apply_patterns(content, patterns)
         
         if content != original_content:
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"✅ Modified: {file_path}")
-            modified_files.append(file_path)
+            rewrites.append((file_path, original_content, content))
         else:
             print(f"ℹ️  No changes needed: {file_path}")
     
+    # Check every rewrite before anything is written
+    with phase("validate"):
+        results = validate_many(rewrites)
+    
+    for file_path, original_content, content in rewrites:
+        if results[file_path]:
+            report_rejected({file_path: results[file_path]})
+            continue
+        full_path = base_path / file_path
+        with phase("save"):
+            write_atomic(full_path, content)
+        count("files_modified")
+        count("bytes_written", full_path.stat().st_size)
+        print(f"✅ Modified: {file_path}")
+        modified_files.append(file_path)
+    
     print(f"\n✨ Modified {len(modified_files)} files:")
     for file in modified_files:
         print(f"   - {file}")
 
 if __name__ == "__main__":
-    hide_delete_buttons()
+    with profiled("hide-delete-buttons"):
+        hide_delete_buttons()
     print("\n✅ All delete buttons have been hidden!")
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Import graph of the front end: dead and near-duplicate pages.
+
+src/pages has collected stale variants (``-OLD``, ``_Old``, ``_Clean``,
+``.backup-*`` copies) that no route uses but that the codemods still have to
+process or skip by name. This analyzer finds them from the code itself:
+
+- every module under src is scanned for its import specifiers (static
+  ``import``/``export ... from``, side-effect imports, dynamic ``import()``
+  and ``require()``) with a small lexer that skips strings and comments, so
+  commented-out imports in App.tsx do not count,
+- specifiers are resolved the way Vite does: relative paths and the ``@/``
+  alias of vite.config.ts, with or without an extension and through
+  ``index`` files; the graph is walked from src/main.tsx and src/App.tsx and
+  pages nothing reaches are reported as unreachable,
+- every module (and every ``.backup`` copy) gets a bottom-k sketch of the
+  hashes of its 5-token shingles. Sketches that share values are compared
+  and pairs whose estimated Jaccard similarity reaches the threshold are
+  reported as near-duplicates, next to which of the two is in use.
+
+Specifiers and sketches are cached per file in .import-graph.json with the
+file's size, mtime and content hash, as in sql_index.py: a run re-reads only
+files whose size or mtime changed and re-scans only those whose hash
+changed, in worker processes when there are several and more than one CPU.
+
+Usage:
+    python import_graph.py [--root DIR] [--entry src/main.tsx,src/App.tsx]
+                           [--threshold 0.8] [--all] [--rebuild] [--json]
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import posixpath
+import re
+import sys
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ims_instrument import count, phase, profiled
+
+DEFAULT_CACHE = ".import-graph.json"
+CACHE_VERSION = 1
+DEFAULT_ENTRIES = ("src/main.tsx", "src/App.tsx")
+DEFAULT_THRESHOLD = 0.8
+SOURCE_DIR = "src"
+PAGES_DIR = "src/pages"
+# Changed files below this are scanned in-process; workers cost more to start
+PARALLEL_MIN_FILES = 8
+
+CODE_SUFFIXES = (".tsx", ".ts", ".jsx", ".js")
+# vite.config.ts resolve.alias (and tsconfig paths)
+ALIASES = {"@/": "src/"}
+# Saved copies such as Page.tsx.backup-1753545277165 or Page.tsx.column-backup-...
+_BACKUP = re.compile(r"\.(?:tsx?|jsx?)\.[\w.-]*backup[\w.-]*$", re.IGNORECASE)
+
+SHINGLE_TOKENS = 5
+SKETCH_SIZE = 128
+# Files with fewer shingles than this are too small to call duplicates
+MIN_SHINGLES = 40
+
+_LEXEME = re.compile(r"""
+      (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`)
+    | (?P<word>[A-Za-z_$][\w$]*|\d[\w.]*)
+    | (?P<punct>[^\s\w])
+""", re.VERBOSE | re.DOTALL)
+# Tried where the lexer meets import, export or require in code
+_IMPORT = re.compile(r"""
+      (?:import|export)\b(?:[^;'"`()]|\([^()]*\))*?\bfrom\s*(['"])([^'"\n]+)\1
+    | import\s*(['"])([^'"\n]+)\3
+    | (?:import|require)\s*\(\s*(['"`])([^'"`\n]+)\5\s*\)
+""", re.VERBOSE)
+_IMPORT_WORDS = frozenset(("import", "export", "require"))
+
+
+def scan_text(text):
+    """``(import specifiers, bottom-k shingle sketch, shingle count)`` of one module."""
+    specifiers = []
+    tokens = []
+    for match in _LEXEME.finditer(text):
+        kind = match.lastgroup
+        if kind == "comment":
+            continue
+        token = match.group()
+        tokens.append(token)
+        if token in _IMPORT_WORDS:
+            statement = _IMPORT.match(text, match.start())
+            if statement:
+                specifier = statement.group(2) or statement.group(4) or statement.group(6)
+                if "${" not in specifier:
+                    specifiers.append(specifier)
+    # Tokens hash once each; a shingle hashes as the tuple of its token hashes,
+    # which (unlike str hashes) is the same in every process
+    codes = {}
+    ids = [codes.get(t) or codes.setdefault(t, zlib.crc32(t.encode("utf-8"))) for t in tokens]
+    hashes = set(map(hash, zip(*(ids[i:] for i in range(SHINGLE_TOKENS)))))
+    return specifiers, heapq.nsmallest(SKETCH_SIZE, hashes), len(hashes)
+
+
+def scan_file(path):
+    """``(path, specifiers, sketch, shingles)`` of one file; runs in worker processes."""
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8-sig", errors="replace")
+    return (path, *scan_text(text))
+
+
+def is_scanned(name):
+    return name.endswith(CODE_SUFFIXES) or bool(_BACKUP.search(name))
+
+
+def similarity(a, b):
+    """Jaccard similarity estimated from two bottom-k sketches."""
+    union = heapq.nsmallest(SKETCH_SIZE, set(a) | set(b))
+    if not union:
+        return 0.0
+    a, b = set(a), set(b)
+    return sum(1 for h in union if h in a and h in b) / len(union)
+
+
+class ImportGraph:
+    """Per-file specifiers and sketches, plus the resolved module graph."""
+
+    def __init__(self, root, cache=None):
+        self.root = Path(root)
+        self.cache = Path(cache) if cache else self.root / DEFAULT_CACHE
+        self.files = {}
+        self.stats = {"files": 0, "stat_unchanged": 0, "hash_unchanged": 0, "scanned": 0, "removed": 0}
+
+    def load(self):
+        try:
+            with open(self.cache, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        if data.get("version") == CACHE_VERSION:
+            self.files = data["files"]
+        return self
+
+    def save(self):
+        tmp = Path(str(self.cache) + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": self.files}, f, separators=(",", ":"))
+        tmp.replace(self.cache)
+
+    def update(self, jobs=None):
+        """Bring the cache in line with the files on disk; returns True when it changed."""
+        changed = False
+        current = {}
+        pending = []
+        with phase("stat"):
+            for folder, dirs, names in os.walk(self.root / SOURCE_DIR):
+                dirs[:] = sorted(d for d in dirs if d != "node_modules" and not d.startswith("."))
+                for name in sorted(names):
+                    if not is_scanned(name):
+                        continue
+                    path = Path(folder) / name
+                    rel = path.relative_to(self.root).as_posix()
+                    st = path.stat()
+                    entry = self.files.get(rel)
+                    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                        current[rel] = entry
+                        self.stats["stat_unchanged"] += 1
+                        continue
+                    with open(path, "rb") as f:
+                        digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+                    changed = True
+                    if entry and entry["hash"] == digest:
+                        entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+                        current[rel] = entry
+                        self.stats["hash_unchanged"] += 1
+                        continue
+                    current[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}
+                    pending.append(rel)
+        self.stats["removed"] = len(set(self.files) - set(current))
+        changed = changed or bool(self.stats["removed"])
+
+        with phase("scan"):
+            paths = [str(self.root / rel) for rel in pending]
+            jobs = jobs or min(len(paths), os.cpu_count() or 1)
+            if jobs > 1 and len(paths) >= PARALLEL_MIN_FILES:
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    results = list(pool.map(scan_file, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+            else:
+                results = [scan_file(path) for path in paths]
+        for rel, (_, specifiers, sketch, shingles) in zip(pending, results):
+            current[rel].update(imports=specifiers, sketch=sketch, shingles=shingles)
+        self.files = current
+        self.stats["files"] = len(current)
+        self.stats["scanned"] = len(pending)
+        count("files_scanned", len(pending))
+        return changed
+
+    # ------------------------------------------------------------------
+    # Graph
+    # ------------------------------------------------------------------
+
+    def resolve(self, importer, specifier):
+        """Module a specifier of ``importer`` refers to, or None (packages, assets)."""
+        for alias, target in ALIASES.items():
+            if specifier.startswith(alias):
+                base = target + specifier[len(alias):]
+                break
+        else:
+            if not specifier.startswith("."):
+                return None
+            base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), specifier))
+        if base in self.files and base.endswith(CODE_SUFFIXES):
+            return base
+        for candidate in [base + suffix for suffix in CODE_SUFFIXES] + [f"{base}/index{suffix}" for suffix in CODE_SUFFIXES]:
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def edges(self):
+        """``{module: [imported modules]}`` over the code modules."""
+        return {
+            rel: [target for target in (self.resolve(rel, s) for s in entry["imports"]) if target]
+            for rel, entry in self.files.items()
+            if rel.endswith(CODE_SUFFIXES)
+        }
+
+    def reachable(self, entries):
+        edges = self.edges()
+        seen = set()
+        stack = [entry for entry in entries if entry in edges]
+        while stack:
+            module = stack.pop()
+            if module in seen:
+                continue
+            seen.add(module)
+            stack.extend(target for target in edges[module] if target not in seen)
+        return seen
+
+    def duplicates(self, threshold=DEFAULT_THRESHOLD):
+        """``[(similarity, a, b)]`` of files whose sketches are at least ``threshold`` alike."""
+        holders = defaultdict(list)
+        for rel, entry in self.files.items():
+            if entry["shingles"] >= MIN_SHINGLES:
+                for h in entry["sketch"]:
+                    holders[h].append(rel)
+        # Files with similarity J share about J * SKETCH_SIZE sketch values
+        shared = defaultdict(int)
+        for files in holders.values():
+            for i, a in enumerate(files):
+                for b in files[i + 1:]:
+                    shared[a, b] += 1
+        minimum = threshold * SKETCH_SIZE / 2
+        pairs = []
+        for (a, b), n in shared.items():
+            if n >= minimum:
+                score = similarity(self.files[a]["sketch"], self.files[b]["sketch"])
+                if score >= threshold:
+                    pairs.append((score, a, b))
+        pairs.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+        return pairs
+
+
+def _size(entry):
+    return f"{entry['size'] / 1024:,.1f} KB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Unreachable and near-duplicate modules under src/")
+    parser.add_argument("--root", default=".", help="repository root holding src/")
+    parser.add_argument("--entry", default=",".join(DEFAULT_ENTRIES), help="comma-separated entry modules")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="similarity reported as duplicate")
+    parser.add_argument("--all", action="store_true", help="report unreachable modules outside src/pages too")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cached scan")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not (Path(args.root) / SOURCE_DIR).is_dir():
+        raise SystemExit(f"No {SOURCE_DIR}/ under {args.root}")
+    entries = [e.strip() for e in args.entry.split(",") if e.strip()]
+
+    graph = ImportGraph(args.root)
+    if not args.rebuild:
+        graph.load()
+    if graph.update(args.jobs):
+        with phase("save"):
+            graph.save()
+    missing = [entry for entry in entries if entry not in graph.files]
+    if missing:
+        raise SystemExit(f"Entry module not found: {', '.join(missing)}")
+
+    with phase("analyze"):
+        reachable = graph.reachable(entries)
+        scope = "" if args.all else PAGES_DIR + "/"
+        unreachable = sorted(rel for rel in graph.files if rel.startswith(scope) and rel not in reachable)
+        duplicates = graph.duplicates(args.threshold)
+    # Closest match of each file, preferring one that is in use
+    closest = {}
+    for score, a, b in duplicates:
+        for rel, other in ((a, b), (b, a)):
+            best = closest.get(rel)
+            if best is None or (other in reachable and best[1] not in reachable):
+                closest[rel] = (score, other)
+
+    if args.json:
+        print(json.dumps({
+            "entries": entries,
+            "modules": graph.stats["files"],
+            "reachable": len(reachable),
+            "unreachable": [{"file": rel, "size": graph.files[rel]["size"],
+                             "closest": closest.get(rel, (None, None))[1]} for rel in unreachable],
+            "duplicates": [{"similarity": round(score, 3), "a": a, "b": b,
+                            "a_reachable": a in reachable, "b_reachable": b in reachable}
+                           for score, a, b in duplicates],
+        }, indent=2))
+        return 0
+
+    stats = graph.stats
+    print(f"📊 {stats['files']} files under {SOURCE_DIR}/, {len(reachable)} modules reachable from {', '.join(entries)} "
+          f"({stats['scanned']} scanned, {stats['hash_unchanged']} touched but unchanged, {stats['removed']} removed)")
+    label = "modules" if args.all else "pages"
+    if unreachable:
+        print(f"⚠️  {len(unreachable)} unreachable {label}:")
+        for rel in unreachable:
+            note = ""
+            if rel in closest:
+                score, other = closest[rel]
+                note = f"  ≈ {other} ({score:.2f}{', in use' if other in reachable else ''})"
+            print(f"   {rel:<70} {_size(graph.files[rel]):>10}{note}")
+    else:
+        print(f"✅ Every {label[:-1]} is reachable")
+    if duplicates:
+        print(f"👀 {len(duplicates)} near-duplicate pairs (similarity ≥ {args.threshold:.2f}):")
+        for score, a, b in duplicates:
+            marks = "".join("✓" if rel in reachable else "✗" for rel in (a, b))
+            print(f"   {score:.2f} {marks}  {a}  ~  {b}")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("import_graph"):
+        sys.exit(main())
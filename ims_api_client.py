@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Asynchronous fetch layer for the IMS reports API.
+
+Fetches the endpoints a document build needs concurrently instead of one
+after another, so the total time is roughly that of the slowest endpoint:
+
+- keep-alive HTTP/1.1 connections are pooled per host and reused,
+- a semaphore bounds how many requests are in flight,
+- connection errors, 429 and 5xx responses of GET/HEAD/PUT/DELETE requests
+  are retried with exponential backoff and jitter; POST and PATCH are only
+  retried when the connection was refused, before anything was sent,
+- JSON responses are cached on disk; within the TTL no request is made, and
+  after it the cached ETag is revalidated with If-None-Match (Express sends
+  ETags by default, so an unchanged report comes back as a bodyless 304).
+
+The reports routes require a session, so pass the ``connect.sid`` cookie of
+a logged-in session with --cookie or $IMS_API_COOKIE.
+
+StubServer is a local stand-in for the API with configurable per-route
+payloads and delays, for exercising the client without the Node server.
+
+Usage:
+    python ims_api_client.py [--base-url http://localhost:3001] [--cookie "connect.sid=..."]
+                             [--out DIR] [--concurrency 6] [--ttl 300]
+    python ims_api_client.py --stub        # run against a local stub server
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import ssl
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from ims_instrument import count, phase, profiled
+
+REPORT_ENDPOINTS = [
+    "/api/reports/purchases",
+    "/api/reports/tenders",
+    "/api/reports/inventory",
+    "/api/reports/approvals",
+    "/api/reports/dashboard",
+    "/api/inventory/current-stock/summary",
+]
+
+DEFAULT_BASE_URL = os.environ.get("IMS_API_BASE_URL", "http://localhost:3001")
+DEFAULT_CACHE_DIR = ".ims-api-cache"
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Methods a server may safely receive twice
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+
+
+class ApiError(Exception):
+    def __init__(self, url, status, body=b""):
+        super().__init__(f"{url} returned HTTP {status}")
+        self.url = url
+        self.status = status
+        self.body = body
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "reused")
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class ApiClient:
+    """Concurrent JSON client with pooled connections, retries and an on-disk cache."""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, cookie=None, concurrency=6, retries=3,
+                 backoff=0.5, timeout=30.0, cache_dir=DEFAULT_CACHE_DIR, ttl=300.0):
+        self.base_url = base_url.rstrip("/")
+        self.cookie = cookie
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.ttl = ttl
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._idle = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "not_modified": 0, "retries": 0, "connections": 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for connections in self._idle.values():
+            for conn in connections:
+                conn.close()
+        self._idle.clear()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def fetch(self, path, params=None):
+        """GET ``path`` and return the decoded JSON body."""
+        url = self.base_url + path
+        if params:
+            url += "?" + urlencode(params)
+        cached = self._cache_read(url)
+        if cached is not None and time.time() - cached["fetched_at"] < self.ttl:
+            self.stats["cache_hits"] += 1
+            return cached["body"]
+
+        headers = {"Accept": "application/json"}
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        if cached is not None and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        async with self._semaphore:
+            status, response_headers, body = await self._request_with_retry(url, headers)
+
+        if status == 304 and cached is not None:
+            self.stats["not_modified"] += 1
+            cached["fetched_at"] = time.time()
+            self._cache_write(url, cached)
+            return cached["body"]
+        if status != 200:
+            raise ApiError(url, status, body)
+        data = json.loads(body.decode("utf-8"))
+        self._cache_write(url, {
+            "url": url,
+            "etag": response_headers.get("etag"),
+            "fetched_at": time.time(),
+            "body": data,
+        })
+        return data
+
+    async def fetch_all(self, paths):
+        """Fetch every path concurrently; returns ``{path: json}``."""
+        results = await asyncio.gather(*(self.fetch(path) for path in paths))
+        return dict(zip(paths, results))
+
+    async def send(self, method, path, body=None):
+        """Send ``body`` as JSON without caching; returns ``(status, json or None)``."""
+        url = self.base_url + path
+        headers = {"Accept": "application/json"}
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        async with self._semaphore:
+            status, _, response = await self._request_with_retry(url, headers, method, payload)
+        try:
+            data = json.loads(response.decode("utf-8")) if response else None
+        except ValueError:
+            data = None
+        return status, data
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _request_with_retry(self, url, headers, method="GET", payload=None):
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                status, response_headers, body = await asyncio.wait_for(
+                    self._request(url, headers, method, payload), self.timeout
+                )
+                if status not in RETRY_STATUSES or attempt >= self.retries or not idempotent:
+                    return status, response_headers, body
+            except ConnectionRefusedError:
+                # Nothing reached the server, so even a POST can be sent again
+                if attempt >= self.retries:
+                    raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                # A POST may have been applied before the response was lost
+                if attempt >= self.retries or not idempotent:
+                    raise
+            attempt += 1
+            self.stats["retries"] += 1
+            delay = self.backoff * (2 ** (attempt - 1))
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def _request(self, url, headers, method="GET", payload=None):
+        parts = urlsplit(url)
+        https = parts.scheme == "https"
+        host = parts.hostname
+        port = parts.port or (443 if https else 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key = (host, port, https)
+
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if payload is not None:
+            lines.append(f"Content-Length: {len(payload)}")
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (payload or b"")
+
+        while True:
+            conn = await self._acquire(key)
+            try:
+                conn.writer.write(message)
+                await conn.writer.drain()
+                status_line = await conn.reader.readline()
+                if not status_line:
+                    raise ConnectionError("connection closed by server")
+                break
+            except (OSError, ConnectionError):
+                conn.close()
+                # An idle keep-alive connection may have been closed by the
+                # server; retry once on a fresh one before counting a failure.
+                # Only idempotent requests: the server may have read a POST.
+                if not conn.reused or method not in IDEMPOTENT_METHODS:
+                    raise
+
+        try:
+            version, status, _ = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+            status = int(status)
+            response_headers = {}
+            while True:
+                line = await conn.reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+
+            keep_alive = version == "HTTP/1.1" and response_headers.get("connection", "").lower() != "close"
+            if status in (204, 304) or 100 <= status < 200:
+                body = b""
+            elif "chunked" in response_headers.get("transfer-encoding", "").lower():
+                body = await self._read_chunked(conn.reader)
+            elif "content-length" in response_headers:
+                body = await conn.reader.readexactly(int(response_headers["content-length"]))
+            else:
+                body = await conn.reader.read()
+                keep_alive = False
+        except BaseException:
+            conn.close()
+            raise
+
+        if keep_alive:
+            conn.reused = True
+            self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+        self.stats["requests"] += 1
+        return status, response_headers, body
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def _acquire(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof():
+                return conn
+            conn.close()
+        host, port, https = key
+        context = ssl.create_default_context() if https else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        self.stats["connections"] += 1
+        return _Connection(reader, writer)
+
+    # ------------------------------------------------------------------
+    # Disk cache
+    # ------------------------------------------------------------------
+
+    def _cache_path(self, url):
+        digest = hashlib.sha256(f"{self.cookie or ''}|{url}".encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _cache_read(self, url):
+        if self.cache_dir is None:
+            return None
+        path = self._cache_path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cache_write(self, url, entry):
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._cache_path(url)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        tmp.replace(path)
+
+
+def fetch_reports(base_url=DEFAULT_BASE_URL, cookie=None, paths=REPORT_ENDPOINTS, **options):
+    """Synchronous entry point for the generator scripts."""
+    async def run():
+        async with ApiClient(base_url, cookie, **options) as client:
+            return await client.fetch_all(paths), client.stats
+    return asyncio.run(run())
+
+
+class StubServer:
+    """Local stand-in for the IMS API.
+
+    ``routes`` maps a path to ``(payload, delay_seconds)``. Responses carry a
+    content ETag and honour If-None-Match; ``fail_first`` makes the first N
+    requests to each path return 503 to exercise retries.
+    """
+
+    def __init__(self, routes, host="127.0.0.1", port=0, fail_first=0):
+        self.routes = routes
+        self.fail_first = fail_first
+        self.hits = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                stub.hits[path] = stub.hits.get(path, 0) + 1
+                if path not in stub.routes:
+                    return self._send(404, b'{"error":"Not found"}')
+                if stub.hits[path] <= stub.fail_first:
+                    return self._send(503, b'{"error":"Unavailable"}')
+                payload, delay = stub.routes[path]
+                time.sleep(delay)
+                body = json.dumps(payload).encode("utf-8")
+                etag = 'W/"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, b"", etag)
+                self._send(200, body, etag)
+
+            def _send(self, status, body, etag=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                if etag:
+                    self.send_header("ETag", etag)
+                if status != 304:
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch the IMS report endpoints concurrently")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--cookie", default=os.environ.get("IMS_API_COOKIE"), help="session cookie, e.g. connect.sid=...")
+    parser.add_argument("--out", help="write each response to DIR/<endpoint>.json")
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--ttl", type=float, default=300.0, help="seconds a cached response is used without revalidation")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--stub", action="store_true", help="serve the endpoints from a local stub with simulated latency")
+    args = parser.parse_args(argv)
+
+    options = {"concurrency": args.concurrency, "ttl": args.ttl, "cache_dir": args.cache_dir}
+    started = time.perf_counter()
+    with phase("fetch"):
+        if args.stub:
+            routes = {path: ({"success": True, "endpoint": path}, 0.2 + 0.1 * i) for i, path in enumerate(REPORT_ENDPOINTS)}
+            with StubServer(routes) as stub:
+                results, stats = fetch_reports(stub.base_url, args.cookie, **options)
+        else:
+            results, stats = fetch_reports(args.base_url, args.cookie, **options)
+    elapsed = time.perf_counter() - started
+    # A 304 revalidation is served from the cache as well
+    hits = stats["cache_hits"] + stats["not_modified"]
+    count("cache_hits", hits)
+    count("cache_misses", len(results) - hits)
+    count("requests", stats["requests"])
+
+    if args.out:
+        out = Path(args.out)
+        out.mkdir(parents=True, exist_ok=True)
+        for path, data in results.items():
+            name = path.strip("/").replace("/", "_") + ".json"
+            with open(out / name, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+    print(f"Fetched {len(results)} endpoints in {elapsed:.2f}s "
+          f"(requests={stats['requests']}, cache hits={stats['cache_hits']}, "
+          f"304={stats['not_modified']}, retries={stats['retries']}, connections={stats['connections']})")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("ims_api_client"):
+        sys.exit(main())
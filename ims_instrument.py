@@ -0,0 +1,342 @@
+"""
+Phase timers, counters and opt-in profiling shared by the IMS scripts.
+
+Tools mark their work with named phases and bump counters; both are no-ops
+unless profiling is switched on, so instrumented code costs nothing in a
+normal run:
+
+    from ims_instrument import count, phase, profiled
+
+    with profiled("hide-delete-buttons"):
+        with phase("load"):
+            content = path.read_text()
+        count("files")
+
+Any instrumented tool is profiled with one flag (or the same value in
+$IMS_PROFILE):
+
+    --profile                   phase and counter summary on stderr
+    --profile=json[:FILE]       summary as JSON (default <tool>.profile.json)
+    --profile=trace[:FILE]      Chrome trace-event file for chrome://tracing or
+                                https://ui.perfetto.dev (default <tool>.trace.json)
+    --profile=cprofile[:FILE]   also run under cProfile: top functions on stderr,
+                                pstats dump in FILE (default <tool>.prof)
+    --profile=sample[:FILE]     also sample the stack every 5 ms: top functions on
+                                stderr, folded stacks for flamegraph tools in FILE
+                                (default <tool>.folded)
+    --profile=prom[:PATH]       Prometheus textfile-collector file (see ims_metrics.py)
+    --profile=push[:URL]        push the metrics to a Prometheus Pushgateway
+
+Outputs combine with commas, e.g. ``--profile=trace,cprofile``. The console
+summary is printed unless only file or Prometheus outputs were asked for.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+OUTPUTS = {
+    "console": None,
+    "json": "{tool}.profile.json",
+    "trace": "{tool}.trace.json",
+    "cprofile": "{tool}.prof",
+    "sample": "{tool}.folded",
+    "prom": "{tool}.prom",
+    "push": None,
+}
+
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 15
+
+# Trace events kept per run; later phases are still timed but not traced
+MAX_TRACE_EVENTS = 100000
+
+
+class Recorder:
+    """Phase timings and counters of one tool run."""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.origin = time.perf_counter()
+        self.wall_seconds = None
+        self.success = True
+        self.phases = {}
+        self.counters = {}
+        self.events = []
+        self.dropped_events = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            entry = self.phases.get(name)
+            if entry is None:
+                entry = self.phases[name] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += end - start
+            self._event(("X", name, start, end - start, threading.get_ident()))
+
+    def count(self, name, n=1):
+        value = self.counters.get(name, 0) + n
+        self.counters[name] = value
+        self._event(("C", name, time.perf_counter(), value, None))
+
+    def _event(self, event):
+        if len(self.events) < MAX_TRACE_EVENTS:
+            self.events.append(event)
+        else:
+            self.dropped_events += 1
+
+    def summary(self):
+        wall = self.wall_seconds or (time.perf_counter() - self.origin)
+        return {
+            "tool": self.tool,
+            "wall_seconds": wall,
+            "phases": [
+                {"phase": name, "calls": calls, "seconds": seconds, "share": seconds / wall if wall else 0.0}
+                for name, (calls, seconds) in self.phases.items()
+            ],
+            "counters": dict(self.counters),
+            "success": self.success,
+            "finished_at": time.time(),
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+    def trace(self):
+        """Chrome trace-event document (timestamps in microseconds from the start)."""
+        pid = os.getpid()
+        threads = {}
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.tool}}]
+        for kind, name, start, value, thread in self.events:
+            ts = (start - self.origin) * 1e6
+            if kind == "X":
+                tid = threads.setdefault(thread, len(threads) + 1)
+                events.append({"name": name, "cat": "phase", "ph": "X", "ts": ts, "dur": value * 1e6,
+                               "pid": pid, "tid": tid})
+            else:
+                events.append({"name": name, "cat": "counter", "ph": "C", "ts": ts, "pid": pid, "tid": 0,
+                               "args": {name: value}})
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"tool": self.tool, "dropped_events": self.dropped_events},
+        }
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer (a profiler without tracing overhead)."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ims-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        return "".join(f"{stack} {samples}\n" for stack, samples in self.stacks.most_common())
+
+    def top(self, limit=TOP_FUNCTIONS):
+        """``[(function, self_samples, total_samples)]`` by self samples."""
+        own = Counter()
+        total = Counter()
+        for stack, samples in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += samples
+            for function in set(frames):
+                total[function] += samples
+        return [(function, samples, total[function]) for function, samples in own.most_common(limit)]
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+_active = None
+
+
+def phase(name):
+    """Time the enclosed block as phase ``name`` of the active run."""
+    if _active is None:
+        return _NULL_PHASE
+    return _active.phase(name)
+
+
+def count(name, n=1):
+    """Add ``n`` to counter ``name`` of the active run."""
+    if _active is not None:
+        _active.count(name, n)
+
+
+class _NullPhase:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def take_profile_flag(argv):
+    """Remove ``--profile[=SPEC]`` from ``argv`` in place; return SPEC or None."""
+    for i, arg in enumerate(argv):
+        if arg == "--profile":
+            del argv[i]
+            return "console"
+        if arg.startswith("--profile="):
+            del argv[i]
+            return arg.split("=", 1)[1] or "console"
+    return None
+
+
+def parse_spec(spec, tool):
+    """``[(output, path)]`` for a --profile value."""
+    outputs = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        kind, _, path = part.partition(":")
+        if kind not in OUTPUTS:
+            raise SystemExit(f"Unknown --profile output {kind!r} (expected {', '.join(OUTPUTS)})")
+        default = OUTPUTS[kind]
+        outputs.append((kind, path or (default.format(tool=tool) if default else None)))
+    return outputs
+
+
+@contextmanager
+def profiled(tool, argv=None):
+    """Run the enclosed block as one instrumented run of ``tool``.
+
+    Profiling is enabled by ``--profile`` in ``argv`` (default sys.argv, from
+    which the flag is removed) or by $IMS_PROFILE; otherwise this yields None
+    and every phase/count call stays a no-op.
+    """
+    global _active
+    spec = take_profile_flag(sys.argv if argv is None else argv)
+    if spec is None:
+        spec = os.environ.get("IMS_PROFILE")
+    if not spec:
+        yield None
+        return
+
+    outputs = dict(parse_spec(spec, tool))
+    recorder = Recorder(tool)
+    previous, _active = _active, recorder
+    profiler = cProfile.Profile() if "cprofile" in outputs else None
+    sampler = StackSampler(threading.get_ident()) if "sample" in outputs else None
+    if sampler:
+        sampler.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield recorder
+    except SystemExit as e:
+        recorder.success = e.code in (None, 0)
+        raise
+    except BaseException:
+        recorder.success = False
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+        if sampler:
+            sampler.stop()
+        recorder.wall_seconds = time.perf_counter() - recorder.origin
+        _active = previous
+        _report(recorder, outputs, profiler, sampler)
+
+
+def _report(recorder, outputs, profiler, sampler):
+    out = sys.stderr
+    summary = recorder.summary()
+    if "console" in outputs or not ({"json", "trace", "prom", "push"} & outputs.keys()):
+        print(f"\n⏱️  {recorder.tool}: {summary['wall_seconds']:.3f}s", file=out)
+        for row in summary["phases"]:
+            print(f"   {row['phase']:<16} {row['calls']:>6} calls {row['seconds']:>9.3f}s {row['share']:>7.1%}", file=out)
+        if summary["counters"]:
+            print("   " + "  ".join(f"{name}={value:,}" for name, value in summary["counters"].items()), file=out)
+        if summary["peak_rss_bytes"] is not None:
+            print(f"   peak RSS {summary['peak_rss_bytes'] / 1048576:.1f} MiB", file=out)
+
+    if profiler:
+        stats_text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stats_text)
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        print(stats_text.getvalue(), file=out)
+        stats.dump_stats(outputs["cprofile"])
+        summary["cprofile"] = outputs["cprofile"]
+        print(f"📄 cProfile stats: {outputs['cprofile']}", file=out)
+
+    if sampler:
+        total = sum(sampler.stacks.values())
+        print(f"\n   {total} samples every {sampler.interval * 1000:.0f} ms (self / total):", file=out)
+        for function, own, inclusive in sampler.top():
+            print(f"   {own / total:>6.1%} {inclusive / total:>6.1%}  {function}", file=out)
+        with open(outputs["sample"], "w", encoding="utf-8") as f:
+            f.write(sampler.folded())
+        summary["samples"] = {"interval": sampler.interval, "count": total, "folded": outputs["sample"]}
+        print(f"📄 Folded stacks: {outputs['sample']}", file=out)
+
+    if "trace" in outputs:
+        with open(outputs["trace"], "w", encoding="utf-8") as f:
+            json.dump(recorder.trace(), f)
+        print(f"📄 Trace: {outputs['trace']}", file=out)
+    if "json" in outputs:
+        with open(outputs["json"], "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"📄 Profile: {outputs['json']}", file=out)
+
+    if "prom" in outputs or "push" in outputs:
+        import ims_metrics
+
+        text = ims_metrics.render(summary)
+        if "prom" in outputs:
+            path = ims_metrics.write_textfile(text, outputs["prom"], recorder.tool)
+            print(f"📄 Metrics: {path}", file=out)
+        if "push" in outputs:
+            url = outputs["push"] or ims_metrics.DEFAULT_PUSHGATEWAY
+            try:
+                target = ims_metrics.push(text, url, recorder.tool)
+                print(f"📤 Metrics pushed to {target}", file=out)
+            except OSError as e:
+                # Monitoring must never fail the pipeline step itself
+                print(f"⚠️  Could not push metrics to {url}: {e}", file=out)
@@ -0,0 +1,817 @@
+#!/usr/bin/env python3
+"""
+Load generator for the stock issuance workflow.
+
+Replays complete workflow sessions against the API the way the UI drives
+it: a requester creates a request and adds its items, the supervisor opens
+the pending list and the request, asks the store keeper to verify stock,
+the store keeper records the verification, and the request is approved by
+the supervisor (or forwarded to and approved by the admin, or rejected)
+before it is issued and re-read.
+
+Sessions arrive as a Poisson process at --rate per second (open loop, so a
+slow server builds a queue instead of slowing the arrivals down) and at most
+--concurrency sessions are active at once; a session waiting for a free slot
+records its queue wait. Every request is timed per endpoint template
+(``POST /api/stock-issuance/issue/:id``) into a quantile sketch and a fixed
+latency histogram, and every non-2xx response or connection error counts as
+an error. Requests are never retried, and a failed step ends its session.
+
+The report is written to ims-load-test.json, which
+create-ims-one-pager-docx.py renders as a "Workflow Load Test" section.
+
+Targets:
+- the Node server (--base-url, --cookie): the session must belong to a user
+  holding every workflow permission, and --db must point at a SQLite copy
+  or CSV export of the same database so the generated requests reference
+  existing users and items. Only use a non-production database.
+- --stub: WorkflowStub, a local stand-in for the workflow endpoints backed
+  by a SQLite database. --db is copied to a temporary directory first (the
+  source is never modified); without it a small ims_synthetic.py dataset is
+  generated. --db-latency adds a simulated round trip per transaction.
+- --serve: run WorkflowStub alone on --port, e.g. to load it from another
+  process so client and server do not share an interpreter.
+
+Usage:
+    python ims_load_test.py --stub [--db ims.db] [--sessions 200] [--rate 5] [--concurrency 20]
+    python ims_load_test.py --base-url http://localhost:3001 --cookie "connect.sid=..." --db ims.db
+    python ims_load_test.py --serve [--db ims.db] [--port 3001]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import ims_tables
+from ims_api_client import DEFAULT_BASE_URL, ApiClient
+from quantile_sketch import QuantileSketch
+
+DEFAULT_OUTPUT = "ims-load-test.json"
+
+# Session scenarios: (cumulative probability, scenario)
+SCENARIOS = [
+    (0.70, "supervisor_approve"),
+    (0.90, "admin_approve"),
+    (1.00, "supervisor_reject"),
+]
+
+# Upper bounds (milliseconds) of the latency histogram buckets
+HISTOGRAM_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Items per request, same spread as the synthetic dataset
+LINES_PER_REQUEST = (1, 1, 2, 2, 3, 3, 4, 5, 8)
+
+
+# ----------------------------------------------------------------------
+# Measurements
+# ----------------------------------------------------------------------
+
+class EndpointStats:
+    __slots__ = ("latency", "histogram", "statuses", "errors")
+
+    def __init__(self):
+        self.latency = QuantileSketch()
+        self.histogram = [0] * (len(HISTOGRAM_MS) + 1)
+        self.statuses = {}
+        self.errors = 0
+
+    def add(self, seconds, status):
+        self.latency.add(seconds)
+        ms = seconds * 1000
+        bucket = next((i for i, limit in enumerate(HISTOGRAM_MS) if ms <= limit), len(HISTOGRAM_MS))
+        self.histogram[bucket] += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+
+    def to_dict(self, name):
+        p50, p90, p99 = self.latency.quantiles()
+        labels = [f"<={limit}ms" for limit in HISTOGRAM_MS] + [f">{HISTOGRAM_MS[-1]}ms"]
+        return {
+            "endpoint": name,
+            "count": self.latency.count,
+            "errors": self.errors,
+            "error_rate": self.errors / self.latency.count if self.latency.count else 0.0,
+            "mean": self.latency.mean,
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "max": self.latency.max if self.latency.count else None,
+            "histogram": dict(zip(labels, self.histogram)),
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "sketch": self.latency.to_dict(),
+        }
+
+
+class Recorder:
+    """Per-endpoint and per-scenario measurements of one run."""
+
+    def __init__(self):
+        self.endpoints = {}
+        self.scenarios = {}
+        self.queue_wait = QuantileSketch()
+
+    def request(self, name, seconds, status):
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointStats()
+        stats.add(seconds, status)
+
+    def session(self, scenario, seconds, ok):
+        entry = self.scenarios.setdefault(scenario, {"completed": 0, "failed": 0, "duration": QuantileSketch()})
+        entry["completed" if ok else "failed"] += 1
+        if ok:
+            entry["duration"].add(seconds)
+
+
+class SessionFailed(Exception):
+    pass
+
+
+# ----------------------------------------------------------------------
+# Workflow sessions
+# ----------------------------------------------------------------------
+
+def load_fixtures(source):
+    """Users and in-stock items of ``source`` (SQLite file or CSV export)."""
+    users = [
+        (row[0], row[1], row[2])
+        for row in ims_tables.iter_rows(source, "AspNetUsers", ["Id", "FullName", "intWingID"])
+        if row[0] and row[2] not in (None, "")
+    ]
+    available = {
+        ims_tables.norm_id(row[0]): ims_tables.to_number(row[1])
+        for row in ims_tables.iter_rows(source, "current_inventory_stock", ["item_master_id", "available_quantity"])
+    }
+    items = [
+        (row[0], row[1])
+        for row in ims_tables.iter_rows(source, "item_masters", ["id", "nomenclature", "is_deleted"])
+        if not ims_tables.to_flag(row[2]) and available.get(ims_tables.norm_id(row[0]), 0) > 0
+    ]
+    if not users or not items:
+        raise SystemExit(f"{source} has no users or no items in stock to build sessions from")
+    return {"users": users, "items": items}
+
+
+class WorkflowSession:
+    """One request's journey through the workflow, driven step by step."""
+
+    def __init__(self, client, recorder, fixtures, rng, think):
+        self.client = client
+        self.recorder = recorder
+        self.fixtures = fixtures
+        self.rng = rng
+        self.think = think
+
+    async def call(self, name, method, path, body=None):
+        started = time.perf_counter()
+        try:
+            status, data = await self.client.send(method, path, body)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError) as e:
+            self.recorder.request(name, time.perf_counter() - started, type(e).__name__)
+            raise SessionFailed(f"{name}: {e!r}")
+        self.recorder.request(name, time.perf_counter() - started, status)
+        if status >= 400:
+            raise SessionFailed(f"{name}: HTTP {status}")
+        return data or {}
+
+    async def pause(self):
+        if self.think > 0:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think))
+
+    async def run(self, scenario):
+        rng = self.rng
+        users = self.fixtures["users"]
+        items = self.fixtures["items"]
+        requester_id, requester_name, wing = users[int(rng.random() * len(users))]
+        supervisor_id, supervisor_name, _ = users[int(rng.random() * len(users))]
+        keeper_id, keeper_name, _ = users[int(rng.random() * len(users))]
+        lines = {}
+        for _ in range(rng.choice(LINES_PER_REQUEST)):
+            item_id, nomenclature = items[int(len(items) * rng.random() ** 2)]
+            lines[item_id] = (nomenclature, 1 + int(rng.random() * 10))
+
+        created = await self.call("POST /api/stock-issuance/requests", "POST", "/api/stock-issuance/requests", {
+            "requester_wing_id": wing,
+            "requester_user_id": requester_id,
+            "request_type": "Individual",
+            "purpose": "Load test",
+            "urgency_level": rng.choice(["Low", "Normal", "High"]),
+            "is_returnable": False,
+            "request_number": f"SIR-LT-{uuid.uuid4().hex[:10].upper()}",
+        })
+        request_id = created.get("request_id") or (created.get("data") or {}).get("id")
+        if not request_id:
+            raise SessionFailed("create request: no request_id in response")
+        await self.call("POST /api/stock-issuance/items", "POST", "/api/stock-issuance/items", {
+            "request_id": request_id,
+            "items": [
+                {"item_master_id": item_id, "nomenclature": nomenclature, "requested_quantity": quantity,
+                 "item_type": "standard"}
+                for item_id, (nomenclature, quantity) in lines.items()
+            ],
+        })
+        await self.pause()
+
+        await self.call("GET /api/approvals/supervisor/pending", "GET", "/api/approvals/supervisor/pending")
+        detail = await self.call("GET /api/stock-issuance/:id", "GET", f"/api/stock-issuance/{request_id}")
+        request_items = detail.get("items") or []
+        await self.pause()
+
+        if scenario == "supervisor_reject":
+            await self.call("POST /api/approvals/supervisor/reject", "POST", "/api/approvals/supervisor/reject", {
+                "requestId": request_id, "supervisorId": supervisor_id, "comments": "Not required at this time",
+            })
+            return
+
+        verifications = []
+        for item in request_items:
+            data = await self.call(
+                "POST /api/inventory/request-verification", "POST", "/api/inventory/request-verification", {
+                    "stockIssuanceId": request_id,
+                    "itemMasterId": item.get("item_master_id"),
+                    "itemNomenclature": item.get("nomenclature"),
+                    "requestedQuantity": item.get("requested_quantity"),
+                    "requestedByUserId": supervisor_id,
+                    "requestedByName": supervisor_name,
+                    "wingId": wing,
+                    "forwardToStoreKeeperId": keeper_id,
+                })
+            verifications.append((data.get("verificationId"), item.get("requested_quantity")))
+        await self.pause()
+        for verification_id, quantity in verifications:
+            await self.call("POST /api/inventory/update-verification", "POST", "/api/inventory/update-verification", {
+                "verificationId": verification_id,
+                "verificationStatus": "verified_available",
+                "physicalCount": quantity,
+                "availableQuantity": quantity,
+                "verificationNotes": "Physically counted",
+                "verifiedByUserId": keeper_id,
+                "verifiedByName": keeper_name,
+            })
+        await self.pause()
+
+        item_approvals = [
+            {"itemId": item.get("id"), "approvedQuantity": item.get("requested_quantity"), "status": "Approved"}
+            for item in request_items
+        ]
+        if scenario == "admin_approve":
+            await self.call("POST /api/approvals/supervisor/forward", "POST", "/api/approvals/supervisor/forward", {
+                "requestId": request_id, "supervisorId": supervisor_id,
+                "forwardingReason": "Exceeds wing allocation", "comments": "Forwarded for admin approval",
+            })
+            await self.pause()
+            await self.call("GET /api/approvals/admin/pending", "GET", "/api/approvals/admin/pending")
+            await self.call("POST /api/approvals/admin/approve", "POST", "/api/approvals/admin/approve", {
+                "requestId": request_id, "adminId": supervisor_id, "comments": "Approved",
+                "itemApprovals": item_approvals,
+            })
+        else:
+            await self.call("POST /api/approvals/supervisor/approve", "POST", "/api/approvals/supervisor/approve", {
+                "requestId": request_id, "supervisorId": supervisor_id, "comments": "Approved",
+                "itemApprovals": item_approvals,
+            })
+        await self.pause()
+
+        await self.call("POST /api/stock-issuance/issue/:id", "POST", f"/api/stock-issuance/issue/{request_id}", {
+            "issued_by": keeper_id, "issued_by_name": keeper_name, "issuance_notes": "Issued from wing store",
+        })
+        await self.call("GET /api/stock-issuance/:id", "GET", f"/api/stock-issuance/{request_id}")
+
+
+def pick_scenario(rng):
+    roll = rng.random()
+    return next(name for limit, name in SCENARIOS if roll < limit)
+
+
+async def run_load(base_url, cookie, fixtures, sessions=200, rate=5.0, concurrency=20, think=0.2,
+                   seed=1, timeout=30.0, progress=None):
+    """Replay ``sessions`` workflow sessions; returns ``(recorder, elapsed_seconds)``."""
+    recorder = Recorder()
+    arrivals = random.Random(seed)
+    slots = asyncio.Semaphore(concurrency)
+    done = 0
+
+    async with ApiClient(base_url, cookie, concurrency=concurrency, retries=0, timeout=timeout,
+                         cache_dir=None) as client:
+        async def session(n):
+            nonlocal done
+            rng = random.Random(f"{seed}:{n}")
+            scenario = pick_scenario(rng)
+            arrived = time.perf_counter()
+            async with slots:
+                started = time.perf_counter()
+                recorder.queue_wait.add(started - arrived)
+                try:
+                    await WorkflowSession(client, recorder, fixtures, rng, think).run(scenario)
+                    ok = True
+                except SessionFailed:
+                    ok = False
+                recorder.session(scenario, time.perf_counter() - started, ok)
+            done += 1
+            if progress:
+                progress(done, sessions)
+
+        started = time.perf_counter()
+        tasks = []
+        for n in range(sessions):
+            if rate > 0 and n:
+                await asyncio.sleep(arrivals.expovariate(rate))
+            tasks.append(asyncio.create_task(session(n)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    return recorder, elapsed
+
+
+def build_report(recorder, elapsed, settings):
+    endpoints = [stats.to_dict(name) for name, stats in recorder.endpoints.items()]
+    requests = sum(row["count"] for row in endpoints)
+    errors = sum(row["errors"] for row in endpoints)
+    scenarios = []
+    for name, entry in recorder.scenarios.items():
+        p50, p90, p99 = entry["duration"].quantiles()
+        scenarios.append({
+            "scenario": name, "completed": entry["completed"], "failed": entry["failed"],
+            "p50": p50, "p90": p90, "p99": p99,
+        })
+    wait = recorder.queue_wait.quantiles()
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        **settings,
+        "duration_seconds": elapsed,
+        "requests": requests,
+        "errors": errors,
+        "error_rate": errors / requests if requests else 0.0,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "queue_wait": {"p50": wait[0], "p90": wait[1], "p99": wait[2]},
+        "scenarios": scenarios,
+        "endpoints": endpoints,
+    }
+
+
+# ----------------------------------------------------------------------
+# Local stand-in for the workflow endpoints
+# ----------------------------------------------------------------------
+
+# Lookups the SQL Server schema serves from primary keys and indexes; the
+# synthetic dataset only indexes foreign keys
+STAND_IN_INDEXES = [
+    ("stock_issuance_requests", "id"),
+    ("stock_issuance_requests", "approval_status"),
+    ("stock_issuance_items", "id"),
+    ("inventory_verification_requests", "id"),
+    ("current_inventory_stock", "item_master_id"),
+]
+
+
+def prepare_stand_in(path):
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        for table, column in STAND_IN_INDEXES:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "lt_{table}_{column}" ON "{table}" ("{column}")')
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _new_id():
+    return str(uuid.uuid4()).upper()
+
+
+class WorkflowStub:
+    """Local stand-in for the stock issuance workflow endpoints.
+
+    Serves the routes a WorkflowSession uses from a SQLite database with the
+    ims_synthetic.py schema, one transaction per request on a single shared
+    connection (like a one-connection pool). ``db_latency`` is slept before
+    each transaction to simulate the round trip to a database server.
+    """
+
+    ROUTES = [
+        ("POST", r"/api/stock-issuance(?:/requests)?", "create_request"),
+        ("POST", r"/api/stock-issuance/items", "add_items"),
+        ("POST", r"/api/stock-issuance/issue/([^/]+)", "issue"),
+        ("GET", r"/api/approvals/supervisor/pending", "supervisor_pending"),
+        ("GET", r"/api/approvals/admin/pending", "admin_pending"),
+        ("POST", r"/api/approvals/supervisor/approve", "supervisor_approve"),
+        ("POST", r"/api/approvals/supervisor/forward", "supervisor_forward"),
+        ("POST", r"/api/approvals/supervisor/reject", "supervisor_reject"),
+        ("POST", r"/api/approvals/admin/approve", "admin_approve"),
+        ("POST", r"/api/inventory/request-verification", "request_verification"),
+        ("POST", r"/api/inventory/update-verification", "update_verification"),
+        ("GET", r"/api/stock-issuance/([^/]+)", "get_request"),
+    ]
+
+    def __init__(self, db_path, host="127.0.0.1", port=0, db_latency=0.0):
+        prepare_stand_in(db_path)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.db_latency = db_latency
+        self._lock = threading.Lock()
+        self._routes = [(method, re.compile(pattern + r"/?"), name) for method, pattern, name in self.ROUTES]
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, each
+            # response would wait for the client's delayed ACK (~40 ms)
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def _dispatch(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw.decode("utf-8")) if raw else {}
+                except ValueError:
+                    return self._send(400, {"error": "Invalid JSON"})
+                status, payload = stub.handle(method, self.path.split("?", 1)[0], body)
+                self._send(status, payload)
+
+            def _send(self, status, payload):
+                body = json.dumps(payload, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self.conn.close()
+
+    def handle(self, method, path, body):
+        for route_method, pattern, name in self._routes:
+            match = pattern.fullmatch(path)
+            if route_method == method and match:
+                try:
+                    return getattr(self, name)(body, *match.groups())
+                except Exception as e:
+                    return 500, {"error": "Internal server error", "details": str(e)}
+        return 404, {"error": "Not found"}
+
+    @contextmanager
+    def transaction(self):
+        if self.db_latency:
+            time.sleep(self.db_latency)
+        with self._lock:
+            try:
+                yield self.conn
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+
+    @staticmethod
+    def _log(conn, request_id, action, actor, now):
+        row = conn.execute("SELECT id FROM request_approvals WHERE request_id = ?", (request_id,)).fetchone()
+        if row is None:
+            return
+        approval_id = row["id"]
+        step = conn.execute(
+            "SELECT COALESCE(MAX(step_number), 0) FROM approval_history WHERE request_approval_id = ?", (approval_id,)
+        ).fetchone()[0]
+        conn.execute("UPDATE approval_history SET is_current_step = 0 WHERE request_approval_id = ?", (approval_id,))
+        conn.execute(
+            "INSERT INTO approval_history (id, request_approval_id, action_type, action_by, action_date, "
+            "step_number, is_current_step) VALUES (?, ?, ?, ?, ?, ?, 1)",
+            (_new_id(), approval_id, action, actor, now, step + 1),
+        )
+        conn.execute(
+            "UPDATE request_approvals SET current_status = ?, updated_date = ? WHERE id = ?", (action, now, approval_id)
+        )
+
+    def _set_status(self, conn, request_id, status, now, reviewed=False):
+        sql = "UPDATE stock_issuance_requests SET approval_status = ?, request_status = ?, updated_at = ?"
+        if reviewed:
+            sql += ", supervisor_reviewed_at = ?"
+        cursor = conn.execute(sql + " WHERE id = ?", (status, status, now, *((now,) if reviewed else ()), request_id))
+        return cursor.rowcount
+
+    @staticmethod
+    def _approve_items(conn, item_approvals, now):
+        for item in item_approvals or []:
+            conn.execute(
+                "UPDATE stock_issuance_items SET approved_quantity = ?, updated_at = ? WHERE id = ?",
+                (item.get("approvedQuantity"), now, item.get("itemId")),
+            )
+
+    # Routes -------------------------------------------------------------
+
+    def create_request(self, body):
+        wing = body.get("wing_id") or body.get("requester_wing_id")
+        if not wing:
+            return 400, {"error": "wing_id or requester_wing_id is required"}
+        request_id = _new_id()
+        number = body.get("request_number") or f"SIR-LT-{request_id[:8]}"
+        user = body.get("requester_user_id")
+        now = _now()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO stock_issuance_requests (id, request_number, request_type, requester_office_id, "
+                "requester_wing_id, requester_user_id, purpose, urgency_level, is_returnable, request_status, "
+                "approval_status, submitted_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'Pending', 'Pending', ?, ?, ?)",
+                (request_id, number, body.get("request_type") or "Individual", body.get("requester_office_id"),
+                 wing, user, body.get("purpose"), body.get("urgency_level") or "Normal",
+                 1 if body.get("is_returnable") else 0, now, now, now),
+            )
+            conn.execute(
+                "INSERT INTO request_approvals (id, request_id, request_type, current_status, submitted_by, "
+                "submitted_date, created_date, updated_date) VALUES (?, ?, 'stock_issuance', 'pending', ?, ?, ?, ?)",
+                (_new_id(), request_id, user, now, now, now),
+            )
+            self._log(conn, request_id, "submitted", user, now)
+        return 201, {"success": True, "request_id": request_id, "data": {"id": request_id, "request_number": number}}
+
+    def add_items(self, body):
+        request_id, items = body.get("request_id"), body.get("items")
+        if not request_id or not items:
+            return 400, {"error": "request_id and items are required"}
+        now = _now()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO stock_issuance_items (id, request_id, item_master_id, nomenclature, requested_quantity, "
+                "item_type, is_deleted, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                [
+                    (_new_id(), request_id, item.get("item_master_id"), item.get("nomenclature"),
+                     item.get("requested_quantity") or 0, item.get("item_type") or "standard", now, now)
+                    for item in items
+                ],
+            )
+        return 201, {"success": True, "items_count": len(items)}
+
+    def get_request(self, body, request_id):
+        with self.transaction() as conn:
+            request = conn.execute("SELECT * FROM stock_issuance_requests WHERE id = ?", (request_id,)).fetchone()
+            if request is None:
+                return 404, {"error": "Request not found"}
+            items = conn.execute(
+                "SELECT * FROM stock_issuance_items WHERE request_id = ? AND is_deleted = 0", (request_id,)
+            ).fetchall()
+            history = conn.execute(
+                "SELECT h.* FROM approval_history h JOIN request_approvals a ON a.id = h.request_approval_id "
+                "WHERE a.request_id = ? ORDER BY h.step_number", (request_id,)
+            ).fetchall()
+        return 200, {"request": dict(request), "items": [dict(row) for row in items],
+                     "approval_history": [dict(row) for row in history]}
+
+    def _pending(self, status):
+        with self.transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, request_number, requester_wing_id, requester_user_id, urgency_level, submitted_at "
+                "FROM stock_issuance_requests WHERE approval_status = ? ORDER BY submitted_at DESC LIMIT 50",
+                (status,),
+            ).fetchall()
+        return 200, {"success": True, "data": [dict(row) for row in rows]}
+
+    def supervisor_pending(self, body):
+        return self._pending("Pending")
+
+    def admin_pending(self, body):
+        return self._pending("Forwarded to Admin")
+
+    def _decide(self, body, actor_key, status, action, reviewed):
+        request_id, actor = body.get("requestId"), body.get(actor_key)
+        if not request_id or not actor:
+            return 400, {"error": f"requestId and {actor_key} are required"}
+        now = _now()
+        with self.transaction() as conn:
+            if not self._set_status(conn, request_id, status, now, reviewed):
+                return 404, {"error": "Request not found"}
+            self._approve_items(conn, body.get("itemApprovals"), now)
+            self._log(conn, request_id, action, actor, now)
+        return 200, {"success": True, "action": action}
+
+    def supervisor_approve(self, body):
+        return self._decide(body, "supervisorId", "Approved by Supervisor", "approved", True)
+
+    def supervisor_forward(self, body):
+        return self._decide(body, "supervisorId", "Forwarded to Admin", "forwarded_to_admin", True)
+
+    def supervisor_reject(self, body):
+        return self._decide(body, "supervisorId", "Rejected by Supervisor", "rejected", True)
+
+    def admin_approve(self, body):
+        return self._decide(body, "adminId", "Approved by Admin", "approved", False)
+
+    def request_verification(self, body):
+        request_id, item_id, user = body.get("stockIssuanceId"), body.get("itemMasterId"), body.get("requestedByUserId")
+        if not request_id or not item_id or not user:
+            return 400, {"error": "Missing required fields"}
+        verification_id = _new_id()
+        now = _now()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO inventory_verification_requests (id, stock_issuance_id, item_master_id, "
+                "requested_quantity, verification_status, wing_id, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?, ?, ?)",
+                (verification_id, request_id, item_id, body.get("requestedQuantity"), body.get("wingId"), now, now),
+            )
+            self._log(conn, request_id, "sent_to_store_keeper", user, now)
+        return 200, {"success": True, "message": "Verification request created successfully",
+                     "verificationId": verification_id}
+
+    def update_verification(self, body):
+        verification_id, status = body.get("verificationId"), body.get("verificationStatus")
+        if not verification_id or not status or not body.get("verifiedByUserId"):
+            return 400, {"error": "Missing required fields"}
+        status = {"approve": "approved", "reject": "rejected", "forward": "forwarded"}.get(body.get("action"), status)
+        now = _now()
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT s.available_quantity FROM inventory_verification_requests v "
+                "LEFT JOIN current_inventory_stock s ON s.item_master_id = v.item_master_id WHERE v.id = ?",
+                (verification_id,),
+            ).fetchone()
+            if row is None:
+                return 404, {"error": "Verification request not found"}
+            available = body.get("availableQuantity")
+            conn.execute(
+                "UPDATE inventory_verification_requests SET verification_status = ?, physical_count = ?, "
+                "available_quantity = ?, verified_at = ?, updated_at = ? WHERE id = ?",
+                (status, body.get("physicalCount"), available if available is not None else row[0], now, now,
+                 verification_id),
+            )
+        return 200, {"success": True, "message": "Verification updated successfully"}
+
+    def issue(self, body, request_id):
+        now = _now()
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT approval_status FROM stock_issuance_requests WHERE id = ?", (request_id,)
+            ).fetchone()
+            if row is None:
+                return 404, {"error": "Request not found"}
+            if not (row[0] or "").startswith("Approved"):
+                return 400, {"error": f"Request is {row[0]}, not approved"}
+            lines = conn.execute(
+                "SELECT id, item_master_id, COALESCE(approved_quantity, requested_quantity) FROM stock_issuance_items "
+                "WHERE request_id = ? AND is_deleted = 0", (request_id,)
+            ).fetchall()
+            for line_id, item_id, quantity in lines:
+                conn.execute(
+                    "UPDATE stock_issuance_items SET issued_quantity = ?, updated_at = ? WHERE id = ?",
+                    (quantity, now, line_id),
+                )
+                conn.execute(
+                    "UPDATE current_inventory_stock SET current_quantity = current_quantity - ?, "
+                    "available_quantity = available_quantity - ?, last_updated = ? WHERE item_master_id = ?",
+                    (quantity, quantity, now, item_id),
+                )
+            conn.execute(
+                "UPDATE stock_issuance_requests SET approval_status = 'Issued', request_status = 'Issued', "
+                "issued_at = ?, updated_at = ? WHERE id = ?", (now, now, request_id),
+            )
+            self._log(conn, request_id, "issued", body.get("issued_by"), now)
+        return 200, {"success": True, "message": "Items issued successfully"}
+
+
+@contextmanager
+def stand_in_database(db=None, requests=2000, seed=1):
+    """Yield a scratch SQLite path: a copy of ``db`` or a fresh synthetic dataset."""
+    with tempfile.TemporaryDirectory(prefix="ims-load-test-") as scratch:
+        path = Path(scratch) / "ims.db"
+        if db:
+            if not ims_tables.is_sqlite(db):
+                raise SystemExit(f"--db must be a SQLite file for the stub, got {db}")
+            shutil.copyfile(db, path)
+        else:
+            import ims_synthetic
+            ims_synthetic.generate(ims_synthetic.Scale(requests, seed=seed), [ims_synthetic.SqliteSink(str(path))])
+        yield str(path)
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def print_report(report):
+    print(f"\n{'Endpoint':<44} {'Count':>7} {'Err %':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'Max ms':>8}")
+    for row in report["endpoints"]:
+        print(f"{row['endpoint']:<44} {row['count']:>7} {row['error_rate'] * 100:>6.2f} "
+              f"{row['p50'] * 1000:>8.1f} {row['p90'] * 1000:>8.1f} {row['p99'] * 1000:>8.1f} "
+              f"{row['max'] * 1000:>8.1f}")
+    print()
+    for row in report["scenarios"]:
+        p90 = f"{row['p90']:.2f}s" if row["p90"] is not None else "-"
+        print(f"   {row['scenario']:<20} completed {row['completed']:>5}  failed {row['failed']:>4}  p90 {p90}")
+    print(f"   queue wait p90 {report['queue_wait']['p90'] or 0:.3f}s, "
+          f"{report['throughput_rps']:.1f} requests/s over {report['duration_seconds']:.1f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the stock issuance and approval workflow")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--cookie", default=os.environ.get("IMS_API_COOKIE"), help="session cookie, e.g. connect.sid=...")
+    parser.add_argument("--db", help="SQLite database (or CSV export for --base-url) to take users and items from")
+    parser.add_argument("--stub", action="store_true", help="run against a local WorkflowStub on a copy of --db")
+    parser.add_argument("--serve", action="store_true", help="only run the WorkflowStub on --port until interrupted")
+    parser.add_argument("--port", type=int, default=0, help="WorkflowStub port (default: any free port)")
+    parser.add_argument("--stub-requests", type=int, default=2000, help="synthetic requests when --db is not given")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="simulated seconds per stub transaction")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=5.0, help="session arrivals per second (0 = all at once)")
+    parser.add_argument("--concurrency", type=int, default=20, help="sessions active at once")
+    parser.add_argument("--think", type=float, default=0.2, help="mean seconds between a session's steps")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds before a request counts as failed")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="exit 1 above this error rate")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        with stand_in_database(args.db, args.stub_requests, args.seed) as path:
+            with WorkflowStub(path, port=args.port, db_latency=args.db_latency) as stub:
+                print(f"ℹ️  Workflow stub listening on {stub.base_url} (Ctrl+C to stop)")
+                try:
+                    while True:
+                        time.sleep(3600)
+                except KeyboardInterrupt:
+                    pass
+        return 0
+
+    def progress(done, total):
+        if done % max(1, total // 10) == 0 or done == total:
+            print(f"   {done}/{total} sessions")
+
+    settings = {
+        "target": "the local workflow stub" if args.stub else args.base_url,
+        "sessions": args.sessions,
+        "rate": args.rate,
+        "concurrency": args.concurrency,
+        "think_seconds": args.think,
+        "db_latency": args.db_latency if args.stub else None,
+    }
+    options = {"sessions": args.sessions, "rate": args.rate, "concurrency": args.concurrency, "think": args.think,
+               "seed": args.seed, "timeout": args.timeout, "progress": progress}
+    if args.stub:
+        with stand_in_database(args.db, args.stub_requests, args.seed) as path:
+            fixtures = load_fixtures(path)
+            with WorkflowStub(path, port=args.port, db_latency=args.db_latency) as stub:
+                print(f"ℹ️  Workflow stub on {stub.base_url}")
+                recorder, elapsed = asyncio.run(run_load(stub.base_url, args.cookie, fixtures, **options))
+    else:
+        if not args.db:
+            parser.error("--db is required with --base-url (users and items must exist on the server)")
+        fixtures = load_fixtures(args.db)
+        recorder, elapsed = asyncio.run(run_load(args.base_url, args.cookie, fixtures, **options))
+
+    report = build_report(recorder, elapsed, settings)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"\n📄 Report: {args.out}")
+
+    if report["error_rate"] > args.max_error_rate:
+        print(f"❌ Error rate {report['error_rate']:.2%} above {args.max_error_rate:.2%} "
+              f"({report['errors']} of {report['requests']} requests)")
+        return 1
+    print(f"✅ {report['requests']} requests, error rate {report['error_rate']:.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
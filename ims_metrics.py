@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for the Python tool runs.
+
+Turns the run summary of ims_instrument.py into the Prometheus text
+exposition format, so document generation and codemod steps in the deploy
+pipeline show up next to the API metrics. Every series is a gauge labelled
+with ``tool``:
+
+    ims_tool_run_duration_seconds          wall time of the run
+    ims_tool_run_success                   1, or 0 when the run raised
+    ims_tool_last_run_timestamp_seconds    when the run finished
+    ims_tool_phase_duration_seconds        per ``phase`` (load, match, render, save, ...)
+    ims_tool_phase_calls                   per ``phase``
+    ims_tool_<counter>                     every counter (files_scanned, files_modified,
+                                           slides, shapes, bytes_written, ...)
+    ims_tool_cache_hit_ratio               cache_hits / (cache_hits + cache_misses)
+    ims_tool_peak_rss_bytes                peak resident set size of the process
+
+Publish with the --profile flag of any instrumented tool (or $IMS_PROFILE):
+
+    --profile=prom[:PATH]   write <tool>.prom for the node_exporter textfile
+                            collector (PATH may be the collector directory);
+                            written atomically, as the collector requires
+    --profile=push[:URL]    PUT to a Pushgateway under /metrics/job/ims_tools/tool/<tool>
+                            (default $IMS_PUSHGATEWAY_URL or http://localhost:9092)
+
+Run as a script this module is a local scrape target standing in for both:
+it accepts Pushgateway pushes and serves them, merged with the *.prom files
+of --textfile-dir, on /metrics.
+
+Usage:
+    python ims_metrics.py [--port 9092] [--textfile-dir DIR]
+    IMS_PROFILE=push python create-ims-presentation.py
+    curl http://localhost:9092/metrics
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+DEFAULT_PUSHGATEWAY = os.environ.get("IMS_PUSHGATEWAY_URL", "http://localhost:9092")
+DEFAULT_PORT = 9092
+JOB = "ims_tools"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID = re.compile(r"[^a-zA-Z0-9_]")
+_SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)(\s+\S+)?$")
+
+
+def metric_name(name):
+    name = _INVALID.sub("_", name).strip("_").lower()
+    return name if name and not name[0].isdigit() else f"_{name}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def render(summary, labels=None):
+    """Exposition text for one ims_instrument run summary."""
+    labels = {"tool": summary["tool"], **(labels or {})}
+    families = []
+
+    def family(name, help_text, samples):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f"{name}{_labels({**labels, **extra})} {float(value)!r}" for extra, value in samples]
+        families.append("\n".join(lines))
+
+    family("ims_tool_run_duration_seconds", "Wall time of the last run.", [({}, summary["wall_seconds"])])
+    family("ims_tool_run_success", "1 if the last run completed, 0 if it raised.",
+           [({}, 1 if summary.get("success", True) else 0)])
+    family("ims_tool_last_run_timestamp_seconds", "Unix time the last run finished.",
+           [({}, summary.get("finished_at", time.time()))])
+    if summary["phases"]:
+        family("ims_tool_phase_duration_seconds", "Time spent in each phase of the last run.",
+               [({"phase": row["phase"]}, row["seconds"]) for row in summary["phases"]])
+        family("ims_tool_phase_calls", "Times each phase was entered in the last run.",
+               [({"phase": row["phase"]}, row["calls"]) for row in summary["phases"]])
+    counters = summary["counters"]
+    for name, value in counters.items():
+        family(f"ims_tool_{metric_name(name)}", f"Counter {name} of the last run.", [({}, value)])
+    lookups = counters.get("cache_hits", 0) + counters.get("cache_misses", 0)
+    if lookups:
+        family("ims_tool_cache_hit_ratio", "Share of cache lookups served from the cache in the last run.",
+               [({}, counters.get("cache_hits", 0) / lookups)])
+    if summary.get("peak_rss_bytes") is not None:
+        family("ims_tool_peak_rss_bytes", "Peak resident set size of the last run.",
+               [({}, summary["peak_rss_bytes"])])
+    return "\n".join(families) + "\n"
+
+
+def write_textfile(text, path, tool):
+    """Write ``text`` atomically to ``path`` (or ``path/<tool>.prom`` for a directory)."""
+    path = Path(path)
+    if path.is_dir():
+        path = path / f"{tool}.prom"
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    tmp.replace(path)
+    return path
+
+
+def push(text, url, tool, job=JOB, timeout=10):
+    """PUT ``text`` to a Pushgateway, replacing the group of this job and tool."""
+    target = f"{url.rstrip('/')}/metrics/job/{quote(job, safe='')}/tool/{quote(tool, safe='')}"
+    request = urllib.request.Request(target, data=text.encode("utf-8"), method="PUT",
+                                     headers={"Content-Type": CONTENT_TYPE})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+    return target
+
+
+# ----------------------------------------------------------------------
+# Local scrape target
+# ----------------------------------------------------------------------
+
+def parse(text, extra_labels=None):
+    """``{family: (help, type, [sample lines])}`` with ``extra_labels`` added to every sample."""
+    families = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            parts = line.split(None, 3)
+            if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                entry = families.setdefault(parts[2], [None, None, []])
+                entry[0 if parts[1] == "HELP" else 1] = parts[3] if len(parts) > 3 else ""
+            continue
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.group(1), match.group(2), match.group(3)
+        if extra_labels:
+            own = labels[1:-1] if labels else ""
+            added = ",".join(f'{key}="{_escape(val)}"' for key, val in extra_labels.items()
+                             if f'{key}="' not in own)
+            labels = "{" + ",".join(part for part in (own, added) if part) + "}"
+        families.setdefault(name, [None, None, []])[2].append(f"{name}{labels or ''} {value}")
+    return families
+
+
+def merge(texts):
+    """Merge exposition texts so each family's HELP/TYPE appears once."""
+    merged = {}
+    for families in texts:
+        for name, (help_text, kind, samples) in families.items():
+            entry = merged.setdefault(name, [help_text, kind, []])
+            entry[0] = entry[0] or help_text
+            entry[1] = entry[1] or kind
+            entry[2].extend(samples)
+    lines = []
+    for name, (help_text, kind, samples) in merged.items():
+        if help_text is not None:
+            lines.append(f"# HELP {name} {help_text}")
+        if kind is not None:
+            lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Pushgateway-compatible stand-in that also serves a textfile directory.
+
+    ``PUT``/``POST /metrics/job/<job>[/<label>/<value>...]`` stores a group
+    (the path labels are added to every sample), ``DELETE`` removes it, and
+    ``GET /metrics`` returns all groups plus the *.prom files of
+    ``textfile_dir``.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, textfile_dir=None):
+        self.textfile_dir = Path(textfile_dir) if textfile_dir else None
+        self.groups = {}
+        self._lock = threading.Lock()
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    return self._send(404, "Not found\n")
+                self._send(200, metrics.exposition())
+
+            def do_PUT(self):
+                self._store()
+
+            def do_POST(self):
+                self._store()
+
+            def do_DELETE(self):
+                key = metrics.group_key(self.path)
+                if key is None:
+                    return self._send(400, "Expected /metrics/job/<job>[/<label>/<value>...]\n")
+                with metrics._lock:
+                    metrics.groups.pop(key, None)
+                self._send(202, "")
+
+            def _store(self):
+                key = metrics.group_key(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                if key is None:
+                    return self._send(400, "Expected /metrics/job/<job>[/<label>/<value>...]\n")
+                families = parse(body, dict(key))
+                with metrics._lock:
+                    metrics.groups[key] = families
+                self._send(200, "")
+
+            def _send(self, status, text):
+                body = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @staticmethod
+    def group_key(path):
+        parts = [unquote(part) for part in path.split("?", 1)[0].strip("/").split("/")]
+        if len(parts) < 3 or parts[0] != "metrics" or parts[1] != "job" or len(parts) % 2 == 0:
+            return None
+        labels = [("job", parts[2])] + list(zip(parts[3::2], parts[4::2]))
+        return tuple(labels)
+
+    def exposition(self):
+        with self._lock:
+            texts = list(self.groups.values())
+        if self.textfile_dir and self.textfile_dir.is_dir():
+            for path in sorted(self.textfile_dir.glob("*.prom")):
+                texts.append(parse(path.read_text(encoding="utf-8")))
+        return merge(texts)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local scrape target for IMS tool-run metrics")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--textfile-dir", help="also serve the *.prom files in this directory")
+    args = parser.parse_args(argv)
+
+    with MetricsServer(args.host, args.port, args.textfile_dir) as server:
+        print(f"ℹ️  Accepting pushes and serving {server.url}/metrics (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
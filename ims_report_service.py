@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Warm report-generation service for the create-ims-*.py documents.
+
+Each ``python create-ims-presentation.py`` run pays for interpreter start-up,
+importing python-pptx/python-docx and building its templates before the
+first slide is drawn. This service keeps all of that warm and takes
+generation jobs over HTTP, either on a TCP port or a local Unix socket:
+
+- jobs run on a bounded pool of worker processes; every worker imports
+  python-pptx, python-docx and the generator scripts (and builds the client
+  visual template) once, when it starts,
+- a job's inputs are hashed: the generator script(s), the JSON files its
+  environment variables point at (IMS_SERVER_LATENCY, IMS_FY_ROLLUP, ...),
+  the table source of the item catalog and, for dated documents, the day.
+  The artifact is cached under that hash in --cache-dir, so an unchanged
+  request is answered from disk without running anything,
+- identical jobs already running are joined rather than started twice, and
+  once --max-queue distinct jobs are pending new ones get 503 + Retry-After,
+- a worker re-imports a generator whose script changed on disk.
+
+API:
+    POST /jobs/<job>     body (optional JSON): {"source": PATH, "inputs": {"IMS_FY_ROLLUP": PATH}}
+                         200 with the document; X-IMS-Cache: hit|miss, X-IMS-Key,
+                         X-IMS-Milliseconds headers
+    GET  /status         jobs, workers, pending jobs and cache counters as JSON
+
+Jobs: presentation, client-visual, one-pager, system-overview, item-catalog
+(needs "source": a CSV export directory, SQLite stand-in or ims_snapshot.py
+snapshot).
+
+Usage:
+    python ims_report_service.py serve [--port 9093 | --socket PATH] [--workers 2]
+                                       [--cache-dir .ims-report-cache] [--max-queue 16]
+    python ims_report_service.py request JOB [--source SRC] [--input VAR=PATH]
+                                       [--out FILE] [--url URL | --socket PATH]
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from ims_scripts import ROOT, load_script
+
+DEFAULT_PORT = 9093
+DEFAULT_WORKERS = 2
+DEFAULT_CACHE_DIR = ".ims-report-cache"
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_MAX_ARTIFACTS = 100
+JOB_TIMEOUT = 600
+
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# job: (scripts, the first one being the generator, {input env var: default path},
+#       output file name, needs a table source, content depends on the day)
+JOBS = {
+    "presentation": (("create-ims-presentation.py",),
+                     {"IMS_SERVER_LATENCY": "ims-server-latency.json"},
+                     "IMS_System_Presentation.pptx", False, False),
+    "client-visual": (("create-ims-client-visual-presentation.py",),
+                      {},
+                      "IMS-Client-Workflow-Visual-Presentation.pptx", False, False),
+    "one-pager": (("create-ims-one-pager-docx.py",),
+                  {"IMS_WORKFLOW_PERFORMANCE": "ims-workflow-performance.json", "IMS_LOAD_TEST": "ims-load-test.json",
+                   "IMS_PERMISSION_MATRIX": "ims-permission-matrix.json"},
+                  "IMS-6-Month-Progress-One-Pager-Proper-Flow.docx", False, False),
+    "system-overview": (("create-ims-system-overview-docx.py",),
+                        {"IMS_FY_ROLLUP": "ims-fy-rollup.json", "IMS_PO_RECONCILIATION": "ims-po-reconciliation.json",
+                         "IMS_PERMISSION_MATRIX": "ims-permission-matrix.json"},
+                        "IMS-Total-System-Overview-One-Pager.docx", False, False),
+    "item-catalog": (("create-ims-item-catalog.py", "create-ims-presentation.py"),
+                     {},
+                     "IMS_Item_Catalog.pptx", True, True),
+}
+
+
+class JobError(Exception):
+    """A job request the service cannot run; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ----------------------------------------------------------------------
+# Worker processes
+# ----------------------------------------------------------------------
+
+_loaded = {}  # generator script -> (script signatures, module)
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _generator(job):
+    """The generator module of ``job``, re-imported when one of its scripts changed."""
+    scripts = JOBS[job][0]
+    signatures = tuple(_signature(ROOT / script) for script in scripts)
+    loaded = _loaded.get(scripts[0])
+    if loaded is not None and loaded[0] == signatures:
+        return loaded[1]
+    if loaded is not None:
+        for script in scripts:
+            sys.modules.pop(Path(script).stem.replace("-", "_"), None)
+    module = load_script(scripts[0])
+    _loaded[scripts[0]] = (signatures, module)
+    return module
+
+
+def _warm():
+    """Worker initializer: import the libraries and generators, build templates."""
+    import docx  # noqa: F401
+    import pptx  # noqa: F401
+
+    for job in JOBS:
+        _generator(job)
+    _generator("client-visual").template_bytes()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_job(job, source, inputs, path):
+    """Generate ``job`` into ``path``; runs in a worker process."""
+    started = time.perf_counter()
+    module = _generator(job)
+    saved = {name: os.environ.get(name) for name in inputs}
+    os.environ.update(inputs)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        if job == "item-catalog":
+            module.write_catalog(module.Catalog(source), tmp)
+        elif hasattr(module, "build_presentation"):
+            module.build_presentation().save(tmp)
+        else:
+            module.build_document().save(tmp)
+        os.replace(tmp, path)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return time.perf_counter() - started
+
+
+# ----------------------------------------------------------------------
+# Service
+# ----------------------------------------------------------------------
+
+class ReportService:
+    """Job keys, the artifact cache and the worker pool."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, workers=DEFAULT_WORKERS,
+                 max_queue=DEFAULT_MAX_QUEUE, max_artifacts=DEFAULT_MAX_ARTIFACTS):
+        self.cache_dir = Path(cache_dir).resolve()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_artifacts = max_artifacts
+        self.stats = Counter()
+        self._pending = {}
+        self._digests = {}
+        self._lock = threading.Lock()
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm)
+
+    def start(self):
+        """Start every worker now, so the first job does not pay for warming up."""
+        wait([self.pool.submit(_ping) for _ in range(self.workers)])
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def _digest(self, path):
+        """Content hash of a file, recomputed only when its size or mtime changes."""
+        try:
+            signature = _signature(path)
+        except FileNotFoundError:
+            return "absent"
+        cached = self._digests.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        self._digests[path] = (signature, digest)
+        return digest
+
+    def _source_signature(self, source):
+        path = Path(source)
+        if (path / "snapshot.json").is_file():
+            return self._digest(str(path / "snapshot.json"))
+        if path.is_dir():
+            return repr(sorted((p.name, _signature(p)) for p in path.glob("*.csv")))
+        return repr(_signature(path))
+
+    def resolve(self, job, source=None, inputs=None):
+        """Validate a request; returns ``(key, source, inputs)`` with absolute paths."""
+        if job not in JOBS:
+            raise JobError(404, f"Unknown job {job!r}; jobs: {', '.join(JOBS)}")
+        scripts, defaults, _, needs_source, dated = JOBS[job]
+        inputs = dict(inputs or {})
+        unknown = sorted(set(inputs) - set(defaults))
+        if unknown:
+            raise JobError(400, f"{job} takes no input(s) {', '.join(unknown)}; inputs: {', '.join(defaults) or 'none'}")
+        if needs_source:
+            if not source:
+                raise JobError(400, f"{job} needs a table source")
+            source = os.path.abspath(source)
+            if not os.path.exists(source):
+                raise JobError(400, f"Table source not found: {source}")
+        else:
+            source = None
+
+        key = hashlib.sha256(job.encode())
+        for script in scripts:
+            key.update(self._digest(str(ROOT / script)).encode())
+        for name, default in sorted(defaults.items()):
+            inputs[name] = os.path.abspath(inputs.get(name) or os.environ.get(name, default))
+            key.update(f"{name}={self._digest(inputs[name])}".encode())
+        if source:
+            key.update(self._source_signature(source).encode())
+        if dated:
+            key.update(date.today().isoformat().encode())
+        return key.hexdigest()[:20], source, inputs
+
+    def generate(self, job, source=None, inputs=None):
+        """Path of the document for this request; returns ``(path, cache_hit, key)``."""
+        key, source, inputs = self.resolve(job, source, inputs)
+        path = self.cache_dir / f"{job}-{key}{Path(JOBS[job][2]).suffix}"
+        if path.exists():
+            os.utime(path)
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            return path, True, key
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                if len(self._pending) >= self.max_queue:
+                    self.stats["rejected"] += 1
+                    raise JobError(503, f"{len(self._pending)} jobs pending; try again shortly")
+                self.stats["cache_misses"] += 1
+                future = self.pool.submit(_run_job, job, source, inputs, str(path))
+                self._pending[key] = future
+                future.add_done_callback(lambda done, key=key: self._finished(key, done))
+        try:
+            future.result(timeout=JOB_TIMEOUT)
+        except Exception as e:
+            if not future.done():
+                # The job keeps running and is counted when it finishes
+                with self._lock:
+                    self.stats["timed_out"] += 1
+                raise JobError(504, f"{job} did not finish within {JOB_TIMEOUT}s") from e
+            raise JobError(500, f"{job} failed: {type(e).__name__}: {e}") from e
+        return path, False, key
+
+    def _finished(self, key, future):
+        # A failed job leaves no artifact behind (_run_job only renames a
+        # complete one into place), so the next request for it runs it again
+        failed = future.cancelled() or future.exception() is not None
+        with self._lock:
+            self._pending.pop(key, None)
+            self.stats["failed" if failed else "generated"] += 1
+        if not failed:
+            self._evict()
+
+    def _evict(self):
+        artifacts = sorted(self.cache_dir.glob("*.*x"), key=lambda p: p.stat().st_mtime)
+        for path in artifacts[:max(0, len(artifacts) - self.max_artifacts)]:
+            path.unlink(missing_ok=True)
+
+    def status(self):
+        with self._lock:
+            pending = len(self._pending)
+            stats = dict(self.stats)
+        return {
+            "jobs": {job: {"inputs": sorted(spec[1]), "needs_source": spec[3]} for job, spec in JOBS.items()},
+            "workers": self.workers,
+            "pending": pending,
+            "max_queue": self.max_queue,
+            "cache_dir": str(self.cache_dir),
+            "artifacts": sum(1 for _ in self.cache_dir.glob("*.*x")),
+            "stats": stats,
+        }
+
+
+def _handler(service, tcp=True):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # TCP_NODELAY does not exist on Unix sockets
+        disable_nagle_algorithm = tcp
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/status":
+                return self._json(404, {"error": "Not found"})
+            self._json(200, service.status())
+
+        def do_POST(self):
+            parts = self.path.split("?", 1)[0].strip("/").split("/")
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            if len(parts) != 2 or parts[0] != "jobs":
+                return self._json(404, {"error": "Expected POST /jobs/<job>"})
+            started = time.perf_counter()
+            try:
+                request = json.loads(body) if body.strip() else {}
+                if not isinstance(request, dict):
+                    raise JobError(400, "Expected a JSON object")
+                path, hit, key = service.generate(parts[1], request.get("source"), request.get("inputs"))
+                data = path.read_bytes()
+            except JobError as e:
+                headers = {"Retry-After": "1"} if e.status == 503 else {}
+                return self._json(e.status, {"error": str(e)}, headers)
+            except ValueError as e:
+                return self._json(400, {"error": f"Invalid JSON: {e}"})
+            filename = JOBS[parts[1]][2]
+            self._send(200, data, PPTX_TYPE if filename.endswith(".pptx") else DOCX_TYPE, {
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-IMS-Cache": "hit" if hit else "miss",
+                "X-IMS-Key": key,
+                "X-IMS-Milliseconds": f"{(time.perf_counter() - started) * 1000:.1f}",
+            })
+
+        def _json(self, status, payload, headers=None):
+            self._send(status, json.dumps(payload, indent=2).encode("utf-8"), "application/json", headers)
+
+        def _send(self, status, body, content_type, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+            # Unix socket peers have no (host, port)
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=JOB_TIMEOUT):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def serve(args):
+    service = ReportService(args.cache_dir, args.workers, args.max_queue, args.max_artifacts)
+    started = time.perf_counter()
+    service.start()
+    handler = _handler(service, tcp=not args.socket)
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        server = UnixHTTPServer(args.socket, handler)
+        where = f"unix:{args.socket}"
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+        server.daemon_threads = True
+        where = f"http://{args.host}:{server.server_address[1]}"
+    print(f"✅ {args.workers} warm worker(s) ready in {time.perf_counter() - started:.1f}s; "
+          f"serving {where} (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+def request(args):
+    body = {}
+    if args.source:
+        body["source"] = os.path.abspath(args.source)
+    inputs = {}
+    for item in args.input or []:
+        name, sep, path = item.partition("=")
+        if not sep:
+            raise SystemExit(f"Expected VAR=PATH, got {item!r}")
+        inputs[name] = os.path.abspath(path)
+    if inputs:
+        body["inputs"] = inputs
+    if args.socket:
+        conn = _UnixConnection(args.socket)
+    else:
+        url = urlsplit(args.url)
+        conn = http.client.HTTPConnection(url.hostname, url.port or DEFAULT_PORT, timeout=JOB_TIMEOUT)
+    started = time.perf_counter()
+    try:
+        conn.request("POST", f"/jobs/{args.job}", json.dumps(body), {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        data = response.read()
+    except OSError as e:
+        print(f"❌ Service not reachable: {e}")
+        return 1
+    finally:
+        conn.close()
+    if response.status != 200:
+        print(f"❌ {args.job}: {response.status} {json.loads(data).get('error', '')}")
+        return 1
+    out = args.out or JOBS.get(args.job, (None, None, f"{args.job}.out"))[2]
+    with open(out, "wb") as f:
+        f.write(data)
+    print(f"✅ {out} ({len(data):,} bytes, cache {response.getheader('X-IMS-Cache')}, "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm generation service for the IMS decks and one-pagers")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the service")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    serve_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes")
+    serve_parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="artifact cache directory")
+    serve_parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE, help="pending jobs before 503")
+    serve_parser.add_argument("--max-artifacts", type=int, default=DEFAULT_MAX_ARTIFACTS, help="cached documents kept")
+
+    request_parser = commands.add_parser("request", help="generate a document through a running service")
+    request_parser.add_argument("job", help=", ".join(JOBS))
+    request_parser.add_argument("--source", help="table source for item-catalog")
+    request_parser.add_argument("--input", action="append", metavar="VAR=PATH", help="input file override")
+    request_parser.add_argument("--out", help="output file (default: the script's own file name)")
+    request_parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    request_parser.add_argument("--socket", help="talk to the service on this Unix socket")
+
+    args = parser.parse_args(argv)
+    return serve(args) if args.command == "serve" else request(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
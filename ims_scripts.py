@@ -0,0 +1,31 @@
+"""
+Import the hyphenated root scripts (hide-delete-buttons.py,
+create-ims-presentation.py, ...) as modules so other tools can reuse their
+rules and helpers without running them.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+
+def load_script(filename):
+    """Import ``filename`` from the repository root once and return the module."""
+    path = ROOT / filename
+    name = path.stem.replace("-", "_")
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
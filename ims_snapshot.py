@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Local columnar snapshot of the IMS tables the reporting tools read.
+
+Instead of every engine re-reading SQL Server (or a large export) through
+the joins server/routes/reports.cjs runs, one snapshot directory holds typed
+column files that any tool opens without parsing:
+
+    .ims-snapshot/
+        snapshot.json                         manifest: schema, row counts, watermarks
+        item_masters.1/_live.3.bin            int8 per row, 0 for superseded rows
+        item_masters.1/reorder_point.bin      float64, NULL = NaN
+        item_masters.1/nomenclature.offsets   int64 start offsets, rows + 1
+        item_masters.1/nomenclature.data      UTF-8 bytes
+        ...
+
+Column kinds follow ims_tables.load_columns: ``"d"`` float64, ``"i"`` int64
+(identity columns), ``"flag"`` int8 0/1, ``"id"`` normalised ids and ``"s"``
+text; ids and text are stored as offsets + bytes with NULL as an empty value,
+the same convention as the CSV exports. Files are memory-mapped on open, so
+numeric columns are zero-copy ``memoryview`` objects.
+
+Refresh is incremental. Each table remembers the highest ``updated_at`` it
+has seen (or its integer identity where the source has no ``updated_at``)
+and later runs read only rows at or after it. A changed row is appended and
+its previous version marked dead; soft deletes arrive the same way
+(``is_deleted`` flips and ``updated_at`` moves) and stay in the snapshot
+flagged, so readers see what the source holds. Hard deletes and rows with no
+``updated_at`` are only picked up by ``--rebuild``. A table is compacted once
+more than half of its rows are dead.
+
+New rows are appended past the lengths recorded in the manifest and the live
+flags are written to a new file, so an interrupted refresh leaves the last
+snapshot intact and readers that have it open are never disturbed; the
+manifest is replaced last.
+
+The snapshot directory is itself a table source for ims_tables.py, so every
+tool that takes a CSV directory or SQLite file accepts it:
+
+    python ims_snapshot.py ims-standin.db        # build, then refresh
+    python fy_rollup.py .ims-snapshot
+
+Usage:
+    python ims_snapshot.py SOURCE [--dir .ims-snapshot] [--tables a,b]
+                           [--rebuild] [--info]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+import sys
+from array import array
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+
+from ims_instrument import count, phase, profiled
+from ims_tables import iter_rows, norm_id, table_columns, to_flag, to_number
+
+SNAPSHOT_VERSION = 1
+DEFAULT_DIR = ".ims-snapshot"
+MANIFEST = "snapshot.json"
+BATCH_ROWS = 50000
+# Tables smaller than this are never compacted
+COMPACT_MIN_ROWS = 1000
+
+# Fixed-width kinds and their array typecodes; "id" and "s" are offsets + bytes
+FIXED = {"d": "d", "i": "q", "flag": "b"}
+
+# table: (key column, identity column usable as a watermark, {column: kind})
+TABLES = {
+    "categories": ("id", None, {
+        "id": "id", "category_name": "s", "description": "s", "status": "s",
+        "is_deleted": "flag", "created_at": "s", "updated_at": "s",
+    }),
+    "item_masters": ("id", None, {
+        "id": "id", "item_code": "s", "nomenclature": "s", "category_id": "id", "sub_category_id": "id",
+        "unit": "s", "specifications": "s", "minimum_stock_level": "d", "maximum_stock_level": "d",
+        "reorder_point": "d", "status": "s", "is_deleted": "flag", "created_at": "s", "updated_at": "s",
+    }),
+    "stock_admin": ("id", "id", {
+        "id": "i", "item_master_id": "id", "current_quantity": "d", "available_quantity": "d",
+        "reserved_quantity": "d", "minimum_stock_level": "d", "reorder_point": "d",
+        "maximum_stock_level": "d", "unit_price": "d", "stock_status": "s", "last_restocked_date": "s",
+        "created_at": "s", "updated_at": "s",
+    }),
+    "stock_wing": ("id", "id", {
+        "id": "i", "item_master_id": "id", "wing_id": "id", "current_quantity": "d",
+        "available_quantity": "d", "reserved_quantity": "d", "minimum_stock_level": "d",
+        "reorder_point": "d", "maximum_stock_level": "d", "unit_price": "d", "stock_status": "s",
+        "last_replenished_date": "s", "created_at": "s", "updated_at": "s",
+    }),
+    "stock_acquisitions": ("id", None, {
+        "id": "id", "acquisition_number": "s", "po_id": "id", "delivery_id": "id", "item_master_id": "id",
+        "quantity_received": "d", "quantity_issued": "d", "unit_cost": "d", "delivery_date": "s",
+        "acquisition_date": "s", "status": "s", "financial_year": "s", "created_at": "s", "updated_at": "s",
+    }),
+    "stock_issuance_requests": ("id", None, {
+        "id": "id", "request_number": "s", "request_type": "s", "requester_office_id": "id",
+        "requester_wing_id": "id", "requester_user_id": "id", "purpose": "s", "urgency_level": "s",
+        "is_returnable": "flag", "request_status": "s", "approval_status": "s", "submitted_at": "s",
+        "supervisor_reviewed_at": "s", "issued_at": "s", "created_at": "s", "updated_at": "s",
+    }),
+    "stock_issuance_items": ("id", None, {
+        "id": "id", "request_id": "id", "item_master_id": "id", "nomenclature": "s",
+        "requested_quantity": "d", "approved_quantity": "d", "issued_quantity": "d", "item_type": "s",
+        "is_deleted": "flag", "created_at": "s", "updated_at": "s",
+    }),
+}
+
+NAN = float("nan")
+
+
+def is_snapshot(source):
+    return (Path(source) / MANIFEST).is_file()
+
+
+def _encode(kind, value):
+    if kind == "d":
+        number = to_number(value)
+        return NAN if number is None else float(number)
+    if kind == "i":
+        number = to_number(value)
+        return 0 if number is None else int(number)
+    if kind == "flag":
+        return 1 if to_flag(value) else 0
+    if kind == "id":
+        return norm_id(value) or ""
+    return "" if value is None else str(value)
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+class TextColumn:
+    """Offsets + UTF-8 bytes; NULL (empty) values read as None."""
+
+    __slots__ = ("offsets", "data", "size")
+
+    def __init__(self, offsets, data, size):
+        self.offsets = offsets
+        self.data = data
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row):
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return str(self.data[start:end], "utf-8") if end > start else None
+
+    def __iter__(self):
+        offsets, data = self.offsets, self.data
+        start = offsets[0]
+        for row in range(1, self.size + 1):
+            end = offsets[row]
+            yield str(data[start:end], "utf-8") if end > start else None
+            start = end
+
+
+class Table:
+    """One snapshot table; column files are memory-mapped on first use."""
+
+    def __init__(self, directory, name, state):
+        self.directory = Path(directory) / state["path"]
+        self.name = name
+        self.state = state
+        self.size = state["rows"]
+        self.kinds = state["columns"]
+        self._maps = []
+        self._views = []
+        self._columns = {}
+
+    def __len__(self):
+        return self.state["live"]
+
+    def _map(self, filename, typecode, items):
+        nbytes = items * array(typecode).itemsize
+        if not nbytes:
+            return memoryview(b"").cast(typecode)
+        with open(self.directory / filename, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        view = memoryview(mapped)[:nbytes].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def column(self, name):
+        """Zero-copy ``memoryview`` for numeric columns, ``TextColumn`` for ids and text."""
+        column = self._columns.get(name)
+        if column is None:
+            kind = self.kinds[name]
+            if kind in FIXED:
+                column = self._map(f"{name}.bin", FIXED[kind], self.size)
+            else:
+                offsets = self._map(f"{name}.offsets", "q", self.size + 1)
+                data = self._map(f"{name}.data", "B", offsets[self.size])
+                column = TextColumn(offsets, data, self.size)
+            self._columns[name] = column
+        return column
+
+    @property
+    def live(self):
+        """0/1 per stored row; 0 marks a version superseded by a later refresh."""
+        column = self._columns.get("_live")
+        if column is None:
+            column = self._columns["_live"] = self._map(self.state["live_file"], "b", self.size)
+        return column
+
+    def rows(self, columns, include_deleted=True):
+        """Yield tuples of ``columns`` for the current version of every row.
+
+        As with the other table sources, missing columns and NULLs (NaN)
+        come back as None; ``include_deleted=False`` skips soft-deleted rows.
+        """
+        iterators = [iter(self.column(name)) if name in self.kinds else repeat(None) for name in columns]
+        numeric = [i for i, name in enumerate(columns) if self.kinds.get(name) == "d"]
+        if not include_deleted and "is_deleted" in self.kinds:
+            deleted = iter(self.column("is_deleted"))
+        else:
+            deleted = repeat(0)
+        for live, gone, values in zip(self.live, deleted, zip(*iterators)):
+            if not live or gone:
+                continue
+            if numeric:
+                values = list(values)
+                for i in numeric:
+                    if values[i] != values[i]:
+                        values[i] = None
+                values = tuple(values)
+            yield values
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views, self._maps, self._columns = [], [], {}
+
+
+class Snapshot:
+    """An opened snapshot directory."""
+
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = Path(directory)
+        with open(self.directory / MANIFEST, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self._tables = {}
+
+    @property
+    def tables(self):
+        return list(self.manifest["tables"])
+
+    def table(self, name):
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = Table(self.directory, name, self.manifest["tables"][name])
+        return table
+
+    def close(self):
+        for table in self._tables.values():
+            table.close()
+        self._tables = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_snapshot(directory, table, columns, since=None, inclusive=False):
+    """``ims_tables.iter_rows`` over a snapshot directory."""
+    with Snapshot(directory) as snapshot:
+        if table not in snapshot.manifest["tables"]:
+            return
+        current = snapshot.table(table)
+        width = len(columns)
+        filtered = since is not None and since[1] is not None and since[0] in current.kinds
+        names = list(columns) + [since[0]] if filtered else list(columns)
+        if filtered:
+            watermark = to_number(since[1]) if current.kinds[since[0]] in FIXED else str(since[1])
+        for row in current.rows(names):
+            if filtered:
+                value = row[width]
+                if value is None or not (value > watermark or (inclusive and value == watermark)):
+                    continue
+                row = row[:width]
+            yield row
+
+
+# ----------------------------------------------------------------------
+# Refreshing
+# ----------------------------------------------------------------------
+
+class ColumnWriter:
+    """Appends converted rows to the column files of one table directory."""
+
+    def __init__(self, directory, kinds):
+        self.directory = Path(directory)
+        self.kinds = kinds
+        self.data_sizes = {}
+
+    def create(self):
+        self.directory.mkdir(parents=True)
+        for name, kind in self.kinds.items():
+            if kind in FIXED:
+                (self.directory / f"{name}.bin").touch()
+            else:
+                with open(self.directory / f"{name}.offsets", "wb") as f:
+                    array("q", [0]).tofile(f)
+                (self.directory / f"{name}.data").touch()
+
+    def truncate(self, rows):
+        """Drop anything past ``rows`` left behind by an interrupted refresh."""
+        for name, kind in self.kinds.items():
+            if kind in FIXED:
+                os.truncate(self.directory / f"{name}.bin", rows * array(FIXED[kind]).itemsize)
+                continue
+            end = array("q")
+            with open(self.directory / f"{name}.offsets", "rb") as f:
+                f.seek(rows * 8)
+                end.fromfile(f, 1)
+            os.truncate(self.directory / f"{name}.offsets", (rows + 1) * 8)
+            os.truncate(self.directory / f"{name}.data", end[0])
+            self.data_sizes[name] = end[0]
+
+    def append(self, rows):
+        """Append rows (tuples in ``kinds`` order); returns bytes written."""
+        written = 0
+        for index, (name, kind) in enumerate(self.kinds.items()):
+            if kind in FIXED:
+                values = array(FIXED[kind], [row[index] for row in rows])
+                with open(self.directory / f"{name}.bin", "ab") as f:
+                    values.tofile(f)
+                written += len(values) * values.itemsize
+                continue
+            encoded = [row[index].encode("utf-8") for row in rows]
+            offsets = array("q")
+            position = self.data_sizes.get(name, 0)
+            for value in encoded:
+                position += len(value)
+                offsets.append(position)
+            self.data_sizes[name] = position
+            with open(self.directory / f"{name}.offsets", "ab") as f:
+                offsets.tofile(f)
+            data = b"".join(encoded)
+            with open(self.directory / f"{name}.data", "ab") as f:
+                f.write(data)
+            written += len(offsets) * 8 + len(data)
+        return written
+
+
+def _max(current, value):
+    if value is None or value == "":
+        return current
+    return value if current is None or value > current else current
+
+
+def _apply(directory, table, state, rows):
+    """Upsert ``rows`` (raw source tuples) into the table ``state`` describes."""
+    key, _, kinds = TABLES[table]
+    names = list(kinds)
+    key_index = names.index(key)
+    mark_index = names.index(state["watermark_column"]) if state["watermark_column"] else None
+    deleted_index = names.index("is_deleted") if "is_deleted" in kinds else None
+
+    writer = ColumnWriter(Path(directory) / state["path"], kinds)
+    if writer.directory.is_dir():
+        writer.truncate(state["rows"])
+    else:
+        writer.create()
+
+    # Current version of every key: (row, watermark value, soft-deleted)
+    versions = {}
+    live = bytearray()
+    if state["rows"]:
+        current = Table(directory, table, state)
+        try:
+            live = bytearray(current.live)
+            marks = current.column(names[mark_index]) if mark_index is not None else repeat(None)
+            deleted = current.column("is_deleted") if deleted_index is not None else repeat(0)
+            for row, (alive, row_key, mark, gone) in enumerate(zip(live, current.column(key), marks, deleted)):
+                if alive:
+                    versions[row_key] = (row, mark, gone)
+        finally:
+            current.close()
+
+    state = dict(state)
+    stats = {"read": 0, "added": 0, "updated": 0, "unchanged": 0, "bytes_written": 0}
+    converters = list(kinds.values())
+    batch = []
+
+    def flush():
+        with phase("save"):
+            stats["bytes_written"] += writer.append(batch)
+        live.extend(b"\x01" * len(batch))
+        state["rows"] += len(batch)
+        batch.clear()
+
+    with phase("load"):
+        for raw in rows:
+            stats["read"] += 1
+            row = tuple(_encode(kind, value) for kind, value in zip(converters, raw))
+            mark = row[mark_index] if mark_index is not None else None
+            if mark_index is not None:
+                state["watermark"] = _max(state["watermark"], mark)
+            gone = row[deleted_index] if deleted_index is not None else 0
+            previous = versions.get(row[key_index])
+            if previous is not None:
+                if mark is not None and previous[1] == mark:
+                    stats["unchanged"] += 1
+                    continue
+                live[previous[0]] = 0
+                state["live"] -= 1
+                state["deleted"] -= previous[2]
+                stats["updated"] += 1
+            else:
+                stats["added"] += 1
+            versions[row[key_index]] = (state["rows"] + len(batch), mark, gone)
+            state["live"] += 1
+            state["deleted"] += gone
+            batch.append(row)
+            if len(batch) >= BATCH_ROWS:
+                flush()
+        if batch:
+            flush()
+
+    state["generation"] += 1
+    state["live_file"] = f"_live.{state['generation']}.bin"
+    with open(writer.directory / state["live_file"], "wb") as f:
+        f.write(live)
+    count("rows_read", stats["read"])
+    count("bytes_written", stats["bytes_written"] + len(live))
+    return state, stats
+
+
+def _fresh_state(table, kinds, watermark_column, generation, watermark=None):
+    return {
+        "path": f"{table}.{generation + 1}",
+        "columns": kinds,
+        "watermark_column": watermark_column,
+        "watermark": watermark,
+        "generation": generation,
+        "rows": 0,
+        "live": 0,
+        "deleted": 0,
+    }
+
+
+def refresh_table(source, directory, table, state=None, rebuild=False):
+    """Bring one table up to date; returns ``(state, stats)``, or None when the source lacks it."""
+    _, identity, kinds = TABLES[table]
+    present = table_columns(source, table)
+    if not present:
+        return None
+    if "updated_at" in present:
+        watermark_column = "updated_at"
+    elif identity in present:
+        watermark_column = identity
+    else:
+        watermark_column = None
+
+    directory = Path(directory)
+    names = list(kinds)
+    incremental = (not rebuild and state is not None and watermark_column is not None
+                   and state["columns"] == kinds and state["watermark_column"] == watermark_column
+                   and (directory / state["path"] / state["live_file"]).is_file())
+    if incremental:
+        since = (watermark_column, state["watermark"])
+        state, stats = _apply(directory, table, state, iter_rows(source, table, names, since, inclusive=True))
+    else:
+        fresh = _fresh_state(table, kinds, watermark_column, state["generation"] if state else 0)
+        shutil.rmtree(directory / fresh["path"], ignore_errors=True)
+        state, stats = _apply(directory, table, fresh, iter_rows(source, table, names))
+    stats["compacted"] = False
+
+    if state["rows"] >= COMPACT_MIN_ROWS and state["live"] * 2 < state["rows"]:
+        with phase("compact"):
+            old = Table(directory, table, state)
+            try:
+                fresh = _fresh_state(table, kinds, watermark_column, state["generation"], state["watermark"])
+                shutil.rmtree(directory / fresh["path"], ignore_errors=True)
+                state, _ = _apply(directory, table, fresh, old.rows(names))
+            finally:
+                old.close()
+        stats["compacted"] = True
+    return state, stats
+
+
+def _write_manifest(directory, manifest):
+    path = Path(directory) / MANIFEST
+    tmp = path.with_name(f".{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _cleanup(directory, manifest):
+    """Remove table directories and live files the manifest no longer uses."""
+    tables = manifest["tables"]
+    for entry in Path(directory).iterdir():
+        table = entry.name.rpartition(".")[0]
+        if not entry.is_dir() or table not in TABLES:
+            continue
+        state = tables.get(table)
+        if state is None or state["path"] != entry.name:
+            shutil.rmtree(entry, ignore_errors=True)
+            continue
+        for live_file in entry.glob("_live.*.bin"):
+            if live_file.name != state["live_file"]:
+                live_file.unlink()
+
+
+def refresh(source, directory=DEFAULT_DIR, tables=None, rebuild=False):
+    """Refresh ``tables`` (default: all) from ``source``; returns ``(manifest, {table: stats or None})``."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {"version": SNAPSHOT_VERSION, "source": None, "tables": {}}
+    if is_snapshot(directory):
+        with open(directory / MANIFEST, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+        if existing.get("version") == SNAPSHOT_VERSION:
+            manifest = existing
+    source_path = os.path.abspath(source)
+    # Watermarks taken from another database mean nothing here
+    rebuild = rebuild or manifest["source"] not in (None, source_path)
+
+    results = {}
+    for table in tables or TABLES:
+        result = refresh_table(source, directory, table, manifest["tables"].get(table), rebuild)
+        if result is None:
+            results[table] = None
+            continue
+        manifest["tables"][table], results[table] = result
+    manifest["source"] = source_path
+    manifest["refreshed_at"] = datetime.now().isoformat(timespec="seconds")
+    _write_manifest(directory, manifest)
+    _cleanup(directory, manifest)
+    return manifest, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or refresh the local columnar snapshot of IMS tables")
+    parser.add_argument("source", nargs="?", help="CSV export directory or SQLite stand-in database")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="snapshot directory")
+    parser.add_argument("--tables", help="comma-separated tables to refresh (default: all)")
+    parser.add_argument("--rebuild", action="store_true", help="reload every row (picks up hard deletes)")
+    parser.add_argument("--info", action="store_true", help="describe the snapshot and exit")
+    args = parser.parse_args(argv)
+
+    if args.info:
+        if not is_snapshot(args.dir):
+            print(f"❌ No snapshot in {args.dir}")
+            return 1
+        with Snapshot(args.dir) as snapshot:
+            manifest = snapshot.manifest
+        print(f"📄 {args.dir}: {manifest['source']} (refreshed {manifest.get('refreshed_at')})")
+        for name, state in manifest["tables"].items():
+            print(f"   {name:<26} {state['live']:>10,} rows ({state['deleted']:,} soft-deleted, "
+                  f"{state['rows'] - state['live']:,} superseded), watermark {state['watermark']}")
+        return 0
+    if not args.source:
+        parser.error("SOURCE is required unless --info is given")
+    if not os.path.exists(args.source):
+        raise SystemExit(f"Table source not found: {args.source}")
+
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()] if args.tables else None
+    unknown = sorted(set(tables or ()) - set(TABLES))
+    if unknown:
+        raise SystemExit(f"Unknown table(s): {', '.join(unknown)}; known: {', '.join(TABLES)}")
+
+    manifest, results = refresh(args.source, args.dir, tables, args.rebuild)
+    for table, stats in results.items():
+        if stats is None:
+            print(f"ℹ️  {table}: not in the source, skipped")
+            continue
+        state = manifest["tables"][table]
+        note = ", compacted" if stats["compacted"] else ""
+        print(f"✅ {table}: {stats['added']:,} new, {stats['updated']:,} changed of {stats['read']:,} read; "
+              f"{state['live']:,} rows ({state['deleted']:,} soft-deleted){note}")
+    print(f"Snapshot: {args.dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("ims_snapshot"):
+        sys.exit(main())
@@ -0,0 +1,791 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic IMS dataset for scale testing.
+
+Produces referentially consistent rows for the tables the reporting tools
+read: categories/sub_categories, WingsInformation, AspNetUsers,
+item_masters, vendors, tenders/tender_items, purchase_orders and their
+items, deliveries/delivery_items, stock_acquisitions (one OPB- opening
+balance row per item plus a row per posted delivery line),
+stock_issuance_requests/items, request_approvals, approval_history,
+inventory_verification_requests, current_inventory_stock and the ims_*
+role tables (permissions, roles, role grants and user role assignments).
+
+The same seed and scale always give the same data. Ids are derived from
+(table, row number) rather than drawn at random, so child rows reference
+their parents without keeping the parents in memory, and every chunk of
+requests is generated from its own seeded stream. Chunks can therefore be
+generated in parallel worker processes and written in order, a chunk of
+rows at a time, to a SQLite stand-in and/or one CSV per table.
+
+Deliberate irregularities keep the analysis paths honest: some PO lines
+are under- or over-delivered, a few delivery lines are never posted to
+stock, some issuance lines are soft-deleted, requests end in every
+workflow state (pending, approved, rejected, returned, issued, completed),
+and some role grants drift from the seeded templates.
+
+Usage:
+    python ims_synthetic.py --requests 1000000 [--items N] [--seed 1]
+                            [--sqlite ims-synthetic.db] [--csv-dir ims-synthetic-csv]
+                            [--jobs N] [--force]
+"""
+
+import argparse
+import csv
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+DEFAULT_SEED = 1
+DEFAULT_START = "2023-04-01"
+DEFAULT_DAYS = 1095
+CHUNK_REQUESTS = 20000
+
+LINES_PER_REQUEST = (1, 1, 2, 2, 3, 3, 4, 5, 8)
+MAX_ITEMS_PER_REQUEST = max(LINES_PER_REQUEST)
+HISTORY_SLOTS = 5
+
+SCHEMA = {
+    "categories": [
+        ("id", "TEXT"), ("category_name", "TEXT"), ("description", "TEXT"), ("status", "TEXT"),
+        ("is_deleted", "INTEGER"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "sub_categories": [
+        ("id", "TEXT"), ("category_id", "TEXT"), ("sub_category_name", "TEXT"), ("status", "TEXT"),
+        ("is_deleted", "INTEGER"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "WingsInformation": [
+        ("Id", "INTEGER"), ("Name", "TEXT"), ("ShortName", "TEXT"), ("WingCode", "TEXT"),
+        ("OfficeID", "INTEGER"), ("IS_ACT", "INTEGER"),
+    ],
+    "AspNetUsers": [
+        ("Id", "TEXT"), ("FullName", "TEXT"), ("Email", "TEXT"), ("UserName", "TEXT"),
+        ("intWingID", "INTEGER"), ("EmployeeID", "TEXT"),
+    ],
+    "item_masters": [
+        ("id", "TEXT"), ("item_code", "TEXT"), ("nomenclature", "TEXT"), ("category_id", "TEXT"),
+        ("sub_category_id", "TEXT"), ("unit", "TEXT"), ("specifications", "TEXT"),
+        ("minimum_stock_level", "INTEGER"), ("maximum_stock_level", "INTEGER"), ("reorder_point", "INTEGER"),
+        ("status", "TEXT"), ("is_deleted", "INTEGER"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "vendors": [
+        ("id", "TEXT"), ("vendor_code", "TEXT"), ("vendor_name", "TEXT"), ("city", "TEXT"),
+        ("status", "TEXT"), ("is_deleted", "INTEGER"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "tenders": [
+        ("id", "TEXT"), ("tender_number", "TEXT"), ("title", "TEXT"), ("tender_spot_type", "TEXT"),
+        ("publish_date", "TEXT"), ("submission_deadline", "TEXT"), ("vendor_id", "TEXT"),
+        ("is_finalized", "INTEGER"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "tender_items": [
+        ("id", "TEXT"), ("tender_id", "TEXT"), ("item_master_id", "TEXT"), ("nomenclature", "TEXT"),
+        ("quantity", "INTEGER"), ("estimated_unit_price", "REAL"), ("vendor_id", "TEXT"),
+        ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "purchase_orders": [
+        ("id", "TEXT"), ("po_number", "TEXT"), ("tender_id", "TEXT"), ("vendor_id", "TEXT"),
+        ("po_date", "TEXT"), ("total_amount", "REAL"), ("status", "TEXT"),
+        ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "purchase_order_items": [
+        ("id", "TEXT"), ("po_id", "TEXT"), ("item_master_id", "TEXT"), ("quantity", "INTEGER"),
+        ("unit_price", "REAL"), ("total_price", "REAL"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "deliveries": [
+        ("id", "TEXT"), ("delivery_number", "TEXT"), ("po_id", "TEXT"), ("po_number", "TEXT"),
+        ("tender_id", "TEXT"), ("delivery_date", "TEXT"), ("delivery_status", "TEXT"),
+        ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "delivery_items": [
+        ("id", "TEXT"), ("delivery_id", "TEXT"), ("po_item_id", "TEXT"), ("item_master_id", "TEXT"),
+        ("delivery_qty", "INTEGER"), ("quality_status", "TEXT"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "stock_acquisitions": [
+        ("id", "TEXT"), ("acquisition_number", "TEXT"), ("po_id", "TEXT"), ("delivery_id", "TEXT"),
+        ("item_master_id", "TEXT"), ("quantity_received", "INTEGER"), ("quantity_issued", "INTEGER"),
+        ("unit_cost", "REAL"), ("delivery_date", "TEXT"), ("acquisition_date", "TEXT"), ("status", "TEXT"),
+        ("financial_year", "TEXT"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "stock_issuance_requests": [
+        ("id", "TEXT"), ("request_number", "TEXT"), ("request_type", "TEXT"), ("requester_office_id", "INTEGER"),
+        ("requester_wing_id", "INTEGER"), ("requester_user_id", "TEXT"), ("purpose", "TEXT"),
+        ("urgency_level", "TEXT"), ("is_returnable", "INTEGER"), ("request_status", "TEXT"),
+        ("approval_status", "TEXT"), ("submitted_at", "TEXT"), ("supervisor_reviewed_at", "TEXT"),
+        ("issued_at", "TEXT"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "stock_issuance_items": [
+        ("id", "TEXT"), ("request_id", "TEXT"), ("item_master_id", "TEXT"), ("nomenclature", "TEXT"),
+        ("requested_quantity", "INTEGER"), ("approved_quantity", "INTEGER"), ("issued_quantity", "INTEGER"),
+        ("item_type", "TEXT"), ("is_deleted", "INTEGER"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "request_approvals": [
+        ("id", "TEXT"), ("request_id", "TEXT"), ("request_type", "TEXT"), ("current_status", "TEXT"),
+        ("submitted_by", "TEXT"), ("submitted_date", "TEXT"), ("finalized_date", "TEXT"),
+        ("created_date", "TEXT"), ("updated_date", "TEXT"),
+    ],
+    "approval_history": [
+        ("id", "TEXT"), ("request_approval_id", "TEXT"), ("action_type", "TEXT"), ("action_by", "TEXT"),
+        ("action_date", "TEXT"), ("step_number", "INTEGER"), ("is_current_step", "INTEGER"),
+    ],
+    "inventory_verification_requests": [
+        ("id", "TEXT"), ("stock_issuance_id", "TEXT"), ("item_master_id", "TEXT"), ("requested_quantity", "INTEGER"),
+        ("verification_status", "TEXT"), ("physical_count", "INTEGER"), ("available_quantity", "INTEGER"),
+        ("wing_id", "INTEGER"), ("created_at", "TEXT"), ("verified_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "current_inventory_stock": [
+        ("id", "TEXT"), ("item_master_id", "TEXT"), ("current_quantity", "INTEGER"),
+        ("available_quantity", "INTEGER"), ("reserved_quantity", "INTEGER"), ("minimum_stock_level", "INTEGER"),
+        ("maximum_stock_level", "INTEGER"), ("reorder_point", "INTEGER"), ("created_at", "TEXT"),
+        ("last_updated", "TEXT"),
+    ],
+    "ims_permissions": [
+        ("id", "TEXT"), ("permission_key", "TEXT"), ("module_name", "TEXT"), ("action_name", "TEXT"),
+        ("is_active", "INTEGER"), ("created_at", "TEXT"),
+    ],
+    "ims_roles": [
+        ("id", "TEXT"), ("role_name", "TEXT"), ("display_name", "TEXT"), ("is_system_role", "INTEGER"),
+        ("is_active", "INTEGER"), ("created_at", "TEXT"), ("updated_at", "TEXT"),
+    ],
+    "ims_role_permissions": [
+        ("id", "TEXT"), ("role_id", "TEXT"), ("permission_id", "TEXT"), ("granted_by", "TEXT"), ("granted_at", "TEXT"),
+    ],
+    "ims_user_roles": [
+        ("id", "TEXT"), ("user_id", "TEXT"), ("role_id", "TEXT"), ("scope_type", "TEXT"),
+        ("scope_wing_id", "INTEGER"), ("assigned_by", "TEXT"), ("assigned_at", "TEXT"), ("is_active", "INTEGER"),
+    ],
+}
+
+# Leading GUID group per table; the row number fills the last group
+TABLE_CODES = {table: index + 1 for index, table in enumerate(SCHEMA)}
+
+# Foreign-key columns indexed after loading into SQLite
+SQLITE_INDEXES = {
+    "sub_categories": ["category_id"],
+    "item_masters": ["category_id"],
+    "tender_items": ["tender_id"],
+    "purchase_order_items": ["po_id"],
+    "delivery_items": ["po_item_id"],
+    "stock_acquisitions": ["item_master_id"],
+    "stock_issuance_items": ["request_id", "item_master_id"],
+    "request_approvals": ["request_id"],
+    "approval_history": ["request_approval_id"],
+    "ims_role_permissions": ["role_id"],
+    "ims_user_roles": ["user_id"],
+}
+
+CATEGORY_NAMES = [
+    "IT Equipment", "Stationery", "Furniture", "Electrical", "Cleaning Supplies", "Printing Consumables",
+    "Networking", "Medical Supplies", "Vehicle Spares", "Kitchen Items", "Safety Equipment", "Tools",
+]
+SUB_CATEGORIES_PER_CATEGORY = 4
+ITEM_NOUNS = [
+    "Laptop", "Monitor", "Toner", "Paper Ream", "Chair", "Cable", "Switch", "Stapler", "File Cover",
+    "Battery", "Extension Board", "Mouse", "Keyboard", "Projector", "Desk", "Router", "Marker", "Gloves",
+]
+ITEM_GRADES = ["Standard", "Heavy Duty", "Premium", "Compact", "Economy", "Pro"]
+UNITS = ["Each", "Box", "Pack", "Ream", "Set", "Piece"]
+CITIES = ["Islamabad", "Rawalpindi", "Lahore", "Karachi", "Peshawar", "Quetta"]
+TENDER_TYPES = ["Contract", "Annual", "Spot"]
+PURPOSES = ["Office use", "Replacement of faulty item", "New joiner", "Field operation", "Event support"]
+URGENCY = ["Low", "Normal", "Normal", "High", "Urgent"]
+
+# Seeded system roles plus a custom role and a retired one: (name, display name, system role, active)
+ROLES = [
+    ("IMS_SUPER_ADMIN", "IMS Super Administrator", 1, 1),
+    ("IMS_ADMIN", "IMS Administrator", 1, 1),
+    ("WING_SUPERVISOR", "Wing Supervisor", 1, 1),
+    ("GENERAL_USER", "General User", 1, 1),
+    ("PROCUREMENT_OFFICER", "Procurement Officer", 1, 1),
+    ("AUDITOR", "Auditor", 1, 1),
+    ("STORE_KEEPER", "Store Keeper", 0, 1),
+    ("LEGACY_APPROVER", "Legacy Approver", 0, 0),
+]
+STORE_KEEPER_PERMISSIONS = ["inventory.view_all", "inventory.edit_wing", "stock_request.view_wing"]
+# Grants edited by hand after seeding: (role, permission, granted)
+ROLE_DRIFT = [
+    ("WING_SUPERVISOR", "stock_transfer.admin_to_wing", True),
+    ("AUDITOR", "settings.view", False),
+    ("PROCUREMENT_OFFICER", "items.manage", True),
+]
+
+# Request outcomes: (cumulative probability, approval_status). Requests from
+# the last OPEN_DAYS days may still be in flight; older ones are settled.
+OUTCOMES = [
+    (0.12, "Rejected"),
+    (0.18, "Returned"),
+    (0.75, "Issued"),
+    (1.00, "Completed"),
+]
+RECENT_OUTCOMES = [
+    (0.35, "Pending"),
+    (0.65, "Approved"),
+    (0.75, "Rejected"),
+    (0.80, "Returned"),
+    (1.00, "Issued"),
+]
+OPEN_DAYS = 30
+ISSUED_STATUSES = ("Issued", "Completed")
+
+
+def guid(table, n):
+    """Deterministic GUID-shaped id for row ``n`` of ``table``."""
+    return f"{TABLE_CODES[table]:08X}-0000-4000-8000-{n:012X}"
+
+
+class Scale:
+    """Row counts derived from the number of issuance requests."""
+
+    def __init__(self, requests, items=None, wings=40, seed=DEFAULT_SEED, start=DEFAULT_START, days=DEFAULT_DAYS):
+        self.requests = requests
+        self.items = items or max(50, requests // 200)
+        self.wings = wings
+        self.users = max(20, min(requests // 50, 20000))
+        self.vendors = max(10, self.items // 20)
+        self.lines_per_tender = 25
+        self.tenders = max(3, -(-self.items // self.lines_per_tender) * 2)
+        self.seed = seed
+        # Units expected to be issued over the whole history, used to size
+        # purchase orders so stock stays roughly in line with demand
+        issued_share = 1.0 - next(limit for limit, name in OUTCOMES if name == "Returned")
+        self.expected_issues = requests * sum(LINES_PER_REQUEST) / len(LINES_PER_REQUEST) * 5.5 * issued_share
+        self.start = date.fromisoformat(start)
+        self.days = days
+
+
+    def item_demand(self, n):
+        """Expected units issued of item ``n`` (matches the request item skew)."""
+        share = math.sqrt((n + 1) / self.items) - math.sqrt(n / self.items)
+        return self.expected_issues * share
+
+
+class Clock:
+    """Formats second offsets from the start date as DATETIME text."""
+
+    def __init__(self, start, days):
+        self.days = [(start + timedelta(days=d)).isoformat() for d in range(days + 800)]
+
+    def __call__(self, offset):
+        if offset is None:
+            return None
+        day, rest = divmod(int(offset), 86400)
+        hour, rest = divmod(rest, 3600)
+        return f"{self.days[day]} {hour:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+    def day(self, offset):
+        return self.days[int(offset) // 86400]
+
+
+def fy_code(day):
+    year, month = int(day[0:4]), int(day[5:7])
+    start = year if month >= 4 else year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def _rng(scale, *parts):
+    return random.Random(":".join(str(p) for p in (scale.seed,) + parts))
+
+
+# ----------------------------------------------------------------------
+# Master data
+# ----------------------------------------------------------------------
+
+def master_tables(scale, clock):
+    """Yield ``(table, rows)`` for the small reference tables."""
+    created = clock(0)
+    yield "categories", [
+        (guid("categories", c), name, f"{name} used across offices", "Active", 0, created, created)
+        for c, name in enumerate(CATEGORY_NAMES)
+    ]
+    yield "sub_categories", [
+        (guid("sub_categories", c * SUB_CATEGORIES_PER_CATEGORY + k), guid("categories", c),
+         f"{name} - Group {k + 1}", "Active", 0, created, created)
+        for c, name in enumerate(CATEGORY_NAMES) for k in range(SUB_CATEGORIES_PER_CATEGORY)
+    ]
+    yield "WingsInformation", [
+        (w, f"Wing {w:03d}", f"W{w:03d}", f"WNG-{w:03d}", 1 + (w - 1) // 10, 1)
+        for w in range(1, scale.wings + 1)
+    ]
+    yield "AspNetUsers", [
+        (guid("AspNetUsers", u), f"User {u:05d}", f"user{u:05d}@ims.local", f"user{u:05d}",
+         1 + u % scale.wings, f"EMP-{u:05d}")
+        for u in range(scale.users)
+    ]
+
+    rng = _rng(scale, "item_masters")
+    items = []
+    for n in range(scale.items):
+        category = n % len(CATEGORY_NAMES)
+        sub_category = category * SUB_CATEGORIES_PER_CATEGORY + (n // len(CATEGORY_NAMES)) % SUB_CATEGORIES_PER_CATEGORY
+        minimum = rng.randint(5, 20)
+        items.append((
+            guid("item_masters", n), f"ITM-{n + 1:06d}",
+            f"{ITEM_NOUNS[n % len(ITEM_NOUNS)]} {ITEM_GRADES[(n // len(ITEM_NOUNS)) % len(ITEM_GRADES)]} {n + 1}",
+            guid("categories", category), guid("sub_categories", sub_category), rng.choice(UNITS),
+            f"Model {rng.randint(100, 999)}", minimum, minimum * 10, minimum * 2,
+            "Active", 1 if rng.random() < 0.005 else 0, created, created,
+        ))
+    yield "item_masters", items
+
+    rng = _rng(scale, "vendors")
+    yield "vendors", [
+        (guid("vendors", v), f"VND-{v + 1:04d}", f"Vendor {v + 1:04d} Traders", rng.choice(CITIES),
+         "Active", 0, created, created)
+        for v in range(scale.vendors)
+    ]
+
+    yield from role_tables(scale, clock)
+
+
+def role_tables(scale, clock):
+    """Yield the ims_* role tables seeded as create-ims-role-system.sql does.
+
+    Every user holds GENERAL_USER, one per wing supervises it and a handful
+    are admins, procurement officers, auditors or store keepers. Some grants
+    drift from the templates (ROLE_DRIFT), a few assignments are revoked and
+    some users hold the retired LEGACY_APPROVER role.
+    """
+    from permission_matrix import ALL, PERMISSIONS, ROLE_TEMPLATES
+
+    created = clock(0)
+    permission_ids = {key: guid("ims_permissions", n) for n, (key, _, _) in enumerate(PERMISSIONS)}
+    yield "ims_permissions", [
+        (permission_ids[key], key, module, action, 1, created) for key, module, action in PERMISSIONS
+    ]
+    role_ids = {name: guid("ims_roles", n) for n, (name, _, _, _) in enumerate(ROLES)}
+    yield "ims_roles", [
+        (role_ids[name], name, display, system, active, created, created)
+        for name, display, system, active in ROLES
+    ]
+
+    all_keys = [key for key, _, _ in PERMISSIONS]
+    grants = {name: list(all_keys if keys == ALL else keys) for name, keys in ROLE_TEMPLATES.items()}
+    grants["STORE_KEEPER"] = STORE_KEEPER_PERMISSIONS
+    grants["LEGACY_APPROVER"] = ["stock_request.approve_admin", "stock_request.view_all"]
+    for name, key, granted in ROLE_DRIFT:
+        if granted:
+            grants[name].append(key)
+        else:
+            grants[name].remove(key)
+    yield "ims_role_permissions", [
+        (guid("ims_role_permissions", n), role_ids[name], permission_ids[key], "SYSTEM_SETUP", created)
+        for n, (name, key) in enumerate((name, key) for name, _, _, _ in ROLES for key in grants[name])
+    ]
+
+    rng = _rng(scale, "roles")
+    span = scale.days * 86400
+    assignments = []
+
+    def assign(user, role, scope_type="Global", wing=None, active=1):
+        assignments.append((
+            guid("ims_user_roles", len(assignments)), guid("AspNetUsers", user), role_ids[role],
+            scope_type, wing, guid("AspNetUsers", 0), clock(rng.randrange(span)), active,
+        ))
+
+    for u in range(scale.users):
+        assign(u, "GENERAL_USER", active=0 if rng.random() < 0.02 else 1)
+    # User u belongs to wing 1 + u % wings, so the first users cover every wing once
+    for u in range(min(scale.wings, scale.users)):
+        assign(u, "WING_SUPERVISOR", "Wing", 1 + u % scale.wings, active=0 if rng.random() < 0.05 else 1)
+    for role, n in (("IMS_SUPER_ADMIN", 2), ("IMS_ADMIN", 1 + scale.users // 500),
+                    ("PROCUREMENT_OFFICER", 1 + scale.users // 400), ("AUDITOR", 2),
+                    ("STORE_KEEPER", 1 + scale.users // 200), ("LEGACY_APPROVER", 1 + scale.users // 250)):
+        for u in rng.sample(range(scale.users), min(n, scale.users)):
+            assign(u, role)
+    yield "ims_user_roles", assignments
+
+
+def procurement_tables(scale, clock, received):
+    """Yield tenders through stock_acquisitions; adds posted receipts to ``received``.
+
+    Each tender buys ``lines_per_tender`` consecutive items and becomes one
+    PO delivered in one to three drops. PO lines are mostly delivered in
+    full; some short, some over, and a few delivery lines are never posted
+    to stock_acquisitions.
+    """
+    rng = _rng(scale, "procurement")
+    span = scale.days * 86400
+    tenders, tender_items, orders, order_items = [], [], [], []
+    deliveries, delivery_items, acquisitions = [], [], []
+
+    # Opening balances come first, dated on the start day
+    for n in range(scale.items):
+        quantity = rng.randint(20, 400)
+        received[n] += quantity
+        when = clock(rng.randint(9, 17) * 3600)
+        acquisitions.append((
+            guid("stock_acquisitions", n), f"OPB-{n + 1:06d}", None, None, guid("item_masters", n),
+            quantity, 0, round(rng.uniform(50, 5000), 2), None, when[:10], "Completed",
+            fy_code(when), when, when,
+        ))
+    acquisition = scale.items
+
+    occurrences = scale.tenders * scale.lines_per_tender / scale.items
+    line = 0
+    delivery_line = 0
+    delivery_number = 0
+    for t in range(scale.tenders):
+        published = span * t / scale.tenders + rng.randint(9, 12) * 3600
+        vendor = rng.randrange(scale.vendors)
+        tender_id = guid("tenders", t)
+        tender_time = clock(published)
+        tenders.append((
+            tender_id, f"TND-{clock.day(published)[:4]}-{t + 1:04d}", f"Procurement of items batch {t + 1}",
+            TENDER_TYPES[t % len(TENDER_TYPES)], clock.day(published), clock.day(published + 14 * 86400),
+            guid("vendors", vendor), 1, tender_time, tender_time,
+        ))
+        po_time = published + rng.randint(15, 30) * 86400
+        po_id = guid("purchase_orders", t)
+        po_number = f"PO-{clock.day(po_time)[:4]}-{t + 1:05d}"
+        lines = []
+        total = 0.0
+        first = (t * scale.lines_per_tender) % scale.items
+        for k in range(scale.lines_per_tender):
+            item = (first + k) % scale.items
+            quantity = max(20, int(scale.item_demand(item) * rng.uniform(1.0, 1.4) / occurrences))
+            price = round(rng.uniform(50, 5000), 2)
+            total += quantity * price
+            tender_items.append((
+                guid("tender_items", line), tender_id, guid("item_masters", item), None,
+                quantity, price, guid("vendors", vendor), tender_time, tender_time,
+            ))
+            order_items.append((
+                guid("purchase_order_items", line), po_id, guid("item_masters", item), quantity,
+                price, round(quantity * price, 2), clock(po_time), clock(po_time),
+            ))
+            lines.append((line, item, quantity, price))
+            line += 1
+        orders.append((
+            po_id, po_number, tender_id, guid("vendors", vendor), clock.day(po_time), round(total, 2),
+            "Completed", clock(po_time), clock(po_time),
+        ))
+
+        drops = rng.randint(1, 3)
+        for d in range(drops):
+            when = po_time + (d + 1) * rng.randint(5, 20) * 86400
+            delivery_id = guid("deliveries", delivery_number)
+            deliveries.append((
+                delivery_id, f"DEL-{clock.day(when)[:4]}-{delivery_number + 1:06d}", po_id, po_number,
+                tender_id, clock.day(when), "Completed", clock(when), clock(when),
+            ))
+            delivery_number += 1
+            for po_line, item, quantity, price in lines:
+                share = quantity // drops + (quantity % drops if d == drops - 1 else 0)
+                roll = rng.random()
+                if roll < 0.05 and d == drops - 1:
+                    share += max(1, quantity // 10)            # over-delivery
+                elif roll < 0.15 and d == drops - 1:
+                    share = max(0, share - max(1, quantity // 5))  # short delivery
+                if share <= 0:
+                    continue
+                delivery_items.append((
+                    guid("delivery_items", delivery_line), delivery_id, guid("purchase_order_items", po_line),
+                    guid("item_masters", item), share, "Accepted", clock(when), clock(when),
+                ))
+                delivery_line += 1
+                if rng.random() < 0.03:
+                    continue  # received but never posted to stock
+                received[item] += share
+                acquisitions.append((
+                    guid("stock_acquisitions", acquisition), f"ACQ-{clock.day(when)[:4]}-{acquisition + 1:07d}",
+                    po_id, delivery_id, guid("item_masters", item), share, 0, price, clock.day(when),
+                    clock.day(when), "Completed", fy_code(clock(when)), clock(when), clock(when),
+                ))
+                acquisition += 1
+
+    yield "tenders", tenders
+    yield "tender_items", tender_items
+    yield "purchase_orders", orders
+    yield "purchase_order_items", order_items
+    yield "deliveries", deliveries
+    yield "delivery_items", delivery_items
+    yield "stock_acquisitions", acquisitions
+
+
+# ----------------------------------------------------------------------
+# Issuance workflow
+# ----------------------------------------------------------------------
+
+def request_chunk(scale, chunk):
+    """Rows for requests ``chunk * CHUNK_REQUESTS`` onwards.
+
+    Returns ``(tables, issued, reserved)``: the rows per table, and per-item
+    issued / approved-but-not-issued quantities as ``{item: quantity}``.
+    """
+    rng = _rng(scale, "requests", chunk)
+    clock = Clock(scale.start, scale.days)
+    span = scale.days * 86400
+    open_from = span - OPEN_DAYS * 86400
+    expo = rng.expovariate
+    random_ = rng.random
+    item_ids = [guid("item_masters", n) for n in range(scale.items)]
+    user_ids = [guid("AspNetUsers", n) for n in range(scale.users)]
+    request_prefix = guid("stock_issuance_requests", 0)[:-12]
+    approval_prefix = guid("request_approvals", 0)[:-12]
+    history_prefix = guid("approval_history", 0)[:-12]
+    line_prefix = guid("stock_issuance_items", 0)[:-12]
+    requests, items, approvals, history, verifications = [], [], [], [], []
+    issued_totals = {}
+    reserved_totals = {}
+
+    first = chunk * CHUNK_REQUESTS
+    for i in range(first, min(first + CHUNK_REQUESTS, scale.requests)):
+        submitted = span * i / scale.requests + rng.uniform(9 * 3600, 16 * 3600)
+        wing = 1 + int(random_() * scale.wings)
+        user = user_ids[int(random_() * scale.users)]
+        roll = random_()
+        outcomes = RECENT_OUTCOMES if submitted > open_from else OUTCOMES
+        status = next(name for limit, name in outcomes if roll < limit)
+
+        reviewed = forwarded = decided = issued = None
+        if status != "Pending":
+            reviewed = submitted + expo(1 / (6 * 3600))
+            forwarded = reviewed + expo(1 / 1800) if random_() < 0.6 else None
+            if status != "Returned":
+                decided = (forwarded or reviewed) + expo(1 / (18 * 3600))
+            if status in ISSUED_STATUSES:
+                issued = decided + expo(1 / (24 * 3600))
+        last = issued or decided or forwarded or reviewed or submitted
+        submitted_at = clock(submitted)
+        decided_at = clock(decided)
+        last_at = clock(last)
+
+        request_id = f"{request_prefix}{i:012X}"
+        approval_id = f"{approval_prefix}{i:012X}"
+        requests.append((
+            request_id, f"SIR-{submitted_at[:4]}-{i + 1:07d}", "Individual", 1 + (wing - 1) // 10,
+            wing, user, PURPOSES[int(random_() * len(PURPOSES))], URGENCY[int(random_() * len(URGENCY))],
+            1 if random_() < 0.3 else 0, status, status, submitted_at, clock(reviewed), clock(issued),
+            submitted_at, last_at,
+        ))
+        approvals.append((
+            approval_id, request_id, "stock_issuance", status.lower(), user, submitted_at,
+            decided_at, submitted_at, last_at,
+        ))
+
+        steps = [("submitted", submitted_at)]
+        if forwarded is not None:
+            steps.append(("forwarded_to_admin", clock(forwarded)))
+        if status == "Returned":
+            steps.append(("returned", clock(reviewed)))
+        elif decided is not None:
+            steps.append(("rejected" if status == "Rejected" else "approved", decided_at))
+        if issued is not None:
+            steps.append(("issued", last_at))
+        final = len(steps) - 1
+        for step, (action, when) in enumerate(steps):
+            history.append((
+                f"{history_prefix}{i * HISTORY_SLOTS + step:012X}", approval_id, action, user,
+                when, step + 1, 1 if step == final else 0,
+            ))
+
+        approved_status = status == "Approved"
+        issued_status = status in ISSUED_STATUSES
+        for j in range(LINES_PER_REQUEST[int(random_() * len(LINES_PER_REQUEST))]):
+            item = int(scale.items * random_() ** 2)  # popularity skew: low item numbers requested most
+            requested = 1 + int(random_() * 10)
+            approved = None
+            issued_quantity = None
+            if approved_status or issued_status:
+                approved = requested if random_() < 0.85 else 1 + int(random_() * requested)
+            deleted = 1 if random_() < 0.01 else 0
+            if not deleted:
+                if issued_status:
+                    issued_quantity = approved
+                    issued_totals[item] = issued_totals.get(item, 0) + approved
+                elif approved_status:
+                    reserved_totals[item] = reserved_totals.get(item, 0) + approved
+            items.append((
+                f"{line_prefix}{i * MAX_ITEMS_PER_REQUEST + j:012X}", request_id, item_ids[item], None,
+                requested, approved, issued_quantity, "inventory", deleted, submitted_at, last_at,
+            ))
+            if forwarded is not None and j == 0 and random_() < 0.5:
+                created = forwarded + expo(1 / 600)
+                verified_at = clock(created + expo(1 / (4 * 3600)))
+                count = int(random_() * 51)
+                verdict = ("verified_available" if count >= requested
+                           else "verified_partial" if count else "verified_unavailable")
+                verifications.append((
+                    guid("inventory_verification_requests", i), request_id, item_ids[item],
+                    requested, verdict, count, count, wing, clock(created), verified_at, verified_at,
+                ))
+
+    tables = {
+        "stock_issuance_requests": requests,
+        "stock_issuance_items": items,
+        "request_approvals": approvals,
+        "approval_history": history,
+        "inventory_verification_requests": verifications,
+    }
+    return tables, issued_totals, reserved_totals
+
+
+def _request_chunk(task):
+    return request_chunk(*task)
+
+
+# ----------------------------------------------------------------------
+# Sinks
+# ----------------------------------------------------------------------
+
+class CsvSink:
+    """One streamed ``<table>.csv`` per table (NULL written as an empty cell)."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.files = {}
+        self.writers = {}
+
+    def begin(self, table):
+        f = open(self.directory / f"{table}.csv", "w", encoding="utf-8", newline="")
+        self.files[table] = f
+        self.writers[table] = csv.writer(f)
+        self.writers[table].writerow([column for column, _ in SCHEMA[table]])
+
+    def write(self, table, rows):
+        self.writers[table].writerows(rows)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+class SqliteSink:
+    """SQLite stand-in loaded with one executemany per chunk."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.inserts = {}
+
+    def begin(self, table):
+        columns = ", ".join(f'"{column}" {kind}' for column, kind in SCHEMA[table])
+        self.conn.execute(f'CREATE TABLE "{table}" ({columns})')
+        placeholders = ", ".join("?" for _ in SCHEMA[table])
+        self.inserts[table] = f'INSERT INTO "{table}" VALUES ({placeholders})'
+
+    def write(self, table, rows):
+        self.conn.executemany(self.inserts[table], rows)
+
+    def close(self):
+        for table, columns in SQLITE_INDEXES.items():
+            for column in columns:
+                self.conn.execute(f'CREATE INDEX "ix_{table}_{column}" ON "{table}" ("{column}")')
+        self.conn.commit()
+        self.conn.close()
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+def generate(scale, sinks, jobs=1, progress=None):
+    """Write every table to ``sinks``; returns ``{table: row_count}``."""
+    clock = Clock(scale.start, scale.days)
+    counts = {table: 0 for table in SCHEMA}
+    for sink in sinks:
+        for table in SCHEMA:
+            sink.begin(table)
+
+    def emit(table, rows):
+        for sink in sinks:
+            sink.write(table, rows)
+        counts[table] += len(rows)
+
+    for table, rows in master_tables(scale, clock):
+        emit(table, rows)
+        if table == "item_masters":
+            levels = [row[7:10] for row in rows]
+    received = array("q", bytes(8 * scale.items))
+    for table, rows in procurement_tables(scale, clock, received):
+        emit(table, rows)
+
+    issued = array("q", bytes(8 * scale.items))
+    reserved = array("q", bytes(8 * scale.items))
+    tasks = [(scale, chunk) for chunk in range(-(-scale.requests // CHUNK_REQUESTS))]
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(tasks) > 1 else None
+    try:
+        results = pool.map(_request_chunk, tasks) if pool else map(_request_chunk, tasks)
+        for done, (tables, issued_totals, reserved_totals) in enumerate(results, start=1):
+            for table, rows in tables.items():
+                emit(table, rows)
+            for item, quantity in issued_totals.items():
+                issued[item] += quantity
+            for item, quantity in reserved_totals.items():
+                reserved[item] += quantity
+            if progress:
+                progress(done, len(tasks))
+    finally:
+        if pool:
+            pool.shutdown()
+
+    now = clock(scale.days * 86400 - 1)
+    stock = []
+    for n in range(scale.items):
+        current = received[n] - issued[n]
+        stock.append((
+            guid("current_inventory_stock", n), guid("item_masters", n), current,
+            current - reserved[n], reserved[n], *levels[n], clock(0), now,
+        ))
+    emit("current_inventory_stock", stock)
+
+    for sink in sinks:
+        sink.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic IMS dataset")
+    parser.add_argument("--requests", type=int, default=10000, help="stock issuance requests to generate")
+    parser.add_argument("--items", type=int, help="item_masters rows (default: requests / 200, at least 50)")
+    parser.add_argument("--wings", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--start", default=DEFAULT_START, help="first day of the generated history")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="length of the generated history")
+    parser.add_argument("--sqlite", help="SQLite stand-in database to create")
+    parser.add_argument("--csv-dir", help="directory for one CSV per table")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes for requests")
+    parser.add_argument("--force", action="store_true", help="replace an existing SQLite output")
+    args = parser.parse_args(argv)
+
+    if not args.sqlite and not args.csv_dir:
+        parser.error("give --sqlite and/or --csv-dir")
+    if args.sqlite and Path(args.sqlite).exists():
+        if not args.force:
+            parser.error(f"{args.sqlite} exists (use --force to replace it)")
+        Path(args.sqlite).unlink()
+
+    scale = Scale(args.requests, args.items, args.wings, args.seed, args.start, args.days)
+    sinks = []
+    if args.sqlite:
+        sinks.append(SqliteSink(args.sqlite))
+    if args.csv_dir:
+        sinks.append(CsvSink(args.csv_dir))
+
+    started = time.perf_counter()
+    counts = generate(
+        scale, sinks, args.jobs,
+        progress=lambda done, total: print(f"\r   request chunks {done}/{total}", end="", flush=True),
+    )
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print()
+    for table, count in counts.items():
+        print(f"   {table:<34} {count:>12,}")
+    print(f"✅ Generated {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for output in (args.sqlite, args.csv_dir):
+        if output:
+            print(f"Created: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Shared table access for the offline IMS reporting tools.
+
+A table source is either a directory of CSV exports (one ``<table>.csv`` per
+table with a header row) or a SQLite stand-in database (``.db``, ``.sqlite``,
+``.sqlite3``) holding tables with the same names as SQL Server. Empty CSV
+cells are read as NULL, matching how the SQL Server export writes them.
+
+A snapshot directory built by ims_snapshot.py is a source as well; it is
+recognised by its manifest and read through memory-mapped column files.
+"""
+
+import csv
+import sqlite3
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+NAN = float("nan")
+
+
+def is_sqlite(source):
+    return Path(source).suffix.lower() in SQLITE_SUFFIXES
+
+
+def norm_id(value):
+    """Normalise an id for joins (GUIDs come back upper- or lower-case)."""
+    if value is None:
+        return None
+    text = str(value).strip().upper()
+    return text or None
+
+
+def to_number(value):
+    """TRY_CAST-style conversion: blanks and garbage become None."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def to_flag(value):
+    """Read a BIT column exported as 1/0, true/false or NULL."""
+    if value is None:
+        return False
+    if isinstance(value, (int, float)):
+        return bool(value)
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+
+def to_timestamp(value):
+    """Seconds since the epoch for an exported DATETIME2 value, or None."""
+    if value is None:
+        return None
+    text = str(value).strip().replace("T", " ")
+    if not text:
+        return None
+    if "." in text:
+        head, _, fraction = text.partition(".")
+        text = f"{head}.{fraction[:6]}"
+    try:
+        return datetime.fromisoformat(text.rstrip("Z")).timestamp()
+    except ValueError:
+        return None
+
+
+def is_snapshot(source):
+    # Imported here: ims_snapshot builds on this module
+    from ims_snapshot import is_snapshot as snapshot_manifest_exists
+    return not is_sqlite(source) and snapshot_manifest_exists(source)
+
+
+def table_exists(source, table):
+    if is_snapshot(source):
+        return bool(table_columns(source, table))
+    if is_sqlite(source):
+        with sqlite3.connect(source) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (table,)
+            ).fetchone()
+        return row is not None
+    return (Path(source) / f"{table}.csv").exists()
+
+
+def partitions(source, table):
+    """Table names holding ``table``'s rows: ``<table>.csv`` plus any
+    ``<table>-<part>.csv`` partition files in a CSV export directory."""
+    if is_sqlite(source) or is_snapshot(source):
+        return [table] if table_exists(source, table) else []
+    base = Path(source)
+    names = [table] if (base / f"{table}.csv").exists() else []
+    names += sorted(p.stem for p in base.glob(f"{table}-*.csv"))
+    return names
+
+
+def table_columns(source, table):
+    """Column names of ``table`` in ``source``; empty when the table is missing."""
+    if is_snapshot(source):
+        from ims_snapshot import Snapshot
+        with Snapshot(source) as snapshot:
+            state = snapshot.manifest["tables"].get(table)
+        return list(state["columns"]) if state else []
+    if is_sqlite(source):
+        conn = sqlite3.connect(source)
+        try:
+            return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+        finally:
+            conn.close()
+    path = Path(source) / f"{table}.csv"
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return [name.strip() for name in next(csv.reader(f), [])]
+
+
+def iter_rows(source, table, columns, since=None, inclusive=False):
+    """Yield tuples of ``columns`` from ``table``.
+
+    Columns missing from the export come back as None. ``since`` is an
+    optional ``(column, watermark)`` pair; only rows whose column value sorts
+    after the watermark are returned. ISO timestamps compare as text; a
+    numeric watermark (an identity column) compares numerically, so id 10
+    sorts after 9 in CSV exports too. With ``inclusive`` rows equal to the
+    watermark are returned as well.
+    """
+    if is_sqlite(source):
+        yield from _iter_sqlite(source, table, columns, since, inclusive)
+    elif is_snapshot(source):
+        from ims_snapshot import iter_snapshot
+        yield from iter_snapshot(source, table, columns, since, inclusive)
+    else:
+        yield from _iter_csv(Path(source) / f"{table}.csv", columns, since, inclusive)
+
+
+def _iter_sqlite(path, table, columns, since, inclusive):
+    conn = sqlite3.connect(path)
+    try:
+        present = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        select = ", ".join(f'"{c}"' if c in present else "NULL" for c in columns)
+        sql = f'SELECT {select} FROM "{table}"'
+        params = ()
+        if since is not None and since[1] is not None and since[0] in present:
+            op = ">=" if inclusive else ">"
+            sql += f' WHERE "{since[0]}" {op} ?'
+            params = (since[1],)
+        cursor = conn.execute(sql, params)
+        while True:
+            batch = cursor.fetchmany(10000)
+            if not batch:
+                break
+            yield from batch
+    finally:
+        conn.close()
+
+
+def _iter_csv(path, columns, since, inclusive):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        index = {name.strip(): i for i, name in enumerate(header)}
+        positions = [index.get(c) for c in columns]
+        since_pos = index.get(since[0]) if since is not None and since[1] is not None else None
+        numeric = since_pos is not None and isinstance(since[1], (int, float))
+        watermark = since[1] if numeric else str(since[1]) if since_pos is not None else None
+        width = len(header)
+        for record in reader:
+            if len(record) < width:
+                record += [""] * (width - len(record))
+            if since_pos is not None:
+                value = to_number(record[since_pos]) if numeric else record[since_pos]
+                if value is None or not (value > watermark or (inclusive and value == watermark)):
+                    continue
+            yield tuple(
+                (record[p] if record[p] != "" else None) if p is not None else None
+                for p in positions
+            )
+
+
+def load_columns(source, table, schema, since=None, inclusive=False):
+    """Load ``table`` into typed columns.
+
+    ``schema`` maps column name to a type: ``"d"`` for a float ``array``
+    (NULL becomes NaN), ``"id"`` for a list of normalised ids, ``"flag"`` for
+    a byte ``array`` of 0/1 and ``"s"`` for a plain list of strings.
+    ``since`` and ``inclusive`` filter rows as in ``iter_rows``.
+    """
+    names = list(schema)
+    out = {}
+    for name in names:
+        kind = schema[name]
+        if kind == "d":
+            out[name] = array("d")
+        elif kind == "flag":
+            out[name] = array("b")
+        else:
+            out[name] = []
+    appenders = [out[name].append for name in names]
+    converters = [_CONVERTERS[schema[name]] for name in names]
+    for row in iter_rows(source, table, names, since, inclusive):
+        for append, convert, value in zip(appenders, converters, row):
+            append(convert(value))
+    return out
+
+
+def _as_float(value):
+    number = to_number(value)
+    return NAN if number is None else float(number)
+
+
+def _as_text(value):
+    return None if value is None else str(value)
+
+
+_CONVERTERS = {
+    "d": _as_float,
+    "id": norm_id,
+    "flag": lambda value: 1 if to_flag(value) else 0,
+    "s": _as_text,
+}
+
+
+def factorize(keys, index=None):
+    """Map keys to dense integer codes, extending ``index`` in place.
+
+    Returns ``(codes, index)``; None keys get code -1.
+    """
+    if index is None:
+        index = {}
+    codes = array("l")
+    append = codes.append
+    for key in keys:
+        if key is None:
+            append(-1)
+            continue
+        code = index.get(key)
+        if code is None:
+            code = index[key] = len(index)
+        append(code)
+    return codes, index
+
+
+def group_sum(codes, values, size):
+    """Sum ``values`` per code into a float array of length ``size``."""
+    totals = array("d", bytes(8 * size))
+    for code, value in zip(codes, values):
+        if code >= 0:
+            totals[code] += value
+    return totals
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Streaming XLSX export of the inventory, stock-breakdown and reorder-point
+reports.
+
+Writes the rows of /api/reports/inventory, /api/inventory/stock-breakdown
+and the reorder_points.py table as an Excel workbook for the store-keepers, without a workbook object model:
+
+- every worksheet is streamed into the zip as its rows arrive, a few
+  thousand rows at a time, so memory does not grow with the row count,
+- strings are written inline instead of through a shared-strings table
+  (which would have to be held in memory until the end),
+- all cells share six styles (header, integer, decimal, date, date-time and
+  default) defined once in styles.xml,
+- a sheet holds at most 1,048,576 rows (Excel's limit, header included);
+  longer inputs continue on "<title> (2)", "<title> (3)", ... with the
+  header repeated, and text beyond Excel's 32,767 characters per cell is cut.
+
+Rows come from any iterator of sequences or dicts. The reports are read
+from an ims_tables source (CSV exports, SQLite stand-in or ims_snapshot.py
+snapshot), the inventory report by the same joins as server/routes/reports.cjs,
+the breakdown by stock_breakdown.py and the reorder points by
+reorder_points.py, or from the JSON responses that ``ims_api_client.py --out
+DIR`` saved (with ``reorder_points.py --out DIR/ims-reorder-points.json``
+alongside).
+
+Usage:
+    python ims_xlsx.py SOURCE [--out ims-inventory-reports.xlsx]
+                       [--reports inventory,stock-breakdown,reorder-points]
+                       [--wing-id ID] [--category-id ID] [--low-stock]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import zipfile
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from itertools import chain, islice
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+import reorder_points
+import stock_breakdown
+from ims_instrument import count, phase, profiled
+from ims_tables import iter_rows, norm_id, table_exists, to_number
+
+DEFAULT_OUTPUT = "ims-inventory-reports.xlsx"
+REPORTS = ("inventory", "stock-breakdown", "reorder-points")
+
+MAX_ROWS = 1048576
+MAX_CELL_TEXT = 32767
+MAX_SHEET_NAME = 31
+FLUSH_ROWS = 2000
+# Rows looked at to size the columns
+WIDTH_SAMPLE = 200
+MAX_WIDTH = 60
+
+# Shared cellXfs indexes in styles.xml
+STYLE_DEFAULT, STYLE_HEADER, STYLE_INTEGER, STYLE_DECIMAL, STYLE_DATE, STYLE_DATETIME = range(6)
+
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_SHEET_NAME_INVALID = re.compile(r"[\[\]:*?/\\]")
+_ISO_DATE = re.compile(r"^(\d{4})-(\d\d)-(\d\d)(?:[T ](\d\d):(\d\d)(?::(\d\d)(?:\.\d+)?)?)?(?:Z|[+-]\d\d:?\d\d)?$")
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+STYLES_XML = XML_HEAD + f"""<styleSheet xmlns="{MAIN_NS}">
+<numFmts count="3"><numFmt numFmtId="164" formatCode="#,##0.00"/><numFmt numFmtId="165" formatCode="yyyy-mm-dd"/><numFmt numFmtId="166" formatCode="yyyy-mm-dd hh:mm"/></numFmts>
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font><font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/><family val="2"/></font></fonts>
+<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill><fill><patternFill patternType="solid"><fgColor rgb="FF1F4E79"/><bgColor indexed="64"/></patternFill></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="6"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/><xf numFmtId="3" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/><xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/><xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/><xf numFmtId="166" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+
+def column_letter(index):
+    """Excel column name of a 0-based index (0 -> A, 26 -> AA)."""
+    name = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        name = chr(65 + rem) + name
+    return name
+
+
+def excel_serial(value):
+    """Days since Excel's epoch for a date or datetime."""
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    delta = value.replace(tzinfo=None) - _EXCEL_EPOCH
+    return delta.days + delta.seconds / 86400 + delta.microseconds / 86400e6
+
+
+def _parse_iso(text):
+    match = _ISO_DATE.match(text)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second = match.groups()
+    try:
+        return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+    except ValueError:
+        return None
+
+
+def _text_cell(ref, value):
+    if len(value) > MAX_CELL_TEXT:
+        value = value[:MAX_CELL_TEXT]
+    if not value.isprintable():
+        value = _INVALID_XML.sub("", value)
+    if "&" in value or "<" in value or ">" in value:
+        value = escape(value)
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{value}</t></is></c>'
+
+
+def _int_cell(ref, value):
+    return f'<c r="{ref}" s="{STYLE_INTEGER}"><v>{value}</v></c>'
+
+
+def _float_cell(ref, value):
+    if value != value or value in (float("inf"), float("-inf")):
+        return ""
+    if value.is_integer():
+        return f'<c r="{ref}" s="{STYLE_INTEGER}"><v>{int(value)}</v></c>'
+    return f'<c r="{ref}" s="{STYLE_DECIMAL}"><v>{value!r}</v></c>'
+
+
+def _date_value(value):
+    style = STYLE_DATETIME if isinstance(value, datetime) and (value.hour or value.minute or value.second) else STYLE_DATE
+    return f' s="{style}"><v>{excel_serial(value)!r}</v></c>'
+
+
+def _date_cell(ref, value):
+    return f'<c r="{ref}"{_date_value(value)}'
+
+
+@lru_cache(maxsize=4096)
+def _iso_value(text):
+    parsed = _parse_iso(text)
+    return None if parsed is None else _date_value(parsed)
+
+
+def _iso_cell(ref, value):
+    """Text of a date column: an Excel date when it is an ISO timestamp."""
+    converted = _iso_value(value)
+    return _text_cell(ref, value) if converted is None else f'<c r="{ref}"{converted}'
+
+
+def _empty_cell(ref, value):
+    return ""
+
+
+def _other_cell(ref, value):
+    if isinstance(value, (date, datetime)):
+        return _date_cell(ref, value)
+    if isinstance(value, bool):
+        return _int_cell(ref, int(value))
+    if isinstance(value, int):
+        return _int_cell(ref, int(value))
+    if isinstance(value, float):
+        return _float_cell(ref, float(value))
+    return _text_cell(ref, str(value))
+
+
+# Cell writer per value type; other types go through _other_cell
+CELLS = {
+    type(None): _empty_cell,
+    str: _text_cell,
+    int: _int_cell,
+    float: _float_cell,
+    bool: _other_cell,
+    datetime: _date_cell,
+    date: _date_cell,
+}
+DATE_CELLS = {**CELLS, str: _iso_cell}
+
+
+def _width(value):
+    if value is None:
+        return 0
+    if isinstance(value, float):
+        return len(f"{value:,.2f}")
+    if isinstance(value, int):
+        return len(f"{value:,}")
+    return len(str(value))
+
+
+class XlsxWriter:
+    """Write-only workbook whose sheets are streamed straight into the zip.
+
+    Sheets are written one after another with ``write_sheet``; ``close``
+    (or leaving the ``with`` block) adds the workbook parts.
+    """
+
+    def __init__(self, path, max_rows=MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self.sheets = []  # (name, last cell of the header filter range)
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._zip.close()
+
+    def _sheet_name(self, title, part):
+        base = _SHEET_NAME_INVALID.sub(" ", title).strip("'") or "Sheet"
+        suffix = f" ({part})" if part > 1 else ""
+        name = base[:MAX_SHEET_NAME - len(suffix)] + suffix
+        taken = {existing.lower() for existing, _ in self.sheets}
+        n = 2
+        while name.lower() in taken:
+            tag = f" ~{n}"
+            name = base[:MAX_SHEET_NAME - len(suffix) - len(tag)] + suffix + tag
+            n += 1
+        return name
+
+    def write_sheet(self, title, header, rows, date_columns=()):
+        """Stream ``rows`` (sequences, or dicts keyed by ``header``) under ``header``.
+
+        Values in ``date_columns`` that are ISO date strings become Excel
+        dates. Returns the number of data rows written, across all parts.
+        """
+        rows = iter(rows)
+        per_sheet = self.max_rows - 1
+        total = 0
+        part = 1
+        while True:
+            first = next(rows, None)
+            if first is None and part > 1:
+                break
+            chunk = chain((first,), islice(rows, per_sheet - 1)) if first is not None else iter(())
+            written = self._write_worksheet(self._sheet_name(title, part), header, chunk, set(date_columns))
+            total += written
+            if written < per_sheet:
+                break
+            part += 1
+        return total
+
+    def _write_worksheet(self, name, header, rows, date_columns):
+        index = len(self.sheets) + 1
+        letters = [column_letter(i) for i in range(len(header))]
+        writers = [DATE_CELLS if column in date_columns else CELLS for column in header]
+
+        # Size the columns from the header and the first rows
+        sample = list(islice(rows, WIDTH_SAMPLE))
+        widths = [len(str(column)) + 2 for column in header]
+        for row in sample:
+            values = [row.get(column) for column in header] if isinstance(row, dict) else row
+            for i, value in enumerate(values):
+                widths[i] = max(widths[i], min(MAX_WIDTH, _width(value) + 2))
+        cols = "".join(f'<col min="{i + 1}" max="{i + 1}" width="{width}" customWidth="1"/>'
+                       for i, width in enumerate(widths))
+
+        written = 0
+        with self._zip.open(f"xl/worksheets/sheet{index}.xml", "w", force_zip64=True) as stream:
+            stream.write((
+                XML_HEAD + f'<worksheet xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+                '<sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                '</sheetView></sheetViews>'
+                f'<cols>{cols}</cols><sheetData>'
+                '<row r="1">'
+                + "".join(f'<c r="{letter}1" t="inlineStr" s="{STYLE_HEADER}"><is><t>{escape(str(column))}</t></is></c>'
+                          for letter, column in zip(letters, header))
+                + '</row>'
+            ).encode("utf-8"))
+            buffer = []
+            number = 1
+            for row in chain(sample, rows):
+                number += 1
+                values = [row.get(column) for column in header] if isinstance(row, dict) else row
+                cells = "".join(cell_writers.get(type(value), _other_cell)(f"{letter}{number}", value)
+                                for letter, value, cell_writers in zip(letters, values, writers))
+                buffer.append(f'<row r="{number}">{cells}</row>')
+                if len(buffer) >= FLUSH_ROWS:
+                    stream.write("".join(buffer).encode("utf-8"))
+                    buffer.clear()
+            if buffer:
+                stream.write("".join(buffer).encode("utf-8"))
+            written = number - 1
+            last = f"{letters[-1]}{number}" if letters else "A1"
+            stream.write(f'</sheetData><autoFilter ref="A1:{last}"/></worksheet>'.encode("utf-8"))
+        self.sheets.append((name, f"${letters[-1] if letters else 'A'}${number}"))
+        count("rows", written)
+        return written
+
+    def close(self):
+        if not self.sheets:
+            self.write_sheet("Sheet", [], [])
+        sheets = "".join(f'<sheet name={quoteattr(name)} sheetId="{i}" r:id="rId{i}"/>'
+                         for i, (name, _) in enumerate(self.sheets, 1))
+        filters = "".join(
+            f'<definedName name="_xlnm._FilterDatabase" localSheetId="{i}" hidden="1">'
+            f"{escape(_quote_sheet(name))}!$A$1:{last}</definedName>"
+            for i, (name, last) in enumerate(self.sheets)
+        )
+        parts = {
+            "[Content_Types].xml": XML_HEAD + (
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                '<Override PartName="/xl/styles.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                          'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                          for i in range(1, len(self.sheets) + 1))
+                + '<Override PartName="/docProps/core.xml" '
+                'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+                '<Override PartName="/docProps/app.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>'
+                '</Types>'),
+            "_rels/.rels": XML_HEAD + (
+                f'<Relationships xmlns="{PKG_REL_NS}">'
+                f'<Relationship Id="rId1" Type="{REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+                '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/'
+                'metadata/core-properties" Target="docProps/core.xml"/>'
+                f'<Relationship Id="rId3" Type="{REL_NS}/extended-properties" Target="docProps/app.xml"/>'
+                '</Relationships>'),
+            "docProps/core.xml": XML_HEAD + (
+                '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+                'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+                'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+                '<dc:title>IMS Inventory Reports</dc:title><dc:creator>IMS</dc:creator>'
+                f'<dcterms:created xsi:type="dcterms:W3CDTF">{datetime.now(timezone.utc):%Y-%m-%dT%H:%M:%SZ}</dcterms:created>'
+                '</cp:coreProperties>'),
+            "docProps/app.xml": XML_HEAD + (
+                '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+                '<Application>IMS</Application></Properties>'),
+            "xl/workbook.xml": XML_HEAD + (
+                f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><bookViews><workbookView/></bookViews>'
+                f'<sheets>{sheets}</sheets><definedNames>{filters}</definedNames></workbook>'),
+            "xl/_rels/workbook.xml.rels": XML_HEAD + (
+                f'<Relationships xmlns="{PKG_REL_NS}">'
+                + "".join(f'<Relationship Id="rId{i}" Type="{REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                          for i in range(1, len(self.sheets) + 1))
+                + f'<Relationship Id="rId{len(self.sheets) + 1}" Type="{REL_NS}/styles" Target="styles.xml"/>'
+                '</Relationships>'),
+            "xl/styles.xml": STYLES_XML,
+        }
+        for name, xml in parts.items():
+            self._zip.writestr(name, xml)
+        self._zip.close()
+
+
+def _quote_sheet(name):
+    return "'" + name.replace("'", "''") + "'"
+
+
+# ----------------------------------------------------------------------
+# Report rows
+# ----------------------------------------------------------------------
+
+INVENTORY_COLUMNS = [
+    "id", "nomenclature", "unit", "category_name", "wing_id", "wing_name",
+    "available", "reserved", "damaged", "admin_available",
+]
+LOW_STOCK_THRESHOLD = 10
+
+
+def _quantity(value):
+    number = to_number(value)
+    if number is None:
+        return 0
+    return int(number) if float(number).is_integer() else number
+
+
+def inventory_rows(source, wing_id=None, category_id=None, low_stock=False):
+    """Rows of GET /api/reports/inventory from a table source, in the route's order."""
+    categories = {norm_id(cat_id): name for cat_id, name in iter_rows(source, "categories", ["id", "category_name"])}
+    wing_names = {}
+    if table_exists(source, "WingsInformation"):
+        wing_names = {norm_id(wid): name for wid, name in iter_rows(source, "WingsInformation", ["Id", "Name"])}
+    wings = {}
+    if table_exists(source, "stock_wing"):
+        for row in iter_rows(source, "stock_wing", ["item_master_id", "wing_id", "available_quantity",
+                                                      "reserved_quantity", "damaged_quantity"]):
+            wings.setdefault(norm_id(row[0]), []).append(row[1:])
+    admin = {}
+    if table_exists(source, "stock_admin"):
+        for item_id, available in iter_rows(source, "stock_admin", ["item_master_id", "available_quantity"]):
+            admin.setdefault(norm_id(item_id), []).append(available)
+
+    wanted_wing = norm_id(wing_id)
+    wanted_category = norm_id(category_id)
+    items = [
+        (item_id, nomenclature, unit, cat_id)
+        for item_id, nomenclature, unit, cat_id, status in iter_rows(
+            source, "item_masters", ["id", "nomenclature", "unit", "category_id", "status"])
+        if status == "Active" and (wanted_category is None or norm_id(cat_id) == wanted_category)
+    ]
+    # ORDER BY im.nomenclature under SQL Server's case-insensitive collation
+    items.sort(key=lambda item: (item[1] or "").lower())
+    for item_id, nomenclature, unit, cat_id in items:
+        key = norm_id(item_id)
+        category = categories.get(norm_id(cat_id))
+        for wing, available, reserved, damaged in wings.get(key) or [(None, None, None, None)]:
+            if wanted_wing is not None and norm_id(wing) != wanted_wing:
+                continue
+            for admin_available in admin.get(key) or [None]:
+                row = (item_id, nomenclature, unit, category, wing, wing_names.get(norm_id(wing)),
+                       _quantity(available), _quantity(reserved), _quantity(damaged), _quantity(admin_available))
+                if low_stock and not (row[6] < LOW_STOCK_THRESHOLD or row[9] < LOW_STOCK_THRESHOLD):
+                    continue
+                yield row
+
+
+def stock_breakdown_rows(source):
+    """``(columns, rows)`` of GET /api/inventory/stock-breakdown via stock_breakdown.py."""
+    state, _ = stock_breakdown.build(source)
+    return stock_breakdown.OUTPUT_COLUMNS, state.report(source)
+
+
+def reorder_point_rows(source):
+    """``(columns, rows)`` of the reorder_points.py table, most urgent first."""
+    return reorder_points.OUTPUT_COLUMNS, reorder_points.ReorderPlan(source).rows()
+
+
+def api_response_rows(path):
+    """``(columns, rows)`` of a JSON response saved by ims_api_client.py."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = next((value for key in ("inventory", "reorder_points", "data", "rows") if isinstance(value := data.get(key), list)), [])
+    columns = list(data[0]) if data and isinstance(data[0], dict) else []
+    return columns, data
+
+
+# Sheet title, API response file written by ims_api_client.py --out, date columns
+REPORT_SHEETS = {
+    "inventory": ("Inventory", "api_reports_inventory.json", ()),
+    "stock-breakdown": ("Stock Breakdown", "api_inventory_stock-breakdown.json", ("last_transaction_date",)),
+    "reorder-points": ("Reorder Points", "ims-reorder-points.json", ()),
+}
+
+
+def export(source, out, reports=REPORTS, wing_id=None, category_id=None, low_stock=False, max_rows=MAX_ROWS):
+    """Write the requested reports to ``out``; returns ``{sheet title: rows}``."""
+    api_dir = Path(source).is_dir() and any((Path(source) / REPORT_SHEETS[r][1]).exists() for r in reports)
+    written = {}
+    with XlsxWriter(out, max_rows) as workbook:
+        for report in reports:
+            title, response_file, date_columns = REPORT_SHEETS[report]
+            if api_dir:
+                path = Path(source) / response_file
+                if not path.exists():
+                    print(f"ℹ️  {report}: {path} not found, skipped")
+                    continue
+                columns, rows = api_response_rows(path)
+            elif report == "inventory":
+                columns, rows = INVENTORY_COLUMNS, inventory_rows(source, wing_id, category_id, low_stock)
+            elif report == "reorder-points":
+                columns, rows = reorder_point_rows(source)
+            else:
+                with phase("load"):
+                    columns, rows = stock_breakdown_rows(source)
+            with phase("save"):
+                written[title] = workbook.write_sheet(title, columns, rows, date_columns)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream the inventory, stock-breakdown and reorder-point reports to XLSX")
+    parser.add_argument("source", help="CSV export directory, SQLite stand-in, ims_snapshot.py snapshot "
+                                       "or a directory of ims_api_client.py --out responses")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT)
+    parser.add_argument("--reports", default=",".join(REPORTS), help="comma-separated: " + ", ".join(REPORTS))
+    parser.add_argument("--wing-id", help="inventory report: only this wing")
+    parser.add_argument("--category-id", help="inventory report: only this category")
+    parser.add_argument("--low-stock", action="store_true", help="inventory report: available below 10")
+    args = parser.parse_args(argv)
+
+    reports = [r.strip() for r in args.reports.split(",") if r.strip()]
+    unknown = sorted(set(reports) - set(REPORTS))
+    if unknown:
+        raise SystemExit(f"Unknown report(s): {', '.join(unknown)}; reports: {', '.join(REPORTS)}")
+    if not os.path.exists(args.source):
+        raise SystemExit(f"Source not found: {args.source}")
+
+    written = export(args.source, args.out, reports, args.wing_id, args.category_id, args.low_stock)
+    count("bytes_written", os.path.getsize(args.out))
+    for title, rows in written.items():
+        print(f"✅ {title}: {rows:,} rows")
+    print(f"Created: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("ims_xlsx"):
+        sys.exit(main())
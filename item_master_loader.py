@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Streaming validator and bulk loader for item_masters CSV uploads.
+
+Applies the rules from CSV-BULK-UPLOAD-GUIDE.md to files of any size:
+nomenclature is required, category and sub-category names are resolved
+case-insensitively against a preloaded index, item codes must be unique
+within the file and against item_masters, and stock levels must be whole
+numbers. Valid rows are inserted in parameterised batches through a
+pluggable target; every rejected row is reported with its CSV row number.
+
+Targets:
+    SqliteTarget  - SQLite stand-in database (also used for testing)
+    OdbcTarget    - SQL Server through pyodbc (optional dependency)
+
+Usage:
+    python item_master_loader.py <file.csv> --db ims.sqlite [--validate-only]
+                                 [--errors errors.csv] [--batch-size 1000]
+    python item_master_loader.py <file.csv> --odbc "DRIVER=...;SERVER=...;"
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+import uuid
+from datetime import datetime
+
+from ims_tables import iter_rows, table_exists, to_flag
+
+CSV_COLUMNS = [
+    "item_code", "nomenclature", "manufacturer", "unit", "specifications",
+    "description", "category_name", "sub_category_name", "status",
+    "minimum_stock_level", "maximum_stock_level", "reorder_level",
+]
+
+INSERT_COLUMNS = [
+    "id", "item_code", "nomenclature", "manufacturer", "unit", "specifications",
+    "description", "category_id", "sub_category_id", "status",
+    "minimum_stock_level", "maximum_stock_level", "reorder_point",
+    "is_deleted", "created_at", "updated_at",
+]
+
+STOCK_LEVEL_COLUMNS = ("minimum_stock_level", "maximum_stock_level", "reorder_level")
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ReferenceIndex:
+    """Case-insensitive category / sub-category lookup plus known item codes."""
+
+    def __init__(self, categories, sub_categories, item_codes):
+        self.categories = {}
+        for cat_id, name in categories:
+            if name:
+                self.categories.setdefault(name.strip().lower(), cat_id)
+        self.sub_categories = {}
+        self.sub_by_name = {}
+        for sub_id, name, cat_id in sub_categories:
+            if not name:
+                continue
+            key = name.strip().lower()
+            self.sub_categories.setdefault((str(cat_id).upper() if cat_id else None, key), sub_id)
+            self.sub_by_name.setdefault(key, sub_id)
+        self.item_codes = {code.strip().lower() for code in item_codes if code and code.strip()}
+
+    def category(self, name):
+        return self.categories.get(name.strip().lower())
+
+    def sub_category(self, name, category_id):
+        key = name.strip().lower()
+        if category_id is None:
+            return self.sub_by_name.get(key), True
+        sub_id = self.sub_categories.get((str(category_id).upper(), key))
+        return sub_id, sub_id is not None or key not in self.sub_by_name
+
+
+def _active(status):
+    return status is None or status.strip().lower() == "active"
+
+
+class SqliteTarget:
+    """Insert into a SQLite stand-in with the item_masters schema."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        present = {row[1] for row in self.conn.execute('PRAGMA table_info("item_masters")')}
+        if not present:
+            raise ValueError(f"{path} has no item_masters table")
+        self.columns = [c for c in INSERT_COLUMNS if c in present]
+
+    def reference(self):
+        return load_reference(self.path)
+
+    def insert_many(self, rows):
+        placeholders = ", ".join("?" for _ in self.columns)
+        sql = f'INSERT INTO item_masters ({", ".join(self.columns)}) VALUES ({placeholders})'
+        positions = [INSERT_COLUMNS.index(c) for c in self.columns]
+        self.conn.executemany(sql, ([row[p] for p in positions] for row in rows))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class OdbcTarget:
+    """Insert into SQL Server through pyodbc with fast_executemany."""
+
+    def __init__(self, connection_string):
+        try:
+            import pyodbc
+        except ImportError:
+            raise SystemExit("pyodbc is required for --odbc (pip install pyodbc)")
+        self.conn = pyodbc.connect(connection_string, autocommit=False)
+        self.cursor = self.conn.cursor()
+        self.cursor.fast_executemany = True
+        self.columns = INSERT_COLUMNS
+
+    def reference(self):
+        cur = self.conn.cursor()
+        categories = cur.execute(
+            "SELECT CONVERT(NVARCHAR(100), id), category_name FROM categories WHERE status = 'Active'"
+        ).fetchall()
+        sub_categories = cur.execute(
+            "SELECT CONVERT(NVARCHAR(100), id), sub_category_name, CONVERT(NVARCHAR(100), category_id) "
+            "FROM sub_categories WHERE status = 'Active'"
+        ).fetchall()
+        codes = [row[0] for row in cur.execute("SELECT item_code FROM item_masters WHERE item_code IS NOT NULL")]
+        return ReferenceIndex(categories, sub_categories, codes)
+
+    def insert_many(self, rows):
+        placeholders = ", ".join("?" for _ in self.columns)
+        sql = f'INSERT INTO item_masters ({", ".join(self.columns)}) VALUES ({placeholders})'
+        self.cursor.executemany(sql, rows)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def load_reference(source):
+    """Build the reference index from a CSV export directory or SQLite file."""
+    categories = [
+        (cat_id, name)
+        for cat_id, name, status, deleted in iter_rows(
+            source, "categories", ["id", "category_name", "status", "is_deleted"]
+        )
+        if _active(status) and not to_flag(deleted)
+    ]
+    sub_categories = [
+        (sub_id, name, cat_id)
+        for sub_id, name, cat_id, status, deleted in iter_rows(
+            source, "sub_categories", ["id", "sub_category_name", "category_id", "status", "is_deleted"]
+        )
+        if _active(status) and not to_flag(deleted)
+    ]
+    codes = []
+    if table_exists(source, "item_masters"):
+        codes = [row[0] for row in iter_rows(source, "item_masters", ["item_code"])]
+    return ReferenceIndex(categories, sub_categories, codes)
+
+
+def _stock_level(row, column, errors):
+    text = (row.get(column) or "").strip()
+    if not text:
+        return None
+    try:
+        value = int(text)
+    except ValueError:
+        errors.append(f"Invalid {column}: {text} (must be a whole number)")
+        return None
+    if value < 0:
+        errors.append(f"Invalid {column}: {text} (must not be negative)")
+        return None
+    return value
+
+
+def validate_row(row, reference, seen_codes):
+    """Return ``(insert_params, errors)`` for one CSV record."""
+    errors = []
+    nomenclature = (row.get("nomenclature") or "").strip()
+    if not nomenclature:
+        errors.append("Missing required field: nomenclature")
+
+    category_id = None
+    category_name = (row.get("category_name") or "").strip()
+    if category_name:
+        category_id = reference.category(category_name)
+        if category_id is None:
+            errors.append(f"Category not found: {category_name}")
+
+    sub_category_id = None
+    sub_name = (row.get("sub_category_name") or "").strip()
+    if sub_name:
+        sub_category_id, belongs = reference.sub_category(sub_name, category_id)
+        if sub_category_id is None and belongs:
+            errors.append(f"Sub-category not found: {sub_name}")
+        elif sub_category_id is None:
+            errors.append(f"Sub-category {sub_name} does not belong to category {category_name}")
+
+    item_code = (row.get("item_code") or "").strip() or None
+    if item_code:
+        key = item_code.lower()
+        if key in reference.item_codes:
+            errors.append(f"Duplicate item_code: {item_code} (already exists)")
+        elif key in seen_codes:
+            errors.append(f"Duplicate item_code: {item_code} (repeated in file)")
+
+    levels = {column: _stock_level(row, column, errors) for column in STOCK_LEVEL_COLUMNS}
+    low, high = levels["minimum_stock_level"], levels["maximum_stock_level"]
+    if low is not None and high is not None and low > high:
+        errors.append(f"minimum_stock_level {low} is greater than maximum_stock_level {high}")
+
+    if errors:
+        return None, errors
+    if item_code:
+        seen_codes.add(item_code.lower())
+
+    now = datetime.now().isoformat(sep=" ", timespec="seconds")
+    params = [
+        str(uuid.uuid4()).upper(),
+        item_code,
+        nomenclature,
+        (row.get("manufacturer") or "").strip() or None,
+        (row.get("unit") or "").strip() or None,
+        (row.get("specifications") or "").strip() or None,
+        (row.get("description") or "").strip() or None,
+        category_id,
+        sub_category_id,
+        (row.get("status") or "").strip() or "Active",
+        levels["minimum_stock_level"],
+        levels["maximum_stock_level"],
+        levels["reorder_level"],
+        0,
+        now,
+        now,
+    ]
+    return params, []
+
+
+def load_csv(path, reference, target=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Stream ``path`` through validation and batched inserts.
+
+    Returns ``(valid_count, errors)`` where ``errors`` is a list of
+    ``{"row", "error", "data"}`` dicts. Row numbers count the header as 1
+    and, like csv-parse's ``skip_empty_lines`` in the server endpoint, do not
+    count blank or whitespace-only lines.
+    """
+    seen_codes = set()
+    errors = []
+    batch = []
+    valid = 0
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in ("nomenclature",) if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path} is missing required column(s): {', '.join(missing)}")
+        line = 1
+        for row in reader:
+            values = [value for value in row.values() if isinstance(value, str)]
+            if len(values) == 1 and not values[0].strip():
+                continue  # whitespace-only line: csv-parse drops it without a row number
+            line += 1
+            if not any(value.strip() for value in values):
+                continue
+            params, row_errors = validate_row(row, reference, seen_codes)
+            if row_errors:
+                errors.append({"row": line, "error": "; ".join(row_errors), "data": row})
+                continue
+            valid += 1
+            if target is not None:
+                batch.append(params)
+                if len(batch) >= batch_size:
+                    target.insert_many(batch)
+                    batch = []
+    if target is not None:
+        if batch:
+            target.insert_many(batch)
+        target.commit()
+    return valid, errors
+
+
+def write_errors(errors, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["row", "error"] + CSV_COLUMNS)
+        for entry in errors:
+            writer.writerow([entry["row"], entry["error"]] + [entry["data"].get(c, "") for c in CSV_COLUMNS])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and bulk-load an item_masters CSV")
+    parser.add_argument("csv_file")
+    target_group = parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument("--db", help="SQLite stand-in database to load into")
+    target_group.add_argument("--odbc", help="pyodbc connection string for SQL Server")
+    target_group.add_argument("--reference", help="CSV export directory or SQLite file (validation only)")
+    parser.add_argument("--validate-only", action="store_true", help="report errors without inserting")
+    parser.add_argument("--errors", help="write the per-row error report to this CSV")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    target = None
+    if args.db:
+        target = SqliteTarget(args.db)
+    elif args.odbc:
+        target = OdbcTarget(args.odbc)
+    reference = target.reference() if target is not None else load_reference(args.reference)
+
+    started = datetime.now()
+    try:
+        valid, errors = load_csv(
+            args.csv_file,
+            reference,
+            None if args.validate_only else target,
+            args.batch_size,
+        )
+    finally:
+        if target is not None:
+            target.close()
+    elapsed = (datetime.now() - started).total_seconds()
+
+    action = "Validated" if args.validate_only or target is None else "Inserted"
+    print(f"✅ {action} {valid} rows in {elapsed:.2f}s")
+    if errors:
+        print(f"❌ {len(errors)} rows rejected")
+        for entry in errors[:20]:
+            print(f"   Row {entry['row']}: {entry['error']}")
+        if len(errors) > 20:
+            print(f"   ... {len(errors) - 20} more")
+        if args.errors:
+            write_errors(errors, args.errors)
+            print(f"📄 Error report: {args.errors}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Merge several decks (per wing, per module) into one consolidated deck.
+
+The merge works on the zip packages rather than through python-pptx, so
+slide content is never parsed or rendered again:
+
+- every part of the first deck is copied over unchanged, and its
+  presentation.xml is the one the merged deck keeps (slide size, notes
+  master, properties),
+- for each further deck, slides are copied in deck order with every part
+  they reach through their relationships (layouts, masters, themes, media,
+  notes, charts, embeddings). Part bytes are streamed from one zip to the
+  other through the public zipfile API in fixed-size chunks; only the small
+  .rels files are rewritten to point at the renumbered part names,
+- slide masters are deduplicated by a content hash over the master, its
+  layouts, theme and media, so decks built from the same template share one
+  master family; identical media files are stored once,
+- presentation.xml, its relationships and [Content_Types].xml are rewritten
+  to list the added slides and masters, with one section per input deck.
+
+docProps/app.xml keeps the first deck's slide count; PowerPoint refreshes it
+on the next save.
+
+Usage:
+    python merge_ppt.py DECK [DECK ...] [--out IMS_Consolidated.pptx]
+                        [--no-sections]
+"""
+
+import argparse
+import hashlib
+import posixpath
+import re
+import shutil
+import sys
+import uuid
+import zipfile
+from pathlib import Path
+
+from lxml import etree
+
+from ims_instrument import count, phase, profiled
+
+DEFAULT_OUTPUT = "IMS_Consolidated.pptx"
+COPY_CHUNK = 1 << 20
+
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+P14_NS = "http://schemas.microsoft.com/office/powerpoint/2010/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+CONTENT_TYPES = "[Content_Types].xml"
+OFFICE_DOCUMENT = R_NS + "/officeDocument"
+SLIDE_RELTYPE = R_NS + "/slide"
+MASTER_RELTYPE = R_NS + "/slideMaster"
+NOTES_MASTER_RELTYPE = R_NS + "/notesMaster"
+MASTER_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slideMaster+xml"
+NOTES_MASTER_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.notesMaster+xml"
+SECTIONS_URI = "{521415D9-36F7-43E2-AB2F-B90AF26B5E84}"
+FIRST_SLIDE_ID = 256
+FIRST_MASTER_ID = 2147483648
+
+_NUMBERED = re.compile(r"^(.*?)(\d*)(\.[^./]*)?$")
+
+
+def _xml(tree):
+    return etree.tostring(tree, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def rels_name(name):
+    """Relationship part of ``name`` ("" is the package itself)."""
+    folder, base = posixpath.split(name)
+    return posixpath.join(folder, "_rels", base + ".rels")
+
+
+def _is_xml(content_type):
+    return content_type is None or content_type.endswith("+xml") or content_type.endswith("/xml")
+
+
+def _copy_member(src, info, out, name):
+    """Stream member ``info`` of ``src`` into ``out`` as ``name``, keeping its compression."""
+    zinfo = zipfile.ZipInfo(name, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.external_attr = info.external_attr
+    # Lets open() decide on zip64 for the local header up front
+    zinfo.file_size = info.file_size
+    with src.open(info) as source, out.open(zinfo, "w") as target:
+        shutil.copyfileobj(source, target, COPY_CHUNK)
+
+
+class Deck:
+    """One input package: its members, content types and relationships."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.zip = zipfile.ZipFile(path)
+        self.infos = {info.filename: info for info in self.zip.infolist()}
+        types = etree.fromstring(self.zip.read(CONTENT_TYPES))
+        self.defaults = {d.get("Extension").lower(): d.get("ContentType") for d in types.iter(f"{{{CT_NS}}}Default")}
+        self.overrides = {o.get("PartName").lstrip("/"): o.get("ContentType") for o in types.iter(f"{{{CT_NS}}}Override")}
+        self._rels = {}
+        self.presentation = next(target for rel_type, _, target in self.links("") if rel_type == OFFICE_DOCUMENT)
+        self.tree = etree.fromstring(self.read(self.presentation))
+        targets = {rel.get("Id"): target for rel, target in self.rels(self.presentation)[1]}
+        self.slides = [targets[s.get(f"{{{R_NS}}}id")] for s in self.tree.iter(f"{{{P_NS}}}sldId")]
+        self.masters = [targets[m.get(f"{{{R_NS}}}id")] for m in self.tree.iter(f"{{{P_NS}}}sldMasterId")]
+        size = self.tree.find(f"{{{P_NS}}}sldSz")
+        self.size = None if size is None else (size.get("cx"), size.get("cy"))
+
+    def read(self, name):
+        return self.zip.read(name)
+
+    def has_rels(self, name):
+        return rels_name(name) in self.infos
+
+    def content_type(self, name):
+        return self.overrides.get(name) or self.defaults.get(name.rsplit(".", 1)[-1].lower())
+
+    def rels(self, name):
+        """``(tree, [(Relationship element, target part or None if external)])`` of a part."""
+        cached = self._rels.get(name)
+        if cached is None:
+            path = rels_name(name)
+            if path not in self.infos:
+                cached = (None, [])
+            else:
+                tree = etree.fromstring(self.read(path))
+                folder = posixpath.dirname(name)
+                links = []
+                for rel in tree.iter(f"{{{PKG_RELS_NS}}}Relationship"):
+                    target = rel.get("Target")
+                    if rel.get("TargetMode") == "External":
+                        links.append((rel, None))
+                    elif target.startswith("/"):
+                        links.append((rel, target.lstrip("/")))
+                    else:
+                        links.append((rel, posixpath.normpath(posixpath.join(folder, target))))
+                cached = (tree, links)
+            self._rels[name] = cached
+        return cached
+
+    def links(self, name):
+        """``(type, id, target)`` of each internal relationship, in Id order."""
+        return sorted((rel.get("Type"), rel.get("Id"), target)
+                      for rel, target in self.rels(name)[1] if target is not None)
+
+    def signature(self, name, visiting=()):
+        """Hash of a part's bytes and, recursively, of the parts it links to.
+
+        A link back to a part already on the path (a layout pointing at its
+        master) hashes as its depth, so the master/layout cycle stays finite.
+        """
+        digest = hashlib.blake2b(self.read(name), digest_size=16)
+        visiting = visiting + (name,)
+        for rel_type, rel_id, target in self.links(name):
+            digest.update(f"{rel_type}|{rel_id}|".encode())
+            if target in visiting:
+                digest.update(str(visiting.index(target)).encode())
+            else:
+                digest.update(self.signature(target, visiting))
+        return digest.digest()
+
+    def family(self, master):
+        """Parts reachable from a master, keyed by the relationship-id path to them."""
+        paths = {(): master}
+        seen = {master}
+        queue = [((), master)]
+        while queue:
+            path, name = queue.pop(0)
+            for _, rel_id, target in self.links(name):
+                if target not in seen:
+                    seen.add(target)
+                    paths[path + (rel_id,)] = target
+                    queue.append((path + (rel_id,), target))
+        return paths
+
+
+class DeckMerger:
+    """Writes the merged package: the first deck as-is, then the others' slides."""
+
+    def __init__(self, base, output_path):
+        self.base = base
+        self.out = zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED)
+        self.names = set()
+        self.numbers = {}       # (stem, extension) -> highest number taken
+        self.overrides = {}     # new part -> content type
+        self.defaults = dict(base.defaults)
+        self.media = {}         # (CRC, size) -> [(deck, part, output part)]
+        self.families = {}      # master signature -> {relationship path: output part}
+        self.masters = []       # output masters added to the base deck's
+        self.sections = []      # (deck name, [output slides])
+        self.notes_master = None
+        self.new_notes_master = None
+        self.next_master_id = FIRST_MASTER_ID
+        self.rels_written = {}  # (deck, folders, .rels bytes) -> rewritten .rels bytes
+        self.bytes_copied = 0
+
+    # ------------------------------------------------------------------
+    # Copying
+    # ------------------------------------------------------------------
+
+    def add_base(self):
+        base = self.base
+        skip = {CONTENT_TYPES, base.presentation, rels_name(base.presentation)}
+        for name, info in base.infos.items():
+            if name in skip:
+                continue
+            self._claim(name)
+            self._copy_raw(base, name, name)
+            if not base.has_rels(name) and not _is_xml(base.content_type(name)):
+                self.media.setdefault((info.CRC, info.file_size), []).append((base, name, name))
+        ids = [int(m.get("id")) for m in base.tree.iter(f"{{{P_NS}}}sldMasterId")]
+        for master in base.masters:
+            self.families.setdefault(base.signature(master), base.family(master))
+            tree = etree.fromstring(base.read(master))
+            ids.extend(int(layout.get("id")) for layout in tree.iter(f"{{{P_NS}}}sldLayoutId"))
+        self.next_master_id = max(ids, default=FIRST_MASTER_ID - 1) + 1
+        self.notes_master = next(
+            (target for rel, target in base.rels(base.presentation)[1] if rel.get("Type") == NOTES_MASTER_RELTYPE),
+            None,
+        )
+        self.sections.append((base.path.stem, list(base.slides)))
+
+    def add(self, deck):
+        """Copy ``deck``'s slides, and the parts they use, after those already merged."""
+        if deck.size != self.base.size:
+            print(f"⚠️  {deck.path.name}: slide size {deck.size} differs from {self.base.size}")
+        mapped = {}
+        for master in deck.masters:
+            self._part(deck, master, mapped)
+        slides = [self._part(deck, slide, mapped) for slide in deck.slides]
+        self.sections.append((deck.path.stem, slides))
+        count("slides", len(slides))
+
+    def _part(self, deck, name, mapped):
+        """Output name of ``deck``'s part ``name``, copying it (and its links) on first use."""
+        new = mapped.get(name)
+        if new is not None:
+            return new
+        content_type = deck.content_type(name)
+        if content_type == MASTER_CONTENT_TYPE:
+            return self._master(deck, name, mapped)
+        if content_type == NOTES_MASTER_CONTENT_TYPE and self.notes_master:
+            mapped[name] = self.notes_master
+            return self.notes_master
+        if not deck.has_rels(name) and not _is_xml(content_type):
+            new = self._known_media(deck, name)
+            if new is not None:
+                mapped[name] = new
+                return new
+        new = mapped[name] = self._new_name(name)
+        if content_type == NOTES_MASTER_CONTENT_TYPE:
+            self.notes_master = self.new_notes_master = new
+        self._copy(deck, name, new, mapped)
+        if not deck.has_rels(name) and not _is_xml(content_type):
+            info = deck.infos[name]
+            self.media.setdefault((info.CRC, info.file_size), []).append((deck, name, new))
+        return new
+
+    def _master(self, deck, name, mapped):
+        signature = deck.signature(name)
+        paths = deck.family(name)
+        family = self.families.get(signature)
+        if family is not None:
+            count("masters_shared")
+            for path, part in paths.items():
+                mapped.setdefault(part, family[path])
+            return mapped[name]
+        new = mapped[name] = self._new_name(name)
+        self.masters.append(new)
+        # Layout ids share one id space with master ids across the presentation
+        tree = etree.fromstring(deck.read(name))
+        for layout in tree.iter(f"{{{P_NS}}}sldLayoutId"):
+            layout.set("id", str(self.next_master_id + 1))
+            self.next_master_id += 1
+        self._copy(deck, name, new, mapped, _xml(tree))
+        self.families[signature] = {path: mapped[part] for path, part in paths.items()}
+        count("masters_copied")
+        return new
+
+    def _known_media(self, deck, name):
+        info = deck.infos[name]
+        for other, part, new in self.media.get((info.CRC, info.file_size), ()):
+            if other.read(part) == deck.read(name):
+                count("media_shared")
+                return new
+        return None
+
+    def _copy(self, deck, name, new, mapped, data=None):
+        content_type = deck.content_type(name)
+        if name in deck.overrides:
+            self.overrides[new] = content_type
+        else:
+            extension = name.rsplit(".", 1)[-1].lower()
+            self.defaults.setdefault(extension, deck.defaults.get(extension))
+        if data is None:
+            self._copy_raw(deck, name, new)
+        else:
+            self.out.writestr(new, data)
+        info = deck.infos.get(rels_name(name))
+        if info is None:
+            return
+        # Slides built from one layout have byte-identical .rels; the first one
+        # is rewritten and later ones reuse its output member
+        folder = posixpath.dirname(new)
+        key = (deck, posixpath.dirname(name), folder, deck.zip.read(info))
+        written = self.rels_written.get(key)
+        if written is None:
+            tree, links = deck.rels(name)
+            for rel, target in links:
+                if target is not None:
+                    rel.set("Target", posixpath.relpath(self._part(deck, target, mapped), folder))
+            written = self.rels_written[key] = _xml(tree)
+        self.out.writestr(rels_name(new), written)
+
+    def _copy_raw(self, deck, name, new):
+        info = deck.infos[name]
+        _copy_member(deck.zip, info, self.out, new)
+        self.bytes_copied += info.file_size
+
+    def _claim(self, name):
+        self.names.add(name)
+        stem, number, extension = _NUMBERED.match(name).groups()
+        if number:
+            key = (stem, extension or "")
+            self.numbers[key] = max(self.numbers.get(key, 0), int(number))
+
+    def _new_name(self, name):
+        stem, _, extension = _NUMBERED.match(name).groups()
+        key = (stem, extension or "")
+        number = self.numbers.get(key, 0)
+        while True:
+            number += 1
+            new = f"{stem}{number}{extension or ''}"
+            if new not in self.names:
+                break
+        self.numbers[key] = number
+        self._claim(new)
+        self._claim(rels_name(new))
+        return new
+
+    # ------------------------------------------------------------------
+    # Package parts
+    # ------------------------------------------------------------------
+
+    def finish(self, sections=True):
+        base = self.base
+        presentation_rels = etree.fromstring(base.read(rels_name(base.presentation)))
+        folder = posixpath.dirname(base.presentation)
+        rel_ids = {rel.get("Id") for rel in presentation_rels}
+        rel_counter = iter(range(1, 1 << 30))
+
+        def relate(rel_type, target):
+            rel_id = next(f"rIdMerged{n}" for n in rel_counter if f"rIdMerged{n}" not in rel_ids)
+            etree.SubElement(presentation_rels, f"{{{PKG_RELS_NS}}}Relationship",
+                             Id=rel_id, Type=rel_type, Target=posixpath.relpath(target, folder))
+            return rel_id
+
+        tree = base.tree
+        master_list = _child(tree, "sldMasterIdLst", ())
+        for master in self.masters:
+            self.next_master_id += 1
+            etree.SubElement(master_list, f"{{{P_NS}}}sldMasterId",
+                             {"id": str(self.next_master_id), f"{{{R_NS}}}id": relate(MASTER_RELTYPE, master)})
+        if self.new_notes_master:
+            notes_list = _child(tree, "notesMasterIdLst", ("sldMasterIdLst",))
+            etree.SubElement(notes_list, f"{{{P_NS}}}notesMasterId",
+                             {f"{{{R_NS}}}id": relate(NOTES_MASTER_RELTYPE, self.new_notes_master)})
+
+        slide_list = _child(tree, "sldIdLst", ("sldMasterIdLst", "notesMasterIdLst", "handoutMasterIdLst"))
+        slide_ids = [int(s.get("id")) for s in slide_list]
+        ids = {slide: slide_id for slide, slide_id in zip(base.slides, slide_ids)}
+        next_id = max(slide_ids, default=FIRST_SLIDE_ID - 1) + 1
+        for _, slides in self.sections[1:]:
+            for slide in slides:
+                ids[slide] = next_id
+                etree.SubElement(slide_list, f"{{{P_NS}}}sldId",
+                                 {"id": str(next_id), f"{{{R_NS}}}id": relate(SLIDE_RELTYPE, slide)})
+                next_id += 1
+        if sections:
+            _set_sections(tree, [(title, [ids[slide] for slide in slides]) for title, slides in self.sections])
+
+        types = etree.fromstring(base.read(CONTENT_TYPES))
+        present = {d.get("Extension").lower() for d in types.iter(f"{{{CT_NS}}}Default")}
+        for extension, content_type in self.defaults.items():
+            if extension not in present and content_type:
+                types.insert(0, etree.Element(f"{{{CT_NS}}}Default", Extension=extension, ContentType=content_type))
+        for name, content_type in self.overrides.items():
+            etree.SubElement(types, f"{{{CT_NS}}}Override", PartName=f"/{name}", ContentType=content_type)
+
+        self.out.writestr(CONTENT_TYPES, _xml(types))
+        self.out.writestr(base.presentation, _xml(tree))
+        self.out.writestr(rels_name(base.presentation), _xml(presentation_rels))
+        self.out.close()
+
+
+def _child(tree, tag, after):
+    """``tree``'s p:``tag`` child, created after the last of ``after`` present."""
+    child = tree.find(f"{{{P_NS}}}{tag}")
+    if child is not None:
+        return child
+    child = etree.Element(f"{{{P_NS}}}{tag}")
+    position = 0
+    for i, element in enumerate(tree):
+        if etree.QName(element).localname in after:
+            position = i + 1
+    tree.insert(position, child)
+    return child
+
+
+def _set_sections(tree, sections):
+    """Replace the presentation's p14 section list with one section per deck."""
+    ext_list = tree.find(f"{{{P_NS}}}extLst")
+    if ext_list is None:
+        ext_list = etree.SubElement(tree, f"{{{P_NS}}}extLst")
+    for ext in ext_list.findall(f"{{{P_NS}}}ext"):
+        if ext.get("uri") == SECTIONS_URI:
+            ext_list.remove(ext)
+    ext = etree.SubElement(ext_list, f"{{{P_NS}}}ext", uri=SECTIONS_URI)
+    section_list = etree.SubElement(ext, f"{{{P14_NS}}}sectionLst", nsmap={"p14": P14_NS})
+    for title, slide_ids in sections:
+        section = etree.SubElement(section_list, f"{{{P14_NS}}}section",
+                                   name=title, id="{" + str(uuid.uuid4()).upper() + "}")
+        slide_list = etree.SubElement(section, f"{{{P14_NS}}}sldIdLst")
+        for slide_id in slide_ids:
+            etree.SubElement(slide_list, f"{{{P14_NS}}}sldId", id=str(slide_id))
+
+
+def merge_decks(paths, output_path, sections=True):
+    """Merge the decks at ``paths`` into ``output_path``; returns the merger."""
+    with phase("load"):
+        decks = [Deck(path) for path in paths]
+    merger = DeckMerger(decks[0], output_path)
+    with phase("copy"):
+        merger.add_base()
+        count("slides", len(decks[0].slides))
+        for deck in decks[1:]:
+            merger.add(deck)
+    with phase("save"):
+        merger.finish(sections)
+    count("bytes_copied", merger.bytes_copied)
+    return merger
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge decks into one consolidated .pptx without re-rendering")
+    parser.add_argument("decks", nargs="+", help=".pptx files, or directories of them, in slide order")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT)
+    parser.add_argument("--no-sections", action="store_true", help="do not add a section per input deck")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for entry in map(Path, args.decks):
+        if entry.is_dir():
+            paths.extend(sorted(entry.glob("*.pptx")))
+        elif entry.exists():
+            paths.append(entry)
+        else:
+            raise SystemExit(f"Deck not found: {entry}")
+    paths = [path for path in paths if path.resolve() != Path(args.out).resolve()]
+    if not paths:
+        raise SystemExit("No decks to merge")
+
+    merger = merge_decks(paths, args.out, sections=not args.no_sections)
+    slides = sum(len(slides) for _, slides in merger.sections)
+    print(f"✅ Merged {len(paths)} decks")
+    print(f"📊 File saved as: {args.out}")
+    print(f"📈 Total slides: {slides} ({len(merger.families)} master families)")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("merge_ppt"):
+        sys.exit(main())
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Effective-permission matrix of every user against the role templates.
+
+Resolves what fn_HasPermission / permissions.cjs would answer for every user
+and permission at once. Each role's granted permissions (ims_role_permissions
+joined to active ims_permissions) are encoded as an int bitset, one bit per
+permission key, and a user's effective permissions are the bitwise OR of the
+masks of their active role assignments (ims_user_roles.is_active). Like
+fn_HasPermission and permissions.cjs, ims_roles.is_active is not checked, so
+a deactivated role keeps granting its permissions to the users still
+assigned to it.
+
+Users are grouped by their set of assigned roles first (also a bitset, one bit
+per role), so the OR is taken once per distinct role combination rather than
+once per user; thousands of users resolve in a few milliseconds.
+
+The result is diffed against ROLE_TEMPLATES, the grants seeded by
+create-ims-role-system.sql (IMS_SUPER_ADMIN holds every active permission):
+
+- role drift: permissions a role has been granted beyond its template
+  (extra) or has lost (missing), including template permissions that are
+  inactive or absent from ims_permissions,
+- user deviations: users whose effective permissions differ from the OR of
+  their roles' templates, and users with no active role at all,
+- inactive roles that are still effective: deactivated roles that grant
+  permissions to users who are still assigned to them.
+
+Roles without a template (created from the Roles page) are taken as they are.
+
+The report written by --out is read by create-ims-system-overview-docx.py and
+create-ims-one-pager-docx.py for their effective-permissions annexes; --csv
+writes the full user x permission table (1/0 per permission) for auditors.
+
+Usage:
+    python permission_matrix.py SOURCE [--templates FILE]
+                                [--out ims-permission-matrix.json] [--csv FILE]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from ims_instrument import count, phase, profiled
+from ims_tables import iter_rows, norm_id, table_exists, to_flag
+
+DEFAULT_OUTPUT = "ims-permission-matrix.json"
+TABLES = ("ims_permissions", "ims_roles", "ims_role_permissions", "ims_user_roles")
+ALL = "*"
+
+# Permission catalogue seeded by create-ims-role-system.sql: (key, module, action)
+PERMISSIONS = [
+    ("inventory.view_all", "Inventory", "View All"),
+    ("inventory.view_wing", "Inventory", "View Wing"),
+    ("inventory.view_personal", "Inventory", "View Personal"),
+    ("inventory.edit_all", "Inventory", "Edit All"),
+    ("inventory.edit_wing", "Inventory", "Edit Wing"),
+    ("stock_request.create", "Stock Request", "Create"),
+    ("stock_request.approve_supervisor", "Stock Request", "Approve as Supervisor"),
+    ("stock_request.approve_admin", "Stock Request", "Approve as Admin"),
+    ("stock_request.forward", "Stock Request", "Forward"),
+    ("stock_request.reject", "Stock Request", "Reject"),
+    ("stock_request.view_all", "Stock Request", "View All"),
+    ("stock_request.view_wing", "Stock Request", "View Wing"),
+    ("stock_request.view_own", "Stock Request", "View Own"),
+    ("stock_transfer.admin_to_wing", "Stock Transfer", "Admin to Wing"),
+    ("stock_transfer.wing_to_personal", "Stock Transfer", "Wing to Personal"),
+    ("tender.create", "Tender", "Create"),
+    ("tender.approve", "Tender", "Approve"),
+    ("vendor.manage", "Vendor", "Manage"),
+    ("acquisition.create", "Acquisition", "Create"),
+    ("reports.view_all", "Reports", "View All"),
+    ("reports.view_wing", "Reports", "View Wing"),
+    ("reports.view_own", "Reports", "View Own"),
+    ("roles.manage", "Roles", "Manage"),
+    ("users.assign_roles", "Users", "Assign Roles"),
+    ("users.view_all", "Users", "View All"),
+    ("categories.manage", "Categories", "Manage"),
+    ("items.manage", "Items", "Manage"),
+    ("settings.view", "Settings", "View"),
+    ("settings.edit", "Settings", "Edit"),
+]
+
+# Expected grants per system role, as seeded by create-ims-role-system.sql
+ROLE_TEMPLATES = {
+    "IMS_SUPER_ADMIN": ALL,
+    "IMS_ADMIN": [
+        "inventory.view_all", "inventory.edit_all",
+        "stock_request.view_all", "stock_request.approve_admin", "stock_request.reject",
+        "stock_transfer.admin_to_wing", "stock_transfer.wing_to_personal",
+        "tender.approve", "vendor.manage", "acquisition.create",
+        "reports.view_all", "users.view_all", "users.assign_roles",
+        "categories.manage", "items.manage", "settings.view", "settings.edit",
+    ],
+    "WING_SUPERVISOR": [
+        "inventory.view_wing", "inventory.edit_wing",
+        "stock_request.view_wing", "stock_request.approve_supervisor",
+        "stock_request.forward", "stock_request.reject",
+        "stock_transfer.wing_to_personal",
+        "reports.view_wing",
+    ],
+    "GENERAL_USER": [
+        "inventory.view_personal",
+        "stock_request.create", "stock_request.view_own",
+        "reports.view_own",
+    ],
+    "PROCUREMENT_OFFICER": [
+        "tender.create", "tender.approve",
+        "vendor.manage", "acquisition.create",
+        "inventory.view_all", "reports.view_all",
+    ],
+    "AUDITOR": [
+        "inventory.view_all",
+        "stock_request.view_all",
+        "reports.view_all",
+        "users.view_all",
+        "settings.view",
+    ],
+}
+
+
+def _bits(mask):
+    """Indexes of the set bits of ``mask``, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class PermissionMatrix:
+    """Permission and role bitsets plus each user's set of assigned roles."""
+
+    def __init__(self, templates=None):
+        self.templates = ROLE_TEMPLATES if templates is None else templates
+        self.keys = []          # bit -> permission key
+        self.modules = {}       # permission key -> (module, action)
+        self.bit = {}           # permission key -> bit
+        self.active = 0         # mask of active permissions
+        self.roles = []         # role bit -> [role id, name, display name, active, granted mask]
+        self.role_bit = {}      # role id -> role bit
+        self.users = {}         # user id -> [full name, wing id, role set]
+        self.inactive_assignments = 0
+
+    def _permission(self, key, module=None, action=None):
+        if key not in self.bit:
+            self.bit[key] = len(self.keys)
+            self.keys.append(key)
+        if module or key not in self.modules:
+            self.modules[key] = (module, action)
+        return self.bit[key]
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self, source):
+        """Read permissions, roles, grants, assignments and users from ``source``."""
+        permissions = {}
+        rows = sorted(
+            iter_rows(source, "ims_permissions", ["id", "permission_key", "module_name", "action_name", "is_active"]),
+            key=lambda row: str(row[1] or ""),
+        )
+        for permission_id, key, module, action, active in rows:
+            if not key:
+                continue
+            key = str(key).strip()
+            bit = self._permission(key, module, action)
+            permissions[norm_id(permission_id)] = bit
+            # Exports without is_active predate the column: every permission is live
+            if active is None or to_flag(active):
+                self.active |= 1 << bit
+        # Template keys missing from the catalogue still get a bit so they show as missing
+        for keys in self.templates.values():
+            if keys != ALL:
+                for key in sorted(keys):
+                    self._permission(key)
+
+        for role_id, name, display, active in sorted(
+            iter_rows(source, "ims_roles", ["id", "role_name", "display_name", "is_active"]),
+            key=lambda row: str(row[1] or ""),
+        ):
+            self.role_bit[norm_id(role_id)] = len(self.roles)
+            self.roles.append([norm_id(role_id), name, display or name, active is None or to_flag(active), 0])
+
+        roles, role_bit = self.roles, self.role_bit
+        for role_id, permission_id in iter_rows(source, "ims_role_permissions", ["role_id", "permission_id"]):
+            r = role_bit.get(norm_id(role_id))
+            p = permissions.get(norm_id(permission_id))
+            if r is not None and p is not None:
+                roles[r][4] |= 1 << p
+        for role in roles:
+            role[4] &= self.active
+
+        users = self.users
+        if table_exists(source, "AspNetUsers"):
+            for user_id, name, wing in iter_rows(source, "AspNetUsers", ["Id", "FullName", "intWingID"]):
+                users[norm_id(user_id)] = [name, wing, 0]
+        for user_id, role_id, active in iter_rows(source, "ims_user_roles", ["user_id", "role_id", "is_active"]):
+            user_id, role_id = norm_id(user_id), norm_id(role_id)
+            user = users.get(user_id)
+            if user is None:
+                user = users[user_id] = [None, None, 0]
+            # Only the assignment's flag counts: the permission checks join
+            # ims_roles without testing its is_active
+            if (active is not None and not to_flag(active)) or role_id not in role_bit:
+                self.inactive_assignments += 1
+                continue
+            user[2] |= 1 << role_bit[role_id]
+        return self
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def template_masks(self):
+        """Expected mask per role bit; roles without a template expect what they hold."""
+        masks = []
+        for role in self.roles:
+            keys = self.templates.get(role[1])
+            if keys is None:
+                masks.append(role[4])
+            elif keys == ALL:
+                masks.append(self.active)
+            else:
+                mask = 0
+                for key in keys:
+                    mask |= 1 << self.bit[key]
+                masks.append(mask)
+        return masks
+
+    def resolve(self):
+        """Effective and expected masks per distinct role set: ``{role set: (effective, expected)}``."""
+        granted = [role[4] for role in self.roles]
+        expected = self.template_masks()
+        resolved = {}
+        for user in self.users.values():
+            role_set = user[2]
+            if role_set not in resolved:
+                effective = template = 0
+                for r in _bits(role_set):
+                    effective |= granted[r]
+                    template |= expected[r]
+                resolved[role_set] = (effective, template)
+        return resolved
+
+    def names(self, mask):
+        return [self.keys[b] for b in _bits(mask)]
+
+    def role_names(self, role_set):
+        return [self.roles[r][1] for r in _bits(role_set)]
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def report(self, resolved, elapsed):
+        """Role drift, role-set profiles and per-user masks for the JSON report."""
+        expected = self.template_masks()
+        per_role = [0] * len(self.roles)
+        profiles = {}
+        for user in self.users.values():
+            profiles[user[2]] = profiles.get(user[2], 0) + 1
+        for role_set, n in profiles.items():
+            for r in _bits(role_set):
+                per_role[r] += n
+
+        role_rows = []
+        for r, (role_id, name, display, active, mask) in enumerate(self.roles):
+            role_rows.append({
+                "role_id": role_id, "role_name": name, "display_name": display, "is_active": active,
+                "has_template": name in self.templates, "users": per_role[r],
+                "permissions": mask.bit_count(), "mask": f"{mask:x}",
+                "extra": self.names(mask & ~expected[r]), "missing": self.names(expected[r] & ~mask),
+            })
+
+        profile_rows = []
+        for role_set, n in profiles.items():
+            effective, template = resolved[role_set]
+            profile_rows.append({
+                "roles": self.role_names(role_set), "users": n,
+                "permissions": effective.bit_count(), "mask": f"{effective:x}",
+                "extra": self.names(effective & ~template), "missing": self.names(template & ~effective),
+            })
+        profile_rows.sort(key=lambda p: (-p["users"], p["roles"]))
+
+        user_rows = []
+        deviating = without_roles = 0
+        for user_id, (name, wing, role_set) in self.users.items():
+            effective, template = resolved[role_set]
+            if not role_set:
+                without_roles += 1
+            elif effective != template:
+                deviating += 1
+            user_rows.append({
+                "user_id": user_id, "full_name": name, "wing_id": wing, "roles": self.role_names(role_set),
+                "mask": f"{effective:x}", "deviates": effective != template,
+            })
+        user_rows.sort(key=lambda u: (not u["deviates"], u["full_name"] or "", u["user_id"]))
+        inactive_effective = [
+            {"role_id": row["role_id"], "role_name": row["role_name"], "display_name": row["display_name"],
+             "users": row["users"], "permissions": row["permissions"]}
+            for row in role_rows if not row["is_active"] and row["users"] and row["permissions"]
+        ]
+
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "summary": {
+                "users": len(self.users),
+                "users_with_roles": len(self.users) - without_roles,
+                "users_without_roles": without_roles,
+                "users_deviating": deviating,
+                "inactive_assignments": self.inactive_assignments,
+                "roles": len(self.roles),
+                "roles_drifted": sum(1 for row in role_rows if row["extra"] or row["missing"]),
+                "roles_inactive_effective": len(inactive_effective),
+                "permissions": self.active.bit_count(),
+                "profiles": len(profiles),
+                "resolve_ms": round(elapsed * 1000, 3),
+            },
+            "permissions": [
+                {"bit": b, "permission_key": key, "module_name": self.modules[key][0],
+                 "action_name": self.modules[key][1], "is_active": bool(self.active >> b & 1)}
+                for b, key in enumerate(self.keys)
+            ],
+            "roles": role_rows,
+            "inactive_effective_roles": inactive_effective,
+            "profiles": profile_rows,
+            "users": user_rows,
+        }
+
+    def write_csv(self, path, resolved):
+        """One row per user with a 1/0 column per active permission."""
+        columns = [b for b in _bits(self.active)]
+        rows = {}
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["user_id", "full_name", "wing_id", "roles"] + [self.keys[b] for b in columns])
+            for user_id, (name, wing, role_set) in self.users.items():
+                cells = rows.get(role_set)
+                if cells is None:
+                    effective = resolved[role_set][0]
+                    cells = rows[role_set] = [";".join(self.role_names(role_set))] + [
+                        effective >> b & 1 for b in columns]
+                writer.writerow([user_id, name, wing] + cells)
+
+
+def load_templates(path):
+    """Role templates from a JSON file: ``{role_name: [permission keys] or "*"}``."""
+    with open(path, "r", encoding="utf-8") as f:
+        templates = json.load(f)
+    for name, keys in templates.items():
+        if keys != ALL and not isinstance(keys, list):
+            raise ValueError(f"Template for {name} must be a list of permission keys or \"*\"")
+    return templates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve every user's effective permissions and diff them against role templates")
+    parser.add_argument("source", help="CSV export directory, SQLite stand-in database or ims_snapshot.py snapshot")
+    parser.add_argument("--templates", help="JSON role templates to use instead of the seeded ones")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="report JSON for the DOCX generators")
+    parser.add_argument("--csv", help="also write the full user x permission table")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        raise SystemExit(f"Table source not found: {args.source}")
+    missing = [table for table in TABLES if not table_exists(args.source, table)]
+    if missing:
+        raise SystemExit(f"❌ {args.source} has no {', '.join(missing)} table(s) to resolve permissions from")
+    templates = load_templates(args.templates) if args.templates else None
+
+    with phase("load"):
+        matrix = PermissionMatrix(templates).load(args.source)
+    with phase("resolve"):
+        started = time.perf_counter()
+        resolved = matrix.resolve()
+        elapsed = time.perf_counter() - started
+    count("users", len(matrix.users))
+    count("role_sets", len(resolved))
+    with phase("report"):
+        report = matrix.report(resolved, elapsed)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        if args.csv:
+            matrix.write_csv(args.csv, resolved)
+
+    summary = report["summary"]
+    print(f"📊 {summary['users']:,} users x {summary['permissions']} permissions resolved in "
+          f"{summary['resolve_ms']:.2f} ms ({summary['profiles']} role combinations)")
+    for role in report["roles"]:
+        if role["extra"] or role["missing"]:
+            print(f"⚠️  {role['role_name']}: +{len(role['extra'])} extra, -{len(role['missing'])} missing vs template")
+    for role in report["inactive_effective_roles"]:
+        print(f"⚠️  {role['role_name']} is inactive but still grants {role['permissions']} permissions "
+              f"to {role['users']:,} users")
+    if summary["users_deviating"]:
+        print(f"⚠️  {summary['users_deviating']:,} users deviate from their roles' templates")
+    if summary["users_without_roles"]:
+        print(f"ℹ️  {summary['users_without_roles']:,} users have no active role")
+    print(f"Created: {args.out}")
+    if args.csv:
+        print(f"Created: {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("permission_matrix"):
+        sys.exit(main())
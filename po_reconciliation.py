@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Offline reconciliation of purchase orders, deliveries and stock postings.
+
+Follows the procurement chain of purchaseOrders.cjs -> deliveries.cjs ->
+stockAcquisitions.cjs and reports where it does not add up:
+
+- PO lines delivered above (OVER) or below (UNDER) the ordered quantity,
+  once their purchase order has had a delivery; rejected quantities do not
+  count as delivered,
+- delivery lines received on a completed delivery but never posted to
+  stock_acquisitions (UNPOSTED), posted only in part (PARTLY_POSTED) or
+  more than once (OVER_POSTED), acquisitions that name a delivery line that
+  does not exist (ORPHAN), and delivery lines that match no PO line
+  (UNMATCHED).
+
+The join is a hash join in one pass per table: PO lines and deliveries are
+held in dicts keyed by id (plus PO id and item, for delivery lines saved
+without a po_item_id), delivery_items and stock_acquisitions are streamed
+against them and summed per PO line and per delivery + item receipt.
+
+As in stock_breakdown.py every applied row's contribution is kept in a
+state file with an updated_at watermark per table, so ``--incremental``
+only reads rows changed since the last run and applies their difference.
+
+The report written by --out is read by create-ims-system-overview-docx.py
+for its procurement reconciliation annex.
+
+Usage:
+    python po_reconciliation.py SOURCE [--state FILE] [--incremental]
+                                [--out ims-po-reconciliation.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from ims_instrument import count, phase, profiled
+from ims_tables import iter_rows, load_columns, norm_id, table_exists, to_flag, to_number
+
+DEFAULT_STATE = "po-reconciliation.state.json"
+DEFAULT_OUTPUT = "ims-po-reconciliation.json"
+STATE_VERSION = 1
+
+OVER, UNDER, MATCHED, OPEN = "OVER", "UNDER", "MATCHED", "OPEN"
+UNPOSTED, PARTLY_POSTED, OVER_POSTED, ORPHAN, POSTED, AWAITING = (
+    "UNPOSTED", "PARTLY_POSTED", "OVER_POSTED", "ORPHAN", "POSTED", "AWAITING_RECEIPT")
+UNMATCHED = "UNMATCHED"
+REJECTED_STATUSES = ("REJECTED",)
+RECEIVED_STATUSES = ("COMPLETED", "RECEIVED")
+TABLES = ("purchase_orders", "purchase_order_items", "deliveries", "delivery_items", "stock_acquisitions")
+EPSILON = 1e-6
+
+
+def _zero_nan(value):
+    return 0.0 if value != value else value
+
+
+class _Ids(dict):
+    """norm_id() memo for foreign keys, which repeat across thousands of rows."""
+
+    def __missing__(self, value):
+        key = self[value] = norm_id(value)
+        return key
+
+
+def _receipt(delivery_id, item):
+    return f"{delivery_id}|{item}"
+
+
+class Reconciliation:
+    """Procurement rows by id plus the per-line and per-receipt sums built from them."""
+
+    def __init__(self):
+        self.watermarks = {}
+        self.orders = {}        # PO id -> PO number
+        self.po_lines = {}      # PO line id -> [PO id, item, ordered, unit price]
+        self.po_index = {}      # "PO id|item" -> PO line id
+        self.deliveries = {}    # delivery id -> [PO id, number, date, status, deleted]
+        self.lines = {}         # delivery line id -> [PO line id, receipt key, accepted, rejected]
+        self.acquisitions = {}  # acquisition id -> [receipt key, quantity]
+        self.delivered = {}     # PO line id -> [accepted, rejected]
+        self.received = {}      # receipt key -> accepted quantity
+        self.posted = {}        # receipt key -> posted quantity
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported state version in {path}: {data.get('version')}")
+        state = cls()
+        for name in ("watermarks", "orders", "po_lines", "deliveries", "lines", "acquisitions"):
+            setattr(state, name, data[name])
+        # The sums are cheaper to rebuild from the kept contributions than to store
+        state.po_index = {f"{po_id}|{item}": line_id for line_id, (po_id, item, _, _) in state.po_lines.items()}
+        for line in state.lines.values():
+            state._add_line(line, 1.0)
+        posted = state.posted
+        for receipt, quantity in state.acquisitions.values():
+            posted[receipt] = posted.get(receipt, 0.0) + quantity
+        return state
+
+    def save(self, path):
+        data = {
+            "version": STATE_VERSION,
+            "watermarks": self.watermarks,
+            "orders": self.orders,
+            "po_lines": self.po_lines,
+            "deliveries": self.deliveries,
+            "lines": self.lines,
+            "acquisitions": self.acquisitions,
+        }
+        tmp = Path(str(path) + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            # dumps() takes the C encoder; dump() streams through the Python one
+            f.write(json.dumps(data, separators=(",", ":")))
+        tmp.replace(path)
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, source):
+        """Apply rows changed since the stored watermarks (all rows on an empty state).
+
+        Returns the number of rows applied per table.
+        """
+        applied = {}
+        with phase("build"):
+            applied["purchase_orders"] = self._refresh_orders(source)
+            applied["purchase_order_items"], touched = self._refresh_po_lines(source)
+            applied["deliveries"], redo, moved = self._refresh_deliveries(source)
+            # Delivery lines saved without a po_item_id were matched to a PO line
+            # by PO and item; that match changes when the PO's lines or the
+            # delivery's PO change, without the delivery line being touched
+            rematch = moved
+            if touched and self.watermarks.get("delivery_items") is not None:
+                rematch = moved | {d for d, delivery in self.deliveries.items() if delivery[0] in touched}
+        with phase("probe"):
+            applied["delivery_items"] = self._refresh_lines(source, redo, rematch)
+            applied["stock_acquisitions"] = self._refresh_acquisitions(source)
+        return applied
+
+    def _since(self, table):
+        return ("updated_at", self.watermarks.get(table))
+
+    # Reads are inclusive of the watermark, since exported stamps are only
+    # second- or minute-precise. Rows are kept by id, so the boundary rows
+    # read again are no-ops and only rows whose entry changes count as applied.
+
+    def _advance(self, table, stamps):
+        stamps = [s for s in stamps if s is not None]
+        if stamps:
+            latest = max(stamps)
+            current = self.watermarks.get(table)
+            if current is None or latest > current:
+                self.watermarks[table] = latest
+
+    def _refresh_orders(self, source):
+        table = "purchase_orders"
+        stamps = []
+        applied = 0
+        for po_id, number, updated_at in iter_rows(
+            source, table, ["id", "po_number", "updated_at"], self._since(table), inclusive=True
+        ):
+            key = norm_id(po_id)
+            if key is not None:
+                if key not in self.orders or self.orders[key] != number:
+                    self.orders[key] = number
+                    applied += 1
+                stamps.append(updated_at)
+        self._advance(table, stamps)
+        return applied
+
+    def _refresh_po_lines(self, source):
+        """Returns ``(rows applied, ids of the POs whose lines changed)``."""
+        table = "purchase_order_items"
+        cols = load_columns(source, table, {
+            "id": "id", "po_id": "id", "item_master_id": "id", "quantity": "d", "unit_price": "d",
+            "updated_at": "s",
+        }, self._since(table), inclusive=True)
+        applied = 0
+        touched = set()
+        for line_id, po_id, item, quantity, price in zip(
+            cols["id"], cols["po_id"], cols["item_master_id"], cols["quantity"], cols["unit_price"],
+        ):
+            if line_id is None:
+                continue
+            line = [po_id, item, _zero_nan(quantity), _zero_nan(price)]
+            old = self.po_lines.get(line_id)
+            if old == line:
+                continue
+            if old is not None and self.po_index.get(f"{old[0]}|{old[1]}") == line_id:
+                del self.po_index[f"{old[0]}|{old[1]}"]
+            if old is not None:
+                touched.add(old[0])
+            touched.add(po_id)
+            self.po_lines[line_id] = line
+            self.po_index[f"{po_id}|{item}"] = line_id
+            applied += 1
+        self._advance(table, cols["updated_at"])
+        return applied, touched
+
+    def _refresh_deliveries(self, source):
+        """Returns ``(rows applied, ids of known deliveries whose deleted flag
+        flipped, ids of known deliveries moved to another PO)``."""
+        table = "deliveries"
+        stamps = []
+        redo = set()
+        moved = set()
+        applied = 0
+        for delivery_id, po_id, number, day, status, deleted, updated_at in iter_rows(
+            source, table,
+            ["id", "po_id", "delivery_number", "delivery_date", "delivery_status", "is_deleted", "updated_at"],
+            self._since(table), inclusive=True,
+        ):
+            key = norm_id(delivery_id)
+            if key is None:
+                continue
+            stamps.append(updated_at)
+            deleted = to_flag(deleted)
+            delivery = [norm_id(po_id), number, day, (status or "").strip().upper(), deleted]
+            old = self.deliveries.get(key)
+            if old == delivery:
+                continue
+            if old is not None and old[4] != deleted:
+                redo.add(key)
+            if old is not None and old[0] != delivery[0]:
+                moved.add(key)
+            self.deliveries[key] = delivery
+            applied += 1
+        self._advance(table, stamps)
+        return applied, redo, moved
+
+    def _refresh_lines(self, source, redo, rematch=()):
+        """Apply changed delivery lines, plus every line of the ``redo`` deliveries
+        and the lines without a po_item_id of the ``rematch`` deliveries."""
+        table = "delivery_items"
+        names = ["id", "delivery_id", "po_item_id", "item_master_id", "delivery_qty",
+                 "quality_status", "is_deleted", "updated_at"]
+        incremental = self.watermarks.get(table) is not None
+        pending = iter_rows(source, table, names, self._since(table), inclusive=True)
+        if (redo or rematch) and incremental:
+            # Lines of a delivery deleted or restored since the last run change
+            # without being touched themselves
+            rows = {norm_id(row[0]): row for row in pending}
+            for row in iter_rows(source, table, names):
+                delivery_id = norm_id(row[1])
+                if delivery_id in redo or (delivery_id in rematch and norm_id(row[2]) is None):
+                    rows.setdefault(norm_id(row[0]), row)
+            pending = rows.values()
+
+        deliveries = self.deliveries
+        po_index = self.po_index
+        lines = self.lines
+        ids = _Ids()
+        stamps = []
+        applied = 0
+        for line_id, delivery_id, po_line, item, quantity, quality, deleted, updated_at in pending:
+            line_id = norm_id(line_id)
+            if line_id is None:
+                continue
+            stamps.append(updated_at)
+            delivery_id = ids[delivery_id]
+            delivery = deliveries.get(delivery_id)
+            line = None
+            if not to_flag(deleted) and not (delivery is not None and delivery[4]):
+                item = ids[item]
+                po_line = ids[po_line]
+                if po_line is None and delivery is not None:
+                    po_line = po_index.get(f"{delivery[0]}|{item}")
+                quantity = float(to_number(quantity) or 0.0)
+                rejected = (quality or "").strip().upper() in REJECTED_STATUSES
+                line = [po_line, _receipt(delivery_id, item),
+                        0.0 if rejected else quantity, quantity if rejected else 0.0]
+            old = lines.get(line_id)
+            if old == line:
+                continue
+            applied += 1
+            if old is not None:
+                del lines[line_id]
+                self._add_line(old, -1.0)
+            if line is not None:
+                lines[line_id] = line
+                self._add_line(line, 1.0)
+        self._advance(table, stamps)
+        return applied
+
+    def _add_line(self, line, sign):
+        po_line, receipt, accepted, rejected = line
+        totals = self.delivered.get(po_line)
+        if totals is None:
+            totals = self.delivered[po_line] = [0.0, 0.0]
+        totals[0] += sign * accepted
+        totals[1] += sign * rejected
+        self.received[receipt] = self.received.get(receipt, 0.0) + sign * accepted
+
+    def _refresh_acquisitions(self, source):
+        table = "stock_acquisitions"
+        acquisitions = self.acquisitions
+        posted = self.posted
+        ids = _Ids()
+        stamps = []
+        applied = 0
+        for acq_id, delivery_id, item, quantity, updated_at in iter_rows(
+            source, table, ["id", "delivery_id", "item_master_id", "quantity_received", "updated_at"],
+            self._since(table), inclusive=True,
+        ):
+            acq_id = norm_id(acq_id)
+            stamps.append(updated_at)
+            delivery_id = ids[delivery_id]
+            acquisition = None
+            # Opening balances and manual entries are not tied to a delivery
+            if acq_id is not None and delivery_id is not None:
+                acquisition = [_receipt(delivery_id, ids[item]), float(to_number(quantity) or 0.0)]
+            old = acquisitions.get(acq_id)
+            if old == acquisition:
+                continue
+            applied += 1
+            if old is not None:
+                del acquisitions[acq_id]
+                posted[old[0]] -= old[1]
+            if acquisition is not None:
+                acquisitions[acq_id] = acquisition
+                posted[acquisition[0]] = posted.get(acquisition[0], 0.0) + acquisition[1]
+        self._advance(table, stamps)
+        return applied
+
+    # ------------------------------------------------------------------
+    # Report
+    # ------------------------------------------------------------------
+
+    def report(self, source):
+        """Summary counts plus the PO line and receipt exceptions, largest first."""
+        items = {}
+        for item_id, code, nomenclature, unit in iter_rows(
+            source, "item_masters", ["id", "item_code", "nomenclature", "unit"]
+        ):
+            items[norm_id(item_id)] = (code, nomenclature, unit)
+        summary = dict.fromkeys((MATCHED, OVER, UNDER, OPEN, POSTED, UNPOSTED, PARTLY_POSTED,
+                                 OVER_POSTED, ORPHAN, AWAITING, UNMATCHED), 0)
+
+        delivered_orders = {self.deliveries[d][0] for d in self.deliveries if not self.deliveries[d][4]}
+        po_rows = []
+        for line_id, (po_id, item, ordered, price) in self.po_lines.items():
+            accepted, rejected = self.delivered.get(line_id, (0.0, 0.0))
+            difference = accepted - ordered
+            if abs(difference) < EPSILON:
+                status = MATCHED
+            elif po_id not in delivered_orders:
+                status = OPEN
+            else:
+                status = OVER if difference > 0 else UNDER
+            summary[status] += 1
+            if status in (OVER, UNDER):
+                code, nomenclature, unit = items.get(item, (None, None, None))
+                po_rows.append({
+                    "po_number": self.orders.get(po_id), "po_item_id": line_id, "item_master_id": item,
+                    "item_code": code, "nomenclature": nomenclature, "unit": unit,
+                    "ordered": ordered, "delivered": accepted, "rejected": rejected,
+                    "difference": difference, "value": round(difference * price, 2), "status": status,
+                })
+        summary[UNMATCHED] = sum(1 for line in self.lines.values() if line[0] not in self.po_lines)
+
+        receipt_rows = []
+        for receipt in self.received.keys() | self.posted.keys():
+            accepted = self.received.get(receipt, 0.0)
+            posted = self.posted.get(receipt, 0.0)
+            if abs(accepted) < EPSILON and abs(posted) < EPSILON:
+                continue
+            delivery_id, item = receipt.split("|")
+            delivery = self.deliveries.get(delivery_id) or [None, None, None, "", False]
+            difference = posted - accepted
+            if receipt not in self.received or abs(accepted) < EPSILON:
+                status = ORPHAN
+            elif abs(difference) < EPSILON:
+                status = POSTED
+            elif delivery[3] not in RECEIVED_STATUSES:
+                status = AWAITING
+            elif abs(posted) < EPSILON:
+                status = UNPOSTED
+            else:
+                status = PARTLY_POSTED if difference < 0 else OVER_POSTED
+            summary[status] += 1
+            if status in (UNPOSTED, PARTLY_POSTED, OVER_POSTED, ORPHAN):
+                code, nomenclature, unit = items.get(item, (None, None, None))
+                receipt_rows.append({
+                    "delivery_number": delivery[1], "delivery_date": delivery[2],
+                    "po_number": self.orders.get(delivery[0]), "delivery_id": delivery_id,
+                    "item_master_id": item, "item_code": code, "nomenclature": nomenclature, "unit": unit,
+                    "delivered": accepted, "posted": posted, "difference": difference, "status": status,
+                })
+
+        po_rows.sort(key=lambda r: (-abs(r["value"]), r["po_number"] or "", r["po_item_id"]))
+        receipt_rows.sort(key=lambda r: (-abs(r["difference"]), r["delivery_number"] or "", r["item_master_id"] or ""))
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "watermarks": self.watermarks,
+            "summary": {
+                "po_lines": len(self.po_lines),
+                "delivery_lines": len(self.lines),
+                "receipts": sum(summary[s] for s in (POSTED, UNPOSTED, PARTLY_POSTED, OVER_POSTED, ORPHAN, AWAITING)),
+                **{status.lower(): n for status, n in summary.items()},
+            },
+            "po_lines": po_rows,
+            "receipts": receipt_rows,
+        }
+
+
+def build(source, state_path=None, incremental=False):
+    """Load (or build) the reconciliation state for ``source``; see stock_breakdown.build."""
+    if incremental and state_path and Path(state_path).exists():
+        with phase("load"):
+            state = Reconciliation.load(state_path)
+    else:
+        state = Reconciliation()
+    applied = state.refresh(source)
+    if state_path and any(applied.values()):
+        with phase("save"):
+            state.save(state_path)
+    return state, applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile PO lines, deliveries and stock acquisitions")
+    parser.add_argument("source", help="CSV export directory, SQLite stand-in database or ims_snapshot.py snapshot")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="persisted state file")
+    parser.add_argument("--incremental", action="store_true", help="apply only rows changed since the state")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="report JSON for the DOCX generators")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        raise SystemExit(f"Table source not found: {args.source}")
+    missing = [table for table in TABLES if not table_exists(args.source, table)]
+    if missing:
+        raise SystemExit(f"❌ {args.source} has no {', '.join(missing)} table(s) to reconcile")
+    state, applied = build(args.source, args.state, args.incremental)
+    for table, n in applied.items():
+        count(f"{table}_applied", n)
+    with phase("report"):
+        report = state.report(args.source)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+    summary = report["summary"]
+    print("Applied rows: " + ", ".join(f"{table}={n}" for table, n in applied.items()))
+    print(f"📊 {summary['po_lines']:,} PO lines: {summary['matched']:,} matched, {summary['over']:,} over, "
+          f"{summary['under']:,} under, {summary['open']:,} open")
+    print(f"📊 {summary['receipts']:,} receipts: {summary['posted']:,} posted, {summary['unposted']:,} unposted, "
+          f"{summary['partly_posted']:,} partly posted, {summary['over_posted']:,} over-posted, "
+          f"{summary['orphan']:,} orphan acquisitions")
+    if summary["unmatched"]:
+        print(f"⚠️  {summary['unmatched']:,} delivery lines match no PO line")
+    print(f"Created: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("po_reconciliation"):
+        sys.exit(main())
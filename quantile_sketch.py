@@ -0,0 +1,109 @@
+"""
+Mergeable quantile sketch with bounded memory.
+
+Values are counted in logarithmic buckets (the DDSketch layout): every
+quantile estimate is within ``relative_accuracy`` of the true value, memory
+depends only on the value range (about 1,000 buckets for one second to three
+years at 1%), and two sketches merge by adding bucket counts. That makes it
+safe to build sketches in parallel workers and combine them afterwards.
+"""
+
+import math
+
+
+class QuantileSketch:
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "buckets", "zeros", "count", "total", "min", "max")
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value, weight=1):
+        """Record a non-negative value (negative values are clamped to zero)."""
+        if value <= 0:
+            self.zeros += weight
+            value = 0.0
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + weight
+        self.count += weight
+        self.total += value * weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, weight in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + weight
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Estimate the ``q`` quantile (0..1); None when the sketch is empty."""
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs=(0.5, 0.9, 0.99)):
+        """Estimate several quantiles with one walk over the buckets."""
+        if self.count == 0:
+            return [None] * len(qs)
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        result = [self.max] * len(qs)
+        keys = iter(sorted(self.buckets))
+        seen = self.zeros
+        key = None
+        for i in order:
+            rank = qs[i] * (self.count - 1)
+            if rank < self.zeros:
+                result[i] = 0.0
+                continue
+            while seen <= rank:
+                key = next(keys, None)
+                if key is None:
+                    break
+                seen += self.buckets[key]
+            if key is None:
+                break
+            value = 2 * self.gamma ** key / (self.gamma + 1)
+            result[i] = min(max(value, self.min), self.max)
+        return result
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "zeros": self.zeros,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.buckets = {int(k): v for k, v in data["buckets"].items()}
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
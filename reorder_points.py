@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Reorder-point engine for the item masters.
+
+/api/reports/inventory flags low stock with a fixed ``available_quantity <
+10`` and reorder requests are raised by hand. This engine derives a reorder
+level and a suggested order quantity per item from its issue history:
+
+- issued stock_issuance_items lines (request ISSUED/COMPLETED, dated by
+  issued_at) are bucketed into an item x week matrix ending at ``--as-of``,
+  held as one flat float array,
+- running totals of the matrix and of its squares are taken in a single
+  ``itertools.accumulate`` pass each, so any rolling window of any item is
+  a difference of two prefix values; the recent consumption rate, the
+  weekly variability and the peak rolling consumption of every item come
+  from these without a per-item loop over its history,
+- the reorder level is lead-time demand plus safety stock (z x weekly
+  deviation x sqrt(lead time in weeks)), never below the item's
+  minimum_stock_level; items with no recent demand keep their configured
+  reorder_point,
+- an item at or below its reorder level is topped up to its
+  maximum_stock_level, or to the reorder level plus ``--cover-days`` of
+  demand when no usable maximum is set.
+
+Available stock is the stock_admin plus stock_wing available quantities
+(current_inventory_stock when neither table exists). The output table uses
+the reorder_requests field names (reorder_quantity, min_quantity,
+reorder_level) so rows can be posted to /api/reorder-requests as they are;
+ims_xlsx.py renders it as its "Reorder Points" sheet.
+
+Usage:
+    python reorder_points.py SOURCE [--out ims-reorder-points.csv|.json]
+                             [--as-of YYYY-MM-DD] [--lead-time-days 30]
+                             [--service-level 0.95] [--cover-days 90]
+                             [--reorder-only]
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from array import array
+from datetime import date
+from itertools import accumulate
+from operator import mul, sub
+from statistics import NormalDist
+
+from ims_instrument import count, phase, profiled
+from ims_tables import iter_rows, load_columns, norm_id, table_exists, to_flag, to_number
+
+DEFAULT_OUTPUT = "ims-reorder-points.csv"
+
+ISSUED_STATUSES = ("ISSUED", "COMPLETED")
+WEEK = 7
+# Weeks behind the consumption rate and the variability estimate
+RATE_WEEKS = 13
+VARIABILITY_WEEKS = 52
+DEFAULT_LEAD_TIME_DAYS = 30
+DEFAULT_SERVICE_LEVEL = 0.95
+DEFAULT_COVER_DAYS = 90
+
+OUT_OF_STOCK, REORDER, OK = "OUT_OF_STOCK", "REORDER", "OK"
+MISSING = object()
+
+ITEM_SCHEMA = {
+    "id": "id",
+    "item_code": "s",
+    "nomenclature": "s",
+    "unit": "s",
+    "category_id": "id",
+    "status": "s",
+    "is_deleted": "flag",
+    "minimum_stock_level": "d",
+    "maximum_stock_level": "d",
+    "reorder_point": "d",
+}
+
+OUTPUT_COLUMNS = [
+    "item_master_id", "item_code", "nomenclature", "unit", "category_name",
+    "available_quantity", "weekly_consumption", "weekly_deviation", "peak_window_consumption",
+    "days_of_cover", "min_quantity", "configured_reorder_point", "maximum_stock_level",
+    "lead_time_demand", "safety_stock", "reorder_level", "order_up_to", "reorder_quantity", "status",
+]
+
+
+def _day(value):
+    """First 10 characters of a timestamp, or None when it is not a date."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if len(text) < 10 or text[4] != "-" or text[7] != "-":
+        return None
+    return text[:10]
+
+
+def _level(value):
+    return value if value == value and value > 0 else 0.0
+
+
+class ConsumptionMatrix:
+    """Weekly issued quantities of every item, one flat row per item.
+
+    Column ``weeks - 1`` is the week ending on ``as_of``; ``sums`` and
+    ``squares`` are running totals over the flat array with a leading zero,
+    so the total of row ``r`` over columns ``[a, b)`` is
+    ``sums[r * weeks + b] - sums[r * weeks + a]``.
+    """
+
+    __slots__ = ("items", "weeks", "as_of", "cells", "sums", "squares", "lines")
+
+    def __init__(self, items, weeks, as_of):
+        self.items = items
+        self.weeks = weeks
+        self.as_of = as_of
+        self.cells = array("d", bytes(8 * items * weeks))
+        self.sums = self.squares = None
+        self.lines = 0
+
+    @classmethod
+    def load(cls, source, index, as_of):
+        """Bucket the issued lines of ``source`` for the items in ``index``."""
+        end = as_of.toordinal()
+        # Request id as exported -> issue day ordinal, or None when the request
+        # was not issued; lines are looked up by their raw ids first and only
+        # normalised on a miss (GUIDs can differ in case between tables)
+        issued_on = {}
+        first = None
+        for req_id, status, issued_at, updated_at in iter_rows(
+            source, "stock_issuance_requests", ["id", "approval_status", "issued_at", "updated_at"]
+        ):
+            ordinal = None
+            day = _day(issued_at) or _day(updated_at)
+            if day is not None and (status or "").strip().upper() in ISSUED_STATUSES:
+                try:
+                    ordinal = date.fromisoformat(day).toordinal()
+                except ValueError:
+                    pass
+            if ordinal is not None and ordinal > end:
+                ordinal = None
+            if ordinal is not None:
+                first = ordinal if first is None else min(first, ordinal)
+            issued_on[req_id] = issued_on[norm_id(req_id)] = ordinal
+
+        weeks = max((end - (first or end)) // WEEK + 1, VARIABILITY_WEEKS)
+        matrix = cls(len(index), weeks, as_of)
+        if first is None or not table_exists(source, "stock_issuance_items"):
+            return matrix
+        rows = dict(index)
+        cells = matrix.cells
+        last = weeks - 1
+        lines = 0
+        for request_id, item_id, issued, requested, deleted in iter_rows(
+            source, "stock_issuance_items",
+            ["request_id", "item_master_id", "issued_quantity", "requested_quantity", "is_deleted"],
+        ):
+            ordinal = issued_on.get(request_id, MISSING)
+            if ordinal is MISSING:
+                ordinal = issued_on.get(norm_id(request_id))
+            if ordinal is None or (deleted and to_flag(deleted)):
+                continue
+            row = rows.get(item_id, MISSING)
+            if row is MISSING:
+                row = rows[item_id] = index.get(norm_id(item_id))
+            if row is None:
+                continue
+            quantity = to_number(issued)
+            if quantity is None:
+                quantity = to_number(requested)
+            if quantity:
+                cells[row * weeks + last - (end - ordinal) // WEEK] += quantity
+                lines += 1
+        matrix.lines = lines
+        return matrix
+
+    def accumulate(self):
+        self.sums = array("d", accumulate(self.cells, initial=0.0))
+        self.squares = array("d", accumulate(map(mul, self.cells, self.cells), initial=0.0))
+
+    def window(self, totals, weeks):
+        """Per-item totals over the last ``weeks`` columns."""
+        span = self.weeks
+        ends = totals[span::span]
+        starts = totals[span - weeks::span]
+        return array("d", map(sub, ends, starts))
+
+    def peak(self, weeks):
+        """Per-item largest total over any ``weeks`` consecutive columns."""
+        span = self.weeks
+        weeks = min(weeks, span)
+        # Rolling totals of every window in the flat array; the ones that
+        # straddle two rows are sliced away per item below
+        rolling = array("d", map(sub, self.sums[weeks:], self.sums[:len(self.sums) - weeks]))
+        windows = span - weeks + 1
+        return array("d", (max(rolling[r * span:r * span + windows]) for r in range(self.items)))
+
+
+class ReorderPlan:
+    """Reorder levels and suggested quantities for every live item."""
+
+    def __init__(self, source, as_of=None, lead_time_days=DEFAULT_LEAD_TIME_DAYS,
+                 service_level=DEFAULT_SERVICE_LEVEL, cover_days=DEFAULT_COVER_DAYS):
+        if not 0 < service_level < 1:
+            raise ValueError(f"service level must be between 0 and 1, got {service_level}")
+        self.source = source
+        self.as_of = as_of or date.today()
+        self.lead_weeks = lead_time_days / WEEK
+        self.cover_weeks = cover_days / WEEK
+        self.z = NormalDist().inv_cdf(service_level)
+
+        with phase("load"):
+            self.items = load_columns(source, "item_masters", ITEM_SCHEMA)
+            self.categories = {norm_id(cat_id): name
+                               for cat_id, name in iter_rows(source, "categories", ["id", "category_name"])}
+            index = {item_id: i for i, item_id in enumerate(self.items["id"]) if item_id is not None}
+            self.available = self._available(source, index, len(self.items["id"]))
+            self.matrix = ConsumptionMatrix.load(source, index, self.as_of)
+        count("issue_lines", self.matrix.lines)
+        count("matrix_cells", len(self.matrix.cells))
+
+        with phase("rolling"):
+            matrix = self.matrix
+            matrix.accumulate()
+            self.weekly = array("d", (total / RATE_WEEKS for total in matrix.window(matrix.sums, RATE_WEEKS)))
+            n = VARIABILITY_WEEKS
+            self.deviation = array("d", (
+                math.sqrt(max(squares - total * total / n, 0.0) / (n - 1))
+                for total, squares in zip(matrix.window(matrix.sums, n), matrix.window(matrix.squares, n))
+            ))
+            self.peak = matrix.peak(RATE_WEEKS)
+
+    @staticmethod
+    def _available(source, index, size):
+        available = array("d", bytes(8 * size))
+        tables = [t for t in ("stock_admin", "stock_wing") if table_exists(source, t)]
+        if not tables and table_exists(source, "current_inventory_stock"):
+            tables = ["current_inventory_stock"]
+        for table in tables:
+            for item_id, quantity in iter_rows(source, table, ["item_master_id", "available_quantity"]):
+                i = index.get(norm_id(item_id))
+                quantity = to_number(quantity)
+                if i is not None and quantity is not None:
+                    available[i] += quantity
+        return available
+
+    def rows(self, reorder_only=False):
+        """Output rows for live (Active, not deleted) items, most urgent first."""
+        items = self.items
+        rows = []
+        for i, item_id in enumerate(items["id"]):
+            if items["is_deleted"][i] or (items["status"][i] or "Active") != "Active":
+                continue
+            weekly = self.weekly[i]
+            deviation = self.deviation[i]
+            available = self.available[i]
+            minimum = _level(items["minimum_stock_level"][i])
+            configured = _level(items["reorder_point"][i])
+            maximum = _level(items["maximum_stock_level"][i])
+
+            lead_demand = weekly * self.lead_weeks
+            safety = self.z * deviation * math.sqrt(self.lead_weeks)
+            if weekly > 0 or deviation > 0:
+                level = max(math.ceil(lead_demand + safety), minimum)
+            else:
+                level = max(configured, minimum)
+            order_up_to = maximum if maximum > level else math.ceil(level + weekly * self.cover_weeks)
+
+            if available <= level and order_up_to > available:
+                quantity = math.ceil(order_up_to - available)
+                status = OUT_OF_STOCK if available <= 0 else REORDER
+            else:
+                quantity = 0
+                status = OK
+            if reorder_only and status == OK:
+                continue
+            rows.append({
+                "item_master_id": item_id,
+                "item_code": items["item_code"][i],
+                "nomenclature": items["nomenclature"][i],
+                "unit": items["unit"][i],
+                "category_name": self.categories.get(items["category_id"][i]),
+                "available_quantity": available,
+                "weekly_consumption": round(weekly, 3),
+                "weekly_deviation": round(deviation, 3),
+                "peak_window_consumption": self.peak[i],
+                "days_of_cover": round(max(available, 0.0) / weekly * WEEK, 1) if weekly > 0 else None,
+                "min_quantity": minimum,
+                "configured_reorder_point": configured,
+                "maximum_stock_level": maximum,
+                "lead_time_demand": round(lead_demand, 2),
+                "safety_stock": round(safety, 2),
+                "reorder_level": level,
+                "order_up_to": order_up_to,
+                "reorder_quantity": quantity,
+                "status": status,
+            })
+        urgency = {OUT_OF_STOCK: 0, REORDER: 1, OK: 2}
+        rows.sort(key=lambda r: (urgency[r["status"]], r["days_of_cover"] is None,
+                                 r["days_of_cover"] or 0.0, (r["nomenclature"] or "").lower()))
+        return rows
+
+
+def write_rows(rows, out):
+    if str(out).lower().endswith(".json"):
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump({"success": True, "reorder_points": rows, "total": len(rows)}, f, indent=2)
+        return
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reorder points and suggested quantities from issue history")
+    parser.add_argument("source", help="CSV export directory, SQLite stand-in database or ims_snapshot.py snapshot")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="write rows to .csv or .json")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="last day of history (default today)")
+    parser.add_argument("--lead-time-days", type=float, default=DEFAULT_LEAD_TIME_DAYS)
+    parser.add_argument("--service-level", type=float, default=DEFAULT_SERVICE_LEVEL,
+                        help="chance of not running out during the lead time")
+    parser.add_argument("--cover-days", type=float, default=DEFAULT_COVER_DAYS,
+                        help="demand to order beyond the reorder level when an item has no maximum")
+    parser.add_argument("--reorder-only", action="store_true", help="only items at or below their reorder level")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        raise SystemExit(f"Table source not found: {args.source}")
+    try:
+        plan = ReorderPlan(args.source, args.as_of, args.lead_time_days, args.service_level, args.cover_days)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    rows = plan.rows(args.reorder_only)
+    with phase("save"):
+        write_rows(rows, args.out)
+
+    flagged = sum(1 for row in rows if row["status"] != OK)
+    print(f"📊 {plan.matrix.lines:,} issue lines over {plan.matrix.weeks} weeks for {plan.matrix.items:,} items")
+    print(f"⚠️  {flagged:,} items at or below their reorder level")
+    print(f"Created: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("reorder_points"):
+        sys.exit(main())
@@ -2,6 +2,14 @@
 function requestLogger(req, res, next) {
   console.log(`🌍 ${req.method} ${req.originalUrl}`);
   
+  // Completion line with status and duration, parsed by server_latency.py:
+  // ⏱️ 2026-01-31T09:15:02.114Z GET /api/inventory/current-stock 200 12.4ms
+  const started = process.hrtime.bigint();
+  res.on('finish', () => {
+    const elapsedMs = Number(process.hrtime.bigint() - started) / 1e6;
+    console.log(`⏱️ ${new Date().toISOString()} ${req.method} ${req.originalUrl} ${res.statusCode} ${elapsedMs.toFixed(1)}ms`);
+  });
+  
   // Log specific endpoints
   if (req.originalUrl.includes('/ims/check-permission')) {
     console.log('🔍 PERMISSION CHECK REQUEST DETECTED!');
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Per-route latency report from the Express server logs.
+
+The request logger (server/middleware/logger.cjs) writes one completion line
+per request:
+
+    ⏱️ 2026-01-31T09:15:02.114Z GET /api/stock-issuance/7F3C...-...-0A1B 200 12.4ms
+
+A single precompiled bytes pattern finds these lines wherever they sit, so
+plain console captures, ``docker logs`` output with its own prefixes and
+JSON lines exported from Loki all work unchanged. URLs are folded into route
+templates (query strings dropped, GUIDs and numeric ids replaced by ``:id``)
+and every route gets a request count, 4xx/5xx counts and a mergeable latency
+sketch (quantile_sketch.py), per day and overall.
+
+Logs of any size are streamed: plain files are memory-mapped and split into
+newline-aligned byte ranges, .gz files are decompressed in blocks, and the
+ranges and files are scanned in parallel worker processes. Results are kept
+per calendar day of the log timestamps and merged afterwards.
+
+The JSON written by --out feeds the "Top Slow Endpoints" slide of
+create-ims-presentation.py.
+
+Usage:
+    python server_latency.py LOG_OR_DIR [...] [--out FILE] [--jobs N]
+                             [--top 10] [--min-count 20] [--chunk-mb 64]
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from ims_instrument import count, phase, profiled
+from quantile_sketch import QuantileSketch
+
+DEFAULT_OUTPUT = "ims-server-latency.json"
+DEFAULT_CHUNK_MB = 64
+GZIP_BLOCK = 16 * 1024 * 1024
+LOG_PATTERNS = ("*.log", "*.log.*", "*.txt", "*.gz")
+
+REQUEST_LINE = re.compile(
+    rb"(\d{4}-\d\d-\d\d)T\d\d:\d\d:\d\d(?:\.\d+)?Z "
+    rb"(GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS) (\S+) (\d{3}) (\d+(?:\.\d+)?)ms"
+)
+ID_SEGMENT = re.compile(
+    rb"/(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)(?=/|$)"
+)
+
+# Distinct raw URLs remembered by the route cache before it is reset
+ROUTE_CACHE_LIMIT = 200000
+
+
+class RouteStats:
+    """Per-(day, route) counts and latency sketches."""
+
+    def __init__(self):
+        self.routes = {}
+        self.lines = 0
+
+    def merge(self, other):
+        for key, (requests, client_errors, server_errors, sketch) in other.routes.items():
+            entry = self.routes.get(key)
+            if entry is None:
+                self.routes[key] = [requests, client_errors, server_errors, sketch]
+                continue
+            entry[0] += requests
+            entry[1] += client_errors
+            entry[2] += server_errors
+            entry[3].merge(sketch)
+        self.lines += other.lines
+        return self
+
+
+def route_template(method, url):
+    path = url.split(b"?", 1)[0].split(b"#", 1)[0]
+    path = ID_SEGMENT.sub(b"/:id", path).rstrip(b"/") or b"/"
+    return f"{method.decode()} {path.decode('utf-8', 'replace')}"
+
+
+def scan_buffer(buffer, stats, start=0, end=None, cache=None):
+    """Add every completion line of ``buffer[start:end]`` to ``stats``."""
+    cache = {} if cache is None else cache
+    routes = stats.routes
+    end = len(buffer) if end is None else end
+    matched = 0
+    for match in REQUEST_LINE.finditer(buffer, start, end):
+        day, method, url, status, millis = match.groups()
+        route = cache.get((method, url))
+        if route is None:
+            if len(cache) >= ROUTE_CACHE_LIMIT:
+                cache.clear()
+            route = cache[(method, url)] = route_template(method, url)
+        key = (day, route)
+        entry = routes.get(key)
+        if entry is None:
+            entry = routes[key] = [0, 0, 0, QuantileSketch()]
+        entry[0] += 1
+        if status[0] == 52:  # b"4"
+            entry[1] += 1
+        elif status[0] == 53:  # b"5"
+            entry[2] += 1
+        entry[3].add(float(millis) / 1000)
+        matched += 1
+    stats.lines += matched
+
+
+def _line_start(buffer, offset):
+    if offset <= 0:
+        return 0
+    newline = buffer.find(b"\n", offset - 1)
+    return len(buffer) if newline < 0 else newline + 1
+
+
+def scan_range(path, start, end):
+    """Scan the lines of a plain log that start inside ``[start, end)``."""
+    stats = RouteStats()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return stats
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            scan_buffer(buffer, stats, _line_start(buffer, start), _line_start(buffer, end))
+    return stats
+
+
+def scan_gzip(path):
+    stats = RouteStats()
+    cache = {}
+    tail = b""
+    with gzip.open(path, "rb") as f:
+        while True:
+            block = f.read(GZIP_BLOCK)
+            if not block:
+                break
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            scan_buffer(block, stats, 0, cut, cache)
+            tail = block[cut:]
+    if tail:
+        scan_buffer(tail, stats, cache=cache)
+    return stats
+
+
+def _scan(task):
+    path, start, end = task
+    if start is None:
+        return scan_gzip(path)
+    return scan_range(path, start, end)
+
+
+def log_files(inputs):
+    files = []
+    for name in inputs:
+        path = Path(name)
+        if path.is_dir():
+            found = {p for pattern in LOG_PATTERNS for p in path.glob(pattern) if p.is_file()}
+            files.extend(sorted(found))
+        elif path.exists():
+            files.append(path)
+        else:
+            raise SystemExit(f"Log file not found: {path}")
+    return files
+
+
+def plan(files, chunk_bytes):
+    """Scan tasks: newline-aligned byte ranges of plain files, whole .gz files."""
+    tasks = []
+    for path in files:
+        if path.suffix == ".gz":
+            tasks.append((str(path), None, None))
+            continue
+        size = path.stat().st_size
+        for start in range(0, max(size, 1), chunk_bytes):
+            tasks.append((str(path), start, min(start + chunk_bytes, size)))
+    return tasks
+
+
+def analyze(files, jobs=None, chunk_bytes=DEFAULT_CHUNK_MB * 1024 * 1024):
+    """Scan every file (in parallel) and return merged ``RouteStats``."""
+    tasks = plan(files, chunk_bytes)
+    jobs = jobs or min(len(tasks), os.cpu_count() or 1) or 1
+    stats = RouteStats()
+    with phase("scan"):
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                for result in pool.map(_scan, tasks):
+                    stats.merge(result)
+        else:
+            for task in tasks:
+                stats.merge(_scan(task))
+    count("files_scanned", len(files))
+    count("bytes_read", sum(path.stat().st_size for path in files))
+    count("lines_matched", stats.lines)
+    return stats
+
+
+def _summary(requests, client_errors, server_errors, sketch):
+    p50, p90, p99 = sketch.quantiles((0.5, 0.9, 0.99))
+    return {
+        "count": requests,
+        "client_errors": client_errors,
+        "server_errors": server_errors,
+        "error_rate": server_errors / requests if requests else 0.0,
+        "mean": sketch.mean,
+        "p50": p50,
+        "p90": p90,
+        "p99": p99,
+        "max": sketch.max if sketch.count else None,
+    }
+
+
+def report(stats, files, top=10, min_count=20):
+    routes = {}
+    days = {}
+    for (day, route), (requests, client_errors, server_errors, sketch) in stats.routes.items():
+        for totals, key in ((routes, route), (days, day.decode())):
+            entry = totals.get(key)
+            if entry is None:
+                entry = totals[key] = [0, 0, 0, QuantileSketch()]
+            entry[0] += requests
+            entry[1] += client_errors
+            entry[2] += server_errors
+            entry[3].merge(sketch)
+
+    route_rows = sorted(
+        (dict(route=route, **_summary(*entry)) for route, entry in routes.items()),
+        key=lambda row: row["p90"] or 0,
+        reverse=True,
+    )
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "files": [str(path) for path in files],
+        "requests": stats.lines,
+        "first_day": min(days) if days else None,
+        "last_day": max(days) if days else None,
+        "top_slow": [row for row in route_rows if row["count"] >= min_count][:top],
+        "routes": route_rows,
+        "days": [dict(day=day, **_summary(*days[day])) for day in sorted(days)],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-route latency percentiles from the server logs")
+    parser.add_argument("logs", nargs="+", help="log files (.gz allowed) or directories of them")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="JSON for the presentation generator")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per range/file, up to CPU count)")
+    parser.add_argument("--top", type=int, default=10, help="routes on the Top Slow Endpoints slide")
+    parser.add_argument("--min-count", type=int, default=20, help="requests a route needs to be ranked")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_MB, help="byte range per worker task")
+    args = parser.parse_args(argv)
+
+    files = log_files(args.logs)
+    stats = analyze(files, args.jobs, args.chunk_mb * 1024 * 1024)
+    data = report(stats, files, args.top, args.min_count)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+    print(f"{data['requests']:,} requests from {len(files)} file(s), {data['first_day']} to {data['last_day']}")
+    for row in data["top_slow"]:
+        print(f"{row['route']:<60} n={row['count']:<8} p50={row['p50'] * 1000:8.1f}ms "
+              f"p90={row['p90'] * 1000:8.1f}ms p99={row['p99'] * 1000:8.1f}ms 5xx={row['error_rate']:.2%}")
+    print(f"Created: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("server_latency"):
+        sys.exit(main())
@@ -0,0 +1,775 @@
+#!/usr/bin/env python3
+"""
+Object index of the ad-hoc SQL scripts in the repository root.
+
+Answers "which scripts touch stock_issuance_items?" or "what drops
+approval_history?" without grepping hundreds of .sql files:
+
+- every script is tokenized with a small T-SQL lexer (line and nested block
+  comments, N'' strings, [bracketed] and "quoted" identifiers, GO batches)
+  and its statements are read for the objects they name: tables, views,
+  procedures, functions and triggers, whether plain, ``dbo.``-qualified or
+  cross-database (``InvMISDB.dbo.item_masters``),
+- each reference is classified as ``ddl`` (CREATE/ALTER, SELECT INTO, index
+  and trigger definitions), ``dml`` (INSERT/UPDATE/MERGE), ``destructive``
+  (DELETE, DROP, TRUNCATE, ALTER TABLE ... DROP), ``read`` (FROM/JOIN/USING/
+  REFERENCES) or ``exec``; UPDATE/DELETE aliases are resolved to the table
+  in their FROM clause and dynamic SQL in ``EXEC('...')`` and
+  ``sp_executesql`` strings is indexed as well,
+- the references of every script are cached in .sql-index.json with the
+  script's size, mtime and content hash. A run re-reads only scripts whose
+  size or mtime changed and re-tokenizes only those whose hash changed, in
+  worker processes when there are several and more than one CPU, so a
+  query against an unchanged tree costs a stat per script.
+
+Temporary tables, table variables, CTE names and sys/INFORMATION_SCHEMA
+objects are not indexed. Object names are matched case-insensitively and
+may be shell-style patterns.
+
+Usage:
+    python sql_index.py [OBJECT ...] [--root DIR] [--kind ddl,dml,destructive,read,exec]
+                        [--script FILE] [--rebuild] [--json]
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ims_instrument import count, phase, profiled
+
+DEFAULT_CACHE = ".sql-index.json"
+CACHE_VERSION = 2
+DEFAULT_PATTERN = "*.sql"
+# Changed scripts below this are tokenized in-process; workers cost more to start
+PARALLEL_MIN_FILES = 8
+
+DDL, DML, DESTRUCTIVE, READ, EXEC = "ddl", "dml", "destructive", "read", "exec"
+KINDS = (DDL, DML, DESTRUCTIVE, READ, EXEC)
+
+# Token kinds: unquoted word, quoted identifier, string literal, punctuation
+WORD, QUOTED, STRING, PUNCT = range(4)
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<line_comment>--[^\n]*)
+      | (?P<block_comment>/\*)
+      | (?P<string>[Nn]?'(?:[^']|'')*')
+      | (?P<bracketed>\[(?:[^\]]|\]\])*\])
+      | (?P<quoted>"(?:[^"]|"")*")
+      | (?P<word>[#@]*[A-Za-z_][\w@$#]*)
+      | (?P<number>\d[\w.]*)
+      | (?P<punct>\S)
+    )""", re.VERBOSE)
+_COMMENT_EDGE = re.compile(r"/\*|\*/")
+
+# Object types named after CREATE/ALTER/DROP; those with an ON clause name
+# the table they belong to
+OBJECT_TYPES = {
+    "TABLE": "table", "VIEW": "view", "PROCEDURE": "procedure", "PROC": "procedure",
+    "FUNCTION": "function", "TRIGGER": "trigger", "SYNONYM": "synonym", "TYPE": "type",
+    "INDEX": "index", "POLICY": "policy",
+}
+ON_TABLE_TYPES = ("INDEX", "TRIGGER", "POLICY")
+SYSTEM_SCHEMAS = ("SYS", "INFORMATION_SCHEMA")
+# Compatibility views usually named without a schema, trigger pseudo-tables
+# and built-in table functions
+SYSTEM_NAMES = frozenset((
+    "sysobjects", "syscolumns", "sysindexes", "syscomments", "sysusers", "sysdatabases",
+    "sysconstraints", "sysreferences", "sysforeignkeys", "systypes",
+    "inserted", "deleted",
+    "openjson", "openrowset", "openquery", "opendatasource", "openxml", "string_split",
+    "generate_series", "unnest", "json_array_elements", "jsonb_array_elements",
+))
+SYSTEM_PREFIXES = ("pg_", "xp_")
+
+# Words that end a statement when met outside parentheses
+STATEMENT_WORDS = frozenset("""
+    CREATE ALTER DROP INSERT UPDATE DELETE MERGE TRUNCATE EXEC EXECUTE PRINT DECLARE IF ELSE
+    BEGIN END GO USE RETURN WHILE RAISERROR THROW COMMIT ROLLBACK GRANT DENY REVOKE
+""".split())
+# Words that cannot be a table alias
+KEYWORDS = STATEMENT_WORDS | frozenset("""
+    AS ON WHERE JOIN INNER LEFT RIGHT FULL OUTER CROSS APPLY GROUP ORDER BY HAVING SET WITH
+    UNION EXCEPT INTERSECT VALUES OUTPUT SELECT FROM INTO USING WHEN THEN AND OR NOT TOP
+    OPTION FOR PIVOT UNPIVOT TABLESAMPLE NOLOCK ROWLOCK HOLDLOCK DEFAULT
+""".split())
+# A DML verb after one of these is part of a trigger, grant or FK clause
+VERB_CONTEXT_WORDS = frozenset(("ON", "FOR", "AFTER", "OF", "GRANT", "DENY", "REVOKE", "INSTEAD"))
+# FROM after one of these names a cursor or is part of EXTRACT(... FROM x)
+NOT_SOURCE_WORDS = frozenset((
+    "NEXT", "PRIOR", "FIRST", "LAST", "ABSOLUTE", "RELATIVE", "FETCH",
+    "YEAR", "MONTH", "DAY", "HOUR", "MINUTE", "SECOND", "EPOCH", "DOW", "DOY", "WEEK", "QUARTER",
+))
+
+
+# ----------------------------------------------------------------------
+# Lexer
+# ----------------------------------------------------------------------
+
+def tokenize(text, first_line=1):
+    """Tokens of ``text`` as ``(kind, key, value, line)``.
+
+    ``key`` is the upper-cased word for unquoted words and punctuation and
+    None otherwise; ``value`` is the identifier without its quotes or the
+    string contents with doubled quotes undone. A GO batch separator comes
+    back as a ``;``.
+    """
+    tokens = []
+    append = tokens.append
+    line = first_line
+    counted = 0
+    pos = 0
+    end = len(text)
+    match = _TOKEN.match
+    while pos < end:
+        m = match(text, pos)
+        if m is None:
+            break
+        group = m.lastgroup
+        start = m.start(group)
+        line += text.count("\n", counted, start)
+        counted = start
+        pos = m.end()
+        if group == "word":
+            word = m.group(group)
+            key = word.upper()
+            if key == "GO" and _alone_on_line(text, start, pos):
+                append((PUNCT, ";", ";", line))
+            else:
+                append((WORD, key, word, line))
+        elif group == "bracketed":
+            append((QUOTED, None, m.group(group)[1:-1].replace("]]", "]"), line))
+        elif group == "quoted":
+            append((QUOTED, None, m.group(group)[1:-1].replace('""', '"'), line))
+        elif group == "string":
+            literal = m.group(group)
+            append((STRING, None, literal[literal.index("'") + 1:-1].replace("''", "'"), line))
+        elif group == "punct":
+            char = m.group(group)
+            append((PUNCT, char, char, line))
+        elif group == "block_comment":
+            # T-SQL block comments nest
+            depth = 1
+            while depth:
+                edge = _COMMENT_EDGE.search(text, pos)
+                if edge is None:
+                    pos = end
+                    break
+                depth += 1 if edge.group() == "/*" else -1
+                pos = edge.end()
+    return tokens
+
+
+def _alone_on_line(text, start, end):
+    before = text.rfind("\n", 0, start) + 1
+    after = text.find("\n", end)
+    rest = text[end:] if after < 0 else text[end:after]
+    return not text[before:start].strip() and (not rest.strip() or rest.strip().isdigit()
+                                                or rest.lstrip().startswith("--"))
+
+
+# ----------------------------------------------------------------------
+# Statement reader
+# ----------------------------------------------------------------------
+
+class ScriptReader:
+    """Walks a token list and records ``[key, name, kind, verb, type, line]`` references."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.refs = []
+        self.local_names = set()
+
+    def read(self):
+        tokens = self.tokens
+        i = 0
+        while i < len(tokens):
+            kind, key, _, _ = tokens[i]
+            handler = _HANDLERS.get(key) if kind == WORD else None
+            i = handler(self, i) if handler else i + 1
+        # CTE, cursor and variable names are not objects
+        return [ref for ref in self.refs if ref[3].startswith(("CREATE", "ALTER")) or ref[0] not in self.local_names]
+
+    # -- token helpers --------------------------------------------------
+
+    def key(self, i):
+        return self.tokens[i][1] if i < len(self.tokens) else None
+
+    def word(self, i):
+        """Upper-cased word at ``i``, or None for anything else."""
+        if i < len(self.tokens) and self.tokens[i][0] == WORD:
+            return self.tokens[i][1]
+        return None
+
+    def previous(self, i):
+        return self.tokens[i - 1][1] if i > 0 else None
+
+    def name(self, i):
+        """Dotted object name at ``i``: ``(parts, next index)``, parts None when absent."""
+        tokens = self.tokens
+        parts = []
+        while i < len(tokens):
+            kind, key, value, _ = tokens[i]
+            if kind == QUOTED or (kind == WORD and (parts or key not in KEYWORDS)):
+                parts.append(value)
+                i += 1
+            elif not (parts and key == "."):
+                # A second "." (db..table) leaves the schema out
+                break
+            if self.key(i) != ".":
+                break
+            i += 1
+        return (parts or None), i
+
+    def skip_parens(self, i):
+        """Index after the parenthesised group starting at ``i``."""
+        depth = 0
+        tokens = self.tokens
+        while i < len(tokens):
+            key = tokens[i][1]
+            if key == "(":
+                depth += 1
+            elif key == ")":
+                depth -= 1
+                if depth <= 0:
+                    return i + 1
+            i += 1
+        return i
+
+    def statement_end(self, i, clauses=()):
+        """Index of the token that ends the statement continuing at ``i``.
+
+        Words in ``clauses`` only end it when an object type follows them
+        (``DROP COLUMN`` continues an ALTER TABLE, ``DROP TABLE`` does not).
+        """
+        tokens = self.tokens
+        depth = cases = 0
+        while i < len(tokens):
+            kind, key, _, _ = tokens[i]
+            if key == "(":
+                depth += 1
+            elif key == ")":
+                depth -= 1
+                if depth < 0:
+                    return i
+            elif kind == WORD and key == "CASE":
+                cases += 1
+            elif kind == WORD and key == "END" and cases:
+                cases -= 1
+            elif depth == 0 and (key == ";" or (kind == WORD and key in STATEMENT_WORDS and not cases)):
+                if key not in clauses or self.word(i + 1) in OBJECT_TYPES:
+                    return i
+            i += 1
+        return i
+
+    def aliases(self, i, end):
+        """``{alias: parts}`` for the FROM/JOIN sources in ``[i, end)``."""
+        found = {}
+        while i < end:
+            if self.word(i) in ("FROM", "JOIN") or (self.key(i) == "," and found):
+                parts, j = self.name(i + 1)
+                if parts:
+                    alias, j = self.alias(j)
+                    if alias:
+                        found[alias.upper()] = parts
+                    i = j
+                    continue
+            i += 1
+        return found
+
+    def alias(self, i):
+        """Table alias at ``i`` (after an optional AS): ``(alias, next index)``."""
+        if self.word(i) == "AS":
+            i += 1
+        if i < len(self.tokens):
+            kind, key, value, _ = self.tokens[i]
+            if kind == QUOTED or (kind == WORD and key not in KEYWORDS and not value.startswith(("@", "#"))):
+                return value, i + 1
+        return None, i
+
+    def add(self, parts, kind, verb, line, object_type=""):
+        if not parts:
+            return
+        name = parts[-1]
+        if name.startswith(("#", "@")) or name.lower() in SYSTEM_NAMES or name.lower().startswith(SYSTEM_PREFIXES):
+            return
+        if len(parts) > 1 and parts[-2].upper() in SYSTEM_SCHEMAS:
+            return
+        self.refs.append([name.lower(), ".".join(parts), kind, verb, object_type, line])
+
+    def line(self, i):
+        return self.tokens[min(i, len(self.tokens) - 1)][3]
+
+    # -- handlers: each takes the verb's index and returns where to resume
+
+    def create(self, i):
+        start = i
+        i += 1
+        if self.word(i) == "OR" and self.word(i + 1) in ("ALTER", "REPLACE"):
+            i += 2
+        while self.word(i) in ("UNIQUE", "CLUSTERED", "NONCLUSTERED", "MATERIALIZED"):
+            i += 1
+        return self._define(start, i, "CREATE")
+
+    def alter(self, i):
+        start = i
+        type_word = self.word(i + 1)
+        if type_word == "TABLE":
+            parts, j = self.name(i + 2)
+            end = self.statement_end(j, clauses=("ADD", "ALTER", "DROP"))
+            drops = any(self.word(k) == "DROP" for k in range(j, end))
+            if drops:
+                self.add(parts, DESTRUCTIVE, "ALTER TABLE DROP", self.line(start), "table")
+            else:
+                self.add(parts, DDL, "ALTER TABLE", self.line(start), "table")
+            # Skip the DROP/ALTER COLUMN clauses; REFERENCES inside are still read
+            k = j
+            while k < end:
+                if self.word(k) == "REFERENCES":
+                    k = self.references(k)
+                else:
+                    k += 1
+            return end
+        return self._define(start, i + 1, "ALTER")
+
+    def _define(self, start, i, verb):
+        type_word = self.word(i)
+        object_type = OBJECT_TYPES.get(type_word)
+        if object_type is None:
+            return i
+        parts, i = self.name(i + 1)
+        line = self.line(start)
+        if type_word in ON_TABLE_TYPES:
+            if self.word(i) == "ON":
+                table, i = self.name(i + 1)
+                self.add(table, DDL, f"{verb} {type_word}", line, "table")
+            if type_word == "TRIGGER":
+                self.add(parts, DDL, f"{verb} TRIGGER", line, object_type)
+            return i
+        self.add(parts, DDL, f"{verb} {type_word if type_word != 'PROC' else 'PROCEDURE'}", line, object_type)
+        return i
+
+    def drop(self, i):
+        start = i
+        type_word = self.word(i + 1)
+        object_type = OBJECT_TYPES.get(type_word)
+        if object_type is None:
+            # DROP COLUMN / CONSTRAINT belong to an ALTER TABLE
+            return i + 1
+        i += 2
+        if self.word(i) == "IF" and self.word(i + 1) == "EXISTS":
+            i += 2
+        verb = f"DROP {type_word if type_word != 'PROC' else 'PROCEDURE'}"
+        line = self.line(start)
+        while True:
+            parts, i = self.name(i)
+            if parts is None:
+                return i
+            if type_word in ON_TABLE_TYPES:
+                if self.word(i) == "ON":
+                    table, i = self.name(i + 1)
+                    self.add(table, DESTRUCTIVE, verb, line, "table")
+                elif type_word == "INDEX" and len(parts) > 1:
+                    # Old DROP INDEX table.index syntax
+                    self.add(parts[:-1], DESTRUCTIVE, verb, line, "table")
+                if type_word == "TRIGGER":
+                    self.add(parts, DESTRUCTIVE, verb, line, object_type)
+            else:
+                self.add(parts, DESTRUCTIVE, verb, line, object_type)
+            if self.key(i) != ",":
+                return i
+            i += 1
+
+    def truncate(self, i):
+        if self.word(i + 1) != "TABLE":
+            return i + 1
+        parts, j = self.name(i + 2)
+        self.add(parts, DESTRUCTIVE, "TRUNCATE TABLE", self.line(i), "table")
+        return j
+
+    def _top(self, i):
+        if self.word(i) == "TOP":
+            i = self.skip_parens(i + 1) if self.key(i + 1) == "(" else i + 2
+            if self.word(i) == "PERCENT":
+                i += 1
+        return i
+
+    def _dml_target(self, i, verb, kind, *, allow_from=False, allow_into=False):
+        start = i
+        if self.previous(i) in VERB_CONTEXT_WORDS or self.previous(i) == ",":
+            return i + 1
+        i = self._top(i + 1)
+        if allow_from and self.word(i) == "FROM":
+            i += 1
+        if allow_into and self.word(i) == "INTO":
+            i += 1
+        if self.key(i) == "(" or self.word(i) in ("STATISTICS", "SET"):
+            return i
+        parts, j = self.name(i)
+        if parts is None:
+            return j
+        if len(parts) == 1 and verb in ("UPDATE", "DELETE"):
+            end = self.statement_end(j)
+            parts = self.aliases(j, end).get(parts[0].upper(), parts)
+        self.add(parts, kind, verb, self.line(start), "table")
+        return j
+
+    def delete(self, i):
+        return self._dml_target(i, "DELETE", DESTRUCTIVE, allow_from=True)
+
+    def update(self, i):
+        return self._dml_target(i, "UPDATE", DML)
+
+    def insert(self, i):
+        return self._dml_target(i, "INSERT", DML, allow_into=True)
+
+    def merge(self, i):
+        return self._dml_target(i, "MERGE", DML, allow_into=True)
+
+    def select_into(self, i):
+        # INSERT/MERGE consume their own INTO; what is left is SELECT ... INTO
+        # (creates the table) or OUTPUT ... INTO table (columns)
+        parts, j = self.name(i + 1)
+        if parts and len(parts) == 2 and parts[0].upper() in ("NEW", "OLD"):
+            # PostgreSQL trigger row fields
+            return j
+        if self.key(j) == "(":
+            self.add(parts, DML, "OUTPUT INTO", self.line(i), "table")
+        else:
+            self.add(parts, DDL, "SELECT INTO", self.line(i), "table")
+        return j
+
+    def source(self, i):
+        """FROM / JOIN / USING: every comma-separated source is a read."""
+        verb = self.tokens[i][1]
+        if verb == "FROM" and self.previous(i) in NOT_SOURCE_WORDS:
+            return i + 2
+        i += 1
+        while True:
+            if self.key(i) == "(":
+                return i
+            parts, j = self.name(i)
+            if parts is None or self.key(j) == "=":
+                # FROM DISK = '...' in BACKUP/RESTORE
+                return j
+            if self.key(j) == "(":
+                # Table-valued function call
+                self.add(parts, READ, verb, self.line(i), "function")
+                j = self.skip_parens(j)
+            else:
+                self.add(parts, READ, verb, self.line(i))
+            _, j = self.alias(j)
+            if verb == "USING" or self.key(j) != ",":
+                return j
+            i = j + 1
+
+    def references(self, i):
+        parts, j = self.name(i + 1)
+        self.add(parts, READ, "REFERENCES", self.line(i), "table")
+        return j
+
+    def execute(self, i):
+        start = i
+        i += 1
+        if self.key(i) == "(":
+            return self._dynamic(i + 1, start)
+        if self.word(i) and self.tokens[i][2].startswith("@") and self.key(i + 1) == "=":
+            i += 2
+        elif self.word(i) in ("FUNCTION", "PROCEDURE"):
+            # EXECUTE FUNCTION f() in a PostgreSQL trigger
+            i += 1
+        parts, j = self.name(i)
+        if parts is None:
+            return j
+        if parts[-1].lower() == "sp_executesql":
+            return self._dynamic(j, start)
+        self.add(parts, EXEC, "EXEC", self.line(start), "procedure")
+        return j
+
+    def _dynamic(self, i, start):
+        """Index the string literals of EXEC('...') / sp_executesql N'...'."""
+        tokens = self.tokens
+        while i < len(tokens) and (tokens[i][0] == STRING or tokens[i][1] == "+"):
+            kind, _, value, line = tokens[i]
+            if kind == STRING:
+                inner = ScriptReader(tokenize(value, line))
+                for ref in inner.read():
+                    ref[3] = f"{ref[3]} (dynamic)"
+                    self.refs.append(ref)
+                self.local_names |= inner.local_names
+            i += 1
+        return i
+
+    def with_clause(self, i):
+        # WITH name [(columns)] AS ( ... ) [, name AS ( ... )] declares CTEs.
+        # All names are recorded first, then reading resumes inside the first
+        # body so the tables the CTEs read are indexed too
+        i += 1
+        body = None
+        while True:
+            parts, j = self.name(i)
+            if parts is None or len(parts) != 1:
+                break
+            if self.key(j) == "(":
+                j = self.skip_parens(j)
+            if self.word(j) != "AS" or self.key(j + 1) != "(":
+                break
+            self.local_names.add(parts[0].lower())
+            if body is None:
+                body = j + 2
+            j = self.skip_parens(j + 1)
+            if self.key(j) != ",":
+                break
+            i = j + 1
+        return i if body is None else body
+
+    def declare(self, i):
+        # DECLARE name CURSOR: later FETCH ... FROM name is not a table
+        if self.word(i + 2) == "CURSOR" or (self.word(i + 2) == "INSENSITIVE" and self.word(i + 3) == "CURSOR"):
+            self.local_names.add(self.tokens[i + 1][2].lower())
+            return i + 1
+        # A PostgreSQL DECLARE block: "name type;" entries up to BEGIN, read
+        # by SELECT ... INTO name later
+        i += 1
+        while self.word(i) and self.word(i) != "BEGIN" and not self.tokens[i][2].startswith("@"):
+            self.local_names.add(self.tokens[i][2].lower())
+            while i < len(self.tokens) and self.key(i) != ";":
+                i += 1
+            i += 1
+        return i
+
+
+_HANDLERS = {
+    "CREATE": ScriptReader.create,
+    "ALTER": ScriptReader.alter,
+    "DROP": ScriptReader.drop,
+    "TRUNCATE": ScriptReader.truncate,
+    "DELETE": ScriptReader.delete,
+    "UPDATE": ScriptReader.update,
+    "INSERT": ScriptReader.insert,
+    "MERGE": ScriptReader.merge,
+    "INTO": ScriptReader.select_into,
+    "FROM": ScriptReader.source,
+    "JOIN": ScriptReader.source,
+    "USING": ScriptReader.source,
+    "REFERENCES": ScriptReader.references,
+    "EXEC": ScriptReader.execute,
+    "EXECUTE": ScriptReader.execute,
+    "WITH": ScriptReader.with_clause,
+    "DECLARE": ScriptReader.declare,
+}
+
+
+def decode(data):
+    """Script text from bytes: UTF-16 with a BOM (SSMS exports), else UTF-8."""
+    if data[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return data.decode("utf-16", errors="replace")
+    return data.decode("utf-8-sig", errors="replace")
+
+
+def index_script(path):
+    """``(path, references)`` of one script; runs in worker processes."""
+    with open(path, "rb") as f:
+        text = decode(f.read())
+    return path, ScriptReader(tokenize(text)).read()
+
+
+# ----------------------------------------------------------------------
+# Cached corpus index
+# ----------------------------------------------------------------------
+
+class SqlIndex:
+    """Per-script references plus the object -> references inversion."""
+
+    def __init__(self, root, pattern=DEFAULT_PATTERN, cache=None):
+        self.root = Path(root)
+        self.pattern = pattern
+        self.cache = Path(cache) if cache else self.root / DEFAULT_CACHE
+        self.files = {}
+        self.stats = {"scripts": 0, "stat_unchanged": 0, "hash_unchanged": 0, "tokenized": 0, "removed": 0}
+
+    def load(self):
+        try:
+            with open(self.cache, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        if data.get("version") == CACHE_VERSION and data.get("pattern") == self.pattern:
+            self.files = data["files"]
+        return self
+
+    def save(self):
+        tmp = Path(str(self.cache) + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "pattern": self.pattern, "files": self.files},
+                      f, separators=(",", ":"))
+        tmp.replace(self.cache)
+
+    def update(self, jobs=None):
+        """Bring the index in line with the scripts on disk; returns True when it changed."""
+        changed = False
+        current = {}
+        pending = []
+        with phase("scan"):
+            for path in sorted(self.root.glob(self.pattern)):
+                if not path.is_file():
+                    continue
+                rel = path.relative_to(self.root).as_posix()
+                st = path.stat()
+                entry = self.files.get(rel)
+                if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                    current[rel] = entry
+                    self.stats["stat_unchanged"] += 1
+                    continue
+                with open(path, "rb") as f:
+                    digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+                changed = True
+                if entry and entry["hash"] == digest:
+                    entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+                    current[rel] = entry
+                    self.stats["hash_unchanged"] += 1
+                    continue
+                current[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest, "refs": []}
+                pending.append(rel)
+        self.stats["removed"] = len(set(self.files) - set(current))
+        changed = changed or bool(self.stats["removed"])
+
+        with phase("tokenize"):
+            paths = [str(self.root / rel) for rel in pending]
+            jobs = jobs or min(len(paths), os.cpu_count() or 1)
+            if jobs > 1 and len(paths) >= PARALLEL_MIN_FILES:
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    results = list(pool.map(index_script, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+            else:
+                results = [index_script(path) for path in paths]
+        for rel, (_, refs) in zip(pending, results):
+            current[rel]["refs"] = refs
+        self.files = current
+        self.stats["scripts"] = len(current)
+        self.stats["tokenized"] = len(pending)
+        count("scripts_tokenized", len(pending))
+        return changed
+
+    def objects(self):
+        """``{object key: [(script, ref), ...]}`` over every script."""
+        inverted = defaultdict(list)
+        for rel, entry in self.files.items():
+            for ref in entry["refs"]:
+                inverted[ref[0]].append((rel, ref))
+        return inverted
+
+    def query(self, patterns, kinds=KINDS):
+        """``{object key: [(script, ref), ...]}`` for keys matching any of ``patterns``."""
+        inverted = self.objects()
+        wanted = [p.lower().split(".")[-1].strip("[]\"") for p in patterns]
+        result = {}
+        for key in sorted(inverted):
+            if any(key == p or fnmatch.fnmatchcase(key, p) for p in wanted):
+                hits = [(rel, ref) for rel, ref in inverted[key] if ref[2] in kinds]
+                if hits:
+                    result[key] = hits
+        return result
+
+
+def object_type(hits):
+    types = {ref[4] for _, ref in hits if ref[4]}
+    for preferred in ("table", "view", "procedure", "function", "trigger", "synonym", "type", "policy"):
+        if preferred in types:
+            return preferred
+    return "object"
+
+
+def print_object(key, hits):
+    scripts = sorted({rel for rel, _ in hits})
+    print(f"📄 {key} ({object_type(hits)}) - {len(scripts)} script(s)")
+    by_script = defaultdict(list)
+    for rel, ref in hits:
+        by_script[rel].append(ref)
+    order = {kind: n for n, kind in enumerate((DESTRUCTIVE, DDL, DML, EXEC, READ))}
+    for rel in sorted(by_script, key=lambda r: (min(order[ref[2]] for ref in by_script[r]), r.lower())):
+        refs = by_script[rel]
+        verbs = []
+        for ref in sorted(refs, key=lambda ref: (order[ref[2]], ref[5])):
+            label = f"{ref[3]}:{ref[5]}"
+            if label not in verbs:
+                verbs.append(label)
+        kinds = sorted({ref[2] for ref in refs}, key=order.get)
+        shown = ", ".join(verbs[:6]) + (f", … (+{len(verbs) - 6})" if len(verbs) > 6 else "")
+        print(f"   {'/'.join(kinds):<18} {rel}  {shown}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Which SQL scripts create, change, drop or read an object")
+    parser.add_argument("objects", nargs="*", help="object names or patterns (stock_issuance_*, dbo.tenders)")
+    parser.add_argument("--root", default=".", help="directory holding the scripts")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help="glob of scripts under --root")
+    parser.add_argument("--kind", default=",".join(KINDS), help="comma-separated: " + ", ".join(KINDS))
+    parser.add_argument("--script", help="list what one script touches instead")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cached index")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--json", action="store_true", help="print matches as JSON")
+    args = parser.parse_args(argv)
+
+    kinds = tuple(k.strip() for k in args.kind.split(",") if k.strip())
+    unknown = sorted(set(kinds) - set(KINDS))
+    if unknown:
+        raise SystemExit(f"Unknown kind(s): {', '.join(unknown)}; kinds: {', '.join(KINDS)}")
+    if not Path(args.root).is_dir():
+        raise SystemExit(f"Not a directory: {args.root}")
+
+    index = SqlIndex(args.root, args.pattern)
+    if not args.rebuild:
+        index.load()
+    if index.update(args.jobs):
+        with phase("save"):
+            index.save()
+    stats = index.stats
+
+    if args.script:
+        entry = index.files.get(Path(args.script).as_posix())
+        if entry is None:
+            raise SystemExit(f"Not an indexed script: {args.script}")
+        refs = [ref for ref in entry["refs"] if ref[2] in kinds]
+        if args.json:
+            print(json.dumps(refs, indent=2))
+            return 0
+        for key in sorted({ref[0] for ref in refs}):
+            print_object(key, [(args.script, ref) for ref in refs if ref[0] == key])
+        return 0
+
+    if not args.objects:
+        objects = index.objects()
+        destructive = sorted(((len({rel for rel, ref in hits if ref[2] == DESTRUCTIVE}), key)
+                              for key, hits in objects.items()), reverse=True)
+        print(f"📊 {stats['scripts']} scripts, {len(objects):,} objects "
+              f"({stats['tokenized']} tokenized, {stats['hash_unchanged']} touched but unchanged, "
+              f"{stats['removed']} removed)")
+        print("⚠️  Objects changed destructively by the most scripts:")
+        for scripts, key in [item for item in destructive if item[0]][:10]:
+            print(f"   {scripts:>3}  {key}")
+        return 0
+
+    matches = index.query(args.objects, kinds)
+    if args.json:
+        print(json.dumps({key: [{"script": rel, "name": ref[1], "kind": ref[2], "verb": ref[3],
+                                 "type": ref[4], "line": ref[5]} for rel, ref in hits]
+                          for key, hits in matches.items()}, indent=2))
+        return 0 if matches else 1
+    if not matches:
+        print(f"ℹ️  No script references {', '.join(args.objects)}")
+        return 1
+    for key, hits in matches.items():
+        print_object(key, hits)
+    return 0
+
+
+if __name__ == "__main__":
+    with profiled("sql_index"):
+        sys.exit(main())
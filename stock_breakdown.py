@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Offline stock breakdown engine mirroring GET /api/inventory/stock-breakdown.
+
+Reads item_masters, categories, sub_categories, stock_acquisitions,
+current_inventory_stock and stock_issuance_requests/items from CSV exports or
+a SQLite stand-in (see ims_tables.py) and computes the same opening balance /
+new acquisition / issued figures per item as the SQL CTE, so the report
+generators and offline audits never have to query SQL Server.
+
+Ledger rows are loaded into typed columns and reduced with a factorised
+group-by. Every applied row's contribution is kept in the snapshot, so an
+incremental refresh only loads rows changed since the last run and applies
+their difference.
+
+Usage:
+    python stock_breakdown.py <source> [--snapshot FILE] [--incremental]
+                              [--out FILE.csv|FILE.json] [--search TEXT]
+                              [--category-id ID] [--low-stock] [--show-zero-stock]
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+from pathlib import Path
+
+from ims_tables import factorize, group_sum, iter_rows, load_columns, norm_id, table_exists, to_flag, to_number
+
+DEFAULT_SNAPSHOT = "stock-breakdown.snapshot.json"
+SNAPSHOT_VERSION = 1
+
+ISSUED_STATUSES = ("ISSUED", "COMPLETED")
+LOW_STOCK_THRESHOLD = 10
+
+# Per-item accumulator layout
+OPENING, NEW, RECEIVED, SA_ISSUED, COUNT, OPENING_COUNT, NEW_COUNT, ISSUED_REQUESTS = range(8)
+TOTAL_FIELDS = 8
+
+OUTPUT_COLUMNS = [
+    "item_master_id", "nomenclature", "item_code", "unit", "specifications",
+    "category_id", "category_name", "sub_category_id", "sub_category_name",
+    "opening_balance_quantity", "new_acquisition_quantity", "total_quantity",
+    "total_received", "total_issued", "last_transaction_date",
+    "acquisition_count", "opening_balance_count", "new_acquisition_count",
+]
+
+
+def _acquisition_kind(number):
+    """'OPB' for opening balance rows, 'NEW' for other numbered rows, None otherwise."""
+    if number is None:
+        return None
+    return "OPB" if number.upper().startswith("OPB-") else "NEW"
+
+
+def _acquisition_contribution(kind, received, issued):
+    net = received - issued
+    return (
+        net if kind == "OPB" else 0.0,
+        net if kind == "NEW" else 0.0,
+        received,
+        issued,
+        1.0,
+        1.0 if kind == "OPB" else 0.0,
+        1.0 if kind == "NEW" else 0.0,
+        0.0,
+    )
+
+
+def _zero_nan(value):
+    return 0.0 if math.isnan(value) else value
+
+
+class StockBreakdown:
+    """Per-item stock totals plus the row contributions they were built from."""
+
+    def __init__(self):
+        self.watermarks = {}
+        self.issued_requests = set()
+        self.acquisitions = {}   # acquisition id -> [item, kind, received, issued]
+        self.issuances = {}      # issuance item id -> [item, quantity]
+        self.totals = {}         # item id -> [TOTAL_FIELDS floats]
+        self.last_update = {}    # item id -> latest stock_acquisitions.updated_at
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version in {path}: {data.get('version')}")
+        state = cls()
+        state.watermarks = data["watermarks"]
+        state.issued_requests = set(data["issued_requests"])
+        state.acquisitions = data["acquisitions"]
+        state.issuances = data["issuances"]
+        state.totals = data["totals"]
+        state.last_update = data["last_update"]
+        return state
+
+    def save(self, path):
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "watermarks": self.watermarks,
+            "issued_requests": sorted(self.issued_requests),
+            "acquisitions": self.acquisitions,
+            "issuances": self.issuances,
+            "totals": self.totals,
+            "last_update": self.last_update,
+        }
+        tmp = Path(str(path) + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        tmp.replace(path)
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, source):
+        """Apply ledger rows changed since the stored watermarks.
+
+        On an empty state this is a full build. Returns a dict with the
+        number of rows applied per table.
+        """
+        applied_req, flipped_requests = self._refresh_requests(source)
+        applied_acq = self._refresh_acquisitions(source)
+        applied_iss = self._refresh_issuances(source, flipped_requests)
+        return {
+            "stock_issuance_requests": applied_req,
+            "stock_acquisitions": applied_acq,
+            "stock_issuance_items": applied_iss,
+        }
+
+    def _since(self, table):
+        return ("updated_at", self.watermarks.get(table))
+
+    # Reads are inclusive of the watermark: exported stamps are only second-
+    # or minute-precise, so a row saved later can carry the stamp of the last
+    # row applied. Contributions are keyed by row id, so re-reading is harmless.
+
+    def _advance(self, table, stamps):
+        stamps = [s for s in stamps if s is not None]
+        if stamps:
+            latest = max(stamps)
+            current = self.watermarks.get(table)
+            if current is None or latest > current:
+                self.watermarks[table] = latest
+
+    def _refresh_requests(self, source):
+        """Apply request status changes; returns (rows read, ids whose issued state flipped)."""
+        table = "stock_issuance_requests"
+        flipped = set()
+        stamps = []
+        for req_id, status, updated_at in iter_rows(
+            source, table, ["id", "approval_status", "updated_at"], self._since(table), inclusive=True
+        ):
+            key = norm_id(req_id)
+            if key is None:
+                continue
+            stamps.append(updated_at)
+            was_issued = key in self.issued_requests
+            if (status or "").strip().upper() in ISSUED_STATUSES:
+                self.issued_requests.add(key)
+            else:
+                self.issued_requests.discard(key)
+            if was_issued != (key in self.issued_requests):
+                flipped.add(key)
+        self._advance(table, stamps)
+        return len(stamps), flipped
+
+    def _refresh_acquisitions(self, source):
+        table = "stock_acquisitions"
+        cols = load_columns(source, table, {
+            "id": "id",
+            "acquisition_number": "s",
+            "item_master_id": "id",
+            "quantity_received": "d",
+            "quantity_issued": "d",
+            "updated_at": "s",
+        }, self._since(table), inclusive=True)
+
+        delta_items = []
+        delta_rows = []
+        for acq_id, number, item, received, issued, updated_at in zip(
+            cols["id"], cols["acquisition_number"], cols["item_master_id"],
+            cols["quantity_received"], cols["quantity_issued"], cols["updated_at"],
+        ):
+            if acq_id is None:
+                continue
+            old = self.acquisitions.get(acq_id)
+            if old is not None:
+                delta_items.append(old[0])
+                delta_rows.append(tuple(-v for v in _acquisition_contribution(*old[1:])))
+            kind = _acquisition_kind(number)
+            received = _zero_nan(received)
+            issued = _zero_nan(issued)
+            self.acquisitions[acq_id] = [item, kind, received, issued]
+            delta_items.append(item)
+            delta_rows.append(_acquisition_contribution(kind, received, issued))
+            if item is not None and updated_at is not None:
+                if updated_at > self.last_update.get(item, ""):
+                    self.last_update[item] = updated_at
+
+        self._apply_deltas(delta_items, delta_rows)
+        self._advance(table, cols["updated_at"])
+        return len(cols["id"])
+
+    def _refresh_issuances(self, source, flipped_requests):
+        table = "stock_issuance_items"
+        names = ["id", "request_id", "item_master_id", "issued_quantity",
+                 "requested_quantity", "is_deleted", "updated_at"]
+        pending = {}
+        for row in iter_rows(source, table, names, self._since(table), inclusive=True):
+            pending[norm_id(row[0])] = row
+        # A request that just moved to or from ISSUED changes its items'
+        # contribution without touching the items themselves.
+        if flipped_requests and self.watermarks.get(table) is not None:
+            for row in iter_rows(source, table, names):
+                if norm_id(row[1]) in flipped_requests:
+                    pending[norm_id(row[0])] = row
+
+        delta_items = []
+        delta_rows = []
+        for item_id, (_, request_id, item, issued, requested, is_deleted, _) in pending.items():
+            if item_id is None:
+                continue
+            item = norm_id(item)
+            quantity = 0.0
+            if not to_flag(is_deleted) and norm_id(request_id) in self.issued_requests:
+                quantity = to_number(issued)
+                if quantity is None:
+                    quantity = to_number(requested) or 0.0
+            old = self.issuances.pop(item_id, None)
+            if old is not None:
+                delta_items.append(old[0])
+                delta_rows.append((0.0,) * ISSUED_REQUESTS + (-old[1],))
+            if quantity:
+                self.issuances[item_id] = [item, float(quantity)]
+                delta_items.append(item)
+                delta_rows.append((0.0,) * ISSUED_REQUESTS + (float(quantity),))
+
+        self._apply_deltas(delta_items, delta_rows)
+        self._advance(table, [row[6] for row in pending.values()])
+        return len(pending)
+
+    def _apply_deltas(self, items, rows):
+        """Group-sum the delta rows per item and fold them into the totals."""
+        if not rows:
+            return
+        codes, index = factorize(items)
+        size = len(index)
+        sums = [group_sum(codes, column, size) for column in zip(*rows)]
+        for item, code in index.items():
+            totals = self.totals.get(item)
+            if totals is None:
+                totals = self.totals[item] = [0.0] * TOTAL_FIELDS
+            for field in range(TOTAL_FIELDS):
+                totals[field] += sums[field][code]
+
+    # ------------------------------------------------------------------
+    # Report
+    # ------------------------------------------------------------------
+
+    def report(self, source, search=None, category_id=None, low_stock=False, show_zero_stock=False):
+        """Return the stock-breakdown rows exactly as the API endpoint would."""
+        categories = dict(iter_rows(source, "categories", ["id", "category_name"]))
+        category_keys = {norm_id(k): k for k in categories}
+        sub_categories = dict(iter_rows(source, "sub_categories", ["id", "sub_category_name"]))
+        sub_category_keys = {norm_id(k): k for k in sub_categories}
+
+        current_stock = {}
+        if table_exists(source, "current_inventory_stock"):
+            for item, quantity, last_updated in iter_rows(
+                source, "current_inventory_stock", ["item_master_id", "current_quantity", "last_updated"]
+            ):
+                current_stock[norm_id(item)] = (to_number(quantity) or 0.0, last_updated)
+
+        needle = search.lower() if search else None
+        wanted_category = norm_id(category_id)
+        rows = []
+        for item_id, nomenclature, item_code, unit, specs, cat_id, sub_id in iter_rows(
+            source, "item_masters",
+            ["id", "nomenclature", "item_code", "unit", "specifications", "category_id", "sub_category_id"],
+        ):
+            key = norm_id(item_id)
+            if needle and needle not in (nomenclature or "").lower() and needle not in (item_code or "").lower():
+                continue
+            cat_key = category_keys.get(norm_id(cat_id))
+            if wanted_category and norm_id(cat_key) != wanted_category:
+                continue
+            sub_key = sub_category_keys.get(norm_id(sub_id))
+
+            totals = self.totals.get(key) or [0.0] * TOTAL_FIELDS
+            cis_quantity, cis_updated = current_stock.get(key, (0.0, None))
+            issued_requests = totals[ISSUED_REQUESTS]
+            total_issued = max(totals[SA_ISSUED], issued_requests)
+
+            if totals[COUNT] > 0:
+                new_quantity = totals[NEW]
+                total_quantity = max(totals[RECEIVED] - total_issued, 0.0)
+            else:
+                new_quantity = total_quantity = max(cis_quantity - issued_requests, 0.0)
+
+            last_acq = self.last_update.get(key)
+            if last_acq is not None and (cis_updated is None or last_acq > cis_updated):
+                last_transaction = last_acq
+            else:
+                last_transaction = cis_updated
+
+            if low_stock and not (0 < total_quantity < LOW_STOCK_THRESHOLD):
+                continue
+            if not show_zero_stock and total_quantity <= 0:
+                continue
+
+            rows.append({
+                "item_master_id": item_id,
+                "nomenclature": nomenclature,
+                "item_code": item_code,
+                "unit": unit,
+                "specifications": specs,
+                "category_id": cat_key,
+                "category_name": categories.get(cat_key),
+                "sub_category_id": sub_key,
+                "sub_category_name": sub_categories.get(sub_key),
+                "opening_balance_quantity": totals[OPENING],
+                "new_acquisition_quantity": new_quantity,
+                "total_quantity": total_quantity,
+                "total_received": totals[RECEIVED],
+                "total_issued": total_issued,
+                "last_transaction_date": last_transaction,
+                "acquisition_count": int(totals[COUNT]),
+                "opening_balance_count": int(totals[OPENING_COUNT]),
+                "new_acquisition_count": int(totals[NEW_COUNT]),
+            })
+
+        rows.sort(key=lambda r: (r["total_quantity"], r["nomenclature"] or ""))
+        return rows
+
+
+def build(source, snapshot=None, incremental=False):
+    """Load (or build) the breakdown state for ``source``.
+
+    With ``incremental`` and an existing ``snapshot`` file only changed rows
+    are applied; otherwise the state is rebuilt from scratch. The snapshot is
+    written back when a path is given.
+    """
+    if incremental and snapshot and Path(snapshot).exists():
+        state = StockBreakdown.load(snapshot)
+    else:
+        state = StockBreakdown()
+    applied = state.refresh(source)
+    if snapshot:
+        state.save(snapshot)
+    return state, applied
+
+
+def write_rows(rows, out):
+    if str(out).lower().endswith(".json"):
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump({"success": True, "inventory": rows, "total": len(rows)}, f, indent=2)
+        return
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline /api/inventory/stock-breakdown")
+    parser.add_argument("source", help="CSV export directory or SQLite stand-in database")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT, help="persisted state file")
+    parser.add_argument("--incremental", action="store_true", help="apply only rows changed since the snapshot")
+    parser.add_argument("--out", help="write rows to .csv or .json")
+    parser.add_argument("--search")
+    parser.add_argument("--category-id")
+    parser.add_argument("--low-stock", action="store_true")
+    parser.add_argument("--show-zero-stock", action="store_true")
+    args = parser.parse_args(argv)
+
+    state, applied = build(args.source, args.snapshot, args.incremental)
+    rows = state.report(
+        args.source,
+        search=args.search,
+        category_id=args.category_id,
+        low_stock=args.low_stock,
+        show_zero_stock=args.show_zero_stock,
+    )
+    print("Applied rows: " + ", ".join(f"{table}={count}" for table, count in applied.items()))
+    if args.out:
+        write_rows(rows, args.out)
+        print(f"Created: {args.out}")
+    print(f"Items in breakdown: {len(rows)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Incremental po_reconciliation runs must match a rebuild from scratch.
+
+Run with ``python -m unittest discover tests`` (or pytest) from the repository root.
+"""
+
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import po_reconciliation  # noqa: E402
+
+SCHEMA = {
+    "item_masters": ["id", "item_code", "nomenclature", "unit"],
+    "purchase_orders": ["id", "po_number", "updated_at"],
+    "purchase_order_items": ["id", "po_id", "item_master_id", "quantity", "unit_price", "updated_at"],
+    "deliveries": ["id", "po_id", "delivery_number", "delivery_date", "delivery_status", "is_deleted", "updated_at"],
+    "delivery_items": ["id", "delivery_id", "po_item_id", "item_master_id", "delivery_qty", "quality_status",
+                       "is_deleted", "updated_at"],
+    "stock_acquisitions": ["id", "delivery_id", "item_master_id", "quantity_received", "updated_at"],
+}
+
+
+class IncrementalMatchesRebuild(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = str(Path(self.tmp.name) / "ims.db")
+        self.state = str(Path(self.tmp.name) / "po.state.json")
+        with sqlite3.connect(self.db) as conn:
+            for table, columns in SCHEMA.items():
+                conn.execute(f'CREATE TABLE "{table}" ({", ".join(columns)})')
+            self.insert(conn, "item_masters", ("I1", "ITM-1", "Toner", "Each"), ("I2", "ITM-2", "Paper", "Ream"))
+            self.insert(conn, "purchase_orders", ("P1", "PO-1", "2026-01-01 10:00:00"),
+                        ("P2", "PO-2", "2026-01-01 10:00:00"))
+            self.insert(conn, "purchase_order_items", ("L1", "P1", "I1", 10, 5.0, "2026-01-01 10:00:00"))
+            self.insert(conn, "deliveries", ("D1", "P1", "DEL-1", "2026-01-02", "COMPLETED", 0, "2026-01-02 10:00:00"))
+            # X1 is saved without a po_item_id and only matches once P1 orders I2;
+            # X0 moves the delivery_items watermark past it
+            self.insert(conn, "delivery_items",
+                        ("X0", "D1", "L1", "I1", 10, "ACCEPTED", 0, "2026-01-02 12:00:00"),
+                        ("X1", "D1", None, "I2", 4, "ACCEPTED", 0, "2026-01-02 10:00:00"))
+            self.insert(conn, "stock_acquisitions", ("A1", "D1", "I1", 10, "2026-01-03 10:00:00"))
+        po_reconciliation.build(self.db, self.state)
+
+    @staticmethod
+    def insert(conn, table, *rows):
+        marks = ", ".join("?" * len(SCHEMA[table]))
+        conn.executemany(f'INSERT INTO "{table}" VALUES ({marks})', rows)
+
+    def assertMatchesRebuild(self):
+        incremental, _ = po_reconciliation.build(self.db, self.state, incremental=True)
+        rebuilt, _ = po_reconciliation.build(self.db)
+        got, expected = incremental.report(self.db), rebuilt.report(self.db)
+        for key in ("summary", "po_lines", "receipts"):
+            self.assertEqual(got[key], expected[key], key)
+        return got["summary"]
+
+    def test_late_po_line_rematches_saved_delivery_lines(self):
+        with sqlite3.connect(self.db) as conn:
+            self.insert(conn, "purchase_order_items", ("L2", "P1", "I2", 4, 2.0, "2026-02-01 10:00:00"))
+        summary = self.assertMatchesRebuild()
+        self.assertEqual((summary["matched"], summary["under"], summary["unmatched"]), (2, 0, 0))
+
+    def test_delivery_moved_to_another_po_rematches_its_lines(self):
+        with sqlite3.connect(self.db) as conn:
+            self.insert(conn, "purchase_order_items", ("L3", "P2", "I2", 4, 2.0, "2026-01-01 10:00:00"))
+            conn.execute("UPDATE deliveries SET po_id = 'P2', updated_at = '2026-02-01 10:00:00' WHERE id = 'D1'")
+        self.assertMatchesRebuild()
+
+
+if __name__ == "__main__":
+    unittest.main()
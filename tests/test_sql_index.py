@@ -0,0 +1,44 @@
+"""Tables read inside CTE bodies must be indexed, the CTE names themselves not.
+
+Run with ``python -m unittest discover tests`` (or pytest) from the repository root.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sql_index import ScriptReader, tokenize  # noqa: E402
+
+
+def objects(text):
+    return sorted({ref[0] for ref in ScriptReader(tokenize(text)).read()})
+
+
+class CommonTableExpressions(unittest.TestCase):
+
+    def test_body_sources_are_read(self):
+        self.assertEqual(
+            objects("WITH c AS (SELECT * FROM foo JOIN stock_issuance_items s ON 1=1) SELECT * FROM c"),
+            ["foo", "stock_issuance_items"],
+        )
+
+    def test_update_through_cte(self):
+        self.assertEqual(objects(";WITH c AS (SELECT * FROM foo) UPDATE c SET x=1"), ["foo"])
+
+    def test_chained_ctes(self):
+        self.assertEqual(
+            objects("WITH a AS (SELECT * FROM t1), b (x) AS (SELECT x FROM a JOIN t2 ON 1=1) DELETE FROM b"),
+            ["t1", "t2"],
+        )
+
+    def test_clean_phantom_inventory(self):
+        with open(ROOT / "clean-phantom-inventory.sql", "r", encoding="utf-8") as f:
+            text = "".join(f.readlines()[14:36])
+        self.assertEqual(objects(text), ["current_inventory_stock", "item_masters", "stock_transactions"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Structural check of codemod output before it is written.
+
+The codemods comment JSX out by wrapping a regex match in ``{/* ... */}``.
+When the match already contains ``*/`` or a ``{/* */}`` comment, or starts
+inside one element and ends in a sibling, the rewritten TSX no longer parses
+and the Vite build fails minutes later. This module catches that in
+milliseconds with a single linear pass over the file:
+
+- a small lexer walks code, strings, template literals (with ``${}``
+  nesting), line comments and block comments, jumping from one significant
+  token to the next with a per-state regex,
+- in code it tracks ``{}``/``()``/``[]`` on a stack and the open/close
+  balance of every JSX tag name (self-closing tags and ``=>`` are handled),
+- inside block comments it records every ``/*``, since comments do not nest
+  and the first ``*/`` ends them, and it keeps the span of every block
+  comment (codemod_watch.py uses them to leave commented-out blocks alone).
+
+``validate`` compares the rewritten text with the original rather than with
+a full grammar: a rewrite may only add balanced comments, so bracket errors,
+unterminated comments, nested comment openers or a changed JSX tag balance
+that the original did not have are reported. ``<Button`` openers and
+``</Button>`` closers are counted in code only (commented-out ones do not
+count), and a rewrite that hides a different number of closers than
+openers is reported too. Lexer blind spots (regex literals, apostrophes
+in JSX text) cancel out because both versions share them.
+
+The codemods run ``validate_many`` over all of their rewrites (in parallel
+worker processes when there are several files and more than one CPU) and
+only then write the files that passed, each with ``write_atomic``.
+
+Usage:
+    python tsx_validator.py FILE [...]    # check files on their own
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+CODE, LINE_COMMENT, BLOCK_COMMENT, SINGLE, DOUBLE, TEMPLATE = range(6)
+
+_TOKENS = {
+    CODE: re.compile(r"//|/\*|</?>|</?[A-Za-z][\w.:-]*|/>|=>|['\"`{}()\[\]>/\n]"),
+    LINE_COMMENT: re.compile(r"\n"),
+    BLOCK_COMMENT: re.compile(r"\*/|/\*|\n"),
+    SINGLE: re.compile(r"\\.|['\n]", re.DOTALL),
+    DOUBLE: re.compile(r'\\.|["\n]', re.DOTALL),
+    TEMPLATE: re.compile(r"\\.|\$\{|[`\n]", re.DOTALL),
+}
+# Body of a regex literal after its opening "/", on one line
+_REGEX_BODY = re.compile(r"(?:[^\\/\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*")
+# A "/" after one of these (or a keyword like return) starts a regex, otherwise it divides
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_OPENERS = {"{": "}", "(": ")", "[": "]", "${": "}"}
+_CLOSERS = {"}", ")", "]"}
+_STATE_NAMES = {BLOCK_COMMENT: "block comment", SINGLE: "string", DOUBLE: "string", TEMPLATE: "template literal"}
+
+
+class Structure:
+    """What one lexer pass found in a TSX file."""
+
+    __slots__ = ("bracket_error", "unterminated", "nested_comments", "comments", "tags", "button_opens",
+                 "button_closes")
+
+    def __init__(self):
+        self.bracket_error = None
+        self.unterminated = None
+        self.nested_comments = []
+        self.comments = []      # (start, end) offsets of each block comment, in order
+        self.tags = Counter()
+        self.button_opens = 0
+        self.button_closes = 0
+
+
+def _starts_regex(text, slash):
+    i = slash - 1
+    while i >= 0 and text[i] in " \t\r\n":
+        i -= 1
+    if i < 0 or text[i] in _REGEX_PRECEDERS:
+        return True
+    return text[max(0, i - 5):i + 1].endswith(("return", "typeof", "case"))
+
+
+def scan(text):
+    """Lex ``text`` once and return its ``Structure``."""
+    result = Structure()
+    state = CODE
+    stack = []          # (opener, line)
+    opened_at = 1       # line the current comment/string/template started on
+    comment_start = 0   # offset of the current block comment's "/*"
+    pending_tag = None  # (name, stack depth) of a tag whose ">" has not been seen
+    tags = result.tags
+    line = 1
+    pos = 0
+    end = len(text)
+
+    while pos < end:
+        match = _TOKENS[state].search(text, pos)
+        if match is None:
+            break
+        token = match.group()
+        pos = match.end()
+        if token == "\n":
+            line += 1
+            if state == LINE_COMMENT:
+                state = CODE
+            elif state in (SINGLE, DOUBLE):
+                # Quotes cannot span lines; this was an apostrophe in JSX text
+                state = CODE
+            continue
+
+        if state == CODE:
+            if token == "//":
+                state = LINE_COMMENT
+            elif token == "/*":
+                state, opened_at, comment_start = BLOCK_COMMENT, line, match.start()
+            elif token == "'":
+                state, opened_at = SINGLE, line
+            elif token == '"':
+                state, opened_at = DOUBLE, line
+            elif token == "`":
+                state, opened_at = TEMPLATE, line
+            elif token in _OPENERS:
+                stack.append((token, line))
+            elif token in _CLOSERS:
+                if not stack:
+                    if result.bracket_error is None:
+                        result.bracket_error = (line, f"unmatched '{token}'")
+                    continue
+                opener, opener_line = stack.pop()
+                if _OPENERS[opener] != token and result.bracket_error is None:
+                    result.bracket_error = (line, f"'{token}' closes '{opener}' from line {opener_line}")
+                if opener == "${":
+                    state = TEMPLATE
+            elif token == ">":
+                if pending_tag is not None and pending_tag[1] == len(stack):
+                    tags[pending_tag[0]] += 1
+                    pending_tag = None
+            elif token == "/>":
+                if pending_tag is not None and pending_tag[1] == len(stack):
+                    pending_tag = None
+            elif token == "/":
+                if _starts_regex(text, match.start()):
+                    literal = _REGEX_BODY.match(text, pos)
+                    if literal:
+                        pos = literal.end()
+            elif token == "=>":
+                pass
+            elif token == "<>":
+                tags[""] += 1
+            elif token == "</>":
+                tags[""] -= 1
+            elif token.startswith("</"):
+                tags[token[2:]] -= 1
+                if token == "</Button":
+                    result.button_closes += 1
+            else:
+                pending_tag = (token[1:], len(stack))
+                if token == "<Button":
+                    result.button_opens += 1
+        elif state == BLOCK_COMMENT:
+            if token == "*/":
+                state = CODE
+                result.comments.append((comment_start, pos))
+            else:
+                result.nested_comments.append(line)
+        elif state == SINGLE or state == DOUBLE:
+            if token[0] == "\\":
+                line += token.count("\n")
+            else:
+                state = CODE
+        elif state == TEMPLATE:
+            if token == "`":
+                state = CODE
+            elif token == "${":
+                stack.append(("${", line))
+                state = CODE
+            else:
+                line += token.count("\n")
+
+    if state == BLOCK_COMMENT:
+        result.comments.append((comment_start, end))
+    if state in _STATE_NAMES:
+        result.unterminated = (opened_at, _STATE_NAMES[state])
+    if stack and result.bracket_error is None:
+        opener, opener_line = stack[-1]
+        result.bracket_error = (opener_line, f"'{opener}' is never closed")
+    return result
+
+
+def check(text):
+    """Problems of ``text`` on its own (no original to compare with)."""
+    found = scan(text)
+    problems = []
+    if found.unterminated:
+        problems.append(f"line {found.unterminated[0]}: unterminated {found.unterminated[1]}")
+    if found.bracket_error:
+        problems.append(f"line {found.bracket_error[0]}: {found.bracket_error[1]}")
+    for line in found.nested_comments:
+        problems.append(f"line {line}: '/*' inside a block comment")
+    return problems
+
+
+def validate(original, rewritten):
+    """Problems the rewrite introduced; an empty list means it is safe to write."""
+    before = scan(original)
+    after = scan(rewritten)
+    problems = []
+    if after.unterminated and not before.unterminated:
+        problems.append(f"line {after.unterminated[0]}: unterminated {after.unterminated[1]}")
+    if after.bracket_error and not before.bracket_error:
+        problems.append(f"line {after.bracket_error[0]}: {after.bracket_error[1]}")
+    if len(after.nested_comments) > len(before.nested_comments):
+        lines = ", ".join(str(line) for line in after.nested_comments)
+        problems.append(f"'/*' inside a block comment at line(s) {lines}")
+    for name in sorted(set(before.tags) | set(after.tags)):
+        if before.tags[name] != after.tags[name]:
+            problems.append(f"<{name or '>'}> open/close balance changed from "
+                            f"{before.tags[name]:+d} to {after.tags[name]:+d}")
+    hidden_opens = before.button_opens - after.button_opens
+    hidden_closes = before.button_closes - after.button_closes
+    if hidden_opens != hidden_closes:
+        problems.append(f"</Button> count in code changed by {-hidden_closes:+d} but <Button> count by {-hidden_opens:+d}")
+    return problems
+
+
+def _validate_task(task):
+    path, original, rewritten = task
+    return path, validate(original, rewritten)
+
+
+def validate_many(rewrites, jobs=None):
+    """``{path: problems}`` for ``[(path, original, rewritten)]``, in parallel when worthwhile."""
+    rewrites = list(rewrites)
+    jobs = jobs or min(len(rewrites), os.cpu_count() or 1)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return dict(pool.map(_validate_task, rewrites))
+    return dict(_validate_task(task) for task in rewrites)
+
+
+def write_atomic(path, content):
+    """Replace ``path`` with ``content`` via a temp file in the same directory."""
+    mode = os.stat(path).st_mode if os.path.exists(path) else None
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".codemod-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def report_rejected(rejected):
+    """Print ``{path: problems}`` for files that were not written."""
+    for path, problems in rejected.items():
+        print(f"❌ Not written, rewrite would break the TSX: {path}")
+        for problem in problems:
+            print(f"     {problem}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check TSX files for comment, bracket and tag structure")
+    parser.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            problems = check(f.read())
+        if problems:
+            failed += 1
+            print(f"❌ {path}")
+            for problem in problems:
+                print(f"     {problem}")
+        else:
+            print(f"✅ {path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())